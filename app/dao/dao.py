@@ -1,7 +1,22 @@
 import os
 from dotenv import load_dotenv
 from pathlib import Path
+import time
 import psycopg2
+import psycopg2.extensions
+
+from app.utils.metrics import DB_QUERY_SECONDS
+
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """모든 쿼리의 실행 시간을 db_query_seconds 메트릭으로 기록하는 커서"""
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            operation = query.lstrip().split(None, 1)[0].upper() if isinstance(query, str) and query.strip() else "OTHER"
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, operation=operation)
 
 class PostgresDAO:
     def __init__(self):
@@ -22,6 +37,7 @@ class PostgresDAO:
             dbname=self.db,
             user=self.user,
             password=self.password,
+            cursor_factory=TimedCursor,
         )
 
     def close(self):
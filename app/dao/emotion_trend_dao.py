@@ -0,0 +1,114 @@
+from .dao import PostgresDAO
+
+
+class EmotionTrendDAO(PostgresDAO):
+    """
+    사용자별 감정 추이 집계 테이블 (user_emotion_trend, migrations/002_emotion_trend.sql):
+    대화가 저장될 때마다 해당 대화가 속한 일(day) 버킷만 증분 갱신합니다.
+    주간 추이는 일 버킷을 다시 묶어서 계산하므로 사용자 전체 이력을 재스캔하지 않습니다.
+    감정을 분석하지 못한 문장(dominant_emotion 이 NULL)은 집계하지 않고,
+    텍스트/음성 중 한쪽 점수가 NULL 인 문장은 불일치로 세지 않습니다.
+    002 적용 이전에 저장된 대화는 rebuild_user_trend 로 사용자별로 다시 집계해야 포함됩니다.
+
+    CREATE TABLE user_emotion_trend (
+        user_uid INTEGER NOT NULL,
+        bucket_date DATE NOT NULL,
+        dominant_emotion VARCHAR(32) NOT NULL,
+        sentence_count INTEGER NOT NULL DEFAULT 0,
+        disagree_count INTEGER NOT NULL DEFAULT 0,   -- 텍스트/음성 표준 감정 불일치 문장 수
+        user_speech_ms BIGINT NOT NULL DEFAULT 0,    -- 사용자 본인 발화 시간
+        total_speech_ms BIGINT NOT NULL DEFAULT 0,   -- 전체 발화 시간
+        PRIMARY KEY (user_uid, bucket_date, dominant_emotion)
+    );
+    """
+    PERIODS = ("day", "week")
+
+    # 한 대화(master)의 상세 문장들을 (사용자, 일, 감정) 단위로 집계하는 SELECT
+    _AGGREGATE_SELECT = """
+        SELECT m.user_uid,
+               m.created_at::date AS bucket_date,
+               d.dominant_emotion,
+               COUNT(*) AS sentence_count,
+               COUNT(*) FILTER (
+                   WHERE d.text_scores IS NOT NULL AND d.audio_scores IS NOT NULL
+                     AND text_emotion_standard(d.text_scores) <> audio_emotion_standard(d.audio_scores)
+               ) AS disagree_count,
+               COALESCE(SUM(d.end_ms - d.start_ms) FILTER (WHERE d.is_user), 0) AS user_speech_ms,
+               COALESCE(SUM(d.end_ms - d.start_ms), 0) AS total_speech_ms
+        FROM user_conversation_detail d
+        JOIN user_conversation_master m ON d.master_uid = m.uid
+    """
+
+    def add_conversation_to_trend(self, master_uid: int):
+        """새로 저장된 대화 하나의 집계값을 해당 버킷에 더합니다."""
+        query = f"""
+            INSERT INTO user_emotion_trend
+                (user_uid, bucket_date, dominant_emotion, sentence_count,
+                 disagree_count, user_speech_ms, total_speech_ms)
+            {self._AGGREGATE_SELECT}
+            WHERE d.master_uid = %s AND m.user_uid IS NOT NULL AND d.dominant_emotion IS NOT NULL
+            GROUP BY 1, 2, 3
+            ON CONFLICT (user_uid, bucket_date, dominant_emotion) DO UPDATE SET
+                sentence_count = user_emotion_trend.sentence_count + EXCLUDED.sentence_count,
+                disagree_count = user_emotion_trend.disagree_count + EXCLUDED.disagree_count,
+                user_speech_ms = user_emotion_trend.user_speech_ms + EXCLUDED.user_speech_ms,
+                total_speech_ms = user_emotion_trend.total_speech_ms + EXCLUDED.total_speech_ms
+        """
+        self.execute_query(query, (master_uid,))
+
+    def rebuild_user_trend(self, user_uid: int):
+        """사용자의 집계 버킷을 전체 이력으로부터 다시 만듭니다. (초기 적재/복구용)"""
+        conn = self.get_connection()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM user_emotion_trend WHERE user_uid = %s", (user_uid,))
+            cur.execute(f"""
+                INSERT INTO user_emotion_trend
+                    (user_uid, bucket_date, dominant_emotion, sentence_count,
+                     disagree_count, user_speech_ms, total_speech_ms)
+                {self._AGGREGATE_SELECT}
+                WHERE m.user_uid = %s AND d.dominant_emotion IS NOT NULL
+                GROUP BY 1, 2, 3
+            """, (user_uid,))
+            conn.commit()
+
+    def get_user_trend(self, user_uid: int, period: str = "day", start_date=None, end_date=None):
+        """
+        기간 버킷별 감정 분포, 텍스트/음성 불일치율, 사용자 발화 비율을 반환합니다.
+        모든 집계는 SQL에서 수행합니다.
+        """
+        if period not in self.PERIODS:
+            raise ValueError(f"period는 {self.PERIODS} 중 하나여야 합니다: {period}")
+        query = """
+            SELECT bucket,
+                   jsonb_object_agg(dominant_emotion, sentence_count) AS distribution,
+                   SUM(sentence_count) AS sentence_count,
+                   SUM(disagree_count)::float / NULLIF(SUM(sentence_count), 0) AS disagreement_rate,
+                   SUM(user_speech_ms)::float / NULLIF(SUM(total_speech_ms), 0) AS user_speech_share
+            FROM (
+                SELECT date_trunc(%s, bucket_date)::date AS bucket,
+                       dominant_emotion,
+                       SUM(sentence_count) AS sentence_count,
+                       SUM(disagree_count) AS disagree_count,
+                       SUM(user_speech_ms) AS user_speech_ms,
+                       SUM(total_speech_ms) AS total_speech_ms
+                FROM user_emotion_trend
+                WHERE user_uid = %s
+                  AND (%s::date IS NULL OR bucket_date >= %s::date)
+                  AND (%s::date IS NULL OR bucket_date <= %s::date)
+                GROUP BY 1, 2
+            ) t
+            GROUP BY bucket
+            ORDER BY bucket
+        """
+        params = (period, user_uid, start_date, start_date, end_date, end_date)
+        results = self.execute_query(query, params) or []
+        return [
+            {
+                "bucket": str(r[0]),
+                "distribution": r[1],
+                "sentence_count": int(r[2]),
+                "disagreement_rate": r[3],
+                "user_speech_share": r[4],
+            }
+            for r in results
+        ]
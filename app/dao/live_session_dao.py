@@ -0,0 +1,140 @@
+import json
+
+from .dao import PostgresDAO
+
+
+class LiveSessionDAO(PostgresDAO):
+    """
+    워커 간 공유 세션 상태 / 최종 분석 작업 큐 (migrations/007_live_sessions.sql)
+
+    CREATE TABLE live_sessions (
+        token VARCHAR(64) PRIMARY KEY,      -- resume_token
+        session_id VARCHAR(32) NOT NULL,
+        node_id VARCHAR(255) NOT NULL,      -- 세션을 가진 워커
+        user_id VARCHAR(255),
+        state JSONB NOT NULL,               -- sid, ts, wav_path, pcm_path, progressive, encoding, received_bytes
+        detached_at TIMESTAMP,              -- 연결이 끊긴 시각 (NULL 이면 연결 중)
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE finalization_jobs (
+        uid SERIAL PRIMARY KEY,
+        session_id VARCHAR(32) NOT NULL UNIQUE,
+        payload JSONB NOT NULL,             -- finalize_analysis 인자 (wav_path, user_id, sid, ts, live_results)
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        node_id VARCHAR(255),               -- 작업을 가져간 워커
+        attempts INTEGER NOT NULL DEFAULT 0,
+        master_uid INTEGER,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        claimed_at TIMESTAMP,
+        finished_at TIMESTAMP
+    );
+    """
+    # --- live_sessions ---
+    def save_session(self, token: str, session_id: str, node_id: str, user_id: str | None, state: dict,
+                     detached: bool) -> bool:
+        """세션 상태를 기록합니다. 다른 워커가 이미 가져간 세션이면 기록하지 않고 False 를 반환합니다."""
+        query = """
+            INSERT INTO live_sessions (token, session_id, node_id, user_id, state, detached_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s::jsonb, CASE WHEN %s THEN CURRENT_TIMESTAMP END, CURRENT_TIMESTAMP)
+            ON CONFLICT (token) DO UPDATE
+            SET state = EXCLUDED.state, detached_at = EXCLUDED.detached_at, updated_at = CURRENT_TIMESTAMP
+            WHERE live_sessions.node_id = EXCLUDED.node_id
+            RETURNING token
+        """
+        result = self.execute_query(query, (token, session_id, node_id, user_id, json.dumps(state), detached))
+        return bool(result)
+
+    def claim_session(self, token: str, node_id: str, user_id: str | None) -> dict | None:
+        """
+        재연결한 워커(node_id)로 세션 소유권을 옮기고 상태를 반환합니다.
+        다른 워커에 연결 중인 세션은 옮기지 않습니다. (이전 워커가 음성을 아직 보관하지 않았으므로)
+        """
+        query = """
+            UPDATE live_sessions
+            SET node_id = %s, detached_at = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE token = %s
+              AND user_id IS NOT DISTINCT FROM %s
+              AND (node_id = %s OR detached_at IS NOT NULL)
+            RETURNING state
+        """
+        result = self.execute_query(query, (node_id, token, user_id, node_id))
+        return result[0][0] if result else None
+
+    def release_session(self, token: str, node_id: str) -> bool:
+        """node_id 가 세션을 가지고 있으면 삭제하고 True 를 반환합니다. (최종 분석 직전 호출)"""
+        query = "DELETE FROM live_sessions WHERE token = %s AND node_id = %s RETURNING token"
+        return bool(self.execute_query(query, (token, node_id)))
+
+    # --- finalization_jobs ---
+    def enqueue_job(self, session_id: str, payload: dict) -> bool:
+        """작업을 등록합니다. 같은 session_id 의 작업이 이미 있으면 False."""
+        query = """
+            INSERT INTO finalization_jobs (session_id, payload)
+            VALUES (%s, %s::jsonb)
+            ON CONFLICT (session_id) DO NOTHING
+            RETURNING uid
+        """
+        return bool(self.execute_query(query, (session_id, json.dumps(payload))))
+
+    def claim_job(self, node_id: str, lease_sec: float, max_attempts: int) -> tuple[str, dict, int] | None:
+        """
+        대기 중인 작업(또는 lease_sec 이 지나도록 갱신되지 않은 작업) 하나를 가져가 (session_id, payload, attempt)를 반환합니다.
+        여러 워커가 동시에 호출해도 SKIP LOCKED 로 서로 다른 작업을 가져갑니다.
+        attempt 는 이번 실행의 식별자로, renew_job / finish_job 에서 아직 이 실행이 작업을 가지고 있는지 확인하는 데 씁니다.
+        """
+        # 재시도 횟수를 다 쓴 채 멈춘 작업은 실패로 정리합니다. (작업을 실행하던 워커가 죽은 경우)
+        self.execute_query("""
+            UPDATE finalization_jobs
+            SET status = 'failed', error = 'lease expired', finished_at = CURRENT_TIMESTAMP
+            WHERE status = 'running'
+              AND claimed_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+              AND attempts >= %s
+        """, (lease_sec, max_attempts))
+        query = """
+            UPDATE finalization_jobs
+            SET status = 'running', node_id = %s, attempts = attempts + 1, claimed_at = CURRENT_TIMESTAMP
+            WHERE uid = (
+                SELECT uid FROM finalization_jobs
+                WHERE (status = 'pending'
+                       OR (status = 'running' AND claimed_at < CURRENT_TIMESTAMP - make_interval(secs => %s)))
+                  AND attempts < %s
+                ORDER BY created_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING session_id, payload, attempts
+        """
+        result = self.execute_query(query, (node_id, lease_sec, max_attempts))
+        return (result[0][0], result[0][1], result[0][2]) if result else None
+
+    def renew_job(self, session_id: str, node_id: str, attempt: int) -> bool:
+        """실행 중인 작업의 lease 를 연장합니다. 다른 워커가 이미 가져갔거나 끝난 작업이면 False."""
+        query = """
+            UPDATE finalization_jobs
+            SET claimed_at = CURRENT_TIMESTAMP
+            WHERE session_id = %s AND node_id = %s AND attempts = %s AND status = 'running'
+            RETURNING uid
+        """
+        return bool(self.execute_query(query, (session_id, node_id, attempt)))
+
+    def finish_job(self, session_id: str, node_id: str, attempt: int, master_uid: int | None,
+                   error: str | None = None) -> bool:
+        """작업 결과를 기록합니다. lease 를 잃은 실행(다른 워커가 다시 가져감)의 결과는 기록하지 않고 False."""
+        query = """
+            UPDATE finalization_jobs
+            SET status = %s, master_uid = %s, error = %s, finished_at = CURRENT_TIMESTAMP
+            WHERE session_id = %s AND node_id = %s AND attempts = %s AND status = 'running'
+            RETURNING uid
+        """
+        return bool(self.execute_query(
+            query, ("failed" if error else "done", master_uid, error, session_id, node_id, attempt)))
+
+    def get_job(self, session_id: str) -> dict | None:
+        query = "SELECT status, master_uid, error FROM finalization_jobs WHERE session_id = %s"
+        result = self.execute_query(query, (session_id,))
+        if not result:
+            return None
+        status, master_uid, error = result[0]
+        return {"status": status, "master_uid": master_uid, "error": error}
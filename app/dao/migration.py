@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from .dao import PostgresDAO
+from app.utils.logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent.parent.parent / "migrations"
+
+# 여러 워커가 동시에 기동해도 마이그레이션은 한 번만 적용되도록 잡는 advisory lock 키
+MIGRATION_LOCK_KEY = 726001
+
+
+class MigrationDAO(PostgresDAO):
+    """
+    migrations/ 폴더의 SQL 파일을 파일명 순서대로 적용합니다.
+    적용 이력은 schema_migrations 테이블에 기록하며, 각 파일은 하나의 트랜잭션으로 실행됩니다.
+
+    CREATE TABLE schema_migrations (
+        version VARCHAR(255) PRIMARY KEY,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """
+    def __init__(self, migrations_dir: Path = MIGRATIONS_DIR):
+        super().__init__()
+        self.migrations_dir = Path(migrations_dir)
+
+    def get_migration_files(self) -> list[Path]:
+        return sorted(self.migrations_dir.glob("*.sql"))
+
+    def get_applied_versions(self) -> set[str]:
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(255) PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        rows = self.execute_query("SELECT version FROM schema_migrations") or []
+        return {r[0] for r in rows}
+
+    def apply_migrations(self) -> list[str]:
+        """적용되지 않은 마이그레이션을 순서대로 적용하고, 적용한 버전 목록을 반환합니다."""
+        conn = self.get_connection()
+        applied_now = []
+        self.execute_query("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        try:
+            applied = self.get_applied_versions()
+            for path in self.get_migration_files():
+                version = path.stem
+                if version in applied:
+                    continue
+                sql = path.read_text(encoding="utf-8")
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(sql)
+                        cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                logger.info(f"[마이그레이션] 적용 완료: {version}")
+                applied_now.append(version)
+        finally:
+            self.execute_query("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        return applied_now
+
+
+if __name__ == "__main__":
+    setup_logging()
+    dao = MigrationDAO()
+    try:
+        versions = dao.apply_migrations()
+        print(f"적용된 마이그레이션: {versions if versions else '없음 (최신 상태)'}")
+    except Exception as e:
+        print(f"마이그레이션 실패: {e}")
+    finally:
+        dao.close()
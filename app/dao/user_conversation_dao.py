@@ -1,4 +1,8 @@
 from .dao import PostgresDAO
+from app.utils.emotion_utils import format_analysis_result_from_vectors
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class UserConversationDAO(PostgresDAO):
     """
@@ -7,6 +11,8 @@ class UserConversationDAO(PostgresDAO):
         uid SERIAL PRIMARY KEY,
         user_uid INTEGER,
         topic VARCHAR(255),
+        audio_path TEXT,
+        finalized_at TIMESTAMP,  -- 최종 분석 완료 시각 (이후 상세 내용은 변경되지 않음)
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
 
@@ -16,12 +22,15 @@ class UserConversationDAO(PostgresDAO):
         master_uid INTEGER REFERENCES user_conversation_master(uid) ON DELETE CASCADE,
         sentence TEXT,
         speaker VARCHAR(16),
-        emotion_result JSONB,  -- 전체 감정분석 결과
+        is_user BOOLEAN,  -- 사용자 본인 발화 여부 (음성 임베딩 비교 결과)
+        text_scores REAL[],   -- 텍스트 감정 점수 (positive, negative, neutral 순)
+        audio_scores REAL[],  -- 음성 감정 점수 (happy, sad, angry, fear, disgust, surprise, neutral 순)
         dominant_emotion VARCHAR(32),  -- 가장 높은 감정 key
         start_ms INTEGER,
         end_ms INTEGER,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
+    우세/표준 감정, 한글명, 색상은 저장하지 않고 조회 시 emotion_utils 매핑으로 계산합니다.
     """
     def insert_conversation_master(self, user_uid: int, topic: str = None):
         conn = self.get_connection()
@@ -36,6 +45,10 @@ class UserConversationDAO(PostgresDAO):
             conn.commit()
             return master_uid
 
+    def delete_conversation_master(self, master_uid):
+        """대화를 삭제합니다. (상세는 ON DELETE CASCADE) 저장 도중 최종 분석 작업을 잃은 경우 정리용"""
+        self.execute_query("DELETE FROM user_conversation_master WHERE uid = %s", (master_uid,))
+
     def update_master_audio_path(self, master_uid, audio_path):
         conn = self.get_connection()
         query = """
@@ -47,16 +60,41 @@ class UserConversationDAO(PostgresDAO):
             cur.execute(query, (audio_path, master_uid))
             conn.commit()
 
-    def insert_conversation_detail(self, master_uid, sentence, speaker, emotion_result, dominant_emotion, start_ms, end_ms):
+    def mark_master_finalized(self, master_uid):
+        query = """
+            UPDATE user_conversation_master
+            SET finalized_at = CURRENT_TIMESTAMP
+            WHERE uid = %s
+        """
+        self.execute_query(query, (master_uid,))
+
+    def get_master_finalized_at(self, master_uid):
+        """최종 분석 완료 시각을 반환합니다. (완료 전이거나 대화가 없으면 None)"""
+        query = "SELECT finalized_at FROM user_conversation_master WHERE uid = %s"
+        result = self.execute_query(query, (master_uid,))
+        return result[0][0] if result else None
+
+    def get_conversation_list_version(self, user_uid: int) -> str:
+        """
+        사용자 대화 목록의 버전 값(가장 최근 created_at + 건수)을 반환합니다.
+        (user_uid, created_at DESC) 인덱스만으로 계산되므로 목록 조회보다 가볍습니다.
+        """
+        query = "SELECT MAX(created_at), COUNT(*) FROM user_conversation_master WHERE user_uid = %s"
+        result = self.execute_query(query, (user_uid,))
+        latest, count = result[0] if result else (None, 0)
+        return f"{latest.isoformat() if latest else 'empty'}-{count}"
+
+    def insert_conversation_detail(self, master_uid, sentence, speaker, text_scores, audio_scores, dominant_emotion, start_ms, end_ms, is_user=None):
+        """text_scores/audio_scores 는 emotion_utils.TEXT_EMOTIONS/AUDIO_EMOTIONS 순서의 float 리스트입니다."""
         conn = self.get_connection()
         query = """
-            INSERT INTO user_conversation_detail (master_uid, sentence, speaker, emotion_result, dominant_emotion, start_ms, end_ms)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO user_conversation_detail (master_uid, sentence, speaker, is_user, text_scores, audio_scores, dominant_emotion, start_ms, end_ms)
+            VALUES (%s, %s, %s, %s, %s::real[], %s::real[], %s, %s, %s)
             RETURNING uid
         """
-        print(f"[쿼리] {query.strip()}\n[파라미터] master_uid={master_uid}, sentence={sentence}, speaker={speaker}, emotion_result={emotion_result}, dominant_emotion={dominant_emotion}, start_ms={start_ms}, end_ms={end_ms}")
+        logger.debug("[쿼리] insert_conversation_detail master_uid=%s, speaker=%s, is_user=%s, dominant_emotion=%s, start_ms=%s, end_ms=%s", master_uid, speaker, is_user, dominant_emotion, start_ms, end_ms)
         with conn.cursor() as cur:
-            cur.execute(query, (master_uid, sentence, speaker, emotion_result, dominant_emotion, start_ms, end_ms))
+            cur.execute(query, (master_uid, sentence, speaker, is_user, text_scores, audio_scores, dominant_emotion, start_ms, end_ms))
             detail_uid = cur.fetchone()[0]
             conn.commit()
             return detail_uid
@@ -85,7 +123,7 @@ class UserConversationDAO(PostgresDAO):
     def get_conversation_details(self, master_uid):
         conn = self.get_connection()
         query = """
-            SELECT d.uid, d.sentence, d.speaker, d.emotion_result, d.dominant_emotion, 
+            SELECT d.uid, d.sentence, d.speaker, d.text_scores, d.audio_scores, d.dominant_emotion,
                    d.start_ms, d.end_ms, d.created_at,
                    m.audio_path
             FROM user_conversation_detail d
@@ -98,12 +136,12 @@ class UserConversationDAO(PostgresDAO):
             rows = cur.fetchall()
             result = []
             for row in rows:
-                detail_uid, sentence, speaker, emotion_result, dominant_emotion, start_ms, end_ms, created_at, audio_path = row
+                detail_uid, sentence, speaker, text_scores, audio_scores, dominant_emotion, start_ms, end_ms, created_at, audio_path = row
                 result.append({
                     "detail_uid": detail_uid,
                     "sentence": sentence,
                     "speaker": speaker,
-                    "emotion_result": emotion_result,
+                    "emotion_result": format_analysis_result_from_vectors(text_scores, audio_scores),
                     "dominant_emotion": dominant_emotion,
                     "start_ms": start_ms,
                     "end_ms": end_ms,
@@ -112,31 +150,132 @@ class UserConversationDAO(PostgresDAO):
                 })
             return result
 
-    def get_conversation_list_by_user_uid(self, user_uid: int):
-        query = "SELECT uid, topic, created_at FROM user_conversation_master WHERE user_uid = %s ORDER BY created_at DESC"
-        print(f"[쿼리] {query.strip()}\n[파라미터] user_uid={user_uid}")
-        results = self.execute_query(query, (user_uid,))
+    # 상세 조회 시 fields= 로 선택 가능한 필드와 조회할 SQL 컬럼
+    # emotion: 점수(scores)를 제외한 요약, emotion_result: 전체 감정분석 결과, scores: 원본 점수 벡터
+    DETAIL_FIELDS = {
+        "detail_uid": ("d.uid",),
+        "sentence": ("d.sentence",),
+        "speaker": ("d.speaker",),
+        "is_user": ("d.is_user",),
+        "emotion": ("d.text_scores", "d.audio_scores"),
+        "emotion_result": ("d.text_scores", "d.audio_scores"),
+        "scores": ("d.text_scores", "d.audio_scores"),
+        "dominant_emotion": ("d.dominant_emotion",),
+        "start_ms": ("d.start_ms",),
+        "end_ms": ("d.end_ms",),
+        "audio_path": ("m.audio_path",),
+        "created_at": ("d.created_at",),
+    }
+    DEFAULT_DETAIL_FIELDS = (
+        "detail_uid", "sentence", "speaker", "is_user", "emotion_result", "dominant_emotion",
+        "start_ms", "end_ms", "audio_path", "created_at",
+    )
+
+    @staticmethod
+    def _build_detail_field(field, values):
+        """SELECT 결과 값으로부터 응답 필드 값을 만듭니다. (표시용 감정 정보는 읽기 시점에 계산)"""
+        if field == "emotion_result":
+            return format_analysis_result_from_vectors(*values)
+        if field == "emotion":
+            return format_analysis_result_from_vectors(*values, include_scores=False)
+        if field == "scores":
+            return {"text": values[0], "audio": values[1]}
+        if field == "created_at":
+            return str(values[0])
+        return values[0]
+
+    def get_conversation_list_by_user_uid(self, user_uid: int, limit: int = 50, cursor: tuple | None = None):
+        """
+        사용자의 대화 목록을 최신순으로 키셋 페이지네이션하여 반환합니다.
+        (user_uid, created_at DESC, uid DESC) 인덱스를 사용합니다.
+
+        :param cursor: 이전 페이지 마지막 행의 (created_at, uid)
+        :return: (목록, 다음 페이지 커서 키 또는 None)
+        """
+        query = "SELECT uid, topic, created_at FROM user_conversation_master WHERE user_uid = %s"
+        params = [user_uid]
+        if cursor is not None:
+            query += " AND (created_at, uid) < (%s::timestamp, %s)"
+            params.extend(cursor)
+        query += " ORDER BY created_at DESC, uid DESC LIMIT %s"
+        params.append(limit + 1)
+        logger.debug("[쿼리] %s [파라미터] %s", query, params)
+        results = self.execute_query(query, tuple(params)) or []
+        next_key = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_key = (str(results[-1][2]), results[-1][0])
         return [
             {"uid": r[0], "topic": r[1], "created_at": str(r[2])} for r in results
-        ]
+        ], next_key
 
-    def get_conversation_details_by_master_uid(self, master_uid: int):
-        query = "SELECT speaker_name, is_user, text, start_time, end_time, emotion_result, dominant_emotion, audio_path, created_at FROM user_conversation_detail WHERE master_uid = %s ORDER BY start_time"
-        results = self.execute_query(query, (master_uid,))
-        return [
-            {
-                "speaker_name": r[0],
-                "is_user": r[1],
-                "text": r[2],
-                "start_time": r[3],
-                "end_time": r[4],
-                "emotion_result": r[5],
-                "dominant_emotion": r[6],
-                "audio_path": r[7],
-                "created_at": str(r[8]),
-            }
-            for r in results
-        ]
+    def get_conversation_details_by_master_uid(self, master_uid: int, limit: int = 200, cursor: tuple | None = None, fields=None):
+        """
+        대화 상세 문장을 발화 시작 시간 순으로 키셋 페이지네이션하여 반환합니다.
+        (master_uid, start_ms, uid) 인덱스를 사용하며, fields 로 필요한 컬럼만 조회합니다.
+
+        :param cursor: 이전 페이지 마지막 행의 (start_ms, uid)
+        :return: (상세 목록, 다음 페이지 커서 키 또는 None)
+        """
+        fields = list(fields or self.DEFAULT_DETAIL_FIELDS)
+        select_exprs = ", ".join(col for f in fields for col in self.DETAIL_FIELDS[f])
+        query = f"SELECT d.start_ms, d.uid, {select_exprs} FROM user_conversation_detail d"
+        if "audio_path" in fields:
+            query += " JOIN user_conversation_master m ON d.master_uid = m.uid"
+        query += " WHERE d.master_uid = %s"
+        params = [master_uid]
+        if cursor is not None:
+            query += " AND (d.start_ms, d.uid) > (%s, %s)"
+            params.extend(cursor)
+        query += " ORDER BY d.start_ms, d.uid LIMIT %s"
+        params.append(limit + 1)
+        results = self.execute_query(query, tuple(params)) or []
+        next_key = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_key = (results[-1][0], results[-1][1])
+        details = []
+        for r in results:
+            item = {}
+            pos = 2
+            for f in fields:
+                width = len(self.DETAIL_FIELDS[f])
+                item[f] = self._build_detail_field(f, r[pos:pos + width])
+                pos += width
+            details.append(item)
+        return details, next_key
+
+    EXPORT_COLUMNS = (
+        "master_uid", "user_uid", "topic", "conversation_created_at", "detail_uid", "sentence",
+        "speaker", "is_user", "dominant_emotion", "start_ms", "end_ms", "text_scores", "audio_scores",
+    )
+
+    def iter_conversation_details_for_export(self, user_uid=None, start_date=None, end_date=None, fetch_size: int = 500):
+        """
+        내보내기용으로 대화 상세 행을 서버 사이드 커서(named cursor)로 fetch_size 만큼씩 가져옵니다.
+        전체 결과를 메모리에 올리지 않으며, 스트리밍 중 다른 요청과 커넥션을 공유하지 않도록
+        호출마다 별도의 DAO 인스턴스에서 사용하는 것을 전제로 합니다.
+
+        :return: EXPORT_COLUMNS 순서의 tuple 을 내보내는 generator
+        """
+        query = """
+            SELECT m.uid, m.user_uid, m.topic, m.created_at, d.uid, d.sentence,
+                   d.speaker, d.is_user, d.dominant_emotion, d.start_ms, d.end_ms, d.text_scores, d.audio_scores
+            FROM user_conversation_master m
+            JOIN user_conversation_detail d ON d.master_uid = m.uid
+            WHERE (%s::integer IS NULL OR m.user_uid = %s)
+              AND (%s::date IS NULL OR m.created_at >= %s::date)
+              AND (%s::date IS NULL OR m.created_at < %s::date + 1)
+            ORDER BY m.created_at, m.uid, d.start_ms, d.uid
+        """
+        params = (user_uid, user_uid, start_date, start_date, end_date, end_date)
+        conn = self.get_connection()
+        with conn.cursor(name=f"export_{id(self)}") as cur:
+            cur.itersize = fetch_size
+            cur.execute(query, params)
+            for row in cur:
+                yield row
+        conn.rollback()  # 읽기 전용 트랜잭션 종료
 
 if __name__ == "__main__":
     dao = UserConversationDAO()
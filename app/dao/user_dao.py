@@ -11,11 +11,21 @@ class UserDAO(PostgresDAO):
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
     
-    user_voice_embeddings 테이블 예시:
+    user_voice_embeddings 테이블 예시: (embedding 은 등록 샘플들의 정규화된 중심)
     CREATE TABLE user_voice_embeddings (
         uid SERIAL PRIMARY KEY,
         user_uid INTEGER UNIQUE,
         embedding BYTEA,
+        sample_count INTEGER DEFAULT 1,
+        spread REAL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    user_voice_samples 테이블 예시: (사용자별 최근 등록 샘플)
+    CREATE TABLE user_voice_samples (
+        uid SERIAL PRIMARY KEY,
+        user_uid INTEGER NOT NULL,
+        embedding BYTEA NOT NULL,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
     """
@@ -44,14 +54,48 @@ class UserDAO(PostgresDAO):
             }
         return None
 
-    def save_user_voice_embedding(self, user_uid: int, embedding: np.ndarray):
+    def save_user_voice_embedding(self, user_uid: int, embedding: np.ndarray, sample_count: int = 1, spread: float = 0.0):
         query = """
-            INSERT INTO user_voice_embeddings (user_uid, embedding, created_at)
-            VALUES (%s, %s, CURRENT_TIMESTAMP)
-            ON CONFLICT (user_uid) DO UPDATE SET embedding = EXCLUDED.embedding, created_at = CURRENT_TIMESTAMP
+            INSERT INTO user_voice_embeddings (user_uid, embedding, sample_count, spread, created_at)
+            VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (user_uid) DO UPDATE SET
+                embedding = EXCLUDED.embedding,
+                sample_count = EXCLUDED.sample_count,
+                spread = EXCLUDED.spread,
+                created_at = CURRENT_TIMESTAMP
+        """
+        embedding_bytes = np.asarray(embedding, dtype=np.float32).tobytes()
+        self.execute_query(query, (user_uid, embedding_bytes, sample_count, float(spread)))
+
+    def add_user_voice_sample(self, user_uid: int, embedding: np.ndarray, max_samples: int) -> list[np.ndarray]:
+        """
+        등록 샘플을 추가하고 최근 max_samples 개만 남긴 뒤, 남은 샘플 임베딩들을 최신순으로 반환합니다.
+        추가/정리/조회를 한 트랜잭션으로 처리합니다.
         """
-        embedding_bytes = embedding.tobytes()
-        self.execute_query(query, (user_uid, embedding_bytes))
+        conn = self.get_connection()
+        embedding_bytes = np.asarray(embedding, dtype=np.float32).tobytes()
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO user_voice_samples (user_uid, embedding, created_at) VALUES (%s, %s, CURRENT_TIMESTAMP)",
+                (user_uid, embedding_bytes),
+            )
+            cur.execute("""
+                DELETE FROM user_voice_samples
+                WHERE user_uid = %s AND uid NOT IN (
+                    SELECT uid FROM user_voice_samples
+                    WHERE user_uid = %s
+                    ORDER BY created_at DESC, uid DESC
+                    LIMIT %s
+                )
+            """, (user_uid, user_uid, max_samples))
+            cur.execute("""
+                SELECT embedding FROM user_voice_samples
+                WHERE user_uid = %s
+                ORDER BY created_at DESC, uid DESC
+            """, (user_uid,))
+            rows = cur.fetchall()
+            conn.commit()
+        return [np.frombuffer(r[0], dtype=np.float32) for r in rows]
 
     def get_user_voice_embedding(self, user_uid: int):
         query = """
@@ -61,4 +105,18 @@ class UserDAO(PostgresDAO):
         if result:
             embedding_bytes = result[0][0]
             return np.frombuffer(embedding_bytes, dtype=np.float32)
+        return None
+
+    def get_user_voice_profile(self, user_uid: int):
+        query = """
+            SELECT sample_count, spread, created_at FROM user_voice_embeddings WHERE user_uid = %s
+        """
+        result = self.execute_query(query, (user_uid,))
+        if result:
+            sample_count, spread, created_at = result[0]
+            return {
+                'sample_count': sample_count,
+                'spread': spread,
+                'updated_at': str(created_at)
+            }
         return None 
\ No newline at end of file
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import registry
+
+router = APIRouter()
+
+@router.get("/metrics", tags=["Metrics"], response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
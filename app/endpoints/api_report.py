@@ -1,22 +1,112 @@
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
-from app.services.report_services import report_service
+import json
+from datetime import date
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from app.services.report_services import REPORT_CACHE_TTL_SEC, report_details_cache, report_service
+from app.utils.http_cache import etag_matches, make_etag
+from app.utils.logger import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+# 완료된 대화도 삭제/재분석될 수 있으므로 immutable 로 두지 않고, 서버 캐시와 같은 시간 동안 재사용한 뒤 ETag 로 재검증합니다.
+# (재검증은 서버 캐시에서 304 로 응답하므로 DB 를 조회하지 않습니다.)
+FINALIZED_CACHE_CONTROL = f"private, max-age={int(REPORT_CACHE_TTL_SEC)}"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _cached_json_response(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/api/v1/reports", tags=["Report"])
-def get_report_list(user_uid: int = Query(...)):
+def get_report_list(
+    request: Request,
+    user_uid: int = Query(...),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+):
+    try:
+        # 목록 버전(최신 created_at)이 같으면 목록 쿼리 없이 304 응답
+        version = report_service.get_report_list_version(user_uid)
+        etag = make_etag(f"{user_uid}|{version}|{limit}|{cursor}".encode("utf-8"), weak=True)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL})
+        reports, next_cursor = report_service.get_report_list(user_uid, limit, cursor)
+        logger.debug("[리포트 목록] user_uid=%s, %d건", user_uid, len(reports))
+        body = json.dumps({"success": True, "data": reports, "next_cursor": next_cursor}, ensure_ascii=False).encode("utf-8")
+        return _cached_json_response(request, body, etag, REVALIDATE_CACHE_CONTROL)
+    except ValueError as e:
+        return JSONResponse(content={"success": False, "error": str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
+
+# /api/v1/reports/{master_uid} 보다 먼저 등록해야 경로가 가로채이지 않습니다.
+@router.get("/api/v1/reports/export", tags=["Report"])
+def export_reports(
+    user_uid: int | None = Query(None),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = Query(False),
+):
+    if user_uid is None and start_date is None and end_date is None:
+        return JSONResponse(
+            content={"success": False, "error": "user_uid 또는 start_date/end_date 중 하나는 필요합니다."},
+            status_code=400,
+        )
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    filename = f"conversations.{format}"
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+    stream = report_service.export_conversations(user_uid, start_date, end_date, format, gzip)
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/api/v1/reports/trends", tags=["Report"])
+def get_report_trends(
+    user_uid: int = Query(...),
+    period: str = Query("day", pattern="^(day|week)$"),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+):
     try:
-        reports = report_service.get_report_list(user_uid)
-        print(reports)
-        return JSONResponse(content={"success": True, "data": reports})
+        trends = report_service.get_emotion_trend(user_uid, period, start_date, end_date)
+        return JSONResponse(content={"success": True, "data": trends})
     except Exception as e:
         return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
 
 @router.get("/api/v1/reports/{master_uid}", tags=["Report"])
-def get_report_details(master_uid: int):
+def get_report_details(
+    request: Request,
+    master_uid: int,
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: str | None = Query(None),
+    fields: str | None = Query(None, description="예: sentence,speaker,emotion,start_ms,end_ms"),
+):
     try:
-        details = report_service.get_report_details(master_uid)
-        return JSONResponse(content={"success": True, "data": details})
+        # 최종 분석이 끝난 대화는 캐시에 있으면 DB 조회/직렬화 없이 응답 (If-None-Match 가 맞으면 304)
+        cache_key = (master_uid, limit, cursor, fields)
+        cached = report_details_cache.get(cache_key)
+        if cached is not None:
+            body, etag = cached
+            return _cached_json_response(request, body, etag, FINALIZED_CACHE_CONTROL)
+
+        finalized = report_service.is_report_finalized(master_uid)
+        details, next_cursor = report_service.get_report_details(master_uid, limit, cursor, fields)
+        body = json.dumps({"success": True, "data": details, "next_cursor": next_cursor}, ensure_ascii=False).encode("utf-8")
+        if finalized:
+            etag = report_details_cache.put(cache_key, body)
+            return _cached_json_response(request, body, etag, FINALIZED_CACHE_CONTROL)
+        return _cached_json_response(request, body, make_etag(body), REVALIDATE_CACHE_CONTROL)
+    except ValueError as e:
+        return JSONResponse(content={"success": False, "error": str(e)}, status_code=400)
     except Exception as e:
         return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
\ No newline at end of file
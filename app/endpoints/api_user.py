@@ -3,9 +3,11 @@ from fastapi.responses import JSONResponse
 
 from app.services.user_services import user_service
 from app.services.user_voice_service import user_voice_service
+from app.utils.logger import get_logger
 from app.endpoints.ws_analyze import user_voice_embeddings_mem
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 @router.post("/api/v1/users")
 async def register_user(request: Request):
@@ -55,9 +57,9 @@ async def login_user(request: Request):
             embedding = user_voice_service.get_user_voice_embedding(user_uid)
             if embedding is not None:
                 user_voice_embeddings_mem[user_id] = embedding
-                print(f"[로그인] user_id={user_id} 음성 임베딩 메모리 적재 완료.")
+                logger.info(f"[로그인] user_id={user_id} 음성 임베딩 메모리 적재 완료.")
             else:
-                print(f"[로그인] user_id={user_id} 음성 임베딩 정보 없음.")
+                logger.info(f"[로그인] user_id={user_id} 음성 임베딩 정보 없음.")
             return JSONResponse(content={"success": True, **user}, status_code=200)
         else:
             return JSONResponse(
@@ -1,12 +1,5 @@
 # Standard library imports
-import asyncio
-import io
 import json
-import os
-import tempfile
-import time
-import wave
-from datetime import datetime
 
 # Third-party imports
 from fastapi import APIRouter, WebSocket
@@ -14,114 +7,93 @@ from starlette.websockets import WebSocketDisconnect
 
 # Local application imports
 from app.services.analyze_service import analyze_service
+from app.services.live_session_service import live_session_service
+from app.services.session_store import session_store
+from app.utils.executors import run_in
+from app.utils.logger import bind_log_context, get_logger
+from app.utils.profiler import resolve_profile_mode, start_session_profiler
+from app.utils.metrics import WEBSOCKET_SESSIONS_ACTIVE
+from app.utils.result_codec import ResultEncoder, emotion_table, negotiate_encoding
 
 router = APIRouter()
+logger = get_logger(__name__)
 
-BASE_DIR = "storage/audio"
-WAV_DIR = os.path.join(BASE_DIR, "wav_chunks")
-os.makedirs(WAV_DIR, exist_ok=True)
-
-# --- 세션 관리를 위한 메모리 내 저장소 ---
-# user_voice_embeddings_mem: 사용자 음성 임베딩 캐시
-# session_user_id: 웹소켓 세션(sid)과 사용자 ID 매핑
-session_tempfiles = {}
+# --- 세션 관리 ---
+# user_voice_embeddings_mem: 사용자 음성 임베딩 캐시 (세션 저장소 소유. 공유 저장소에서는 TTL 이 지나면 DB 에서 다시 읽음)
+# session_user_id: 웹소켓 연결(sid)과 사용자 ID 매핑 (연결 단위이므로 워커 메모리에 둡니다)
+# 대화 상태(오디오 버퍼, 청크 결과 등)는 연결과 분리된 LiveAnalysisSession 에 있습니다. (app/services/live_session_service.py)
 session_user_id = {}
-user_voice_embeddings_mem = {}
+user_voice_embeddings_mem = session_store.voice_embeddings
+
+
+# progressive 모드 (초기 설정 메시지에 "progressive": true)
+#   청크(발화) 하나에 대해 다음 메시지를 순서대로 보냅니다. utterance_id 는 chunk_id 와 같습니다.
+#     transcript_interim : 스트리밍 STT 중간 인식 결과 (여러 번, 준비되는 즉시)
+#     transcript_final   : 최종 인식 결과 (준비되는 즉시)
+#     emotion_estimate   : 로컬 모델의 음성 감정 추정치 (EARLY_AUDIO_EMOTION 사용 시, 준비되는 즉시)
+#     emotion_update     : 최종 감정 분석 결과 (emotion_analysis 와 같은 필드, 청크 순서대로)
+#   최종 결과(emotion_update)를 이미 보낸 발화의 선행 메시지는 보내지 않습니다.
+#   progressive 를 켜지 않은 클라이언트는 기존과 같이 emotion_analysis 만 받습니다.
+
+# 결과 인코딩 (초기 설정 메시지에 "encoding": "json" | "msgpack" | "binary", 자세한 형식은 app/utils/result_codec.py)
+#   초기 설정 응답은 항상 JSON 텍스트이며, 실제 사용하는 인코딩을 "encoding" 으로 알려줍니다.
+#   json 이 아니면 바로 다음 메시지로 라벨/색상 표(emotion_table)를 한 번 보냅니다.
+
+# 세션 재개 (초기 설정 메시지에 "resumable": true)
+#   설정 응답에 resume_token 이 포함되고, 2초 청크를 받을 때마다 {"event": "ack", "offset": 수신 바이트 수} 를 보냅니다.
+#   연결이 끊기면 SESSION_RESUME_GRACE_SEC 동안 세션(버퍼, 청크 번호, 처리 중인 청크)을 유지합니다.
+#   재연결 시 설정 메시지에 "resume_token" 을 넣으면 응답의 "resumed": true 와 "offset" 을 받고,
+#   클라이언트는 offset 이후의 음성만 다시 보냅니다. 전송하지 못한 청크 결과는 재연결 후 이어서 전송합니다.
+#   (progressive/encoding 은 처음 설정한 값을 유지합니다)
+#   토큰이 없거나 만료되었으면 "resumed": false 로 새 대화가 시작됩니다. 최종 분석은 대화당 한 번만 실행됩니다.
+
+# 클라이언트가 요청하지 않은 종료
+#   서버 오류      : {"event": "error", "message": ...} 를 보낸 뒤 close code 1011 로 닫습니다.
+#   세션 이어받기  : 다른 연결이 resume_token 으로 세션을 가져가면 {"event": "session_taken_over"} 를 보낸 뒤
+#                    close code 4001 로 닫습니다. 최종 분석은 새 연결에서 이어집니다.
+#   end_conversation 으로 정상 종료하면 {"event": "finalized", ...} 후 close code 1000 입니다.
+
+# end_conversation 요청 시 처리 중인 청크 결과를 기다리는 최대 시간 (청크 파이프라인 타임아웃보다 약간 길게)
+CHUNK_DRAIN_TIMEOUT_SEC = 16.0
+# 다른 연결이 세션을 이어받아 닫는 경우의 close code (애플리케이션 정의 영역 4000~4999)
+CLOSE_CODE_TAKEN_OVER = 4001
+
+
+def _parse_control_event(text: str) -> str | None:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return data.get("event") if isinstance(data, dict) else None
+
+
+async def _close_with_event(websocket: WebSocket, session, message: dict, code: int, reason: str):
+    """종료 이유를 이벤트로 알린 뒤 close code 와 함께 연결을 닫습니다. (이미 끊긴 연결이면 무시)"""
+    try:
+        if session is not None:
+            await session.send_message(message, websocket)
+        else:
+            await websocket.send_text(json.dumps(message))
+        await websocket.close(code=code, reason=reason)
+    except Exception as e:
+        logger.info(f"{message.get('event')} 이벤트 전송 실패 (sid: {id(websocket)}): {e}")
 
 
 @router.websocket("/ws/analyze")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     sid = id(websocket)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    
-    # 세션별 파일 및 버퍼 초기화
-    wav_path = os.path.join(WAV_DIR, f"session_{ts}_{sid}.wav")
-    temp_fd, temp_path = tempfile.mkstemp(suffix=".pcm")
-    os.close(temp_fd)
-    session_tempfiles[sid] = temp_path
-    
-    buffer = bytearray()
-    full_audio_buffer = bytearray()
-    
-    print(f"🟢 연결됨: {websocket.client} (sid: {sid})")
-
-    # 상수 정의
-    CHUNK_DURATION_SEC = 2.0
-    SAMPLE_RATE = 16000
-    BYTES_PER_SEC = SAMPLE_RATE * 2  # 16bit(2byte) * 16000
-    CHUNK_SIZE = int(CHUNK_DURATION_SEC * BYTES_PER_SEC)
-
-    # --- 병렬 처리 및 순서 보장을 위한 변수 ---
-    # 각 청크에 고유 ID를 부여
-    chunk_id_counter = 0 
-    # 처리 결과를 저장 (key: chunk_id, value: result)
-    results = {}
-    # 다음으로 전송해야 할 청크의 ID
-    next_chunk_to_send = 0
-    # 결과 전송 루프를 제어하기 위한 이벤트
-    stop_event = asyncio.Event()
-
-    user_id_for_session = None
-    sender_task = None
-
-    # 처리 결과를 순서대로 전송하는 비동기 함수 (소비자)
-    async def send_results_in_order():
-        nonlocal next_chunk_to_send
-        while not stop_event.is_set():
-            if next_chunk_to_send in results:
-                result = results.pop(next_chunk_to_send)
-                if result:  # 타임아웃으로 None이 저장된 경우는 전송하지 않음
-                    try:
-                        print(f"[통역결과전달][{result}]")
-                        await websocket.send_text(json.dumps(result, ensure_ascii=False))
-                    except WebSocketDisconnect:
-                        break # 전송 중 연결이 끊어지면 루프 종료
-                next_chunk_to_send += 1
-            else:
-                await asyncio.sleep(0.01) # CPU 부하를 줄이기 위해 잠시 대기
-
-    # 개별 청크를 타임아웃과 함께 처리하는 비동기 함수
-    async def process_chunk_with_timeout(chunk_id, chunk_data, user_id, user_embedding):
-        try:
-            async with asyncio.timeout(15.0): # 전체 파이프라인에 대한 타임아웃을 15초로 설정
-                # 1단계: STT와 오디오 처리를 동시에 실행
-                stt_task = asyncio.create_task(analyze_service.transcribe_chunk(chunk_data))
-                audio_task = asyncio.create_task(analyze_service._process_audio_for_analysis(chunk_data))
-
-                transcript = await stt_task
-                if not transcript:
-                    print(f"Chunk {chunk_id} STT 결과 없음. 처리 중단.")
-                    results[chunk_id] = None
-                    return
-
-                audio_array = await audio_task
-
-                # 2단계: Gemini 분석과 음성 비교를 동시에 실행
-                emotion_task = asyncio.create_task(analyze_service.analyze_emotion_from_audio_and_text(transcript, audio_array))
-                voice_task = asyncio.create_task(analyze_service.compare_voice_in_chunk(chunk_data, user_embedding))
-                
-                emotion_result = await emotion_task
-                is_same, similarity = await voice_task
-
-                # 3단계: 결과 조합
-                analysis_result = {
-                    "event": "emotion_analysis",
-                    "transcript": transcript,
-                    "emotion": emotion_result,
-                    "is_same": is_same,
-                    "similarity": similarity
-                }
-                results[chunk_id] = analysis_result
-                print(f"Chunk {chunk_id} 모든 처리 완료.")
-
-        except asyncio.TimeoutError:
-            print(f"Chunk {chunk_id} 처리 시간 초과 (15초). 해당 요청을 버립니다.")
-            results[chunk_id] = None # 타임아웃된 작업 표시
-        except Exception as e:
-            print(f"Chunk {chunk_id} 처리 중 에러: {e}")
-            results[chunk_id] = None
+    bind_log_context(sid=sid)
+
+    logger.info(f"🟢 연결됨: {websocket.client} (sid: {sid})")
+    WEBSOCKET_SESSIONS_ACTIVE.inc(endpoint="analyze")
 
+    session = None
+    session_profiler = None
+    # 클라이언트가 end_conversation 이벤트로 정상 종료를 요청했는지 여부
+    ended_by_client = False
+    # 클라이언트가 요청하지 않은 종료의 이유 ("taken_over" | "error"). 연결이 끊긴 경우는 None
+    server_close = None
 
     try:
         # 1. 초기 설정 메시지 처리
@@ -132,60 +104,111 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.close(code=1008, reason=response_data.get("message"))
             return
         
+        bind_log_context(user_id=user_id)
+        resume_token = setup_data.get("resume_token")
+        if resume_token:
+            session = await live_session_service.resume(resume_token, user_id, websocket, user_voice_embeddings_mem.get(user_id))
+            response_data["resumed"] = session is not None
+        if session is None:
+            # 실시간 화자 검증은 세션 동안 특징을 누적하는 스트리밍 검증기를 사용합니다. (등록된 음성이 있을 때)
+            session = await live_session_service.create(
+                sid,
+                user_id,
+                progressive=bool(setup_data.get("progressive")),
+                encoder=ResultEncoder(negotiate_encoding(setup_data.get("encoding"))),
+                speaker_verifier=analyze_service.create_speaker_verifier(user_voice_embeddings_mem.get(user_id)),
+                resumable=bool(setup_data.get("resumable") or resume_token),
+            )
+            session.attach(websocket)
+        response_data["progressive"] = session.progressive
+        response_data["encoding"] = session.encoder.encoding
+        if session.resumable:
+            response_data["resume_token"] = session.resume_token
+            response_data["offset"] = session.received_bytes
+
+        # 세션 프로파일링 (SESSION_PROFILING_ENABLED 또는 운영자 플래그가 있을 때만)
+        profile_mode = resolve_profile_mode(setup_data.get("profile"), user_id)
+        if profile_mode:
+            session_profiler = start_session_profiler(f"analyze_{sid}", profile_mode)
+            response_data["profiling"] = profile_mode if session_profiler else None
+
         await websocket.send_text(json.dumps(response_data))
-        user_id_for_session = user_id
+        if session.encoder.compact:
+            await session.send_message(emotion_table(session.encoder.encoding))
 
         # 결과 전송 루프 시작
-        sender_task = asyncio.create_task(send_results_in_order())
+        session.start_sender()
 
         # 2. 실시간 음성 데이터 처리 루프 (생산자)
+        # 바이너리 메시지는 음성 데이터, 텍스트 메시지는 제어 이벤트(end_conversation)로 처리합니다.
         while True:
-            chunk = await websocket.receive_bytes()
-            buffer.extend(chunk)
-            full_audio_buffer.extend(chunk)
-
-            while len(buffer) >= CHUNK_SIZE:
-                chunk_to_process = buffer[:CHUNK_SIZE]
-                del buffer[:CHUNK_SIZE]
-                
-                user_embedding = user_voice_embeddings_mem.get(user_id_for_session)
-                
-                # 각 청크를 병렬 처리 작업으로 생성
-                asyncio.create_task(
-                    process_chunk_with_timeout(
-                        chunk_id_counter, chunk_to_process, user_id_for_session, user_embedding
-                    )
-                )
-                chunk_id_counter += 1
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("text") is not None:
+                event = _parse_control_event(message["text"])
+                if event == "end_conversation":
+                    ended_by_client = True
+                    break
+                logger.warning(f"알 수 없는 제어 이벤트: {message['text'][:100]}")
+                continue
+
+            user_embedding = user_voice_embeddings_mem.get(session.user_id)
+            if not session.feed_audio(websocket, message.get("bytes") or b"", user_embedding):
+                logger.info(f"다른 연결이 세션을 이어받아 이전 연결을 종료합니다. (sid: {sid})")
+                server_close = "taken_over"
+                break
 
     except WebSocketDisconnect:
-        print(f"🔌 연결 해제 (sid: {sid})")
+        logger.info(f"🔌 연결 해제 (sid: {sid})")
     except Exception as e:
         if not isinstance(e, WebSocketDisconnect):
-            print(f"❌ 예상치 못한 에러 (sid: {sid}): {e}")
+            logger.error(f"❌ 예상치 못한 에러 (sid: {sid}): {e}")
+            server_close = "error"
     finally:
         # 3. 후처리 및 세션 정리
-        print(f"🔌 후처리 시작 (sid: {sid}). 수신된 총 데이터 크기: {len(full_audio_buffer)} bytes")
-        
-        # 백그라운드 작업들을 안전하게 종료
-        stop_event.set()
-        if sender_task:
-            await sender_task
-
-        analyze_service.finalize_analysis(
-            wav_path=wav_path,
-            full_audio_buffer=full_audio_buffer,
-            user_id=user_id_for_session,
-            sid=sid,
-            ts=ts,
-            user_voice_embeddings_mem=user_voice_embeddings_mem
-        )
+        if session is not None and ended_by_client and session.websocket is websocket:
+            logger.info(f"🔌 후처리 시작 (sid: {sid}). 수신된 총 데이터 크기: {session.received_bytes} bytes")
+            # 클라이언트가 종료를 요청한 경우, 처리 중인 청크 결과까지 모두 전송한 뒤 최종 분석
+            await session.drain(CHUNK_DRAIN_TIMEOUT_SEC)
+            await session.stop_sender()
+            master_uid = None
+            try:
+                master_uid = await live_session_service.finalize(session)
+            except Exception as e:
+                logger.error(f"[최종 분석] 실패 (sid: {sid}): {e}")
+
+            # 종료 요청에 대한 응답: 후처리 완료를 알리고 연결을 닫습니다.
+            try:
+                await session.send_message({"event": "finalized", "master_uid": master_uid}, websocket)
+                await websocket.close(code=1000)
+            except Exception as e:
+                logger.info(f"finalized 이벤트 전송 실패 (sid: {sid}): {e}")
+            await session.detach(websocket)
+        elif session is not None:
+            # 서버 쪽 종료는 클라이언트가 연결 끊김과 구분할 수 있도록 이유를 알리고 닫습니다.
+            if server_close == "taken_over":
+                await _close_with_event(websocket, session, {"event": "session_taken_over"},
+                                        CLOSE_CODE_TAKEN_OVER, "session taken over")
+            elif server_close == "error":
+                await _close_with_event(websocket, session, {"event": "error", "message": "서버 오류로 연결을 종료합니다."},
+                                        1011, "internal error")
+            # resumable 세션은 재연결 유예 시간 뒤에, 아니면 바로 최종 분석합니다.
+            try:
+                await live_session_service.disconnect(session, websocket)
+            except Exception as e:
+                logger.error(f"[최종 분석] 실패 (sid: {sid}): {e}")
+        elif server_close == "error":
+            # 세션을 만들기 전(초기 설정 처리 중) 오류
+            await _close_with_event(websocket, None, {"event": "error", "message": "서버 오류로 연결을 종료합니다."},
+                                    1011, "internal error")
         
+        if session_profiler:
+            await run_in("provider_io", session_profiler.stop)
+
         # 세션 관련 데이터 정리
-        temp_file_to_remove = session_tempfiles.pop(sid, None)
-        if temp_file_to_remove and os.path.exists(temp_file_to_remove):
-            os.remove(temp_file_to_remove)
         session_user_id.pop(sid, None)
         # user_voice_embeddings_mem은 캐시이므로 유지
+        WEBSOCKET_SESSIONS_ACTIVE.dec(endpoint="analyze")
         
-        print(f"세션 정리 완료 (sid: {sid}).")
\ No newline at end of file
+        logger.info(f"세션 정리 완료 (sid: {sid}).")
@@ -12,9 +12,13 @@ from starlette.websockets import WebSocketDisconnect
 # Local application imports
 from app.services.user_services import user_service
 from app.services.user_voice_service import user_voice_service
+from app.utils.executors import run_in
+from app.utils.logger import bind_log_context, get_logger
+from app.utils.metrics import WEBSOCKET_SESSIONS_ACTIVE
 from .ws_analyze import user_voice_embeddings_mem
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 BASE_DIR = "storage/audio"
 WAV_DIR = os.path.join(BASE_DIR, "wav_chunks")
@@ -24,77 +28,109 @@ session_tempfiles = {}
 session_mode = {}
 session_user_id = {}
 
+def _register_voice(sid: int, buffer: bytearray, wav_path: str) -> bool:
+    """수신한 등록용 오디오를 WAV로 저장하고 음성 임베딩을 추출하여 DB/메모리에 저장합니다."""
+    if session_mode.get(sid) != "register_voice" or not buffer:
+        logger.info("[register_voice] 받은 오디오 데이터가 없습니다.")
+        return False
+
+    user_id = session_user_id.get(sid)
+    with wave.open(wav_path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(buffer)
+
+    logger.info(f"[register_voice] 등록용 오디오 WAV 파일 저장 완료: {wav_path}")
+
+    if not user_id:
+        return False
+    try:
+        logger.info(f"[register_voice] 음성 임베딩 및 DB 저장 시작: user_id={user_id}")
+        user_uid = user_service.get_user_uid_by_user_id(user_id)
+        if user_uid is None:
+            logger.warning(f"[register_voice] user_uid를 찾을 수 없음: user_id={user_id}")
+            return False
+        embedding = user_voice_service.register_user_voice(user_uid, wav_path)
+        logger.info(f"[register_voice] 음성 임베딩 및 DB 저장 완료: user_uid={user_uid}")
+        user_voice_embeddings_mem[user_id] = embedding
+        logger.info(f"[register_voice] user_id={user_id} 임베딩을 메모리에 적재 완료.")
+        return embedding is not None
+    except Exception as e:
+        logger.error(f"[register_voice] 음성 임베딩/DB 저장 에러: {e}")
+        return False
+
+
 @router.websocket("/ws/users")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     sid = id(websocket)
+    bind_log_context(sid=sid)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     wav_path = os.path.join(WAV_DIR, f"session_{ts}_{sid}.wav")
     temp_fd, temp_path = tempfile.mkstemp(suffix=".pcm")
     os.close(temp_fd)
     session_tempfiles[sid] = temp_path
     buffer = bytearray()
-    print(f"🟢 연결됨: {websocket.client}")
+    logger.info(f"🟢 연결됨: {websocket.client}")
+    WEBSOCKET_SESSIONS_ACTIVE.inc(endpoint="users")
 
     try:
         # 1. 설정 메시지 수신
         setup_data = await websocket.receive_json()
         event = setup_data.get("event")
-        print(f"🟢 이벤트: {event}")
+        logger.info(f"🟢 이벤트: {event}")
 
         if event == "register_voice":
             user_info = setup_data.get("user_info", {})
             user_id = user_info.get("user_id")
             if user_id:
                 session_user_id[sid] = user_id
-            print(f"[register_voice] 사용자 음성 등록 요청: {user_info}")
+                bind_log_context(user_id=user_id)
+            logger.info(f"[register_voice] 사용자 음성 등록 요청: {user_info}")
             session_mode[sid] = "register_voice"
             await websocket.send_text(
                 json.dumps({"event": "register_voice", "status": "ok", "user_info": user_info})
             )
         else:
-            print(f"잘못된 시작 이벤트 '{event}'. 연결을 종료합니다.")
+            logger.warning(f"잘못된 시작 이벤트 '{event}'. 연결을 종료합니다.")
             await websocket.close(code=1008)
             return
 
-        # 2. 데이터 스트림 수신
+        # 2. 데이터 스트림 수신 (텍스트 메시지 end_register_voice 로 정상 종료)
         while True:
-            audio_bytes = await websocket.receive_bytes()
-            buffer.extend(audio_bytes)
-            
-    except WebSocketDisconnect:
-        print(f"🔌 연결 해제: {websocket.client}")
-        
-        if session_mode.get(sid) == "register_voice" and buffer:
-            user_id = session_user_id.get(sid)
-            with wave.open(wav_path, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(16000)
-                wf.writeframes(buffer)
-
-            print(f"[register_voice] 등록용 오디오 WAV 파일 저장 완료: {wav_path}")
-
-            if user_id:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("text") is not None:
                 try:
-                    print(f"[register_voice] 음성 임베딩 및 DB 저장 시작: user_id={user_id}")
-                    user_uid = user_service.get_user_uid_by_user_id(user_id)
-                    if user_uid is not None:
-                        embedding = user_voice_service.register_user_voice(user_uid, wav_path)
-                        print(f"[register_voice] 음성 임베딩 및 DB 저장 완료: user_uid={user_uid}")
-                        user_voice_embeddings_mem[user_id] = embedding
-                        print(f"[register_voice] user_id={user_id} 임베딩을 메모리에 적재 완료.")
-                    else:
-                        print(f"[register_voice] user_uid를 찾을 수 없음: user_id={user_id}")
-                except Exception as e:
-                    print(f"[register_voice] 음성 임베딩/DB 저장 에러: {e}")
-        else:
-            print("[register_voice] 받은 오디오 데이터가 없습니다.")
+                    event = json.loads(message["text"]).get("event")
+                except (json.JSONDecodeError, AttributeError):
+                    event = None
+                if event == "end_register_voice":
+                    break
+                logger.warning(f"알 수 없는 제어 이벤트: {message['text'][:100]}")
+                continue
+            buffer.extend(message.get("bytes") or b"")
+
+        logger.info(f"[register_voice] 종료 요청 수신: {websocket.client}")
+        # 임베딩 추출(모델 추론)은 이벤트 루프를 막지 않도록 inference 풀에서 실행
+        registered = await run_in("inference", _register_voice, sid, buffer, wav_path)
+        await websocket.send_text(json.dumps({
+            "event": "register_voice_done",
+            "status": "ok" if registered else "error",
+        }))
+        await websocket.close(code=1000)
+
+    except WebSocketDisconnect:
+        logger.info(f"🔌 연결 해제: {websocket.client}")
+        await run_in("inference", _register_voice, sid, buffer, wav_path)
 
     except Exception as e:
         if not isinstance(e, WebSocketDisconnect):
-            print(f"❌ 에러: {e}")
+            logger.error(f"❌ 에러: {e}")
     finally:
+        WEBSOCKET_SESSIONS_ACTIVE.dec(endpoint="users")
         if sid in session_tempfiles:
              os.remove(session_tempfiles[sid])
              del session_tempfiles[sid]
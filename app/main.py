@@ -3,11 +3,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.endpoints.api_user import router as api_user_router
 from app.endpoints.api_analyze import router as api_analyze_router
 from app.endpoints.api_report import router as api_report_router
+from app.endpoints.api_metrics import router as api_metrics_router
 from app.endpoints.ws_user_voice import router as ws_user_router
 from app.endpoints.ws_analyze import router as ws_analyze_router
+from app.providers.gemini_client import warmup_emotion_router
+from app.services.embedding_pool import start_embedding_pool, stop_embedding_pool
+from app.services.finalization_service import start_finalization_worker, stop_finalization_worker
+from app.utils.executors import shutdown_executors
+from app.utils.logger import setup_logging
 import uvicorn
 
+# 비동기(큐 기반) 로깅 설정 - LOG_LEVEL, LOG_SAMPLE_EVERY 환경 변수로 조정
+setup_logging()
+
 app = FastAPI()
+# 임베딩 워커 풀은 모델 로드 직후, 추론을 시작하기 전에 fork 해야 하므로 시작 이벤트에서 띄웁니다.
+app.add_event_handler("startup", start_embedding_pool)
+# 로컬 감정 모델(EMOTION_ROUTER_MODE=local|hybrid)은 fork 이후에 로드/워밍업합니다.
+app.add_event_handler("startup", warmup_emotion_router)
+# 최종 분석 작업 큐 소비 (다른 워커가 등록한 작업도 이 워커가 가져가 실행할 수 있음)
+app.add_event_handler("startup", start_finalization_worker)
+app.add_event_handler("shutdown", stop_finalization_worker)
+app.add_event_handler("shutdown", stop_embedding_pool)
+app.add_event_handler("shutdown", shutdown_executors)
 
 # CORS 설정 추가
 app.add_middleware(
@@ -21,6 +39,7 @@ app.add_middleware(
 app.include_router(api_user_router)
 app.include_router(api_analyze_router)
 app.include_router(api_report_router)
+app.include_router(api_metrics_router)
 app.include_router(ws_user_router)
 app.include_router(ws_analyze_router)
 
@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+from app.utils.metrics import CIRCUIT_REJECTED_TOTAL, CIRCUIT_STATE, CIRCUIT_TRANSITIONS_TOTAL
+
+logger = get_logger(__name__)
+
+dotenv_path = Path(__file__).parent.parent.parent / "ENV" / ".env"
+if dotenv_path.exists():
+    load_dotenv(dotenv_path=dotenv_path)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 외부 Provider 호출을 하지 않은 경우"""
+    def __init__(self, name: str):
+        super().__init__(f"{name} 서킷이 열려 있습니다.")
+        self.name = name
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else default
+
+
+class CircuitBreaker:
+    """
+    외부 Provider 호출용 서킷 브레이커
+
+    - closed    : 정상. 최근 window 건 중 min_calls 건 이상 호출했고 실패 비율이 failure_ratio 이상이면 open 으로 전환
+    - open      : open_sec 동안 호출하지 않고 즉시 실패 처리 (청크마다 타임아웃까지 기다리지 않음)
+    - half_open : open_sec 이후 half_open_calls 건만 시험 호출을 허용. 모두 성공하면 closed, 하나라도 실패하면 다시 open
+    slow_call_sec 보다 오래 걸린 호출은 성공하더라도 실패로 집계합니다.
+
+    사용법:
+        call = breaker.call()
+        if call is None:
+            ...  # 즉시 실패 / degraded 모드
+        with call:
+            try:
+                result = provider()
+            except Exception:
+                call.failure()
+                raise
+            call.success()
+    결과를 기록하지 않고 with 블록을 벗어나면(취소, 타임아웃 등) half_open 시험 슬롯을 반환하므로
+    시험 호출이 취소되어도 서킷이 half_open 에 멈추지 않습니다.
+    """
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5, failure_ratio: float = 0.5,
+                 open_sec: float = 30.0, half_open_calls: int = 1, slow_call_sec: float | None = None):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_sec = open_sec
+        self.half_open_calls = half_open_calls
+        self.slow_call_sec = slow_call_sec
+        self._outcomes = deque(maxlen=window)  # True = 실패
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # half_open 전환 횟수. 이전 half_open 기간의 시험 호출이 늦게 끝나도 현재 슬롯을 건드리지 않도록 구분합니다.
+        self._half_open_id = 0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(0, provider=name)
+
+    @property
+    def state(self) -> str:
+        """현재 상태 (open_sec 가 지난 open 은 half_open 으로 보고합니다)"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_sec:
+                return HALF_OPEN
+            return self._state
+
+    def available(self) -> bool:
+        """호출 가능 여부를 확인만 합니다. (half_open 시험 호출 슬롯을 사용하지 않음)"""
+        return self.state != OPEN
+
+    def _transition(self, state: str):
+        if self._state == state:
+            return
+        logger.warning(f"[서킷 브레이커] {self.name}: {self._state} → {state}")
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], provider=self.name)
+        CIRCUIT_TRANSITIONS_TOTAL.inc(provider=self.name, state=state)
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == HALF_OPEN:
+            self._half_open_id += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        else:
+            self._outcomes.clear()
+
+    def _admit(self) -> tuple[bool, int | None]:
+        """(허용 여부, 시험 호출이면 half_open id / 일반 호출이면 0)"""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_sec:
+                    CIRCUIT_REJECTED_TOTAL.inc(provider=self.name)
+                    return False, None
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_calls:
+                    CIRCUIT_REJECTED_TOTAL.inc(provider=self.name)
+                    return False, None
+                self._probes_in_flight += 1
+                return True, self._half_open_id
+            return True, 0
+
+    def allow(self) -> bool:
+        """
+        호출해도 되는지 확인합니다. False 이면 호출하지 말고 즉시 실패/degraded 처리해야 합니다.
+        True 이면 반드시 record_* 중 하나를 호출해야 합니다. (가능하면 결과 기록이 보장되는 call() 사용)
+        """
+        return self._admit()[0]
+
+    def call(self) -> "CircuitCall | None":
+        """allow() 와 같지만, 허용되면 결과를 한 번만 기록하는 CircuitCall 을 반환합니다. 거부되면 None."""
+        allowed, probe = self._admit()
+        return CircuitCall(self, probe) if allowed else None
+
+    def _is_current_probe(self, probe: int | None) -> bool:
+        # probe 를 모르는 호출(allow + record_*)은 현재 half_open 기간의 시험 호출로 봅니다.
+        # 0 은 closed 상태에서 허용된 일반 호출이므로 half_open 시험 결과에 반영하지 않습니다.
+        return self._state == HALF_OPEN and (probe is None or probe == self._half_open_id)
+
+    def record_success(self, elapsed_sec: float | None = None, probe: int | None = None):
+        if self.slow_call_sec is not None and elapsed_sec is not None and elapsed_sec >= self.slow_call_sec:
+            self.record_failure(probe)
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if self._is_current_probe(probe):
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+            self._outcomes.append(False)
+
+    def record_ignored(self, probe: int | None = None):
+        """성공/실패로 집계하지 않는 결과 (예: 클라이언트 측 호출 제한, 취소). half_open 시험 슬롯만 반환합니다."""
+        with self._lock:
+            if self._is_current_probe(probe) and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def record_failure(self, probe: int | None = None):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if self._is_current_probe(probe):
+                    self._transition(OPEN)
+                return
+            if self._state == OPEN:
+                return
+            self._outcomes.append(True)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_ratio:
+                self._transition(OPEN)
+
+
+class CircuitCall:
+    """
+    CircuitBreaker.call() 로 허용된 호출 하나
+    success / failure / ignored 중 처음 기록한 결과만 반영합니다.
+    기록 없이 with 블록을 벗어나면 예외(Exception)는 실패로, 그 밖의 종료(CancelledError 등)는 ignored 로 처리해
+    half_open 시험 슬롯이 항상 반환되도록 합니다.
+    """
+    def __init__(self, breaker: CircuitBreaker, probe: int | None):
+        self.breaker = breaker
+        self.probe = probe
+        self.start = time.perf_counter()
+        self.recorded = False
+
+    def success(self):
+        if not self.recorded:
+            self.recorded = True
+            self.breaker.record_success(time.perf_counter() - self.start, self.probe)
+
+    def failure(self):
+        if not self.recorded:
+            self.recorded = True
+            self.breaker.record_failure(self.probe)
+
+    def ignored(self):
+        if not self.recorded:
+            self.recorded = True
+            self.breaker.record_ignored(self.probe)
+
+    def timed(self, fn):
+        """
+        코루틴 함수 fn 을 실제로 호출하는 시점부터 시간을 재도록 감쌉니다.
+        호출 제한(GeminiScheduler) 대기열에서 기다린 시간이 slow_call_sec 판정에 들어가지 않도록 call_async 에 넘길 때 사용합니다.
+        (429 재시도마다 다시 재므로 마지막 시도의 응답 시간만 반영)
+        """
+        async def run(*args, **kwargs):
+            self.start = time.perf_counter()
+            return await fn(*args, **kwargs)
+        return run
+
+    def __enter__(self) -> "CircuitCall":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.failure()
+        else:
+            self.ignored()
+        return False
+
+
+# Provider 별 서킷 브레이커
+#   gemini_text  : Gemini 텍스트 감정 분석 → 열리면 음성 감정만 사용 (audio_only)
+#   gemini_audio : Gemini 음성 감정 분석 → 열리면 텍스트 감정만 사용 (text_only)
+#   google_stt   : 실시간 STT → 열리면 Clova Short STT 로 대체
+#   clova_short  : Clova Short STT
+#   clova_long   : 최종 분석용 Clova Long STT → 열리면 최종 분석을 즉시 실패 처리
+PROVIDERS = ("gemini_text", "gemini_audio", "google_stt", "clova_short", "clova_long")
+
+breakers = {
+    name: CircuitBreaker(
+        name,
+        window=int(_env_float("CIRCUIT_WINDOW", 20)),
+        min_calls=int(_env_float("CIRCUIT_MIN_CALLS", 5)),
+        failure_ratio=_env_float("CIRCUIT_FAILURE_RATIO", 0.5),
+        open_sec=_env_float("CIRCUIT_OPEN_SEC", 30.0),
+        slow_call_sec=(
+            _env_float("CIRCUIT_LONG_SLOW_CALL_SEC", 60.0) if name == "clova_long"
+            else _env_float("CIRCUIT_SLOW_CALL_SEC", 8.0)
+        ),
+    )
+    for name in PROVIDERS
+}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    return breakers[name]
+
+
+def provider_status() -> dict:
+    """Provider 별 서킷 상태 (웹소켓 결과의 provider_status 필드)"""
+    return {name: breaker.state for name, breaker in breakers.items()}
@@ -4,6 +4,12 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+from app.providers.circuit_breaker import get_breaker
+from app.utils.metrics import record_provider_result
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 # 프로젝트 루트를 기준으로 ENV/.env 파일의 절대 경로를 계산하여 환경 변수를 로드합니다.
 project_root = Path(__file__).resolve().parents[2]
 env_path = project_root / 'ENV' / '.env'
@@ -56,22 +62,32 @@ class ClovaSpeechClient:
 
         url = self.long_invoke_url + "/recognizer/upload"
 
+        # 서킷이 열려 있으면 60초 타임아웃을 기다리지 않고 바로 실패 처리합니다.
+        call = get_breaker("clova_long").call()
+        if call is None:
+            logger.warning("Clova Long API circuit is open. Skipping request.")
+            return None
         try:
-            print(f"Sending long-form STT request to {url}...")
-            response = requests.post(headers=headers, url=url, files=files, timeout=60)
-            response.raise_for_status()
+            logger.debug(f"Sending long-form STT request to {url}...")
+            with call:
+                response = requests.post(headers=headers, url=url, files=files, timeout=60)
+                response.raise_for_status()
+                call.success()
+            record_provider_result("clova_long", True)
             return response.json()
         except requests.exceptions.HTTPError as e:
-            print(f"Clova Long API HTTP Error: {e}")
+            record_provider_result("clova_long", False)
+            logger.error(f"Clova Long API HTTP Error: {e}")
             if e.response:
                 try:
                     error_details = e.response.json()
-                    print(f"Error Details: {error_details}")
+                    logger.error(f"Error Details: {error_details}")
                 except json.JSONDecodeError:
-                    print(f"Could not parse error response. Status: {e.response.status_code}, Body: {e.response.text}")
+                    logger.error(f"Could not parse error response. Status: {e.response.status_code}, Body: {e.response.text}")
             return None
         except Exception as e:
-            print(f"An unexpected error occurred during Clova Long API call: {e}")
+            record_provider_result("clova_long", False)
+            logger.error(f"An unexpected error occurred during Clova Long API call: {e}")
             return None
 
     def recognize_short(self, audio_data: bytes, language="Kor") -> str | None:
@@ -86,14 +102,21 @@ class ClovaSpeechClient:
         # Correct path for short-form API is /stt
         url = self.short_invoke_url + f"?lang={language}"
 
+        call = get_breaker("clova_short").call()
+        if call is None:
+            return None
         try:
-            print(f"Sending Short-form STT request to {url}...")
-            response = requests.post(url, headers=headers, data=audio_data, timeout=20)
-            response.raise_for_status()
-            result = response.json()
-            print(f"Short API Response: {result}")
+            logger.debug(f"Sending Short-form STT request to {url}...")
+            with call:
+                response = requests.post(url, headers=headers, data=audio_data, timeout=20)
+                response.raise_for_status()
+                result = response.json()
+                call.success()
+            record_provider_result("clova_short", True)
+            logger.debug("Short API Response: %s", result)
             return result.get("text")
         except Exception as e:
-            print(f"Clova Short API HTTP Error: {e}")
-            if hasattr(e, 'response') and e.response: print(f"Response Body: {e.response.text}")
+            record_provider_result("clova_short", False)
+            logger.error(f"Clova Short API HTTP Error: {e}")
+            if hasattr(e, 'response') and e.response: logger.error(f"Response Body: {e.response.text}")
             return None 
\ No newline at end of file
@@ -1,12 +1,36 @@
 import os
 import google.generativeai as genai
 import numpy as np
+import asyncio
+import io
 import json
-import tempfile
 import wave
 from dotenv import load_dotenv
 from pathlib import Path
 
+# 감정 매핑/표시용 헬퍼는 DB·리포트 계층에서도 쓰이므로 utils에 두고 여기서 재노출합니다.
+from app.utils.emotion_utils import (
+    EMOTION_COLORS,
+    EMOTION_MAPPING,
+    EMOTION_MAP,
+    get_dominant_emotion,
+    map_emotion_to_standard,
+    map_emotion_to_korean,
+    map_emotion_to_color,
+    format_analysis_result,
+    normalize_scores,
+    AUDIO_EMOTIONS,
+    TEXT_EMOTIONS,
+)
+from app.providers.circuit_breaker import CircuitOpenError, get_breaker
+from app.providers.gemini_scheduler import GeminiRateLimitedError, gemini_scheduler
+from app.providers.local_emotion_client import EARLY_AUDIO_EMOTION_ENABLED, confidence, local_emotion_client
+from app.utils.executors import run_in
+from app.utils.metrics import GEMINI_RESPONSES_TOTAL, record_provider_result
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 # .env 환경변수 로드 (상위 ENV 폴더 기준)
 dotenv_path = Path(__file__).parent.parent.parent / "ENV" / ".env"
 if dotenv_path.exists():
@@ -19,6 +43,15 @@ if not GOOGLE_API_KEY:
 
 genai.configure(api_key=GOOGLE_API_KEY)
 
+# 실시간(realtime) 감정 분석 라우팅 (최종 분석(batch)은 항상 Gemini 사용)
+#   gemini : 텍스트/음성 모두 Gemini (기본)
+#   local  : 로컬 CPU 모델만 사용. 로컬 모델이 없는 모달리티는 중립으로 처리 (지연 시간 예측 가능)
+#   hybrid : 로컬 모델 우선, 로컬 신뢰도(최고 점수)가 EMOTION_LOCAL_MIN_CONFIDENCE 미만이거나 로컬 모델이 없으면 Gemini
+EMOTION_ROUTER_MODE = os.getenv("EMOTION_ROUTER_MODE", "").strip().lower() or "gemini"
+EMOTION_LOCAL_MIN_CONFIDENCE = float(os.getenv("EMOTION_LOCAL_MIN_CONFIDENCE", "").strip() or 0.6)
+if EMOTION_ROUTER_MODE not in ("gemini", "local", "hybrid"):
+    raise ValueError(f"EMOTION_ROUTER_MODE 값이 올바르지 않습니다: {EMOTION_ROUTER_MODE}")
+
 # Gemini 모델 초기화
 def get_gemini_model():
     try:
@@ -27,77 +60,48 @@ def get_gemini_model():
         _ = model.generate_content("Hello")
         return model
     except Exception as e:
-        print(f"[emotion_analyzer] Gemini 모델 초기화 실패: {e}")
+        logger.error(f"[emotion_analyzer] Gemini 모델 초기화 실패: {e}")
         return None
 
 model = get_gemini_model()
 
-# 감정 색상, 한글 매핑, 표준화 맵
-EMOTION_COLORS = {
-    "positive": "#FFD700",  # Gold
-    "negative": "#4682B4",  # Steel Blue
-    "angry": "#FF4500",  # Red Orange
-    "fear": "#800080",  # Purple
-    "disgust": "#006400",  # Dark Green
-    "surprise": "#FF69B4",  # Hot Pink
-    "neutral": "#F5F5F5",  # Light Gray
-    "happy": "#FFD700",  # Alias for positive
-    "sad": "#4682B4",  # Alias for negative
-}
-
-EMOTION_MAPPING = {
-    "positive": "긍정",
-    "negative": "부정",
-    "neutral": "중립",
-    "happy": "행복",
-    "sad": "슬픔",
-    "angry": "분노",
-    "fear": "두려움",
-    "disgust": "혐오",
-    "surprise": "놀람",
-}
-
-EMOTION_MAP = {
-    "positive": "positive",
-    "negative": "negative",
-    "neutral": "neutral",
-    "happy": "positive",
-    "surprise": "positive",
-    "sad": "negative",
-    "angry": "negative",
-    "fear": "negative",
-    "disgust": "negative",
-}
-
-def get_dominant_emotion(emotion_scores: dict, default="neutral"):
-    """
-    감정 점수 dict에서 가장 높은 감정 key를 반환 (값이 없거나 dict가 아니면 default)
-    """
-    if emotion_scores and isinstance(emotion_scores, dict):
-        try:
-            emotion_values = {k: float(v) for k, v in emotion_scores.items()}
-            return max(emotion_values, key=emotion_values.get, default=default)
-        except Exception:
-            return default
-    return default
-
-def map_emotion_to_standard(emotion: str) -> str:
-    """7가지 감정을 3가지 표준 감정(positive/negative/neutral)으로 매핑"""
-    return EMOTION_MAP.get(emotion, "neutral")
+# 응답 스키마: 감정별 점수(0~1) 객체를 강제해 자유 형식 JSON 파싱 실패로 유료 호출을 버리지 않도록 합니다.
+def _score_schema(labels: tuple):
+    return genai.protos.Schema(
+        type=genai.protos.Type.OBJECT,
+        properties={label: genai.protos.Schema(type=genai.protos.Type.NUMBER) for label in labels},
+        required=list(labels),
+    )
 
-def map_emotion_to_korean(emotion: str) -> str:
-    """영문 감정명을 한글로 매핑"""
-    return EMOTION_MAPPING.get(emotion, "중립")
+TEXT_SCORE_CONFIG = {"response_mime_type": "application/json", "response_schema": _score_schema(TEXT_EMOTIONS)}
+AUDIO_SCORE_CONFIG = {"response_mime_type": "application/json", "response_schema": _score_schema(AUDIO_EMOTIONS)}
 
-def map_emotion_to_color(emotion: str) -> str:
-    """감정명에 해당하는 색상 hex코드 반환"""
-    return EMOTION_COLORS.get(emotion, "#F5F5F5")
+def _parse_scores(response, labels: tuple, modality: str) -> dict | None:
+    """스키마 응답을 검증/정규화합니다. 쓸 수 없는 응답이면 None (gemini_responses_total 에 집계)"""
+    try:
+        raw = json.loads(response.text)
+    except (ValueError, AttributeError) as e:  # JSON 오류 또는 차단 등으로 후보가 없는 응답
+        logger.warning(f"[Gemini] {modality} 응답 파싱 실패: {e}")
+        raw = None
+    scores, adjusted = normalize_scores(raw, labels)
+    GEMINI_RESPONSES_TOTAL.inc(
+        modality=modality, outcome="invalid" if scores is None else "normalized" if adjusted else "valid")
+    return scores
 
 # 텍스트 감정 분석 함수
-def analyze_text_sentiment(text, context=""):
+# priority: realtime(실시간 청크) | batch(최종 분석). 할당량 부족 시 기본값 대신 GeminiRateLimitedError 를 올립니다.
+# 429 가 아닌 호출 오류와 검증에 실패한 응답은 가짜 기본 점수 대신 None 을 반환하고(gemini_responses_total outcome=error|invalid),
+# analyze_emotions 는 서킷이 열린 경우와 같이 그 모달리티를 건너뜁니다. (degraded)
+# 성공 집계와 서킷 성공 기록은 응답 검증(_parse_scores)을 통과한 뒤에만 하고, 쓸 수 없는 응답은 서킷 실패로 셉니다.
+# 호출은 SDK 의 비동기 API(generate_content_async)로 이벤트 루프에서 바로 기다리므로 executor 스레드를 점유하지 않습니다.
+# (GenerativeModel 은 SDK 의 기본 비동기 클라이언트(gRPC 채널 1개)를 공유하므로 모든 세션이 같은 연결을 사용합니다.)
+async def analyze_text_sentiment(text, context="", priority="realtime"):
     if not model:
-        print("Model not initialized, returning default sentiment")
-        return {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
+        logger.warning("Model not initialized, skipping text sentiment")
+        return None
+    call = get_breaker("gemini_text").call()
+    if call is None:
+        raise CircuitOpenError("gemini_text")
     try:
         prompt = f"""
         Given the following conversation context:
@@ -106,146 +110,252 @@ def analyze_text_sentiment(text, context=""):
         --- END CONTEXT ---
 
         Analyze the sentiment of THIS specific text: \"{text}\"
-        Return only a JSON object with this exact format:
-        {{\"positive\": number between 0 and 1, \"negative\": number between 0 and 1, \"neutral\": number between 0 and 1}}
-        The sum of all numbers should be 1."""
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        if response_text.startswith("```") and response_text.endswith("```"):
-            response_text = response_text[3:-3]
-        if response_text.startswith("json"):
-            response_text = response_text[4:]
-        response_text = response_text.strip()
-        try:
-            sentiment_scores = json.loads(response_text)
-            if not all(isinstance(v, (int, float)) for v in sentiment_scores.values()):
-                return {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
-            total = sum(sentiment_scores.values())
-            if abs(total - 1.0) > 0.1:
-                return {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
-            required_keys = {"positive", "negative", "neutral"}
-            if not all(key in sentiment_scores for key in required_keys):
-                return {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
-            return sentiment_scores
-        except json.JSONDecodeError:
-            return {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
+        Score positive, negative and neutral between 0 and 1. The sum of all numbers should be 1."""
+        # 느린 호출 판정은 토큰을 받은 뒤부터 (최종 분석의 긴 대기열 대기가 서킷을 열지 않도록)
+        response = await gemini_scheduler.call_async(
+            priority, call.timed(model.generate_content_async), prompt, generation_config=TEXT_SCORE_CONFIG)
+        scores = _parse_scores(response, TEXT_EMOTIONS, "text")
+        if scores is None:
+            record_provider_result("gemini_text", False, outcome="invalid")
+            call.failure()
+            return None
+        record_provider_result("gemini_text", True)
+        call.success()
+        return scores
+    except GeminiRateLimitedError:
+        # 클라이언트 측 호출 제한은 Provider 장애로 보지 않습니다.
+        record_provider_result("gemini_text", False)
+        call.ignored()
+        raise
     except Exception as e:
-        print(f"Error analyzing text sentiment: {str(e)}")
-        return {"positive": 0.33, "negative": 0.33, "neutral": 0.34}
+        record_provider_result("gemini_text", False)
+        call.failure()
+        GEMINI_RESPONSES_TOTAL.inc(modality="text", outcome="error")
+        logger.error(f"Error analyzing text sentiment: {str(e)}")
+        return None
+    finally:
+        # 청크 파이프라인 타임아웃 등으로 취소(CancelledError)되면 결과 없이 half_open 시험 슬롯만 반환합니다.
+        call.ignored()
+
+def _to_wav_bytes(audio_array) -> bytes:
+    """16kHz float 파형을 16-bit mono WAV 바이트로 변환합니다."""
+    with io.BytesIO() as wav_io:
+        with wave.open(wav_io, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)  # 16-bit
+            wav_file.setframerate(16000)
+            wav_data = (audio_array * 32767).astype(np.int16)
+            wav_file.writeframes(wav_data.tobytes())
+        return wav_io.getvalue()
 
 # 음성 감정 분석 함수
-def analyze_audio_emotion(audio_array):
+# 오디오는 파일 업로드(블로킹 HTTP 왕복) 대신 요청에 inline 데이터로 넣어 보냅니다.
+async def analyze_audio_emotion(audio_array, priority="realtime"):
     if model is None:
-        return {"neutral": 1.0}
-    temp_wav_name = None
+        return None
+    call = get_breaker("gemini_audio").call()
+    if call is None:
+        raise CircuitOpenError("gemini_audio")
     try:
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-            with wave.open(temp_wav.name, "wb") as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(16000)
-                wav_data = (audio_array * 32767).astype(np.int16)
-                wav_file.writeframes(wav_data.tobytes())
-            temp_wav_name = temp_wav.name
-        audio_file = genai.upload_file(path=temp_wav_name)
+        audio_part = {"mime_type": "audio/wav", "data": _to_wav_bytes(audio_array)}
         prompt = """
         Please analyze the emotion from the speaker's voice in the provided audio file. 
         Consider vocal cues like tone, pitch, and speed.
         Classify the emotion into one of the following 7 categories: 
         happy, sad, angry, fear, disgust, surprise, neutral.
-        Respond ONLY with a valid JSON object where keys are these 7 emotions 
-        and values are their confidence scores from 0.0 to 1.0, summing to 1.0.
+        Give each of these 7 emotions a confidence score from 0.0 to 1.0, summing to 1.0.
         """
-        response = model.generate_content(
-            [prompt, audio_file],
-            generation_config={"response_mime_type": "application/json"},
+        response = await gemini_scheduler.call_async(
+            priority,
+            call.timed(model.generate_content_async),
+            [prompt, audio_part],
+            generation_config=AUDIO_SCORE_CONFIG,
         )
-        os.unlink(temp_wav_name)
-        return json.loads(response.text)
+        scores = _parse_scores(response, AUDIO_EMOTIONS, "audio")
+        if scores is None:
+            record_provider_result("gemini_audio", False, outcome="invalid")
+            call.failure()
+            return None
+        record_provider_result("gemini_audio", True)
+        call.success()
+        return scores
+    except GeminiRateLimitedError:
+        record_provider_result("gemini_audio", False)
+        call.ignored()
+        raise
     except Exception as e:
-        print(f"Error in Gemini audio emotion analysis: {str(e)}")
-        if temp_wav_name and os.path.exists(temp_wav_name):
-            os.unlink(temp_wav_name)
-        return {"neutral": 1.0}
+        record_provider_result("gemini_audio", False)
+        call.failure()
+        GEMINI_RESPONSES_TOTAL.inc(modality="audio", outcome="error")
+        logger.error(f"Error in Gemini audio emotion analysis: {str(e)}")
+        return None
+    finally:
+        call.ignored()
 
-def analyze_conversation_emotions(segments: list) -> list:
+async def analyze_conversation_emotions(segments: list) -> list:
     """
     (수정) 전체 대화 세그먼트 리스트를 받아, 각 세그먼트를 개별적으로 분석하되,
     이전 대화 내용을 컨텍스트로 함께 제공하여 분석 정확도를 높입니다.
     안정성을 위해 임시 파일을 생성하는 대신 메모리 내에서 오디오를 처리합니다.
 
-    :param segments: [{'text': str, 'speaker': str, 'audio': np.ndarray | None}, ...]
+    :param segments: [{'text': str, 'speaker': str, 'audio': np.ndarray | None, 'result': dict | None}, ...]
+                     result 가 있는 세그먼트(실시간 결과 재사용)는 호출하지 않고 컨텍스트로만 사용합니다.
     :return: 각 세그먼트에 대한 감정 분석 결과 dict의 리스트.
+             분석하지 못한 세그먼트(할당량 부족, 서킷 열림, 호출 오류)는 중립 결과 대신 None 이며,
+             최종 분석은 그 세그먼트의 점수 벡터를 NULL 로 저장해 리포트/추이 집계에서 제외합니다.
     """
-    if not model or not segments:
+    if not segments:
         return []
+    if not model:
+        return [seg.get('result') for seg in segments]
 
     all_results = []
     conversation_history = []
 
-    print(f"[Gemini 대화 분석] {len(segments)}개 세그먼트 순차 분석 시작...")
+    logger.info(f"[Gemini 대화 분석] {len(segments)}개 세그먼트 순차 분석 시작...")
     for i, seg in enumerate(segments):
         try:
             text = seg.get('text', '')
             speaker = seg.get('speaker', 'Unknown')
             audio_array = seg.get('audio')
 
+            if seg.get('result') is not None:
+                all_results.append(seg['result'])
+                conversation_history.append(f"Speaker {speaker}: {text}")
+                continue
+
             # 이전 대화 내용을 컨텍스트로 구성
             context = "\n".join(conversation_history[-3:]) # 최근 3개 대화만 컨텍스트로 사용
             
             # 단일 분석 함수 재활용
             # analyze_emotions는 내부적으로 텍스트와 오디오 분석을 각각 수행
-            analysis_result = analyze_emotions(text, audio_array, context)
+            analysis_result = await analyze_emotions(text, audio_array, context, priority="batch")
             all_results.append(analysis_result)
 
             # 현재 대화를 기록에 추가
             conversation_history.append(f"Speaker {speaker}: {text}")
-            print(f"  - Segment {i+1}/{len(segments)} 분석 완료.")
+            logger.debug("  - Segment %d/%d 분석 완료.", i + 1, len(segments))
 
+        except GeminiRateLimitedError as e:
+            logger.error(f"  - Segment {i+1} 할당량 부족으로 분석하지 못했습니다: {e}")
+            all_results.append(None)
+            conversation_history.append(f"Speaker {seg.get('speaker', 'Unknown')}: {seg.get('text', '')}")
+            continue
         except Exception as e:
-            print(f"  - Segment {i+1} 분석 중 오류 발생: {e}")
-            # 오류 발생 시 기본값으로 결과 추가
-            all_results.append(_format_analysis_result(
-                {"neutral": 1.0}, {"neutral": 1.0}
-            ))
+            logger.error(f"  - Segment {i+1} 분석 중 오류 발생: {e}")
+            all_results.append(None)
+            conversation_history.append(f"Speaker {seg.get('speaker', 'Unknown')}: {seg.get('text', '')}")
             continue
     
-    print(f"[Gemini 대화 분석] 모든 세그먼트 분석 완료.")
+    logger.info(f"[Gemini 대화 분석] 모든 세그먼트 분석 완료.")
     return all_results
 
-def analyze_emotions(text, audio_array, context=""):
+def warmup_emotion_router():
+    """로컬 감정 모델을 쓰는 설정이면 모델을 미리 로드합니다. (앱 시작 이벤트에서 호출)"""
+    if EMOTION_ROUTER_MODE != "gemini":
+        local_emotion_client.warmup()
+    elif EARLY_AUDIO_EMOTION_ENABLED:
+        # progressive 모드의 음성 감정 추정치만 쓰는 경우
+        local_emotion_client.warmup(text=False)
+
+
+async def _route_modality(local_call, gemini_call) -> tuple[dict | None, str]:
+    """
+    로컬 결과와 라우터 모드로 한 모달리티의 점수와 출처(local|gemini|skipped)를 결정합니다.
+    skipped 이면 점수는 None 입니다. (분석하지 않음)
+    """
+    # 로컬 모델 추론은 CPU 작업이므로 inference 풀에서 실행합니다.
+    local_scores = await run_in("inference", local_call)
+    if local_scores is not None and (
+        EMOTION_ROUTER_MODE == "local" or confidence(local_scores) >= EMOTION_LOCAL_MIN_CONFIDENCE
+    ):
+        return local_scores, "local"
+    if EMOTION_ROUTER_MODE == "local":
+        return None, "skipped"
+    try:
+        scores = await gemini_call()
+    except (CircuitOpenError, GeminiRateLimitedError) as e:
+        logger.debug("[감정 라우터] Gemini 사용 불가 (%s), 로컬 결과 사용", e)
+        scores = None
+    if scores is not None:
+        return scores, "gemini"
+    # Gemini 를 쓸 수 없거나 호출이 실패하면 신뢰도가 낮더라도 로컬 결과를 사용합니다.
+    if local_scores is not None:
+        return local_scores, "local"
+    return None, "skipped"
+
+
+async def _analyze_emotions_routed(text, audio_array, context=""):
+    """EMOTION_ROUTER_MODE=local|hybrid 의 실시간 감정 분석"""
+    has_audio = audio_array is not None and audio_array.size > 0
+    text_route = _route_modality(
+        lambda: local_emotion_client.analyze_text(text),
+        lambda: analyze_text_sentiment(text, context, "realtime"),
+    )
+    if has_audio:
+        (text_scores, text_source), (audio_scores, audio_source) = await asyncio.gather(
+            text_route,
+            _route_modality(
+                lambda: local_emotion_client.analyze_audio(audio_array),
+                lambda: analyze_audio_emotion(audio_array, "realtime"),
+            ),
+        )
+    else:
+        text_scores, text_source = await text_route
+        audio_scores, audio_source = None, "skipped"
+    result = format_analysis_result(text_scores, audio_scores)
+    result["source"] = {"text": text_source, "audio": audio_source}
+    return result
+
+
+async def _skip_open_circuit(coro):
+    """서킷이 열려 있거나 호출이 실패하면 None 을 반환합니다. (degraded 모드 판단용)"""
+    try:
+        return await coro
+    except CircuitOpenError:
+        return None
+
+
+async def analyze_emotions(text, audio_array, context="", priority="realtime"):
     """
     (수정) 단일 텍스트와 오디오를 입력받아 Gemini로 감정 분석을 수행합니다.
     대화의 이전 맥락(context)을 프롬프트에 추가할 수 있습니다.
+    텍스트/음성 분석은 동시에 요청하며, 호출은 gemini_scheduler 의 priority 대기열을 거칩니다.
+    할당량 부족 시 GeminiRateLimitedError 가 발생합니다.
+    서킷이 열렸거나 호출이 실패한 쪽은 건너뛰고(degraded 모드) 나머지 결과만 사용합니다.
+    건너뛴 모달리티와 오디오가 없는 세그먼트의 음성 감정은 중립으로 채우지 않고 None 입니다.
+      - gemini_audio 가 열림/실패: 텍스트 감정만 분석 (degraded="text_only")
+      - gemini_text 가 열림/실패 : 음성 감정만 분석 (degraded="audio_only")
+      - 둘 다 열림/실패         : CircuitOpenError
+    실시간 호출은 EMOTION_ROUTER_MODE 에 따라 로컬 CPU 모델을 먼저 사용할 수 있습니다.
     """
-    # 텍스트와 오디오 분석을 병렬로 실행
-    text_scores = analyze_text_sentiment(text, context)
-    
-    # audio_array가 None이거나 비어있으면 오디오 분석 스킵
-    if audio_array is not None and audio_array.size > 0:
-        audio_scores = analyze_audio_emotion(audio_array)
+    if priority == "realtime" and EMOTION_ROUTER_MODE != "gemini":
+        return await _analyze_emotions_routed(text, audio_array, context)
+
+    degraded = None
+    has_audio = audio_array is not None and audio_array.size > 0
+    if has_audio:
+        outcomes = await asyncio.gather(
+            _skip_open_circuit(analyze_text_sentiment(text, context, priority)),
+            _skip_open_circuit(analyze_audio_emotion(audio_array, priority)),
+            return_exceptions=True,
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        text_scores, audio_scores = outcomes
     else:
-        audio_scores = {"neutral": 1.0}
-
-    return _format_analysis_result(text_scores, audio_scores)
-
-def _format_analysis_result(text_scores, audio_scores):
-    """분석 결과를 최종 포맷으로 조합하는 헬퍼 함수"""
-    text_dominant = get_dominant_emotion(text_scores)
-    audio_dominant = get_dominant_emotion(audio_scores)
-    return {
-        "text": {
-            "scores": text_scores,
-            "dominant": text_dominant,
-            "standard": map_emotion_to_standard(text_dominant),
-            "korean": map_emotion_to_korean(text_dominant),
-            "color": map_emotion_to_color(map_emotion_to_standard(text_dominant)),
-        },
-        "audio": {
-            "scores": audio_scores,
-            "dominant": audio_dominant,
-            "standard": map_emotion_to_standard(audio_dominant),
-            "korean": map_emotion_to_korean(audio_dominant),
-            "color": map_emotion_to_color(map_emotion_to_standard(audio_dominant)),
-        },
-    }
+        text_scores = await _skip_open_circuit(analyze_text_sentiment(text, context, priority))
+        audio_scores = None
+
+    if text_scores is None and audio_scores is None:
+        raise CircuitOpenError("gemini_text")
+    if has_audio and audio_scores is None:
+        degraded = "text_only"
+    if text_scores is None:
+        degraded = "audio_only"
+
+    result = format_analysis_result(text_scores, audio_scores)
+    if degraded:
+        result["degraded"] = degraded
+    return result
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+from app.utils.metrics import GEMINI_QUEUE_WAIT_SECONDS, GEMINI_THROTTLED_TOTAL
+
+logger = get_logger(__name__)
+
+dotenv_path = Path(__file__).parent.parent.parent / "ENV" / ".env"
+if dotenv_path.exists():
+    load_dotenv(dotenv_path=dotenv_path)
+
+# 호출 우선순위
+#   realtime : 실시간 청크 분석. 대기 시간이 짧고(GEMINI_REALTIME_MAX_WAIT_SEC) 항상 먼저 토큰을 받습니다.
+#   batch    : 세션 종료 후 최종 분석. 버킷에 예비분(GEMINI_BATCH_HEADROOM)이 남아 있을 때만 토큰을 가져가고 오래 기다릴 수 있습니다.
+PRIORITIES = ("realtime", "batch")
+
+
+class GeminiRateLimitedError(Exception):
+    """할당량 부족(대기 시간 초과 또는 429 재시도 소진)으로 Gemini 호출을 하지 못한 경우"""
+    def __init__(self, priority: str, reason: str):
+        super().__init__(f"Gemini 호출 제한 ({priority}, {reason})")
+        self.priority = priority
+        self.reason = reason
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else default
+
+
+def is_rate_limited_error(e: Exception) -> bool:
+    """google.api_core 의 ResourceExhausted/TooManyRequests (HTTP 429) 인지 확인합니다."""
+    if getattr(e, "code", None) == 429 or type(e).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    return "429" in str(e) and "quota" in str(e).lower()
+
+
+def retry_after_seconds(e: Exception, default: float) -> float:
+    """429 응답의 retry_delay / 'retry in Ns' 안내에서 재시도 대기 시간을 꺼냅니다."""
+    message = str(e)
+    for pattern in (r"retry in ([\d.]+)\s*s", r"retry_delay\s*\{\s*seconds:\s*(\d+)"):
+        match = re.search(pattern, message, re.IGNORECASE)
+        if match:
+            return float(match.group(1))
+    return default
+
+
+class GeminiScheduler:
+    """
+    모든 세션이 공유하는 Gemini 호출 토큰 버킷 (프로세스 단위)
+
+    - rate_per_sec 속도로 최대 burst 개까지 토큰이 찹니다. 호출 1건당 토큰 1개를 사용합니다.
+    - realtime 대기자가 있으면 batch 는 토큰을 가져가지 않고, 평소에도 batch_headroom × burst 만큼은 realtime 몫으로 남깁니다.
+      (예비분은 burst - 1 을 넘지 않으므로 버킷이 가득 차면 batch 도 항상 토큰을 받을 수 있습니다.)
+    - 429 를 받으면 retry-after 동안 버킷 전체를 멈춘 뒤(다른 호출도 같은 할당량을 쓰므로) 재시도합니다.
+    - rate_per_sec 가 0 이하이면 속도 제한 없이 429 처리만 합니다.
+    블로킹 호출(call/acquire)은 threading.Condition 으로, 이벤트 루프의 호출(call_async/acquire_async)은 asyncio.sleep 으로 대기하며
+    두 경로가 같은 버킷을 공유합니다.
+    """
+    def __init__(self, rate_per_sec: float, burst: int, batch_headroom: float = 0.3,
+                 max_wait: dict | None = None, max_retries: int = 2, default_retry_after: float = 5.0):
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        # 예비분은 최대 burst - 1 개까지만 둡니다. 버킷이 가득 차도 batch 가 토큰을 못 받으면(예: burst=1) 최종 분석이 항상 대기 시간 초과로 실패합니다.
+        self.batch_reserve = min(batch_headroom * self.burst, self.burst - 1.0)
+        self.max_wait = max_wait or {"realtime": 3.0, "batch": 120.0}
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = {p: 0 for p in PRIORITIES}
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_sec)
+        self._updated = now
+
+    def _try_take(self, priority: str, now: float) -> float | None:
+        """(잠금 안에서 호출) 토큰을 가져오면 None, 아니면 다시 확인할 때까지 기다릴 시간(초)을 반환합니다."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.rate_per_sec <= 0:
+            return None
+        self._refill(now)
+        reserve = 0.0 if priority == "realtime" else self.batch_reserve
+        yields = priority == "batch" and self._waiting["realtime"] > 0
+        if not yields and self._tokens - reserve >= 1.0:
+            self._tokens -= 1.0
+            return None
+        return max(0.01, (1.0 + reserve - self._tokens) / self.rate_per_sec)
+
+    def _deadline(self, priority: str, start: float, timeout: float | None) -> float:
+        if priority not in PRIORITIES:
+            raise ValueError(f"알 수 없는 우선순위입니다: {priority}")
+        return start + (self.max_wait[priority] if timeout is None else timeout)
+
+    @staticmethod
+    def _queue_timeout(priority: str) -> GeminiRateLimitedError:
+        GEMINI_THROTTLED_TOTAL.inc(priority=priority, reason="queue_timeout")
+        return GeminiRateLimitedError(priority, "queue_timeout")
+
+    def acquire(self, priority: str = "realtime", timeout: float | None = None) -> float:
+        """토큰 1개를 받을 때까지 대기하고 대기 시간(초)을 반환합니다. 시간 안에 받지 못하면 GeminiRateLimitedError"""
+        start = time.monotonic()
+        deadline = self._deadline(priority, start, timeout)
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait_for = self._try_take(priority, now)
+                    if wait_for is None:
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise self._queue_timeout(priority)
+                    self._cond.wait(min(wait_for, remaining))
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        GEMINI_QUEUE_WAIT_SECONDS.observe(waited, priority=priority)
+        return waited
+
+    async def acquire_async(self, priority: str = "realtime", timeout: float | None = None) -> float:
+        """acquire 의 asyncio 버전. 이벤트 루프를 막지 않도록 잠금은 짧게만 잡고 asyncio.sleep 으로 대기합니다."""
+        start = time.monotonic()
+        deadline = self._deadline(priority, start, timeout)
+        with self._cond:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                with self._cond:
+                    wait_for = self._try_take(priority, now)
+                if wait_for is None:
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise self._queue_timeout(priority)
+                await asyncio.sleep(min(wait_for, remaining))
+        finally:
+            with self._cond:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        GEMINI_QUEUE_WAIT_SECONDS.observe(waited, priority=priority)
+        return waited
+
+    def pause(self, seconds: float):
+        """할당량 초과 응답을 받았을 때 모든 호출을 seconds 동안 멈춥니다."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+    def _handle_rate_limited(self, priority: str, e: Exception, attempt: int):
+        """429 응답 후 retry-after 만큼 버킷을 멈춥니다. 재시도를 소진했으면 GeminiRateLimitedError 를 올립니다."""
+        delay = retry_after_seconds(e, self.default_retry_after * (attempt + 1))
+        if attempt >= self.max_retries:
+            GEMINI_THROTTLED_TOTAL.inc(priority=priority, reason="quota_exhausted")
+            raise GeminiRateLimitedError(priority, "quota_exhausted") from e
+        GEMINI_THROTTLED_TOTAL.inc(priority=priority, reason="retry_429")
+        logger.warning(f"[Gemini 스케줄러] 429 응답 ({priority}), {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+        self.pause(delay)
+
+    def call(self, priority: str, fn, *args, **kwargs):
+        """토큰을 받은 뒤 fn 을 호출합니다. 429 는 retry-after 만큼 멈춘 뒤 max_retries 회까지 재시도합니다."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(priority)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited_error(e):
+                    raise
+                self._handle_rate_limited(priority, e, attempt)
+
+    async def call_async(self, priority: str, fn, *args, **kwargs):
+        """call 의 asyncio 버전. fn 은 코루틴 함수(예: model.generate_content_async)입니다."""
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(priority)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited_error(e):
+                    raise
+                self._handle_rate_limited(priority, e, attempt)
+
+
+# GEMINI_RPM: 분당 요청 수 한도 (0 이면 제한 없음), GEMINI_BURST: 버킷 크기
+_rpm = _env_float("GEMINI_RPM", 600)
+gemini_scheduler = GeminiScheduler(
+    rate_per_sec=_rpm / 60,
+    burst=int(_env_float("GEMINI_BURST", max(1, _rpm / 30))),
+    batch_headroom=_env_float("GEMINI_BATCH_HEADROOM", 0.3),
+    max_wait={
+        "realtime": _env_float("GEMINI_REALTIME_MAX_WAIT_SEC", 3.0),
+        "batch": _env_float("GEMINI_BATCH_MAX_WAIT_SEC", 120.0),
+    },
+    max_retries=int(_env_float("GEMINI_MAX_RETRIES", 2)),
+)
@@ -7,7 +7,12 @@ from datetime import datetime
 
 from google.cloud import speech_v1p1beta1 as speech
 
+from app.providers.circuit_breaker import get_breaker
 from app.utils.audio_utils import get_storage_audio_path
+from app.utils.metrics import record_provider_result
+from app.utils.logger import SAMPLED, get_logger
+
+logger = get_logger(__name__)
 
 # =====================
 # Google Cloud 인증 설정 (resources 폴더)
@@ -24,6 +29,8 @@ os.makedirs(WAV_DIR, exist_ok=True)
 SAMPLE_RATE = 16000
 CHUNK_DURATION_SEC = 1.0  # 1초마다 STT
 PCM_BYTES_PER_SEC = SAMPLE_RATE * 2  # 16bit(2byte) * 16000
+# 청크 단위 스트리밍 요청은 100ms 프레임으로 나눠 보냅니다. (요청 메시지 크기 제한, 중간 결과를 빨리 받기 위함)
+STREAM_FRAME_BYTES = PCM_BYTES_PER_SEC // 10
 
 # 세션별 파일/버퍼 관리
 session_files = {}
@@ -37,8 +44,8 @@ speech_client = speech.SpeechClient()
 
 
 class GoogleSTTProvider:
-    def streaming(self, audio_bytes):
-        return google_stt_streaming(audio_bytes)
+    def streaming(self, audio_bytes, on_interim=None):
+        return google_stt_streaming(audio_bytes, on_interim)
 
     def sync(self, audio_bytes):
         return google_stt_sync(audio_bytes)
@@ -104,13 +111,13 @@ def end_streaming_session(sid):
             pcm_bytes = f.read()
         save_pcm_to_wav(pcm_bytes, wav_path)
         os.remove(pcm_path)
-        print(f"[서버] 전체 PCM을 WAV로 저장: {wav_path}")
+        logger.info(f"[서버] 전체 PCM을 WAV로 저장: {wav_path}")
 
         # === 전체 파일을 동기 STT로 전송 ===
         with open(wav_path, "rb") as f:
             wav_bytes = f.read()
         transcript = google_stt_sync(wav_bytes)
-        print(f"[전체 파일 STT 결과] {transcript}")
+        logger.info(f"[전체 파일 STT 결과] {transcript}")
         # =============================
 
         return wav_path
@@ -118,7 +125,12 @@ def end_streaming_session(sid):
     return None
 
 
-def google_stt_streaming(audio_bytes):
+def google_stt_streaming(audio_bytes, on_interim=None):
+    """
+    청크 오디오의 최종 인식 결과를 반환합니다.
+    on_interim 이 있으면 interim_results 를 켜고, 중간 인식 결과가 나올 때마다 on_interim(transcript) 를 호출합니다.
+    (호출은 이 함수를 실행하는 스레드에서 일어나므로 이벤트 루프로 넘길 때는 call_soon_threadsafe 를 사용해야 합니다.)
+    """
     config = speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
         sample_rate_hertz=16000,
@@ -126,25 +138,39 @@ def google_stt_streaming(audio_bytes):
     )
     streaming_config = speech.StreamingRecognitionConfig(
         config=config,
-        interim_results=False,
+        interim_results=on_interim is not None,
         single_utterance=True,
     )
     if isinstance(audio_bytes, bytearray):
         audio_bytes = bytes(audio_bytes)
 
     def request_generator():
-        yield speech.StreamingRecognizeRequest(audio_content=audio_bytes)
+        for offset in range(0, len(audio_bytes), STREAM_FRAME_BYTES):
+            yield speech.StreamingRecognizeRequest(audio_content=audio_bytes[offset:offset + STREAM_FRAME_BYTES])
 
+    # 서킷이 열려 있으면 호출하지 않고 바로 빈 결과를 반환합니다.
+    call = get_breaker("google_stt").call()
+    if call is None:
+        return ""
     try:
-        responses = speech_client.streaming_recognize(streaming_config, request_generator())
-        for response in responses:
-            for result in response.results:
-                if result.is_final and result.alternatives:
-                    transcript = result.alternatives[0].transcript
-                    print(f"[실시간 STT:streaming] {transcript}")
-                    return transcript
+        with call:
+            responses = speech_client.streaming_recognize(streaming_config, request_generator())
+            for response in responses:
+                for result in response.results:
+                    if result.is_final and result.alternatives:
+                        transcript = result.alternatives[0].transcript
+                        logger.debug("[실시간 STT:streaming] %s", transcript, extra=SAMPLED)
+                        record_provider_result("google_stt", True)
+                        call.success()
+                        return transcript
+                    if on_interim is not None and result.alternatives and result.alternatives[0].transcript:
+                        on_interim(result.alternatives[0].transcript)
+            call.success()
     except Exception as e:
-        print(f"[STT 에러] {e}")
+        record_provider_result("google_stt", False)
+        logger.error(f"[STT 에러] {e}")
+        return ""
+    record_provider_result("google_stt", True)
     return ""
 
 
@@ -176,7 +202,7 @@ def google_stt_sync(audio_bytes):
                     if hasattr(w, 'speaker_tag') and w.speaker_tag and w.speaker_tag > 0:
                         speaker_segments[w.speaker_tag] += w.word + ' '
     for speaker, text in speaker_segments.items():
-        print(f"[전체 파일 STT][화자 {speaker}] {text.strip()}")
+        logger.info(f"[전체 파일 STT][화자 {speaker}] {text.strip()}")
     return transcript.strip()
 
 
@@ -220,16 +246,16 @@ def stt_streaming_worker(sid, q):
                                 if last_speaker is None:
                                     last_speaker = w.speaker_tag
                                 if w.speaker_tag != last_speaker:
-                                    print(f"[STT:FINAL][화자 {last_speaker}] {speaker_text.strip()}")
+                                    logger.debug("[STT:FINAL][화자 %s] %s", last_speaker, speaker_text.strip())
                                     speaker_text = w.word + ' '
                                     last_speaker = w.speaker_tag
                                 else:
                                     speaker_text += w.word + ' '
                             if speaker_text:
-                                print(f"[STT:FINAL][화자 {last_speaker}] {speaker_text.strip()}")
+                                logger.debug("[STT:FINAL][화자 %s] %s", last_speaker, speaker_text.strip())
                         else:
-                            print(f"[실시간 STT:FINAL] {transcript}")
+                            logger.debug("[실시간 STT:FINAL] %s", transcript)
                     else:
-                        print(f"[실시간 STT:INTERIM] {transcript}")
+                        logger.debug("[실시간 STT:INTERIM] %s", transcript, extra=SAMPLED)
     except Exception as e:
-        print(f"[STT 에러] {e}") 
\ No newline at end of file
+        logger.error(f"[STT 에러] {e}") 
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+from app.utils.metrics import PIPELINE_STAGE_SECONDS
+
+logger = get_logger(__name__)
+
+dotenv_path = Path(__file__).parent.parent.parent / "ENV" / ".env"
+if dotenv_path.exists():
+    load_dotenv(dotenv_path=dotenv_path)
+
+# 로컬(CPU) 감정 분석 모델
+#   음성: speechbrain wav2vec2 IEMOCAP 감정 분류기 (neu/ang/hap/sad 4종 → 7종 점수 dict 로 변환)
+#   텍스트: (선택) LOCAL_TEXT_EMOTION_MODEL 에 지정한 HuggingFace 문장 분류 모델 (한국어 감성 분류 모델 권장)
+# 모델은 처음 사용할 때 한 번만 로드하며, 로드에 실패하면 해당 모달리티는 사용할 수 없는 것으로 처리합니다. (라우터가 Gemini 사용)
+LOCAL_AUDIO_EMOTION_MODEL = os.getenv("LOCAL_AUDIO_EMOTION_MODEL", "").strip() or "speechbrain/emotion-recognition-wav2vec2-IEMOCAP"
+LOCAL_TEXT_EMOTION_MODEL = os.getenv("LOCAL_TEXT_EMOTION_MODEL", "").strip()
+# 텍스트 모델 출력 라벨(LABEL_0, LABEL_1, ...) 순서에 대응하는 감정 (라벨 이름에 positive/negative/neutral 이 들어 있으면 불필요)
+LOCAL_TEXT_EMOTION_LABELS = [
+    label.strip() for label in os.getenv("LOCAL_TEXT_EMOTION_LABELS", "negative,positive").split(",") if label.strip()
+]
+# 실시간 처리 시간 예산: 음성은 최근 N초만 사용합니다.
+LOCAL_EMOTION_MAX_AUDIO_SEC = float(os.getenv("LOCAL_EMOTION_MAX_AUDIO_SEC", "").strip() or 4.0)
+# progressive 모드에서 Gemini 결과 전에 로컬 음성 감정 추정치(emotion_estimate)를 먼저 보낼지 여부
+EARLY_AUDIO_EMOTION_ENABLED = os.getenv("EARLY_AUDIO_EMOTION", "false").strip().lower() in ("1", "true", "yes", "on")
+
+IEMOCAP_TO_AUDIO_EMOTION = {"neu": "neutral", "ang": "angry", "hap": "happy", "sad": "sad"}
+SAMPLE_RATE = 16000
+
+
+def _text_label_to_emotion(label: str) -> str | None:
+    name = label.lower()
+    for emotion in ("positive", "negative", "neutral"):
+        if emotion[:3] in name:
+            return emotion
+    if name.startswith("label_"):
+        index = int(name.split("_", 1)[1])
+        if index < len(LOCAL_TEXT_EMOTION_LABELS):
+            return LOCAL_TEXT_EMOTION_LABELS[index]
+    return None
+
+
+class LocalEmotionClient:
+    def __init__(self):
+        self._audio_model = None
+        self._text_model = None
+        self._audio_failed = False
+        self._text_failed = not LOCAL_TEXT_EMOTION_MODEL
+        self._lock = threading.Lock()
+
+    # --- 모델 로드 ---
+    def _load_audio_model(self):
+        with self._lock:
+            if self._audio_model is None and not self._audio_failed:
+                try:
+                    from speechbrain.inference.interfaces import foreign_class
+                    self._audio_model = foreign_class(
+                        source=LOCAL_AUDIO_EMOTION_MODEL,
+                        pymodule_file="custom_interface.py",
+                        classname="CustomEncoderWav2vec2Classifier",
+                        savedir=f"/tmp/{LOCAL_AUDIO_EMOTION_MODEL.split('/')[-1]}",
+                    )
+                    logger.info(f"[로컬 감정 분석] 음성 감정 모델 로드 성공: {LOCAL_AUDIO_EMOTION_MODEL}")
+                except Exception as e:
+                    self._audio_failed = True
+                    logger.error(f"[로컬 감정 분석] 음성 감정 모델 로드 실패 (Gemini 사용): {e}")
+        return self._audio_model
+
+    def _load_text_model(self):
+        with self._lock:
+            if self._text_model is None and not self._text_failed:
+                try:
+                    from transformers import pipeline
+                    self._text_model = pipeline("text-classification", model=LOCAL_TEXT_EMOTION_MODEL, top_k=None, device=-1)
+                    logger.info(f"[로컬 감정 분석] 텍스트 감정 모델 로드 성공: {LOCAL_TEXT_EMOTION_MODEL}")
+                except Exception as e:
+                    self._text_failed = True
+                    logger.error(f"[로컬 감정 분석] 텍스트 감정 모델 로드 실패 (Gemini 사용): {e}")
+        return self._text_model
+
+    def has_text_model(self) -> bool:
+        return not self._text_failed
+
+    def has_audio_model(self) -> bool:
+        return not self._audio_failed
+
+    def warmup(self, text: bool = True):
+        """모델을 미리 로드하고 한 번 실행해 첫 요청의 지연을 없앱니다."""
+        self.analyze_audio(np.zeros(SAMPLE_RATE, dtype=np.float32))
+        if text and self.has_text_model():
+            self.analyze_text("안녕하세요")
+
+    # --- 분석 ---
+    def analyze_audio(self, audio_array) -> dict | None:
+        """16kHz float 파형의 7종 음성 감정 점수 dict (모델을 쓸 수 없으면 None)"""
+        model = self._load_audio_model()
+        if model is None or audio_array is None or len(audio_array) == 0:
+            return None
+        import torch
+
+        signal = np.asarray(audio_array, dtype=np.float32)[-int(LOCAL_EMOTION_MAX_AUDIO_SEC * SAMPLE_RATE):]
+        start = time.perf_counter()
+        try:
+            with torch.inference_mode():
+                out_prob, _, _, _ = model.classify_batch(torch.from_numpy(signal).unsqueeze(0))
+        except Exception as e:
+            logger.warning(f"[로컬 감정 분석] 음성 감정 분석 실패: {e}")
+            return None
+        PIPELINE_STAGE_SECONDS.observe(time.perf_counter() - start, stage="local_audio_emotion")
+        probs = out_prob.reshape(-1).float().cpu().numpy()
+        if probs.max() <= 0:  # log-softmax 출력
+            probs = np.exp(probs)
+        probs = probs / (probs.sum() or 1.0)
+        labels = model.hparams.label_encoder.decode_ndim(list(range(len(probs))))
+        scores = {emotion: 0.0 for emotion in ("happy", "sad", "angry", "fear", "disgust", "surprise", "neutral")}
+        for label, p in zip(labels, probs):
+            emotion = IEMOCAP_TO_AUDIO_EMOTION.get(str(label))
+            if emotion:
+                scores[emotion] += round(float(p), 4)
+        return scores
+
+    def analyze_text(self, text: str) -> dict | None:
+        """positive/negative/neutral 텍스트 감정 점수 dict (모델을 쓸 수 없으면 None)"""
+        model = self._load_text_model()
+        if model is None or not text:
+            return None
+        start = time.perf_counter()
+        try:
+            outputs = model(text, truncation=True)
+        except Exception as e:
+            logger.warning(f"[로컬 감정 분석] 텍스트 감정 분석 실패: {e}")
+            return None
+        PIPELINE_STAGE_SECONDS.observe(time.perf_counter() - start, stage="local_text_emotion")
+        if outputs and isinstance(outputs[0], list):
+            outputs = outputs[0]
+        scores = {"positive": 0.0, "negative": 0.0, "neutral": 0.0}
+        for item in outputs:
+            emotion = _text_label_to_emotion(item["label"])
+            if emotion:
+                scores[emotion] += float(item["score"])
+        total = sum(scores.values())
+        if total <= 0:
+            return None
+        return {k: round(v / total, 4) for k, v in scores.items()}
+
+
+def confidence(scores: dict | None) -> float:
+    """점수 dict 의 최댓값 (라우터의 로컬 결과 신뢰도)"""
+    if not scores:
+        return 0.0
+    return max(float(v) for v in scores.values())
+
+
+local_emotion_client = LocalEmotionClient()
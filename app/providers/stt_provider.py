@@ -15,9 +15,10 @@ class ClovaSTTAdapter:
     def __init__(self):
         self.client = ClovaSpeechClient()
 
-    def streaming(self, audio_bytes: bytes) -> str | None:
+    def streaming(self, audio_bytes: bytes, on_interim=None) -> str | None:
         """실시간 처리를 위해 Short API를 호출합니다.
         Raw PCM 데이터를 in-memory WAV로 변환하여 전달합니다.
+        Short API 는 중간 결과를 제공하지 않으므로 on_interim 은 호출되지 않습니다.
         """
         with io.BytesIO() as wav_io:
             with wave.open(wav_io, 'wb') as wf:
@@ -12,17 +12,36 @@ from datetime import datetime
 import librosa
 
 # Local application imports
+from app.dao.emotion_trend_dao import EmotionTrendDAO
 from app.dao.user_conversation_dao import UserConversationDAO
 from app.providers.gemini_client import analyze_emotions, analyze_conversation_emotions
+from app.providers.circuit_breaker import CircuitOpenError, get_breaker
+from app.providers.gemini_scheduler import GeminiRateLimitedError
+from app.providers.local_emotion_client import EARLY_AUDIO_EMOTION_ENABLED, local_emotion_client
 from app.providers.stt_provider import get_streaming_stt_provider, get_sync_stt_provider
-from app.utils.audio_utils import cut_wav_by_timestamps, get_storage_audio_path
+from app.utils.audio_utils import cosine_similarity, cut_wav_by_timestamps, get_storage_audio_path, pcm16_to_float32
+from app.utils.emotion_utils import AUDIO_EMOTIONS, TEXT_EMOTIONS, scores_to_vector, summarize_emotion
+from app.utils.logger import SAMPLED, get_logger
+from app.utils.metrics import FINALIZE_REUSE_RATIO, FINALIZE_SEGMENTS_TOTAL, PIPELINE_STAGE_SECONDS
+from app.utils.executors import embedding_process_pool_enabled, run_in
 from app.services.user_services import user_service
 from app.services.user_voice_service import user_voice_service
+from app.services.embedding_pool import embedding_pool
+from app.services.incremental_finalize import match_live_results
+from app.services.report_services import invalidate_report_cache
+from app.services.speaker_verification import StreamingSpeakerVerifier, create_speaker_verifier
+from app.services.voice_service import extract_voice_embedding_from_pcm, voice_embedding_service
+
+logger = get_logger(__name__)
 
 
 class AnalyzeService:
-    def __init__(self):
-        self.user_conversation_dao = UserConversationDAO()
+    # 실시간 청크 음성 비교 임계값
+    REALTIME_VOICE_THRESHOLD = 0.5
+
+    def _new_daos(self) -> tuple[UserConversationDAO, EmotionTrendDAO]:
+        """finalize_analysis 는 여러 세션이 동시에 실행하므로 호출마다 별도 커넥션을 사용합니다."""
+        return UserConversationDAO(), EmotionTrendDAO()
 
     async def handle_setup_message(self, sid: int, setup_data: dict, session_user_id: dict, user_voice_embeddings_mem: dict) -> tuple[dict, str | None]:
         event = setup_data.get("event")
@@ -34,34 +53,52 @@ class AnalyzeService:
 
         if user_id:
             session_user_id[sid] = user_id
-            if user_id not in user_voice_embeddings_mem:
-                print(f"[음성 임베딩] user_id={user_id} 메모리에 없음. DB 조회 시도...")
-                user_uid = user_service.get_user_uid_by_user_id(user_id)
-                if user_uid:
-                    embedding = user_voice_service.get_user_voice_embedding(user_uid)
-                    if embedding is not None:
-                        user_voice_embeddings_mem[user_id] = embedding
-                        print(f"[음성 임베딩] user_id={user_id} DB에서 조회하여 메모리에 적재 완료.")
-                    else:
-                        print(f"[음성 임베딩] user_id={user_id} DB에도 임베딩 정보가 없음.")
-                else:
-                    print(f"[음성 임베딩] user_id={user_id} 에 해당하는 user_uid 없음.")
+            self.load_user_embedding(user_id, user_voice_embeddings_mem)
         
         return {"event": "send_conversation", "status": "ok"}, user_id
 
+    def load_user_embedding(self, user_id: str, user_voice_embeddings_mem):
+        """캐시에 없으면 DB 에서 사용자 음성 임베딩을 읽어 캐시에 적재하고 반환합니다."""
+        embedding = user_voice_embeddings_mem.get(user_id)
+        if embedding is not None or not user_id:
+            return embedding
+        logger.debug(f"[음성 임베딩] user_id={user_id} 메모리에 없음. DB 조회 시도...")
+        user_uid = user_service.get_user_uid_by_user_id(user_id)
+        if user_uid:
+            embedding = user_voice_service.get_user_voice_embedding(user_uid)
+            if embedding is not None:
+                user_voice_embeddings_mem[user_id] = embedding
+                logger.info(f"[음성 임베딩] user_id={user_id} DB에서 조회하여 메모리에 적재 완료.")
+            else:
+                logger.info(f"[음성 임베딩] user_id={user_id} DB에도 임베딩 정보가 없음.")
+        else:
+            logger.info(f"[음성 임베딩] user_id={user_id} 에 해당하는 user_uid 없음.")
+        return embedding
+
     # 1. STT 처리 (I/O Bound)
-    async def transcribe_chunk(self, chunk_bytes: bytes) -> str | None:
-        print(f"[실시간 처리] STT 요청 시작")
+    async def transcribe_chunk(self, chunk_bytes: bytes, on_interim=None) -> str | None:
+        """청크의 최종 STT 결과. on_interim(transcript) 는 중간 인식 결과마다 이벤트 루프에서 호출됩니다."""
+        logger.debug("[실시간 처리] STT 요청 시작", extra=SAMPLED)
         start_time = time.time()
         # I/O 작업인 STT 요청을 별도 스레드에서 실행
-        transcript = await asyncio.to_thread(get_streaming_stt_provider().streaming, chunk_bytes)
+        # Google STT 서킷이 열려 있으면 Clova Short STT 로 대체합니다. (degraded 모드, 중간 결과 없음)
+        provider = get_streaming_stt_provider()
+        if not get_breaker("google_stt").available() and get_breaker("clova_short").available():
+            provider = get_sync_stt_provider()
+        interim_callback = None
+        if on_interim is not None:
+            loop = asyncio.get_running_loop()
+            def interim_callback(text):
+                loop.call_soon_threadsafe(on_interim, text)
+        with PIPELINE_STAGE_SECONDS.time(stage="stt"):
+            transcript = await run_in("provider_io", provider.streaming, chunk_bytes, interim_callback)
         end_time = time.time()
-        print(f"[실시간 처리] STT 소요 시간: {end_time - start_time:.4f}초. 결과: {transcript}")
+        logger.debug("[실시간 처리] STT 소요 시간: %.4f초. 결과: %s", end_time - start_time, transcript, extra=SAMPLED)
         return transcript
 
     # 2. 오디오 처리 (CPU Bound)
     async def _process_audio_for_analysis(self, chunk_bytes: bytes):
-        print(f"[실시간 처리] 오디오 처리 시작")
+        logger.debug("[실시간 처리] 오디오 처리 시작", extra=SAMPLED)
         start_time = time.time()
         def _process_audio_with_librosa(data):
             with io.BytesIO() as wav_io:
@@ -74,92 +111,192 @@ class AnalyzeService:
                 return librosa.load(wav_io, sr=16000, mono=True)
         
         # CPU 집약적인 작업을 별도 스레드에서 실행
-        audio_array, _ = await asyncio.to_thread(_process_audio_with_librosa, chunk_bytes)
+        with PIPELINE_STAGE_SECONDS.time(stage="audio_decode"):
+            audio_array, _ = await run_in("audio_dsp", _process_audio_with_librosa, chunk_bytes)
         end_time = time.time()
-        print(f"[실시간 처리] 오디오 처리 소요 시간: {end_time - start_time:.4f}초")
+        logger.debug("[실시간 처리] 오디오 처리 소요 시간: %.4f초", end_time - start_time, extra=SAMPLED)
         return audio_array
 
     # 3. 감정 분석 (I/O Bound)
     async def analyze_emotion_from_audio_and_text(self, transcript: str, audio_array) -> dict | None:
-        print(f"[실시간 처리] Gemini 요청 시작")
+        logger.debug("[실시간 처리] Gemini 요청 시작", extra=SAMPLED)
         start_time = time.time()
-        # I/O 작업인 Gemini API 요청을 별도 스레드에서 실행
-        emotion_result = await asyncio.to_thread(analyze_emotions, transcript, audio_array)
+        # Gemini 비동기 API 를 이벤트 루프에서 바로 기다립니다. (executor 스레드를 점유하지 않음)
+        with PIPELINE_STAGE_SECONDS.time(stage="emotion"):
+            try:
+                emotion_result = await analyze_emotions(transcript, audio_array)
+            except GeminiRateLimitedError as e:
+                # 기본값(중립)으로 채우지 않고 감정 결과 없이 전송합니다.
+                logger.warning(f"[실시간 처리] Gemini 할당량 부족으로 감정 분석 생략: {e}")
+                emotion_result = None
+            except CircuitOpenError as e:
+                logger.warning(f"[실시간 처리] Gemini 서킷 열림으로 감정 분석 생략: {e}", extra=SAMPLED)
+                emotion_result = None
         end_time = time.time()
-        print(f"[실시간 처리] Gemini 감정 분석 소요 시간: {end_time - start_time:.4f}초")
+        logger.debug("[실시간 처리] Gemini 감정 분석 소요 시간: %.4f초", end_time - start_time, extra=SAMPLED)
         return emotion_result
 
+    # 3-1. 빠른 음성 감정 추정 (progressive 모드, CPU Bound)
+    async def estimate_audio_emotion(self, audio_array) -> dict | None:
+        """로컬 음성 감정 모델의 추정치 (EARLY_AUDIO_EMOTION 이 꺼져 있거나 모델이 없으면 None)"""
+        if not EARLY_AUDIO_EMOTION_ENABLED or audio_array is None or not local_emotion_client.has_audio_model():
+            return None
+        with PIPELINE_STAGE_SECONDS.time(stage="emotion_estimate"):
+            scores = await run_in("inference", local_emotion_client.analyze_audio, audio_array)
+        if scores is None:
+            return None
+        return {"scores": scores, **summarize_emotion(scores)}
+
     # 4. 음성 비교 (CPU/File I/O Bound)
-    async def compare_voice_in_chunk(self, chunk_bytes: bytes, user_embedding: list) -> tuple[bool | None, float | None]:
-        print(f"[실시간 처리] 음성 비교 시작")
+    def create_speaker_verifier(self, user_embedding) -> StreamingSpeakerVerifier | None:
+        """세션 단위 스트리밍 화자 검증기를 만듭니다. (SPEAKER_VERIFY_MODE=chunk 이면 None)"""
+        return create_speaker_verifier(user_embedding, self.REALTIME_VOICE_THRESHOLD)
+
+    async def compare_voice_in_chunk(self, chunk_bytes: bytes, user_embedding: list, verifier: StreamingSpeakerVerifier | None = None) -> tuple[bool | None, float | None]:
+        logger.debug("[실시간 처리] 음성 비교 시작", extra=SAMPLED)
         start_time = time.time()
-        # 파일 I/O와 계산이 섞여 있으므로 스레드에서 실행
-        is_same, similarity = await asyncio.to_thread(self._compare_voice_in_memory, chunk_bytes, user_embedding)
+        # 모델 추론 경로 선택
+        #   0) 스트리밍 검증기(verifier): 세션의 프레임 특징을 누적해 주기적으로만 임베딩 갱신, 평활화된 유사도 사용
+        #   1) 임베딩 워커 풀(EMBEDDING_POOL_WORKERS): 모든 세션의 요청을 묶어서 배치 추론
+        #   2) 프로세스 풀(EMBEDDING_PROCESS_WORKERS): 요청마다 별도 프로세스에서 추론
+        #   3) 기본: inference 스레드 풀
+        with PIPELINE_STAGE_SECONDS.time(stage="voice_compare"):
+            if user_embedding is not None and verifier is not None:
+                is_same, similarity = await self._compare_voice_streaming(chunk_bytes, user_embedding, verifier)
+            elif user_embedding is not None and embedding_pool.started:
+                is_same, similarity = await self._compare_voice_in_pool(chunk_bytes, user_embedding)
+            elif user_embedding is not None and embedding_process_pool_enabled():
+                is_same, similarity = await self._compare_voice_in_process(chunk_bytes, user_embedding)
+            else:
+                is_same, similarity = await run_in("inference", self._compare_voice_in_memory, chunk_bytes, user_embedding)
         end_time = time.time()
-        print(f"[실시간 처리] 음성 유사도 분석 소요 시간: {end_time - start_time:.4f}초")
+        logger.debug("[실시간 처리] 음성 유사도 분석 소요 시간: %.4f초", end_time - start_time, extra=SAMPLED)
         return is_same, similarity
 
+    async def _compare_voice_streaming(self, chunk_bytes: bytes, user_embedding, verifier: StreamingSpeakerVerifier) -> tuple[bool | None, float | None]:
+        try:
+            return await run_in("inference", verifier.update, bytes(chunk_bytes))
+        except Exception as e:
+            logger.warning(f"[실시간 음성 식별] 스트리밍 검증 실패, 청크 단위 비교로 대체: {e}")
+            return await run_in("inference", self._compare_voice_in_memory, chunk_bytes, user_embedding)
+
+    async def _compare_voice_in_pool(self, chunk_bytes: bytes, user_embedding) -> tuple[bool | None, float | None]:
+        try:
+            embedding = await embedding_pool.embed_pcm(chunk_bytes)
+        except Exception as e:
+            logger.warning(f"[실시간 음성 식별] 임베딩 풀 실패, 스레드 추론으로 대체: {e}")
+            return await run_in("inference", self._compare_voice_in_memory, chunk_bytes, user_embedding)
+        similarity = cosine_similarity(embedding, user_embedding)
+        return similarity >= self.REALTIME_VOICE_THRESHOLD, similarity
+
+    async def _compare_voice_in_process(self, chunk_bytes: bytes, user_embedding) -> tuple[bool | None, float | None]:
+        try:
+            embedding = await run_in("embedding_process", extract_voice_embedding_from_pcm, bytes(chunk_bytes))
+        except Exception as e:
+            logger.warning(f"[실시간 음성 식별 에러] {e}")
+            return None, None
+        if embedding is None:
+            return False, 0.0
+        similarity = cosine_similarity(embedding, user_embedding)
+        return similarity >= self.REALTIME_VOICE_THRESHOLD, similarity
+
     def _compare_voice_in_memory(self, chunk_bytes: bytes, user_embedding: list) -> tuple[bool | None, float | None]:
         if user_embedding is None:
             return None, None
         
         try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-                with wave.open(temp_wav.name, 'wb') as wf:
-                    wf.setnchannels(1)
-                    wf.setsampwidth(2)
-                    wf.setframerate(16000)
-                    wf.writeframes(chunk_bytes)
-                temp_wav_path = temp_wav.name
-            is_same, similarity = user_voice_service.compare_voice(temp_wav_path, user_embedding, threshold=0.5)
-            return is_same, similarity
+            # 임시 WAV 파일 없이 PCM에서 바로 임베딩 추출
+            embedding = voice_embedding_service.extract_voice_embedding_from_array(pcm16_to_float32(chunk_bytes))
+            if embedding is None:
+                return False, 0.0
+            similarity = cosine_similarity(embedding, user_embedding)
+            return similarity >= self.REALTIME_VOICE_THRESHOLD, similarity
         except Exception as e:
-            print(f"[실시간 음성 식별 에러] {e}")
+            logger.warning(f"[실시간 음성 식별 에러] {e}")
             return None, None
-        finally:
-            if 'temp_wav_path' in locals() and os.path.exists(temp_wav_path):
-                os.remove(temp_wav_path)
 
-    def finalize_analysis(self, wav_path: str, full_audio_buffer: bytearray, user_id: str, sid: int, ts: str, user_voice_embeddings_mem: dict):
-        if len(full_audio_buffer) == 0:
-            print("후처리할 오디오 데이터가 없습니다.")
-            return
+    async def finalize_analysis(self, wav_path: str, full_audio_buffer: bytearray | None, user_id: str, sid: int, ts: str,
+                                user_voice_embeddings_mem: dict, live_results: list | None = None,
+                                still_owner=None) -> int | None:
+        """
+        전체 대화를 Clova diarization + Gemini로 최종 분석하여 저장하고, 저장된 master_uid를 반환합니다.
+        블로킹 단계(Clova Long, 오디오 컷팅, DB 저장)는 finalize 풀에서 실행하고,
+        Gemini 감정 분석은 비동기 API 로 이벤트 루프에서 기다립니다.
+        full_audio_buffer 가 None 이면 wav_path 에 이미 저장된 WAV 를 사용합니다. (최종 분석 작업 큐)
+        live_results 가 있으면(FINALIZE_MODE=incremental) 실시간 청크 결과로 덮이는 세그먼트의 감정 분석 결과를 재사용합니다.
+        still_owner 가 있으면 DB 저장 전후에 호출해서 False 이면(최종 분석 작업을 다른 워커가 가져감) 저장하지 않습니다.
+        """
+        prepared = await run_in("finalize", self._prepare_final_segments, wav_path, full_audio_buffer, sid, ts, live_results)
+        if prepared is None:
+            return None
+        segments, segment_files, conversation_for_gemini = prepared
 
+        # 전체 대화 맥락을 사용하여 감정 분석 (1회 호출)
+        with PIPELINE_STAGE_SECONDS.time(stage="final_emotion"):
+            emotion_results_list = await analyze_conversation_emotions(conversation_for_gemini)
+
+        return await run_in(
+            "finalize", self._save_final_results, wav_path, user_id, segments, segment_files,
+            emotion_results_list, user_voice_embeddings_mem, still_owner,
+        )
+
+    @staticmethod
+    def save_wav(wav_path: str, pcm: bytes) -> bool:
+        """16kHz mono PCM 을 WAV 로 저장합니다. 저장할 오디오가 없으면 False."""
+        if len(pcm) == 0:
+            logger.info("후처리할 오디오 데이터가 없습니다.")
+            return False
         with wave.open(wav_path, 'wb') as wf:
             wf.setnchannels(1)
             wf.setsampwidth(2)
             wf.setframerate(16000)
-            wf.writeframes(full_audio_buffer)
+            wf.writeframes(pcm)
+        return True
+
+    @staticmethod
+    def _segment_speaker(seg: dict) -> str:
+        return str(seg.get('speaker', {}).get('label')) if isinstance(seg.get('speaker'), dict) else str(seg.get('speaker'))
+
+    def _prepare_final_segments(self, wav_path, full_audio_buffer, sid, ts, live_results=None) -> tuple[list, list, list] | None:
+        """
+        전체 오디오를 WAV 로 저장하고 Clova diarization 후 문장별로 잘라 (segments, segment_files, Gemini 입력)을 반환합니다.
+        live_results 와 맞춰 본 세그먼트는 Gemini 입력에 재사용할 감정 결과(result)를 넣습니다.
+        """
+        if full_audio_buffer is not None and not self.save_wav(wav_path, full_audio_buffer):
+            return None
         
         with open(wav_path, "rb") as f:
             full_audio = f.read()
 
         clova_start = time.time()
-        print(f"[Clova 분석] 요청 시작: {clova_start}")
-        final_result = get_sync_stt_provider().sync(full_audio)
+        logger.debug(f"[Clova 분석] 요청 시작: {clova_start}")
+        with PIPELINE_STAGE_SECONDS.time(stage="clova_long"):
+            final_result = get_sync_stt_provider().sync(full_audio)
         clova_end = time.time()
-        print(f"[Clova 분석] 요청 종료: {clova_end}, 소요시간: {clova_end - clova_start:.2f}초")
+        logger.info(f"[Clova 분석] 요청 종료: {clova_end}, 소요시간: {clova_end - clova_start:.2f}초")
 
-        print(f"[최종 STT] {final_result}")
+        logger.debug("[최종 STT] %s", final_result)
 
         # `final_result`가 없거나 'segments'가 비어있으면 처리를 중단합니다.
         if not final_result or not final_result.get("segments"):
-            print("후처리할 STT 세그먼트가 없습니다.")
-            return
+            logger.info("후처리할 STT 세그먼트가 없습니다.")
+            return None
 
         segments = final_result["segments"]
 
-        print("[최종 STT - Clova diarization 결과]")
-        user_uid = user_service.get_user_uid_by_user_id(user_id or "test_user")
-        master_uid = self.user_conversation_dao.insert_conversation_master(user_uid, topic=None)
-        print(f"[DB] user_conversation_master 저장: master_uid={master_uid}")
-
-        user_embedding = user_voice_embeddings_mem.get(user_id)
-        
+        logger.debug("[최종 STT - Clova diarization 결과]")
         segment_timestamps = [(seg.get('start') / 1000, seg.get('end') / 1000) for seg in segments]
         segment_dir = get_storage_audio_path(f"segments/{ts}_{sid}")
         segment_files = cut_wav_by_timestamps(wav_path, segment_timestamps, segment_dir)
-        print(f"[문장별 오디오 컷팅 경로] {segment_files}")
+        logger.debug("[문장별 오디오 컷팅 경로] %s", segment_files)
+
+        # 실시간 청크 결과와 시간이 겹치는 세그먼트는 감정 분석 결과를 재사용합니다. (음성 유사도는 세그먼트 단위로 다시 계산)
+        reuse = match_live_results(segments, live_results) if live_results is not None else [None] * len(segments)
+        if live_results is not None:
+            texts = [i for i, seg in enumerate(segments) if seg.get('text')]
+            reused = sum(1 for i in texts if reuse[i] is not None)
+            FINALIZE_REUSE_RATIO.observe(reused / len(texts) if texts else 0.0)
+            logger.info(f"[최종 분석] 실시간 감정 결과 재사용: {reused}/{len(texts)} 세그먼트")
 
         # Gemini에 전달할 대화 세그먼트 리스트 생성
         conversation_for_gemini = []
@@ -167,26 +304,53 @@ class AnalyzeService:
             text = seg.get('text')
             if not text:
                 continue
+
+            if reuse[i] is not None:
+                FINALIZE_SEGMENTS_TOTAL.inc(result="reused")
+                conversation_for_gemini.append({
+                    "text": text,
+                    "speaker": self._segment_speaker(seg),
+                    "audio": None,
+                    "result": reuse[i],
+                })
+                continue
+            FINALIZE_SEGMENTS_TOTAL.inc(result="computed")
             
             seg_wav_path = segment_files[i] if i < len(segment_files) else wav_path
             try:
                 audio_array, _ = librosa.load(seg_wav_path, sr=16000, mono=True)
-                conversation_for_gemini.append({
-                    "text": text,
-                    "speaker": str(seg.get('speaker', {}).get('label')) if isinstance(seg.get('speaker'), dict) else str(seg.get('speaker')),
-                    "audio": audio_array,
-                })
             except Exception as e:
-                print(f"오디오 파일 로드 실패 (Segment {i+1}): {e}")
+                logger.warning(f"오디오 파일 로드 실패 (Segment {i+1}): {e}")
                 # 오디오 로드 실패 시, audio는 None으로 전달
-                conversation_for_gemini.append({
-                    "text": text,
-                    "speaker": str(seg.get('speaker', {}).get('label')) if isinstance(seg.get('speaker'), dict) else str(seg.get('speaker')),
-                    "audio": None,
-                })
+                audio_array = None
+            conversation_for_gemini.append({
+                "text": text,
+                "speaker": self._segment_speaker(seg),
+                "audio": audio_array,
+            })
+        return segments, segment_files, conversation_for_gemini
 
-        # 전체 대화 맥락을 사용하여 감정 분석 (1회 호출)
-        emotion_results_list = analyze_conversation_emotions(conversation_for_gemini)
+    def _save_final_results(self, wav_path, user_id, segments, segment_files, emotion_results_list, user_voice_embeddings_mem,
+                            still_owner=None) -> int | None:
+        conversation_dao, trend_dao = self._new_daos()
+        try:
+            return self._store_final_results(conversation_dao, trend_dao, wav_path, user_id, segments, segment_files,
+                                             emotion_results_list, user_voice_embeddings_mem, still_owner)
+        finally:
+            conversation_dao.close()
+            trend_dao.close()
+
+    def _store_final_results(self, conversation_dao, trend_dao, wav_path, user_id, segments, segment_files,
+                             emotion_results_list, user_voice_embeddings_mem, still_owner=None) -> int | None:
+        if still_owner is not None and not still_owner():
+            logger.warning("[최종 분석] 다른 워커가 작업을 가져가 저장하지 않습니다.")
+            return None
+        user_uid = user_service.get_user_uid_by_user_id(user_id or "test_user")
+        master_uid = conversation_dao.insert_conversation_master(user_uid, topic=None)
+        logger.info(f"[DB] user_conversation_master 저장: master_uid={master_uid}")
+
+        # 다른 워커가 시작한 대화일 수 있으므로 캐시에 없으면 DB 에서 읽습니다.
+        user_embedding = self.load_user_embedding(user_id, user_voice_embeddings_mem)
 
         # 분석 결과와 원본 데이터를 조합하여 DB에 저장
         for i, seg in enumerate(segments):
@@ -200,29 +364,49 @@ class AnalyzeService:
                 # 음성 유사도 분석은 개별적으로 수행
                 seg_wav_path = segment_files[i] if i < len(segment_files) else wav_path
                 is_same, similarity = user_voice_service.compare_voice(seg_wav_path, user_embedding, threshold=0.75)
-                print(f"[음성 식별] Segment {i+1} | 유사도: {similarity:.4f} | 동일인: {is_same}")
+                logger.debug("[음성 식별] Segment %d | 유사도: %s | 동일인: %s", i + 1,
+                             f"{similarity:.4f}" if similarity is not None else None, is_same)
                 
-                dominant_emotion = emotion_result.get('audio', {}).get('dominant', 'neutral')
+                # 분석하지 못한 세그먼트/모달리티(None)는 점수 벡터와 우세 감정을 NULL 로 저장합니다. (리포트/추이 집계에서 제외)
+                text = (emotion_result or {}).get('text') or {}
+                audio = (emotion_result or {}).get('audio') or {}
                 
-                self.user_conversation_dao.insert_conversation_detail(
+                conversation_dao.insert_conversation_detail(
                     master_uid=master_uid,
                     sentence=sentence_text,
-                    speaker=str(seg.get('speaker', {}).get('label')) if isinstance(seg.get('speaker'), dict) else str(seg.get('speaker')),
-                    emotion_result=json.dumps(emotion_result, ensure_ascii=False),
-                    dominant_emotion=dominant_emotion,
+                    speaker=self._segment_speaker(seg),
+                    text_scores=scores_to_vector(text.get('scores'), TEXT_EMOTIONS),
+                    audio_scores=scores_to_vector(audio.get('scores'), AUDIO_EMOTIONS),
+                    dominant_emotion=audio.get('dominant'),
                     start_ms=seg.get('start'),
-                    end_ms=seg.get('end')
+                    end_ms=seg.get('end'),
+                    is_user=is_same if user_embedding is not None else None,
                 )
-                print(f"[DB] user_conversation_detail 저장: master_uid={master_uid}, seg_idx={i}")
+                logger.debug("[DB] user_conversation_detail 저장: master_uid=%s, seg_idx=%d", master_uid, i)
 
             except Exception as e:
-                print(f"[최종 분석] Segment {i+1} 처리 중 에러: {e}")
+                logger.error(f"[최종 분석] Segment {i+1} 처리 중 에러: {e}")
+
+        if master_uid and still_owner is not None and not still_owner():
+            # 저장 도중 lease 를 잃었으면 작업을 가져간 워커가 다시 저장하므로, 중복 대화/집계가 남지 않도록 지웁니다.
+            logger.warning(f"[최종 분석] 저장 중 다른 워커가 작업을 가져가 대화를 삭제합니다: master_uid={master_uid}")
+            conversation_dao.delete_conversation_master(master_uid)
+            invalidate_report_cache(master_uid)
+            return None
 
         if master_uid:
-            self.user_conversation_dao.update_master_audio_path(master_uid, wav_path)
-            print(f"[DB] user_conversation_master.audio_path 업데이트: master_uid={master_uid}")
-        
-        self.user_conversation_dao.close()
+            conversation_dao.update_master_audio_path(master_uid, wav_path)
+            logger.info(f"[DB] user_conversation_master.audio_path 업데이트: master_uid={master_uid}")
+            conversation_dao.mark_master_finalized(master_uid)
+            invalidate_report_cache(master_uid)
+            try:
+                # 이번 대화가 속한 버킷만 증분 갱신
+                trend_dao.add_conversation_to_trend(master_uid)
+                logger.info(f"[DB] user_emotion_trend 갱신: master_uid={master_uid}")
+            except Exception as e:
+                logger.warning(f"[DB] user_emotion_trend 갱신 실패: {e}")
+
+        return master_uid
 
 
 analyze_service = AnalyzeService() 
\ No newline at end of file
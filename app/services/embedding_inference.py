@@ -0,0 +1,156 @@
+import numpy as np
+import torch
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ECAPA 임베딩 CPU 추론 모드 (EMBEDDING_INFERENCE_MODE)
+#   fp32       : speechbrain 기본 eager 추론 (기준)
+#   int8       : Linear 계층 동적 int8 양자화. ECAPA 는 대부분 Conv1d 라서 속도 이득은 모델/CPU에 따라 다릅니다.
+#   torchscript: embedding_model 을 torch.jit.trace 후 freeze/optimize_for_inference 로 연산 융합
+# fp32 외 모드는 기준 모델과의 코사인 유사도 검사를 통과하지 못하면 fp32 로 되돌립니다.
+INFERENCE_MODES = ("fp32", "int8", "torchscript")
+SAMPLE_RATE = 16000
+
+
+def _features(classifier, wavs: torch.Tensor, wav_lens: torch.Tensor) -> torch.Tensor:
+    feats = classifier.mods.compute_features(wavs)
+    return classifier.mods.mean_var_norm(feats, wav_lens)
+
+
+def build_embedding_model(classifier, mode: str):
+    """모드에 맞게 변환한 embedding_model 을 반환합니다. fp32 는 None(기본 encode_batch 사용)"""
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"지원하지 않는 추론 모드입니다: {mode} (가능: {INFERENCE_MODES})")
+    if mode == "fp32":
+        return None
+
+    model = classifier.mods.embedding_model
+    model.eval()
+    if mode == "int8":
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    # torchscript: 서로 다른 길이의 입력으로 검증하므로 대표 길이(2초)로 trace 합니다.
+    # (inference_mode 텐서는 trace 에 쓸 수 없으므로 no_grad 사용)
+    with torch.no_grad():
+        example_wavs = torch.randn(2, 2 * SAMPLE_RATE) * 0.1
+        example_lens = torch.tensor([1.0, 0.75])
+        example_feats = _features(classifier, example_wavs, example_lens)
+        traced = torch.jit.trace(model, (example_feats, example_lens), check_trace=False)
+        traced = torch.jit.freeze(traced.eval())
+        return torch.jit.optimize_for_inference(traced)
+
+
+def encode(classifier, embedding_model, wavs: torch.Tensor, wav_lens: torch.Tensor) -> torch.Tensor:
+    """(B, T) 파형 배치를 (B, D) 임베딩으로 변환합니다."""
+    with torch.inference_mode():
+        if embedding_model is None:
+            embeddings = classifier.encode_batch(wavs, wav_lens)
+        else:
+            embeddings = embedding_model(_features(classifier, wavs, wav_lens), wav_lens)
+    return embeddings.reshape(embeddings.shape[0], -1)
+
+
+def compute_frame_features(classifier, signal: np.ndarray) -> torch.Tensor:
+    """16kHz 파형의 프레임 단위 특징(fbank, 정규화 전)을 (프레임 수, 특징 차원)으로 반환합니다."""
+    with torch.inference_mode():
+        wavs = torch.from_numpy(np.asarray(signal, dtype=np.float32)).unsqueeze(0)
+        return classifier.mods.compute_features(wavs)[0]
+
+
+def encode_features(classifier, embedding_model, feats: torch.Tensor) -> np.ndarray:
+    """
+    미리 계산해 둔 프레임 특징 (프레임 수, 특징 차원) 에서 임베딩을 계산합니다.
+    encode_batch 와 같은 문장 단위 정규화를 거치므로 같은 구간의 파형으로 계산한 임베딩과 거의 같습니다.
+    """
+    model = embedding_model if embedding_model is not None else classifier.mods.embedding_model
+    with torch.inference_mode():
+        batch = feats.unsqueeze(0)
+        lens = torch.ones(1)
+        batch = classifier.mods.mean_var_norm(batch, lens)
+        embeddings = model(batch, lens)
+    return embeddings.reshape(-1).cpu().numpy().astype(np.float32)
+
+
+def pad_batch(signals: list[np.ndarray]) -> tuple[torch.Tensor, torch.Tensor]:
+    max_len = max(len(s) for s in signals)
+    wavs = torch.zeros(len(signals), max_len, dtype=torch.float32)
+    for i, s in enumerate(signals):
+        wavs[i, :len(s)] = torch.from_numpy(np.asarray(s, dtype=np.float32))
+    wav_lens = torch.tensor([len(s) / max_len for s in signals], dtype=torch.float32)
+    return wavs, wav_lens
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / (np.linalg.norm(a, axis=1, keepdims=True) + 1e-9)
+    b = b / (np.linalg.norm(b, axis=1, keepdims=True) + 1e-9)
+    return np.sum(a * b, axis=1)
+
+
+def compare_with_fp32(classifier, embedding_model, signals: list[np.ndarray], thresholds=(0.5, 0.75)) -> dict:
+    """
+    기준(fp32) 임베딩과 후보 모드 임베딩을 비교합니다.
+    - self_cosine: 같은 입력에 대한 두 임베딩의 코사인 유사도
+    - pairwise: 입력 쌍 유사도(실제 화자 비교에 쓰이는 값)의 최대 오차와 임계값 판정 일치율
+    """
+    reference, candidate = [], []
+    for s in signals:
+        wavs, wav_lens = pad_batch([s])
+        reference.append(encode(classifier, None, wavs, wav_lens).numpy()[0])
+        candidate.append(encode(classifier, embedding_model, wavs, wav_lens).numpy()[0])
+    reference, candidate = np.stack(reference), np.stack(candidate)
+    self_cos = _cosine_rows(reference, candidate)
+
+    def pairwise(e):
+        e = e / (np.linalg.norm(e, axis=1, keepdims=True) + 1e-9)
+        return e @ e.T
+
+    iu = np.triu_indices(len(signals), k=1)
+    ref_pairs, cand_pairs = pairwise(reference)[iu], pairwise(candidate)[iu]
+    result = {
+        "samples": len(signals),
+        "self_cosine_mean": float(self_cos.mean()),
+        "self_cosine_min": float(self_cos.min()),
+        "pairwise_max_abs_error": float(np.abs(ref_pairs - cand_pairs).max()) if len(ref_pairs) else 0.0,
+    }
+    for t in thresholds:
+        agree = np.mean((ref_pairs >= t) == (cand_pairs >= t)) if len(ref_pairs) else 1.0
+        result[f"decision_agreement@{t}"] = float(agree)
+    return result
+
+
+def synthetic_reference_signals(count: int = 8, seconds: float = 3.0, seed: int = 0) -> list[np.ndarray]:
+    """참조 음성이 없을 때 쓰는 음성 유사 합성 신호 (기본 주파수/배음/음절 변조가 서로 다름)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    signals = []
+    for _ in range(count):
+        f0 = rng.uniform(90, 250) * (1 + 0.05 * np.sin(2 * np.pi * rng.uniform(0.2, 0.8) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        harmonics = sum(rng.uniform(0.2, 1.0) / k * np.sin(k * phase) for k in range(1, 8))
+        envelope = (0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t))) ** 2
+        signal = harmonics * envelope + rng.normal(0, 0.01, t.size)
+        signals.append((signal / (np.abs(signal).max() + 1e-9) * 0.5).astype(np.float32))
+    return signals
+
+
+def select_embedding_model(classifier, mode: str, check: bool = False, min_cosine: float = 0.99):
+    """
+    설정된 모드의 embedding_model 을 만들고, 실패하거나 검사(check)를 통과하지 못하면 fp32(None)로 되돌립니다.
+    반환값: (embedding_model 또는 None, 실제 적용된 모드)
+    """
+    if mode == "fp32":
+        return None, "fp32"
+    try:
+        model = build_embedding_model(classifier, mode)
+    except Exception as e:
+        logger.warning(f"[임베딩 추론] {mode} 모드 준비 실패, fp32 로 대체합니다: {e}")
+        return None, "fp32"
+    if check:
+        report = compare_with_fp32(classifier, model, synthetic_reference_signals(count=6, seconds=2.0))
+        if report["self_cosine_min"] < min_cosine:
+            logger.warning(f"[임베딩 추론] {mode} 모드 정확도 검사 실패 (최소 코사인 {report['self_cosine_min']:.4f} < {min_cosine}), fp32 로 대체합니다.")
+            return None, "fp32"
+        logger.info(f"[임베딩 추론] {mode} 모드 정확도 검사 통과: {report}")
+    return model, mode
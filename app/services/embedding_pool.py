@@ -0,0 +1,278 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.utils.audio_utils import pcm16_to_float32
+from app.utils.logger import get_logger
+from app.utils.metrics import EMBEDDING_BATCH_SIZE, PIPELINE_STAGE_SECONDS
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+class EmbeddingWorkerPool:
+    """
+    ECAPA 임베딩 전용 워커 프로세스 풀
+
+    - 부모 프로세스에서 모델을 한 번 로드하고 파라미터를 공유 메모리로 옮긴 뒤 fork 하므로,
+      워커 수가 늘어나도 모델 가중치는 한 벌만 메모리에 올라갑니다. (copy-on-write)
+    - 워커마다 입력용 공유 메모리 버퍼를 fork 전에 만들어 두고, 파형은 pickle 대신 이 버퍼에 직접 씁니다.
+      파이프로는 배치 크기/길이 정보만 전달합니다.
+    - 모든 세션의 요청을 batch_window_ms 동안 모아 한 번의 encode_batch 로 처리합니다. (micro-batching)
+    - 죽은 워커는 다시 띄우지 않습니다. 부모 프로세스가 이미 torch 추론을 실행한 뒤라 fork 한 자식이 교착될 수 있기 때문입니다.
+      워커가 모두 죽으면 풀을 닫고, 이후 요청은 프로세스가 재시작될 때까지 in-process(inference 스레드 풀) 추론으로 대체됩니다.
+    - 풀이 닫히면 아직 처리되지 않은 요청의 Future 는 모두 RuntimeError 로 끝나므로, 호출 측은 대체 경로로 넘어갈 수 있습니다.
+
+    환경 변수
+        EMBEDDING_POOL_WORKERS      워커 프로세스 수 (0 이면 사용하지 않음)
+        EMBEDDING_BATCH_WINDOW_MS   배치를 모으는 최대 대기 시간
+        EMBEDDING_MAX_BATCH         배치 최대 크기
+        EMBEDDING_MAX_AUDIO_SEC     요청 1건의 최대 길이 (초과분은 잘라냄)
+    """
+    def __init__(self, workers: int, batch_window_ms: float = 10.0, max_batch: int = 16, max_audio_sec: float = 10.0):
+        self.workers = workers
+        self.batch_window_sec = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.max_samples = int(max_audio_sec * SAMPLE_RATE)
+        self._pending = queue.Queue()
+        self._idle = queue.Queue()
+        self._procs = []
+        self._started = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._started and not self._closed
+
+    def start(self):
+        """
+        워커 프로세스를 fork 합니다. 부모 프로세스에서 모델 추론을 실행하기 전에(앱 시작 시) 호출해야
+        torch 내부 스레드 풀이 fork 된 자식에서 교착되지 않습니다.
+        """
+        with self._lock:
+            if self._started:
+                return
+            from app.services.voice_service import voice_embedding_service
+            classifier = voice_embedding_service.classifier
+            # 파라미터/버퍼를 공유 메모리로 옮겨 fork 이후에도 페이지가 복사되지 않도록 합니다.
+            modules = list(classifier.mods.values())
+            if voice_embedding_service.embedding_model is not None:
+                modules.append(voice_embedding_service.embedding_model)  # int8/torchscript 추론 모드의 변환 모델
+            for module in modules:
+                for tensor in list(module.parameters()) + list(module.buffers()):
+                    tensor.share_memory_()
+
+            ctx = multiprocessing.get_context("fork")
+            # 워커들의 torch 스레드 합이 코어 수를 넘지 않도록 나눠 줍니다.
+            torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            for worker_id in range(self.workers):
+                shm = shared_memory.SharedMemory(create=True, size=self.max_batch * self.max_samples * 4)
+                parent_conn, child_conn = ctx.Pipe()
+                proc = ctx.Process(
+                    target=_worker_main,
+                    args=(worker_id, child_conn, shm, self.max_batch, self.max_samples, torch_threads),
+                    name=f"embedding-worker-{worker_id}",
+                    daemon=True,
+                )
+                proc.start()
+                child_conn.close()
+                worker = _WorkerHandle(worker_id, proc, parent_conn, shm)
+                self._procs.append(worker)
+                self._idle.put(worker)
+
+            threading.Thread(target=self._dispatch_loop, name="embedding-dispatcher", daemon=True).start()
+            self._started = True
+            logger.info(f"[임베딩 풀] 워커 {self.workers}개 시작 (배치 최대 {self.max_batch}, 대기 {self.batch_window_sec * 1000:.0f}ms)")
+
+    def submit(self, signal: np.ndarray) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        item = (np.asarray(signal[:self.max_samples], dtype=np.float32), future)
+        # 종료와 겹쳐도 대기열에 남아 끝나지 않는 요청이 없도록, 닫힘 확인과 추가를 같은 잠금 안에서 합니다.
+        with self._lock:
+            if not self.started:
+                raise RuntimeError("임베딩 풀이 시작되지 않았습니다.")
+            self._pending.put(item)
+        return future
+
+    async def embed(self, signal: np.ndarray) -> np.ndarray:
+        """16kHz float32 파형의 임베딩을 반환합니다."""
+        return await asyncio.wrap_future(self.submit(signal))
+
+    async def embed_pcm(self, pcm_bytes: bytes) -> np.ndarray:
+        return await self.embed(pcm16_to_float32(pcm_bytes))
+
+    def _collect_batch(self) -> list:
+        first = self._pending.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.batch_window_sec
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._pending.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _dispatch_loop(self):
+        while not self._closed:
+            batch = self._collect_batch()
+            if not batch:
+                return
+            worker = self._idle.get()
+            if worker is None:
+                for _, future in batch:
+                    _fail(future, RuntimeError("임베딩 풀이 종료되었습니다."))
+                return
+            EMBEDDING_BATCH_SIZE.observe(len(batch))
+            threading.Thread(target=self._run_batch, args=(worker, batch), daemon=True).start()
+
+    def _run_batch(self, worker, batch: list):
+        lengths = [len(signal) for signal, _ in batch]
+        buf = np.ndarray((self.max_batch, self.max_samples), dtype=np.float32, buffer=worker.shm.buf)
+        for i, (signal, _) in enumerate(batch):
+            buf[i, :len(signal)] = signal
+        try:
+            with PIPELINE_STAGE_SECONDS.time(stage="embedding_batch"):
+                worker.conn.send(lengths)
+                status, payload = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            logger.error(f"[임베딩 풀] 워커 {worker.worker_id} 통신 실패: {e}")
+            for _, future in batch:
+                _fail(future, RuntimeError(f"임베딩 워커 종료: {e}"))
+            self._retire(worker)
+            return
+
+        if status == "ok":
+            for i, (_, future) in enumerate(batch):
+                future.set_result(payload[i])
+        else:
+            logger.warning(f"[임베딩 풀] 배치 처리 실패: {payload}")
+            for _, future in batch:
+                _fail(future, RuntimeError(payload))
+        self._idle.put(worker)
+
+    def _retire(self, worker):
+        """통신이 끊긴 워커를 정리합니다. (다시 띄우지 않음) 마지막 워커였으면 풀을 닫습니다."""
+        worker.close()
+        with self._lock:
+            self._procs = [w for w in self._procs if w is not worker]
+            last = not self._procs and not self._closed
+        if last:
+            logger.error("[임베딩 풀] 살아있는 워커가 없어 풀을 닫습니다. 프로세스를 재시작할 때까지 in-process 추론으로 대체합니다.")
+            self.close()
+
+    def _fail_pending(self):
+        """대기열에 남은 요청을 모두 실패로 끝냅니다."""
+        while True:
+            try:
+                item = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                _fail(item[1], RuntimeError("임베딩 풀이 종료되었습니다."))
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._procs)
+        # 남은 요청을 실패 처리한 뒤 대기 중인 dispatcher 를 깨웁니다. (이미 꺼낸 배치는 워커 연결이 닫히면서 실패로 끝남)
+        self._fail_pending()
+        self._pending.put(None)
+        self._idle.put(None)
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.close()
+
+
+def _fail(future: concurrent.futures.Future, error: Exception):
+    if not future.done():
+        future.set_exception(error)
+
+
+class _WorkerHandle:
+    def __init__(self, worker_id, proc, conn, shm):
+        self.worker_id = worker_id
+        self.proc = proc
+        self.conn = conn
+        self.shm = shm
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def close(self):
+        """연결과 공유 메모리를 정리합니다. (_retire 와 close 가 겹쳐 호출될 수 있으므로 한 번만 실행)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.conn.close()
+        self.proc.join(timeout=5)
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _worker_main(worker_id: int, conn, shm, max_batch: int, max_samples: int, torch_threads: int):
+    """fork 된 워커 프로세스: 부모가 로드한 모델을 그대로 사용합니다."""
+    import torch
+    from app.services.voice_service import voice_embedding_service
+
+    torch.set_num_threads(torch_threads)
+    buf = np.ndarray((max_batch, max_samples), dtype=np.float32, buffer=shm.buf)
+    while True:
+        try:
+            lengths = conn.recv()
+        except EOFError:
+            break
+        if lengths is None:
+            break
+        try:
+            signals = [buf[i, :n].copy() for i, n in enumerate(lengths)]
+            conn.send(("ok", voice_embedding_service.encode_batch(signals)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    shm.close()
+
+
+embedding_pool = EmbeddingWorkerPool(
+    workers=_env_int("EMBEDDING_POOL_WORKERS", 0),
+    batch_window_ms=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "").strip() or 10),
+    max_batch=_env_int("EMBEDDING_MAX_BATCH", 16),
+    max_audio_sec=float(os.getenv("EMBEDDING_MAX_AUDIO_SEC", "").strip() or 10),
+)
+
+
+def start_embedding_pool():
+    """EMBEDDING_POOL_WORKERS > 0 이면 임베딩 워커 풀을 시작합니다. (앱 시작 이벤트에서 호출)"""
+    if embedding_pool.workers > 0:
+        embedding_pool.start()
+
+
+def stop_embedding_pool():
+    if embedding_pool.started:
+        embedding_pool.close()
@@ -0,0 +1,171 @@
+import asyncio
+import os
+
+from app.services.analyze_service import analyze_service
+from app.services.session_store import SessionStore, session_store
+from app.utils.executors import EXECUTOR_SIZES
+from app.utils.logger import bind_log_context, get_logger
+from app.utils.metrics import FINALIZATION_JOBS_TOTAL, FINALIZATION_JOBS_RUNNING, PIPELINE_STAGE_SECONDS
+
+logger = get_logger(__name__)
+
+
+class FinalizationService:
+    """
+    최종 분석 작업 큐 소비자
+
+    - 세션이 끝나면 WAV 를 저장한 뒤 작업(finalize_analysis 인자)을 세션 저장소에 등록하고 완료를 기다립니다.
+    - 각 워커는 동시에 concurrency 개까지 작업을 가져가 실행합니다. 여유가 있는 워커가 먼저 가져가므로
+      postgres 저장소에서는 어느 노드에서 끝난 대화든 놀고 있는 노드가 최종 분석을 맡습니다.
+    - 실행 중에는 lease_sec / 3 마다 lease 를 연장하므로, 오래 걸리는 작업(Gemini batch 대기, Clova Long)도
+      실행하던 워커가 살아 있는 한 다른 워커가 가져가지 않습니다.
+    - 실행하던 워커가 죽으면 lease_sec 이후 다른 워커가 다시 가져갑니다. (최대 max_attempts 회)
+      lease 를 잃은 실행은 대화를 저장하지 않고(저장 중이었다면 삭제), 결과도 기록하지 않습니다.
+    """
+    def __init__(self, store: SessionStore, concurrency: int, poll_sec: float = 1.0,
+                 lease_sec: float = 900.0, max_attempts: int = 2):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.poll_sec = poll_sec
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self._slots = None
+        self._wakeup = None
+        self._loop_task = None
+        # 이 워커가 실행한 작업의 완료 알림 (다른 워커가 실행하면 저장소를 폴링)
+        self._done = {}
+
+    def start(self):
+        """작업 소비 루프를 시작합니다. (앱 시작 시, 또는 첫 작업 등록 시)"""
+        if self._loop_task is not None and not self._loop_task.done():
+            return
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._consume())
+        logger.info(f"[최종 분석 큐] 시작 (backend={self.store.backend}, node={self.store.node_id}, 동시 실행 {self.concurrency})")
+
+    async def stop(self):
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        try:
+            await self._loop_task
+        except asyncio.CancelledError:
+            pass
+        self._loop_task = None
+
+    async def submit(self, session_id: str, payload: dict) -> bool:
+        """작업을 등록합니다. 같은 대화의 작업이 이미 있으면 False (중복 최종 분석 방지)."""
+        self.start()
+        self._done.setdefault(session_id, asyncio.Event())
+        created = await self.store.run(self.store.enqueue_job, session_id, payload)
+        if created:
+            FINALIZATION_JOBS_TOTAL.inc(outcome="submitted")
+        self._wakeup.set()
+        return created
+
+    async def wait(self, session_id: str) -> int | None:
+        """작업이 끝날 때까지 기다려 master_uid 를 반환합니다. 실패한 작업이면 RuntimeError."""
+        done = self._done.setdefault(session_id, asyncio.Event())
+        try:
+            while True:
+                job = await self.store.run(self.store.get_job, session_id)
+                if job is None:
+                    raise RuntimeError(f"최종 분석 작업이 없습니다: {session_id}")
+                if job["status"] == "done":
+                    return job["master_uid"]
+                if job["status"] == "failed":
+                    raise RuntimeError(job["error"])
+                try:
+                    await asyncio.wait_for(done.wait(), self.poll_sec)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._done.pop(session_id, None)
+
+    async def _consume(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                claimed = await self.store.run(self.store.claim_job, self.lease_sec, self.max_attempts)
+            except Exception as e:
+                logger.error(f"[최종 분석 큐] 작업 조회 실패: {e}")
+                claimed = None
+            if claimed is None:
+                self._slots.release()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_sec)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            asyncio.create_task(self._run(*claimed))
+
+    async def _heartbeat(self, session_id: str, attempt: int):
+        while True:
+            await asyncio.sleep(self.lease_sec / 3)
+            try:
+                if not await self.store.run(self.store.renew_job, session_id, attempt):
+                    logger.warning(f"[최종 분석 큐] 다른 워커가 작업을 가져갔습니다. (session: {session_id})")
+                    return
+            except Exception as e:
+                logger.error(f"[최종 분석 큐] lease 연장 실패 (session: {session_id}): {e}")
+
+    async def _run(self, session_id: str, payload: dict, attempt: int):
+        bind_log_context(sid=payload.get("sid"), user_id=payload.get("user_id"))
+        FINALIZATION_JOBS_RUNNING.inc()
+        heartbeat = asyncio.create_task(self._heartbeat(session_id, attempt))
+        master_uid, error = None, None
+
+        def still_owner() -> bool:
+            # finalize 풀 스레드에서 DB 저장 직전에 호출합니다. (lease 연장을 겸함)
+            return self.store.renew_job(session_id, attempt)
+
+        try:
+            # 블로킹 단계는 finalize 풀에서, Gemini 감정 분석은 이벤트 루프에서 비동기로 실행합니다.
+            with PIPELINE_STAGE_SECONDS.time(stage="finalize"):
+                master_uid = await analyze_service.finalize_analysis(
+                    payload["wav_path"],
+                    None,  # WAV 는 작업 등록 전에 저장되어 있습니다.
+                    payload.get("user_id"),
+                    payload.get("sid"),
+                    payload.get("ts"),
+                    self.store.voice_embeddings,
+                    payload.get("live_results"),
+                    still_owner,
+                )
+        except Exception as e:
+            logger.error(f"[최종 분석] 실패 (session: {session_id}): {e}")
+            error = str(e) or type(e).__name__
+        finally:
+            heartbeat.cancel()
+            FINALIZATION_JOBS_RUNNING.dec()
+            self._slots.release()
+        try:
+            if await self.store.run(self.store.finish_job, session_id, attempt, master_uid, error):
+                FINALIZATION_JOBS_TOTAL.inc(outcome="failed" if error else "done")
+            else:
+                FINALIZATION_JOBS_TOTAL.inc(outcome="lost")
+                logger.warning(f"[최종 분석 큐] lease 를 잃은 실행의 결과는 기록하지 않습니다. (session: {session_id})")
+        except Exception as e:
+            logger.error(f"[최종 분석 큐] 완료 기록 실패 (session: {session_id}): {e}")
+        done = self._done.get(session_id)
+        if done is not None:
+            done.set()
+
+
+finalization_service = FinalizationService(
+    session_store,
+    concurrency=int(os.getenv("FINALIZE_CONCURRENCY", "").strip() or EXECUTOR_SIZES["finalize"]),
+    poll_sec=float(os.getenv("FINALIZE_POLL_SEC", "").strip() or 1.0),
+    lease_sec=float(os.getenv("FINALIZE_JOB_LEASE_SEC", "").strip() or 900.0),
+    max_attempts=int(os.getenv("FINALIZE_MAX_ATTEMPTS", "").strip() or 2),
+)
+
+
+async def start_finalization_worker():
+    finalization_service.start()
+
+
+async def stop_finalization_worker():
+    await finalization_service.stop()
@@ -0,0 +1,95 @@
+import difflib
+import os
+
+from app.utils.emotion_utils import AUDIO_EMOTIONS, TEXT_EMOTIONS, format_analysis_result, scores_to_vector, vector_to_scores
+
+# 최종 분석 모드
+#   full        : 전체 대화를 처음부터 다시 분석 (기본값)
+#   incremental : Clova diarization 세그먼트를 실시간 청크 결과와 시간으로 맞춰 보고,
+#                 충분히 겹치는 세그먼트는 실시간 감정 분석 결과를 재사용하고 나머지만 Gemini 로 분석
+# 화자 분리와 문장 경계는 실시간 경로에 없으므로 Clova Long 은 두 모드 모두 호출합니다.
+# 음성 유사도는 재사용하지 않습니다. 실시간 값은 2초 청크(또는 스트리밍 검증기의 평활화 값)라서
+# 세그먼트 단위 임계값(0.75)과 같은 척도가 아니므로, 세그먼트 음성으로 항상 다시 계산합니다.
+FINALIZE_MODE = os.getenv("FINALIZE_MODE", "").strip().lower() or "full"
+# 세그먼트 길이 중 재사용 가능한 청크 결과로 덮인 비율이 이 값 이상이어야 재사용
+FINALIZE_REUSE_MIN_OVERLAP = float(os.getenv("FINALIZE_REUSE_MIN_OVERLAP", "").strip() or 0.8)
+# 세그먼트 문장 중 겹치는 청크의 실시간 인식 결과에 포함된 글자 비율. 낮으면 인식이 달라진 것으로 보고 다시 분석
+FINALIZE_REUSE_MIN_TEXT_MATCH = float(os.getenv("FINALIZE_REUSE_MIN_TEXT_MATCH", "").strip() or 0.6)
+
+
+def incremental_finalize_enabled() -> bool:
+    return FINALIZE_MODE == "incremental"
+
+
+def live_chunk_record(chunk_id: int, chunk_ms: int, transcript: str, emotion: dict | None) -> dict:
+    """
+    실시간 청크 결과를 최종 분석에서 재사용할 수 있는 형태로 줄입니다. (작업 큐 payload 로 저장되므로 JSON 직렬화 가능해야 함)
+    degraded 이거나 한쪽 감정을 건너뛴 결과는 감정을 재사용하지 않습니다.
+    """
+    usable = (
+        isinstance(emotion, dict)
+        and emotion.get("text") is not None
+        and emotion.get("audio") is not None
+        and not emotion.get("degraded")
+        and "skipped" not in (emotion.get("source") or {}).values()
+    )
+    return {
+        "start_ms": chunk_id * chunk_ms,
+        "end_ms": (chunk_id + 1) * chunk_ms,
+        "transcript": transcript or "",
+        "text": scores_to_vector(emotion["text"].get("scores"), TEXT_EMOTIONS) if usable else None,
+        "audio": scores_to_vector(emotion["audio"].get("scores"), AUDIO_EMOTIONS) if usable else None,
+    }
+
+
+def _text_match(sentence: str, live_text: str) -> float:
+    """sentence 의 글자 중 live_text 와 순서대로 일치하는 비율 (공백 무시)"""
+    sentence = "".join(sentence.split())
+    live_text = "".join(live_text.split())
+    if not sentence:
+        return 0.0
+    matcher = difflib.SequenceMatcher(None, sentence, live_text, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(sentence)
+
+
+def _weighted_mean(vectors: list, weights: list) -> list[float]:
+    total = sum(weights)
+    return [sum(v[k] * w for v, w in zip(vectors, weights)) / total for k in range(len(vectors[0]))]
+
+
+def match_live_results(segments: list, live_results: list) -> list[dict | None]:
+    """
+    Clova 세그먼트마다 시간이 겹치는 실시간 청크 결과를 찾아 재사용할 감정 분석 결과를 반환합니다.
+    반환 리스트는 segments 와 같은 길이이며, 재사용 가능한 청크가 세그먼트의 FINALIZE_REUSE_MIN_OVERLAP 이상을 덮고
+    문장이 실시간 인식 결과와 FINALIZE_REUSE_MIN_TEXT_MATCH 이상 일치하면 겹친 길이로 가중 평균한 감정 점수,
+    아니면 None 입니다.
+    """
+    live_results = sorted(live_results or [], key=lambda r: r["start_ms"])
+    matches = []
+    for seg in segments:
+        start, end = seg.get("start") or 0, seg.get("end") or 0
+        duration = end - start
+        matches.append(None)
+        if duration <= 0:
+            continue
+        overlaps = []
+        for record in live_results:
+            if record["start_ms"] >= end:
+                break
+            overlap = min(end, record["end_ms"]) - max(start, record["start_ms"])
+            if overlap > 0:
+                overlaps.append((record, overlap))
+        if not overlaps:
+            continue
+
+        with_emotion = [(r, w) for r, w in overlaps if r["text"] is not None and r["audio"] is not None]
+        covered = sum(w for _, w in with_emotion)
+        live_text = " ".join(r["transcript"] for r, _ in overlaps)
+        if (with_emotion and covered / duration >= FINALIZE_REUSE_MIN_OVERLAP
+                and _text_match(seg.get("text") or "", live_text) >= FINALIZE_REUSE_MIN_TEXT_MATCH):
+            weights = [w for _, w in with_emotion]
+            matches[-1] = format_analysis_result(
+                vector_to_scores(_weighted_mean([r["text"] for r, _ in with_emotion], weights), TEXT_EMOTIONS),
+                vector_to_scores(_weighted_mean([r["audio"] for r, _ in with_emotion], weights), AUDIO_EMOTIONS),
+            )
+    return matches
@@ -0,0 +1,535 @@
+# Standard library imports
+import asyncio
+import os
+import secrets
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+# Third-party imports
+from starlette.websockets import WebSocketDisconnect
+
+# Local application imports
+from app.providers.circuit_breaker import provider_status
+from app.services.analyze_service import analyze_service
+from app.services.finalization_service import finalization_service
+from app.services.incremental_finalize import incremental_finalize_enabled, live_chunk_record
+from app.services.session_store import SessionStore, session_store
+from app.utils.executors import run_in
+from app.utils.logger import SAMPLED, bind_log_context, get_logger
+from app.utils.metrics import (
+    CHUNK_END_TO_END_SECONDS,
+    CHUNKS_DROPPED_TOTAL,
+    CHUNKS_IN_FLIGHT,
+    EARLY_RESULT_SECONDS,
+    LIVE_SESSIONS_DETACHED,
+    RESULT_ORDER_WAIT_SECONDS,
+    SESSION_RESUMES_TOTAL,
+    WEBSOCKET_SENT_BYTES_TOTAL,
+)
+from app.utils.result_codec import ResultEncoder
+
+logger = get_logger(__name__)
+
+BASE_DIR = "storage/audio"
+WAV_DIR = os.path.join(BASE_DIR, "wav_chunks")
+os.makedirs(WAV_DIR, exist_ok=True)
+# 공유 세션 저장소 사용 시 끊긴 세션의 음성을 다른 워커가 이어받을 수 있도록 보관하는 위치
+SESSION_AUDIO_DIR = os.path.join(BASE_DIR, "live_sessions")
+os.makedirs(SESSION_AUDIO_DIR, exist_ok=True)
+
+CHUNK_DURATION_SEC = 2.0
+SAMPLE_RATE = 16000
+BYTES_PER_SEC = SAMPLE_RATE * 2  # 16bit(2byte) * 16000
+CHUNK_SIZE = int(CHUNK_DURATION_SEC * BYTES_PER_SEC)
+# 개별 청크 파이프라인 타임아웃
+CHUNK_TIMEOUT_SEC = 15.0
+
+# resumable 세션의 연결이 끊긴 뒤 재연결을 기다리는 시간. 0 이면 끊기는 즉시 최종 분석
+SESSION_RESUME_GRACE_SEC = float(os.getenv("SESSION_RESUME_GRACE_SEC", "").strip() or 30.0)
+
+
+class LiveAnalysisSession:
+    """
+    /ws/analyze 논리 대화 세션
+
+    웹소켓 연결과 분리된 세션 상태(오디오 버퍼, 청크 번호, 청크 결과, 화자 검증기)를 보관합니다.
+    resumable 세션은 연결이 끊겨도 유예 시간 동안 상태와 처리 중인 청크 Task 가 유지되며,
+    같은 resume_token 으로 재연결하면 새 웹소켓을 붙여(attach) 밀린 결과부터 이어서 전송합니다.
+    """
+    def __init__(self, sid: int, user_id: str | None, progressive: bool, encoder: ResultEncoder,
+                 speaker_verifier=None, resumable: bool = False, session_id: str | None = None,
+                 ts: str | None = None, resume_token: str | None = None):
+        self.sid = sid  # 최초 연결의 sid (파일 이름, 로그용)
+        self.session_id = session_id or uuid.uuid4().hex  # 논리 대화 ID (최종 분석 작업 키)
+        self.ts = ts or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.wav_path = os.path.join(WAV_DIR, f"session_{self.ts}_{sid}.wav")
+        self.pcm_path = os.path.join(SESSION_AUDIO_DIR, f"{self.session_id}.pcm")
+        self.user_id = user_id
+        self.progressive = progressive
+        self.encoder = encoder
+        self.speaker_verifier = speaker_verifier
+        self.resumable = resumable
+        self.resume_token = (resume_token or secrets.token_urlsafe(24)) if resumable else None
+
+        self.buffer = bytearray()
+        self.full_audio_buffer = bytearray()
+        # 각 청크에 고유 ID를 부여
+        self.chunk_id_counter = 0
+        # 처리 결과를 저장 (key: chunk_id, value: result)
+        self.results = {}
+        # 청크 수신 시각 (key: chunk_id, value: perf_counter) - 종단 간 지연 측정용
+        self.chunk_received_at = {}
+        # 청크 처리 완료 시각 - 순서 보장 때문에 전송을 기다린 시간 측정용
+        self.chunk_ready_at = {}
+        # 다음으로 전송해야 할 청크의 ID
+        self.next_chunk_to_send = 0
+        # progressive 모드: 청크 순서와 관계없이 바로 보내는 선행 메시지 대기열
+        self.early_messages = deque()
+        # 클라이언트에 아직 확인(ack)해 주지 않은 수신 데이터가 있는지 여부
+        self.ack_pending = False
+        # pcm_path 에 이미 기록한 바이트 수
+        self.spilled_bytes = 0
+        # FINALIZE_MODE=incremental: 최종 분석에서 재사용할 청크별 실시간 결과 (live_chunk_record)
+        self.live_results = []
+        # 처리 중인 청크 Task (최종 분석 전에 settle 로 마무리를 기다림)
+        self.chunk_tasks = set()
+
+        self.websocket = None
+        self.detached_at = None
+        self.finalize_task = None
+        self.expire_task = None
+        self._sender_task = None
+        self._stop_event = None
+
+    @property
+    def received_bytes(self) -> int:
+        """지금까지 받은 음성 바이트 수. 재연결 시 클라이언트는 이 위치부터 다시 보냅니다."""
+        return len(self.full_audio_buffer)
+
+    @property
+    def finalized(self) -> bool:
+        return self.finalize_task is not None
+
+    def state(self) -> dict:
+        """세션 저장소에 기록하는 상태 (다른 워커가 세션을 이어받을 때 사용)"""
+        state = {
+            "session_id": self.session_id,
+            "sid": self.sid,
+            "ts": self.ts,
+            "pcm_path": self.pcm_path,
+            "progressive": self.progressive,
+            "encoding": self.encoder.encoding,
+            "received_bytes": self.received_bytes,
+        }
+        if self.live_results:
+            state["live_results"] = self.live_results
+        return state
+
+    @classmethod
+    def restore(cls, token: str, user_id: str | None, state: dict, pcm: bytes, speaker_verifier=None) -> "LiveAnalysisSession":
+        """다른 워커가 보관한 음성과 상태로 세션을 복원합니다. 이전 워커에서 전송하지 못한 청크 결과는 복원되지 않습니다."""
+        session = cls(state["sid"], user_id, state["progressive"], ResultEncoder(state["encoding"]), speaker_verifier,
+                      resumable=True, session_id=state["session_id"], ts=state["ts"], resume_token=token)
+        session.full_audio_buffer.extend(pcm)
+        session.spilled_bytes = len(pcm)
+        session.chunk_id_counter = session.next_chunk_to_send = len(pcm) // CHUNK_SIZE
+        session.buffer.extend(pcm[session.chunk_id_counter * CHUNK_SIZE:])
+        session.live_results = list(state.get("live_results") or [])
+        return session
+
+    def spill(self):
+        """아직 기록하지 않은 음성을 pcm_path 에 이어 씁니다. (블로킹 I/O)"""
+        if self.spilled_bytes >= self.received_bytes:
+            return
+        with open(self.pcm_path, "ab") as f:
+            f.write(self.full_audio_buffer[self.spilled_bytes:])
+        self.spilled_bytes = self.received_bytes
+
+    def remove_spill(self):
+        if os.path.exists(self.pcm_path):
+            os.remove(self.pcm_path)
+
+    # --- 연결 관리 ---
+    def attach(self, websocket):
+        """
+        새 웹소켓을 세션에 연결합니다. 결과 전송은 start_sender 이후 시작됩니다.
+        유예 중인 만료(최종 분석 예약)가 있으면 취소합니다.
+        """
+        if self.expire_task is not None:
+            self.expire_task.cancel()
+            self.expire_task = None
+            LIVE_SESSIONS_DETACHED.dec()
+        self.websocket = websocket
+        self.detached_at = None
+
+    def start_sender(self):
+        self._stop_event = asyncio.Event()
+        self._sender_task = asyncio.create_task(self._send_results_in_order(self.websocket, self._stop_event))
+
+    async def stop_sender(self):
+        if self._sender_task is None:
+            return
+        self._stop_event.set()
+        try:
+            await self._sender_task
+        except Exception as e:
+            logger.info(f"결과 전송 루프 종료 중 에러 (sid: {self.sid}): {e}")
+        self._sender_task = None
+
+    async def detach(self, websocket):
+        """websocket 이 아직 이 세션에 연결되어 있으면 결과 전송을 멈추고 연결을 분리합니다."""
+        if self.websocket is not websocket:
+            return
+        await self.stop_sender()
+        self.websocket = None
+        self.detached_at = time.perf_counter()
+
+    # --- 음성 수신 ---
+    def feed_audio(self, websocket, data: bytes, user_embedding) -> bool:
+        """
+        수신한 음성을 버퍼에 쌓고 2초 청크가 완성될 때마다 처리 Task 를 만듭니다.
+        다른 연결이 세션을 이어받은 뒤 도착한 이전 연결의 데이터는 버리고 False 를 반환합니다.
+        """
+        if self.websocket is not websocket:
+            return False
+        self.buffer.extend(data)
+        self.full_audio_buffer.extend(data)
+
+        while len(self.buffer) >= CHUNK_SIZE:
+            chunk_to_process = self.buffer[:CHUNK_SIZE]
+            del self.buffer[:CHUNK_SIZE]
+
+            chunk_id = self.chunk_id_counter
+            self.chunk_received_at[chunk_id] = time.perf_counter()
+            # 각 청크를 병렬 처리 작업으로 생성
+            task = asyncio.create_task(self._process_chunk_with_timeout(chunk_id, chunk_to_process, user_embedding))
+            self.chunk_tasks.add(task)
+            task.add_done_callback(self.chunk_tasks.discard)
+            self.chunk_id_counter += 1
+            self.ack_pending = self.resumable
+        return True
+
+    async def drain(self, timeout: float):
+        """처리 중인 청크 결과가 모두 전송될 때까지 기다립니다."""
+        try:
+            async with asyncio.timeout(timeout):
+                while self.next_chunk_to_send < self.chunk_id_counter:
+                    await asyncio.sleep(0.05)
+        except asyncio.TimeoutError:
+            logger.warning(f"청크 결과 전송 대기 시간 초과 (sid: {self.sid}). "
+                           f"남은 청크: {self.chunk_id_counter - self.next_chunk_to_send}")
+
+    async def settle(self, timeout: float):
+        """
+        처리 중인 청크 Task 가 끝날 때까지 기다립니다. (결과 전송 여부와 무관)
+        연결이 끊겨 drain 을 건너뛴 세션도 live_results 를 확정한 뒤 최종 분석에 넘기기 위해 사용합니다.
+        """
+        if not self.chunk_tasks:
+            return
+        _, pending = await asyncio.wait(set(self.chunk_tasks), timeout=timeout)
+        if pending:
+            logger.warning(f"청크 처리 대기 시간 초과 (sid: {self.sid}). 남은 청크: {len(pending)}")
+
+    # --- 결과 전송 ---
+    async def send_message(self, message: dict, websocket=None):
+        websocket = websocket or self.websocket
+        frame = self.encoder.encode(message)
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+            WEBSOCKET_SENT_BYTES_TOTAL.inc(len(frame), encoding=self.encoder.encoding)
+        else:
+            await websocket.send_text(frame)
+            WEBSOCKET_SENT_BYTES_TOTAL.inc(len(frame.encode("utf-8")), encoding=self.encoder.encoding)
+
+    def emit_early(self, event: str, chunk_id: int, **fields):
+        self.early_messages.append({"event": event, "utterance_id": chunk_id, **fields})
+
+    async def _send_early_messages(self, websocket):
+        while self.early_messages:
+            message = self.early_messages.popleft()
+            utterance_id = message["utterance_id"]
+            if utterance_id < self.next_chunk_to_send:
+                continue  # 최종 결과를 이미 보낸 발화
+            await self.send_message(message, websocket)
+            received_at = self.chunk_received_at.get(utterance_id)
+            if received_at is not None:
+                EARLY_RESULT_SECONDS.observe(time.perf_counter() - received_at, event=message["event"])
+
+    # 처리 결과를 순서대로 전송하는 비동기 함수 (소비자). 연결마다 하나씩 실행됩니다.
+    async def _send_results_in_order(self, websocket, stop_event: asyncio.Event):
+        while not stop_event.is_set():
+            try:
+                if self.ack_pending:
+                    self.ack_pending = False
+                    await self.send_message({"event": "ack", "offset": self.received_bytes}, websocket)
+                if self.early_messages:
+                    await self._send_early_messages(websocket)
+            except WebSocketDisconnect:
+                break
+            chunk_id = self.next_chunk_to_send
+            if chunk_id not in self.results:
+                await asyncio.sleep(0.01)  # CPU 부하를 줄이기 위해 잠시 대기
+                continue
+            result = self.results[chunk_id]
+            if result:  # 타임아웃으로 None이 저장된 경우는 전송하지 않음
+                ready_at = self.chunk_ready_at.get(chunk_id)
+                try:
+                    logger.debug("[통역결과전달][%s]", result, extra=SAMPLED)
+                    await self.send_message(result, websocket)
+                except WebSocketDisconnect:
+                    # 전송하지 못한 결과는 남겨 두었다가 재연결 후 다시 보냅니다.
+                    break
+                if ready_at is not None:
+                    RESULT_ORDER_WAIT_SECONDS.observe(time.perf_counter() - ready_at)
+                received_at = self.chunk_received_at.get(chunk_id)
+                if received_at is not None:
+                    CHUNK_END_TO_END_SECONDS.observe(time.perf_counter() - received_at)
+            self.results.pop(chunk_id, None)
+            self.chunk_received_at.pop(chunk_id, None)
+            self.chunk_ready_at.pop(chunk_id, None)
+            self.next_chunk_to_send += 1
+
+    # --- 청크 처리 ---
+    # progressive 모드: 음성 감정 추정치를 STT 로 발화가 확인된 뒤 emotion_estimate 로 보냅니다.
+    async def _send_audio_estimate(self, chunk_id, stt_task, audio_task):
+        try:
+            # 청크 처리 Task 가 취소되어도 공유 중인 STT/오디오 Task 는 취소하지 않도록 shield 로 기다립니다.
+            estimate = await analyze_service.estimate_audio_emotion(await asyncio.shield(audio_task))
+            if estimate is not None and await asyncio.shield(stt_task):
+                self.emit_early("emotion_estimate", chunk_id, audio=estimate)
+        except Exception as e:
+            logger.debug("Chunk %d 음성 감정 추정 실패: %s", chunk_id, e)
+
+    # 개별 청크를 타임아웃과 함께 처리하는 비동기 함수
+    async def _process_chunk_with_timeout(self, chunk_id, chunk_data, user_embedding):
+        # Task마다 컨텍스트가 복사되므로 다른 청크의 로그와 섞이지 않습니다.
+        bind_log_context(chunk_id=chunk_id)
+        CHUNKS_IN_FLIGHT.inc()
+        estimate_task = None
+        try:
+            async with asyncio.timeout(CHUNK_TIMEOUT_SEC):  # 전체 파이프라인에 대한 타임아웃
+                # 1단계: STT와 오디오 처리를 동시에 실행
+                on_interim = None
+                if self.progressive:
+                    def on_interim(text):
+                        self.emit_early("transcript_interim", chunk_id, transcript=text)
+                stt_task = asyncio.create_task(analyze_service.transcribe_chunk(chunk_data, on_interim))
+                audio_task = asyncio.create_task(analyze_service._process_audio_for_analysis(chunk_data))
+                if self.progressive:
+                    estimate_task = asyncio.create_task(self._send_audio_estimate(chunk_id, stt_task, audio_task))
+
+                transcript = await stt_task
+                if not transcript:
+                    logger.debug("Chunk %d STT 결과 없음. 처리 중단.", chunk_id)
+                    CHUNKS_DROPPED_TOTAL.inc(reason="no_transcript")
+                    self.results[chunk_id] = None
+                    return
+                if self.progressive:
+                    self.emit_early("transcript_final", chunk_id, transcript=transcript)
+
+                audio_array = await audio_task
+
+                # 2단계: Gemini 분석과 음성 비교를 동시에 실행
+                emotion_task = asyncio.create_task(analyze_service.analyze_emotion_from_audio_and_text(transcript, audio_array))
+                voice_task = asyncio.create_task(analyze_service.compare_voice_in_chunk(chunk_data, user_embedding, self.speaker_verifier))
+
+                emotion_result = await emotion_task
+                is_same, similarity = await voice_task
+
+                # 3단계: 결과 조합
+                analysis_result = {
+                    "event": "emotion_update" if self.progressive else "emotion_analysis",
+                    "chunk_id": chunk_id,
+                    "transcript": transcript,
+                    "emotion": emotion_result,
+                    "is_same": is_same,
+                    "similarity": similarity,
+                    # Provider 별 서킷 상태 (closed|half_open|open). 감정 결과의 degraded 와 함께 클라이언트 표시용
+                    "provider_status": provider_status(),
+                }
+                if self.progressive:
+                    analysis_result["utterance_id"] = chunk_id
+                self.results[chunk_id] = analysis_result
+                if incremental_finalize_enabled():
+                    self.live_results.append(live_chunk_record(
+                        chunk_id, int(CHUNK_DURATION_SEC * 1000), transcript, emotion_result,
+                    ))
+                logger.debug("Chunk %d 모든 처리 완료.", chunk_id)
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Chunk {chunk_id} 처리 시간 초과 ({CHUNK_TIMEOUT_SEC:.0f}초). 해당 요청을 버립니다.")
+            CHUNKS_DROPPED_TOTAL.inc(reason="timeout")
+            self.results[chunk_id] = None  # 타임아웃된 작업 표시
+        except Exception as e:
+            logger.error(f"Chunk {chunk_id} 처리 중 에러: {e}")
+            CHUNKS_DROPPED_TOTAL.inc(reason="error")
+            self.results[chunk_id] = None
+        finally:
+            if estimate_task is not None and not estimate_task.done():
+                estimate_task.cancel()
+            self.chunk_ready_at[chunk_id] = time.perf_counter()
+            CHUNKS_IN_FLIGHT.dec()
+
+
+class LiveSessionService:
+    """
+    resumable 세션 레지스트리
+
+    - resume_token 으로 끊긴 세션을 찾아 새 연결에 이어 붙입니다.
+    - 연결이 끊긴 세션은 SESSION_RESUME_GRACE_SEC 동안 보관하고, 그 안에 재연결이 없으면 최종 분석합니다.
+    - 세션 메타데이터는 세션 저장소(SESSION_STORE_BACKEND)에 기록합니다. 공유 저장소(postgres)에서는
+      다른 워커로 재연결해도 보관된 음성으로 세션을 복원해서 이어갑니다.
+    - 최종 분석은 논리 대화(세션)당 정확히 한 번, 최종 분석 작업 큐를 통해 실행됩니다.
+    """
+    def __init__(self, store: SessionStore, grace_sec: float = SESSION_RESUME_GRACE_SEC):
+        self.store = store
+        self.grace_sec = grace_sec
+        self._sessions = {}
+
+    async def create(self, sid: int, user_id: str | None, progressive: bool, encoder: ResultEncoder,
+                     speaker_verifier=None, resumable: bool = False) -> LiveAnalysisSession:
+        session = LiveAnalysisSession(sid, user_id, progressive, encoder, speaker_verifier,
+                                      resumable=resumable and self.grace_sec > 0)
+        if session.resumable:
+            await self.store.run(self.store.save_session, session.resume_token, session.session_id,
+                                 user_id, session.state(), False)
+            self._sessions[session.resume_token] = session
+        return session
+
+    async def resume(self, token: str, user_id: str | None, websocket, user_embedding=None) -> LiveAnalysisSession | None:
+        """
+        token 에 해당하는 세션을 websocket 에 이어 붙입니다. 없거나 다른 사용자의 세션이면 None.
+        이전 연결이 아직 살아 있으면(모바일에서 끊김을 늦게 감지한 경우) 이전 연결을 닫고 넘겨받습니다.
+        """
+        state = await self.store.run(self.store.claim_session, token, user_id) if token else None
+        if state is None:
+            SESSION_RESUMES_TOTAL.inc(outcome="unknown")
+            return None
+        session = self._sessions.get(token)
+        if session is not None and session.websocket is None and session.received_bytes != state["received_bytes"]:
+            # 그 사이 다른 워커가 세션을 이어받아 음성을 더 받았으면 이 워커의 사본은 버립니다.
+            self._drop(session)
+            session = None
+        if session is None or session.finalized:
+            if not self.store.shared:
+                SESSION_RESUMES_TOTAL.inc(outcome="unknown")
+                return None
+            session = await self._adopt(token, user_id, state, user_embedding)
+            SESSION_RESUMES_TOTAL.inc(outcome="adopted")
+        else:
+            # 유예 중인 만료는 attach 에서 취소합니다. (disconnect 가 아직 유예를 시작하기 전일 수도 있음)
+            previous = session.websocket
+            if previous is not None:
+                await session.detach(previous)
+                try:
+                    await previous.close(code=4001, reason="resumed on another connection")
+                except Exception:
+                    pass
+                SESSION_RESUMES_TOTAL.inc(outcome="taken_over")
+            else:
+                logger.info(f"[세션 재개] sid={session.sid}, 끊김 {time.perf_counter() - session.detached_at:.1f}초")
+                SESSION_RESUMES_TOTAL.inc(outcome="resumed")
+        session.attach(websocket)
+        return session
+
+    async def _adopt(self, token: str, user_id: str | None, state: dict, user_embedding) -> LiveAnalysisSession:
+        def read_spill(path):
+            if not os.path.exists(path):
+                return b""
+            with open(path, "rb") as f:
+                return f.read()
+
+        pcm = await run_in("provider_io", read_spill, state["pcm_path"])
+        if len(pcm) < state["received_bytes"]:
+            logger.warning(f"[세션 복원] 보관된 음성이 부족합니다. ({len(pcm)} / {state['received_bytes']} bytes)")
+        session = LiveAnalysisSession.restore(token, user_id, state, pcm,
+                                              analyze_service.create_speaker_verifier(user_embedding))
+        self._sessions[token] = session
+        logger.info(f"[세션 복원] 다른 워커의 세션을 이어받음 (session: {session.session_id}, {len(pcm)} bytes)")
+        return session
+
+    def _drop(self, session: LiveAnalysisSession):
+        """다른 워커가 이어받은 세션의 로컬 사본을 최종 분석 없이 버립니다."""
+        if self._sessions.get(session.resume_token) is session:
+            del self._sessions[session.resume_token]
+        if session.expire_task is not None:
+            session.expire_task.cancel()
+            session.expire_task = None
+            LIVE_SESSIONS_DETACHED.dec()
+        logger.info(f"[세션 이관] sid={session.sid}, 다른 워커가 세션을 이어받았습니다.")
+
+    async def disconnect(self, session: LiveAnalysisSession, websocket):
+        """
+        연결 종료 처리. 다른 연결이 세션을 이어받았으면 아무것도 하지 않고,
+        resumable 세션이면 유예 시간 뒤 최종 분석을 예약하며, 그렇지 않으면 바로 최종 분석합니다.
+        """
+        if session.websocket is not websocket:
+            return
+        await session.detach(websocket)
+        if not session.resumable or session.finalized:
+            await self.finalize(session)
+            return
+        if self.store.shared:
+            await run_in("provider_io", session.spill)
+        owned = await self.store.run(self.store.save_session, session.resume_token, session.session_id,
+                                     session.user_id, session.state(), True)
+        if not owned:
+            self._drop(session)
+            return
+        if session.websocket is not None:
+            # 음성 보관/상태 저장을 기다리는 동안 resume 으로 다시 연결되었으면 유예를 시작하지 않습니다.
+            # 위의 저장이 resume 의 claim_session 뒤에 반영됐을 수 있으므로 연결 중 상태로 다시 기록합니다.
+            await self.store.run(self.store.save_session, session.resume_token, session.session_id,
+                                 session.user_id, session.state(), False)
+            return
+        LIVE_SESSIONS_DETACHED.inc()
+        logger.info(f"[세션 유예] sid={session.sid}, {self.grace_sec:.0f}초 동안 재연결 대기 (수신 {session.received_bytes} bytes)")
+        session.expire_task = asyncio.create_task(self._expire(session))
+
+    async def _expire(self, session: LiveAnalysisSession):
+        await asyncio.sleep(self.grace_sec)
+        session.expire_task = None
+        LIVE_SESSIONS_DETACHED.dec()
+        SESSION_RESUMES_TOTAL.inc(outcome="expired")
+        logger.info(f"[세션 만료] sid={session.sid}. 재연결이 없어 최종 분석을 시작합니다.")
+        try:
+            await self.finalize(session)
+        except Exception as e:
+            logger.error(f"[최종 분석] 실패 (sid: {session.sid}): {e}")
+
+    async def finalize(self, session: LiveAnalysisSession) -> int | None:
+        """세션을 최종 분석하고 master_uid 를 반환합니다. 이미 시작된 최종 분석이 있으면 그 결과를 기다립니다."""
+        if session.finalize_task is None:
+            self._sessions.pop(session.resume_token, None)
+            session.finalize_task = asyncio.create_task(self._finalize(session))
+        return await asyncio.shield(session.finalize_task)
+
+    async def _finalize(self, session: LiveAnalysisSession) -> int | None:
+        if session.resumable:
+            # 다른 워커가 세션을 이어받았으면 그 워커가 최종 분석합니다.
+            if not await self.store.run(self.store.release_session, session.resume_token):
+                logger.info(f"[최종 분석] 다른 워커가 세션을 이어받아 건너뜁니다. (session: {session.session_id})")
+                return None
+        # WAV 를 저장한 뒤 작업 큐에 등록하면, 여유가 있는 워커가 가져가서 최종 분석합니다.
+        saved = await run_in("finalize", analyze_service.save_wav, session.wav_path, session.full_audio_buffer)
+        if session.spilled_bytes:
+            await run_in("provider_io", session.remove_spill)
+        if not saved:
+            return None
+        payload = {
+            "wav_path": session.wav_path,
+            "user_id": session.user_id,
+            "sid": session.sid,
+            "ts": session.ts,
+        }
+        if incremental_finalize_enabled():
+            # 클라이언트가 끊긴 경우 drain 없이 여기로 오므로, 처리 중인 청크가 live_results 에 반영되길 기다립니다.
+            await session.settle(CHUNK_TIMEOUT_SEC)
+            payload["live_results"] = session.live_results
+        await finalization_service.submit(session.session_id, payload)
+        return await finalization_service.wait(session.session_id)
+
+
+live_session_service = LiveSessionService(session_store)
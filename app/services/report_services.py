@@ -1,15 +1,118 @@
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+
+from app.dao.emotion_trend_dao import EmotionTrendDAO
 from app.dao.user_conversation_dao import UserConversationDAO
+from app.utils.http_cache import LRUResponseCache
+from app.utils.pagination import cursor_int, decode_cursor, encode_cursor, parse_fields
+
+# 최종 분석이 끝난 대화 상세 응답(직렬화된 바이트) 캐시. 키는 (master_uid, limit, cursor, fields) 이며,
+# 캐시에 있으면 DB 를 조회하지 않습니다. 같은 프로세스에서 대화를 최종 분석/삭제하면 invalidate_report_cache 로 지우고,
+# 다른 워커에서 바뀐 대화는 REPORT_CACHE_TTL_SEC 이 지나면 다시 조회합니다.
+REPORT_CACHE_TTL_SEC = float(os.getenv("REPORT_CACHE_TTL_SEC", "").strip() or 3600)
+report_details_cache = LRUResponseCache(
+    max_entries=int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "").strip() or 1024),
+    ttl_sec=REPORT_CACHE_TTL_SEC,
+)
+
+
+def invalidate_report_cache(master_uid: int) -> int:
+    """대화의 상세 응답 캐시를 모두 지웁니다. (최종 분석, 재분석, 삭제 시 호출)"""
+    return report_details_cache.invalidate(lambda key: key[0] == master_uid)
+
 
 class ReportService:
     def __init__(self):
         self.dao = UserConversationDAO()
+        self.trend_dao = EmotionTrendDAO()
 
-    def get_report_list(self, user_uid: int):
+    def get_report_list(self, user_uid: int, limit: int = 50, cursor: str | None = None):
+        """대화 목록 한 페이지와 다음 페이지 커서를 반환합니다."""
         # TODO: DAO에서 가져온 데이터를 리포트 형태로 가공하는 로직 추가 가능
-        return self.dao.get_conversation_list_by_user_uid(user_uid)
+        key = decode_cursor(cursor, (datetime.fromisoformat, cursor_int)) if cursor else None
+        reports, next_key = self.dao.get_conversation_list_by_user_uid(user_uid, limit, key)
+        return reports, encode_cursor(*next_key) if next_key else None
+
+    def get_report_list_version(self, user_uid: int) -> str:
+        """목록 응답의 ETag 계산에 쓰는 버전 값 (최신 created_at 기반)"""
+        return self.dao.get_conversation_list_version(user_uid)
+
+    def is_report_finalized(self, master_uid: int) -> bool:
+        """
+        최종 분석이 끝난 대화인지 확인합니다. 끝난 대화의 상세 응답만 캐시합니다.
+        상세 조회보다 먼저 호출해야, 조회 도중 완료된 대화의 미완성 페이지가 캐시되지 않습니다.
+        """
+        return self.dao.get_master_finalized_at(master_uid) is not None
 
-    def get_report_details(self, master_uid: int):
+    def get_report_details(self, master_uid: int, limit: int = 200, cursor: str | None = None, fields: str | None = None):
+        """대화 상세 한 페이지와 다음 페이지 커서를 반환합니다."""
         # TODO: 상세 대화 내용을 리포트 형태로 가공하는 로직 추가 가능
-        return self.dao.get_conversation_details_by_master_uid(master_uid)
+        key = decode_cursor(cursor, (cursor_int, cursor_int)) if cursor else None
+        selected = parse_fields(fields, self.dao.DETAIL_FIELDS, self.dao.DEFAULT_DETAIL_FIELDS)
+        details, next_key = self.dao.get_conversation_details_by_master_uid(master_uid, limit, key, selected)
+        return details, encode_cursor(*next_key) if next_key else None
+
+    def get_emotion_trend(self, user_uid: int, period: str = "day", start_date=None, end_date=None):
+        return self.trend_dao.get_user_trend(user_uid, period, start_date, end_date)
+
+    def rebuild_emotion_trend(self, user_uid: int):
+        self.trend_dao.rebuild_user_trend(user_uid)
+
+    def export_conversations(self, user_uid=None, start_date=None, end_date=None, fmt: str = "ndjson", gzip: bool = False, fetch_size: int = 500):
+        """
+        대화 상세를 NDJSON 또는 CSV 바이트 청크로 스트리밍합니다.
+        서버 사이드 커서로 fetch_size 행씩 읽어 바로 내보내므로 메모리 사용량은 내보내기 크기와 무관합니다.
+        점수는 emotion_utils.TEXT_EMOTIONS/AUDIO_EMOTIONS 순서의 벡터로 내보냅니다.
+        """
+        if fmt not in ("ndjson", "csv"):
+            raise ValueError(f"지원하지 않는 format: {fmt}")
+        if user_uid is None and start_date is None and end_date is None:
+            raise ValueError("user_uid 또는 기간(start_date/end_date) 중 하나는 필요합니다.")
+
+        # 스트리밍 동안 커넥션을 점유하므로 요청마다 별도 DAO를 사용
+        dao = UserConversationDAO()
+        rows = dao.iter_conversation_details_for_export(user_uid, start_date, end_date, fetch_size)
+        compressor = zlib.compressobj(wbits=31) if gzip else None  # wbits=31: gzip 포맷
+
+        def _encode(lines: str) -> bytes:
+            data = lines.encode("utf-8")
+            return compressor.compress(data) if compressor else data
+
+        try:
+            buf = io.StringIO()
+            writer = csv.writer(buf) if fmt == "csv" else None
+            if writer:
+                writer.writerow(UserConversationDAO.EXPORT_COLUMNS)
+            pending = 0
+            for row in rows:
+                record = dict(zip(UserConversationDAO.EXPORT_COLUMNS, row))
+                record["conversation_created_at"] = str(record["conversation_created_at"])
+                if writer:
+                    record["text_scores"] = json.dumps(record["text_scores"])
+                    record["audio_scores"] = json.dumps(record["audio_scores"])
+                    writer.writerow(record.values())
+                else:
+                    buf.write(json.dumps(record, ensure_ascii=False))
+                    buf.write("\n")
+                pending += 1
+                if pending >= fetch_size:
+                    chunk = _encode(buf.getvalue())
+                    buf.seek(0)
+                    buf.truncate()
+                    pending = 0
+                    if chunk:
+                        yield chunk
+            tail = _encode(buf.getvalue())
+            if compressor:
+                tail += compressor.flush()
+            if tail:
+                yield tail
+        finally:
+            rows.close()
+            dao.close()
 
 report_service = ReportService()
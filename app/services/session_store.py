@@ -0,0 +1,247 @@
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+
+from app.dao.live_session_dao import LiveSessionDAO
+from app.utils.executors import run_in
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 세션 상태 저장소
+#   memory   : 프로세스 메모리 (기본값, 단일 워커). 세션 재개/최종 분석 작업은 같은 프로세스 안에서만 공유됩니다.
+#   postgres : live_sessions / finalization_jobs 테이블 (migrations/007). 여러 uvicorn 워커/노드가
+#              끊긴 세션을 이어받고 최종 분석 작업을 나눠 실행할 수 있습니다.
+#              세션 음성은 storage/audio 에 보관하므로 노드 간에는 같은 스토리지를 마운트해야 합니다.
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "").strip().lower() or "memory"
+# 워커 식별자 (미지정 시 호스트명:PID). 워커마다 달라야 합니다.
+NODE_ID = os.getenv("NODE_ID", "").strip() or f"{socket.gethostname()}:{os.getpid()}"
+# 공유 저장소 사용 시 다른 워커에서 등록한 음성 임베딩이 보이기까지 걸리는 최대 시간(초)
+VOICE_EMBEDDING_CACHE_TTL_SEC = float(os.getenv("VOICE_EMBEDDING_CACHE_TTL_SEC", "").strip() or 60.0)
+
+# memory 저장소가 보관하는 완료된 작업 수 (결과 조회용)
+_MEMORY_FINISHED_JOBS = 1024
+
+
+class VoiceEmbeddingCache:
+    """
+    사용자 음성 임베딩 캐시 (dict 와 같은 get / [] / in 인터페이스)
+    ttl_sec 가 있으면 오래된 항목을 버려서 다른 워커가 등록/갱신한 임베딩을 DB 에서 다시 읽게 합니다.
+    """
+    def __init__(self, ttl_sec: float | None = None):
+        self.ttl_sec = ttl_sec
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, user_id) -> bool:
+        item = self._items.get(user_id)
+        if item is None:
+            return False
+        if self.ttl_sec is not None and time.monotonic() - item[1] > self.ttl_sec:
+            del self._items[user_id]
+            return False
+        return True
+
+    def get(self, user_id, default=None):
+        with self._lock:
+            return self._items[user_id][0] if self._alive(user_id) else default
+
+    def __getitem__(self, user_id):
+        with self._lock:
+            if not self._alive(user_id):
+                raise KeyError(user_id)
+            return self._items[user_id][0]
+
+    def __setitem__(self, user_id, embedding):
+        with self._lock:
+            self._items[user_id] = (embedding, time.monotonic())
+
+    def __contains__(self, user_id) -> bool:
+        with self._lock:
+            return self._alive(user_id)
+
+    def pop(self, user_id, default=None):
+        with self._lock:
+            item = self._items.pop(user_id, None)
+            return item[0] if item is not None else default
+
+
+class SessionStore:
+    """
+    세션 상태 저장소 인터페이스
+
+    - voice_embeddings : 사용자 음성 임베딩 캐시
+    - save_session / claim_session / release_session : resumable 세션 메타데이터와 소유 워커
+    - enqueue_job / claim_job / renew_job / finish_job / get_job : 최종 분석 작업 큐 (대화(session_id)당 한 번만 등록)
+      claim_job 이 돌려준 attempt 로 renew_job / finish_job 을 호출하며, lease 를 잃은 실행이면 False 를 반환합니다.
+    """
+    backend = ""
+    shared = False    # 다른 워커와 공유되는 저장소인지 (세션 음성을 스토리지에 보관해야 하는지)
+    blocking = False  # 메서드가 블로킹 I/O 인지 (이벤트 루프에서는 run 으로 호출)
+
+    def __init__(self, node_id: str = NODE_ID):
+        self.node_id = node_id
+
+    async def run(self, method, *args):
+        """저장소 메서드를 호출합니다. 블로킹 저장소는 provider_io 풀에서 실행합니다."""
+        if self.blocking:
+            return await run_in("provider_io", method, *args)
+        return method(*args)
+
+
+class MemorySessionStore(SessionStore):
+    backend = "memory"
+
+    def __init__(self, node_id: str = NODE_ID):
+        super().__init__(node_id)
+        self.voice_embeddings = VoiceEmbeddingCache()
+        self._sessions = {}
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    # 세션 소유/연결 상태 규칙은 LiveSessionDAO 와 같습니다. (다른 워커가 가진 세션은 저장/삭제 불가,
+    # 다른 워커에 연결 중인 세션은 claim 불가)
+    def save_session(self, token, session_id, user_id, state, detached) -> bool:
+        with self._lock:
+            record = self._sessions.get(token)
+            if record is not None and record["node_id"] != self.node_id:
+                return False
+            self._sessions[token] = {"session_id": session_id, "node_id": self.node_id, "user_id": user_id,
+                                     "state": dict(state), "detached": bool(detached)}
+        return True
+
+    def claim_session(self, token, user_id) -> dict | None:
+        with self._lock:
+            record = self._sessions.get(token)
+            if record is None or record["user_id"] != user_id:
+                return None
+            if record["node_id"] != self.node_id and not record["detached"]:
+                return None
+            record.update(node_id=self.node_id, detached=False)
+            return dict(record["state"])
+
+    def release_session(self, token) -> bool:
+        with self._lock:
+            record = self._sessions.get(token)
+            if record is None or record["node_id"] != self.node_id:
+                return False
+            del self._sessions[token]
+            return True
+
+    def enqueue_job(self, session_id, payload) -> bool:
+        with self._lock:
+            if session_id in self._jobs:
+                return False
+            self._jobs[session_id] = {"status": "pending", "payload": payload, "master_uid": None, "error": None,
+                                      "attempts": 0}
+            self._pending.append(session_id)
+            return True
+
+    def claim_job(self, lease_sec, max_attempts) -> tuple[str, dict, int] | None:
+        # 같은 프로세스 안의 작업만 있으므로 lease 만료(워커 종료)는 일어나지 않습니다.
+        with self._lock:
+            if not self._pending:
+                return None
+            session_id = self._pending.popleft()
+            job = self._jobs[session_id]
+            job["status"] = "running"
+            job["attempts"] += 1
+            return session_id, job["payload"], job["attempts"]
+
+    def _running(self, session_id, attempt) -> dict | None:
+        job = self._jobs.get(session_id)
+        if job is None or job["status"] != "running" or job["attempts"] != attempt:
+            return None
+        return job
+
+    def renew_job(self, session_id, attempt) -> bool:
+        with self._lock:
+            return self._running(session_id, attempt) is not None
+
+    def finish_job(self, session_id, attempt, master_uid, error=None) -> bool:
+        with self._lock:
+            job = self._running(session_id, attempt)
+            if job is None:
+                return False
+            job.update(status="failed" if error else "done", master_uid=master_uid, error=error, payload=None)
+            self._jobs.move_to_end(session_id)
+            # 완료된 작업은 최근 것만 남깁니다.
+            while len(self._jobs) > _MEMORY_FINISHED_JOBS:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest["status"] not in ("done", "failed"):
+                    break
+                del self._jobs[oldest_id]
+            return True
+
+    def get_job(self, session_id) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(session_id)
+            return {k: job[k] for k in ("status", "master_uid", "error")} if job else None
+
+
+class PostgresSessionStore(SessionStore):
+    backend = "postgres"
+    shared = True
+    blocking = True
+
+    def __init__(self, node_id: str = NODE_ID):
+        super().__init__(node_id)
+        self.voice_embeddings = VoiceEmbeddingCache(ttl_sec=VOICE_EMBEDDING_CACHE_TTL_SEC)
+        # provider_io 스레드마다 커넥션 하나를 재사용합니다.
+        self._local = threading.local()
+
+    def _dao(self) -> LiveSessionDAO:
+        dao = getattr(self._local, "dao", None)
+        if dao is None:
+            dao = self._local.dao = LiveSessionDAO()
+        return dao
+
+    def _call(self, name, *args):
+        dao = self._dao()
+        try:
+            return getattr(dao, name)(*args)
+        except Exception:
+            # 커넥션 오류 등으로 트랜잭션이 깨졌을 수 있으므로 다음 호출에서 다시 연결합니다.
+            dao.close()
+            raise
+
+    def save_session(self, token, session_id, user_id, state, detached) -> bool:
+        return self._call("save_session", token, session_id, self.node_id, user_id, state, detached)
+
+    def claim_session(self, token, user_id) -> dict | None:
+        return self._call("claim_session", token, self.node_id, user_id)
+
+    def release_session(self, token) -> bool:
+        return self._call("release_session", token, self.node_id)
+
+    def enqueue_job(self, session_id, payload) -> bool:
+        return self._call("enqueue_job", session_id, payload)
+
+    def claim_job(self, lease_sec, max_attempts) -> tuple[str, dict, int] | None:
+        return self._call("claim_job", self.node_id, lease_sec, max_attempts)
+
+    def renew_job(self, session_id, attempt) -> bool:
+        return self._call("renew_job", session_id, self.node_id, attempt)
+
+    def finish_job(self, session_id, attempt, master_uid, error=None) -> bool:
+        return self._call("finish_job", session_id, self.node_id, attempt, master_uid, error)
+
+    def get_job(self, session_id) -> dict | None:
+        return self._call("get_job", session_id)
+
+
+def create_session_store(backend: str = SESSION_STORE_BACKEND) -> SessionStore:
+    if backend == "postgres":
+        store = PostgresSessionStore()
+    else:
+        if backend != "memory":
+            logger.warning(f"[세션 저장소] 알 수 없는 SESSION_STORE_BACKEND={backend}. memory 사용")
+        store = MemorySessionStore()
+    logger.info(f"[세션 저장소] backend={store.backend}, node_id={store.node_id}")
+    return store
+
+
+session_store = create_session_store()
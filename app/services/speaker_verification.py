@@ -0,0 +1,105 @@
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+from app.services.voice_service import voice_embedding_service
+from app.utils.audio_utils import cosine_similarity, pcm16_to_float32
+from app.utils.logger import SAMPLED, get_logger
+from app.utils.metrics import SPEAKER_VERIFY_UPDATES_TOTAL
+
+logger = get_logger(__name__)
+
+FRAMES_PER_SEC = 100  # ECAPA fbank hop 10ms
+SAMPLE_RATE = 16000
+
+
+class StreamingSpeakerVerifier:
+    """
+    세션 단위 스트리밍 화자 검증
+
+    - 청크마다 새로 들어온 구간의 프레임 특징(fbank)만 계산해서 최근 window_sec 만큼 보관합니다.
+      (청크마다 2초 파형 전체를 다시 임베딩하지 않음)
+    - 새 음성이 cadence_sec 이상 쌓였을 때만 보관 중인 특징 전체(최대 window_sec)로 임베딩을 갱신하고,
+      그 사이의 청크는 직전 점수를 재사용합니다.
+    - 유사도는 지수 이동 평균(ema_alpha)으로 평활화하여 청크마다 판정이 튀지 않도록 합니다.
+
+    청크 처리 Task 들이 동시에 호출할 수 있으므로 update 는 세션 락 안에서 실행됩니다. (inference 스레드 풀에서 호출)
+    """
+    def __init__(self, user_embedding, threshold: float, window_sec: float = 6.0, cadence_sec: float = 4.0, ema_alpha: float = 0.5):
+        self.user_embedding = np.asarray(user_embedding, dtype=np.float32)
+        self.threshold = threshold
+        self.window_frames = int(window_sec * FRAMES_PER_SEC)
+        self.cadence_samples = int(cadence_sec * SAMPLE_RATE)
+        self.ema_alpha = ema_alpha
+        self.smoothed = None
+        self.last_similarity = None
+        self.updates = 0
+        self._features = deque()
+        self._frames = 0
+        self._pending_samples = 0
+        self._lock = threading.Lock()
+
+    def _append(self, feats):
+        self._features.append(feats)
+        self._frames += feats.shape[0]
+        # 윈도우를 넘는 오래된 특징은 앞에서부터 버립니다.
+        while self._frames - self._features[0].shape[0] >= self.window_frames:
+            self._frames -= self._features.popleft().shape[0]
+
+    def update(self, chunk_bytes: bytes) -> tuple[bool | None, float | None]:
+        """새 청크를 반영하고 (동일인 여부, 평활화된 유사도) 를 반환합니다."""
+        signal = pcm16_to_float32(chunk_bytes)
+        if signal.size == 0:
+            return self.result()
+        feats = voice_embedding_service.compute_frame_features(signal)
+        with self._lock:
+            self._append(feats)
+            self._pending_samples += signal.size
+            if self.smoothed is not None and self._pending_samples < self.cadence_samples:
+                SPEAKER_VERIFY_UPDATES_TOTAL.inc(result="reused")
+                return self.result()
+            self._pending_samples = 0
+            window_frames = min(self._frames, self.window_frames)
+            embedding = voice_embedding_service.encode_features(list(self._features), self.window_frames)
+            similarity = cosine_similarity(embedding, self.user_embedding)
+            self.last_similarity = similarity
+            if self.smoothed is None:
+                self.smoothed = similarity
+            else:
+                self.smoothed = self.ema_alpha * similarity + (1 - self.ema_alpha) * self.smoothed
+            self.updates += 1
+            SPEAKER_VERIFY_UPDATES_TOTAL.inc(result="computed")
+            logger.debug(
+                "[스트리밍 화자 검증] 윈도우 %.1f초 | 유사도 %.4f | 평활화 %.4f",
+                window_frames / FRAMES_PER_SEC, similarity, self.smoothed, extra=SAMPLED,
+            )
+            return self.result()
+
+    def result(self) -> tuple[bool | None, float | None]:
+        if self.smoothed is None:
+            return None, None
+        return self.smoothed >= self.threshold, self.smoothed
+
+
+def create_speaker_verifier(user_embedding, threshold: float) -> StreamingSpeakerVerifier | None:
+    """
+    SPEAKER_VERIFY_MODE=streaming(기본) 이면 세션용 스트리밍 검증기를 만듭니다.
+    chunk 이거나 사용자 임베딩이 없으면 None (청크마다 독립적으로 임베딩하는 기존 방식)
+
+    환경 변수
+        SPEAKER_VERIFY_WINDOW_SEC   임베딩에 사용할 최근 음성 길이 (기본 6초)
+        SPEAKER_VERIFY_CADENCE_SEC  임베딩을 다시 계산하는 주기 (새 음성 기준, 기본 4초)
+        SPEAKER_VERIFY_EMA_ALPHA    유사도 평활화 계수 (1 이면 평활화 없음, 기본 0.5)
+    """
+    mode = os.getenv("SPEAKER_VERIFY_MODE", "").strip().lower() or "streaming"
+    if mode != "streaming" or user_embedding is None:
+        return None
+    return StreamingSpeakerVerifier(
+        user_embedding,
+        threshold,
+        window_sec=float(os.getenv("SPEAKER_VERIFY_WINDOW_SEC", "").strip() or 6.0),
+        cadence_sec=float(os.getenv("SPEAKER_VERIFY_CADENCE_SEC", "").strip() or 4.0),
+        ema_alpha=float(os.getenv("SPEAKER_VERIFY_EMA_ALPHA", "").strip() or 0.5),
+    )
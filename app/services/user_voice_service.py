@@ -1,19 +1,51 @@
+import os
+
 import numpy as np
 from app.services.voice_service import voice_embedding_service
 from app.utils.audio_utils import cosine_similarity
 from app.dao.user_dao import UserDAO
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def voice_centroid(embeddings: list[np.ndarray]) -> tuple[np.ndarray, float]:
+    """
+    등록 샘플 임베딩들의 정규화된 중심과 퍼짐 정도(샘플-중심 코사인 거리 평균)를 반환합니다.
+    각 샘플을 먼저 단위 벡터로 맞춘 뒤 평균하므로 녹음 크기/길이에 따른 임베딩 크기 차이가 가중치가 되지 않습니다.
+    """
+    samples = np.stack([np.asarray(e, dtype=np.float32) for e in embeddings])
+    samples /= np.linalg.norm(samples, axis=1, keepdims=True) + 1e-9
+    centroid = samples.mean(axis=0)
+    centroid /= np.linalg.norm(centroid) + 1e-9
+    spread = float(np.mean(1.0 - samples @ centroid))
+    return centroid.astype(np.float32), spread
 
 
 class UserVoiceService:
+    # 사용자별로 보관하는 최근 등록 샘플 수
+    MAX_ENROLL_SAMPLES = int(os.getenv("VOICE_ENROLL_MAX_SAMPLES", "").strip() or 5)
+
     def __init__(self):
         self.user_dao = UserDAO()
 
     def register_user_voice(self, user_uid: int, audio_path: str) -> np.ndarray:
-        """사용자의 음성 파일을 등록하고 임베딩을 반환합니다."""
+        """
+        사용자의 음성 파일을 등록 샘플로 추가하고, 최근 샘플들의 중심 임베딩을 저장/반환합니다.
+        등록할 때마다 샘플이 쌓이므로 여러 번(다른 환경에서) 녹음할수록 비교 기준이 안정됩니다.
+        """
         embedding = voice_embedding_service.extract_voice_embedding(audio_path)
-        if embedding is not None:
-            self.user_dao.save_user_voice_embedding(user_uid, embedding)
-        return embedding
+        if embedding is None:
+            return None
+        samples = self.user_dao.add_user_voice_sample(user_uid, embedding, self.MAX_ENROLL_SAMPLES)
+        centroid, spread = voice_centroid(samples)
+        self.user_dao.save_user_voice_embedding(user_uid, centroid, sample_count=len(samples), spread=spread)
+        logger.info(f"[음성 등록] user_uid={user_uid} 샘플 {len(samples)}개로 중심 임베딩 갱신 (spread={spread:.4f})")
+        return centroid
+
+    def get_user_voice_profile(self, user_uid: int) -> dict | None:
+        """등록 샘플 수와 퍼짐 정도(spread)를 조회합니다."""
+        return self.user_dao.get_user_voice_profile(user_uid)
 
     def get_user_voice_embedding(self, user_uid: int) -> np.ndarray:
         """사용자의 음성 임베딩을 DB에서 조회합니다."""
@@ -0,0 +1,111 @@
+"""
+ECAPA 임베딩 추론 모드 정확도/처리량 점검
+
+사용 예:
+    python -m app.services.voice_embedding_check --modes int8 torchscript --reference-dir storage/audio
+    python -m app.services.voice_embedding_check --modes int8 --output storage/bench/embedding_modes.json
+
+- 정확도: 참조 음성마다 fp32 임베딩과 후보 모드 임베딩의 코사인 유사도, 쌍별 유사도 오차, 임계값 판정 일치율
+- 처리량: 배치 크기별 초당 임베딩 수 (embeddings/sec)
+참조 디렉터리를 지정하지 않거나 WAV 가 없으면 합성 신호를 사용합니다. (실제 음성으로 확인하는 것을 권장)
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import librosa
+import numpy as np
+
+from app.services.embedding_inference import (
+    INFERENCE_MODES, SAMPLE_RATE, build_embedding_model, compare_with_fp32, encode, pad_batch,
+    synthetic_reference_signals,
+)
+from app.services.voice_service import voice_embedding_service
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def load_reference_signals(reference_dir: str | None, limit: int, seconds: float) -> list[np.ndarray]:
+    if reference_dir:
+        paths = sorted(glob.glob(os.path.join(reference_dir, "**", "*.wav"), recursive=True))[:limit]
+        signals = []
+        for path in paths:
+            try:
+                signal, _ = librosa.load(path, sr=SAMPLE_RATE, duration=seconds)
+            except Exception as e:
+                logger.warning(f"[임베딩 점검] 참조 음성 로드 실패: {path} ({e})")
+                continue
+            if len(signal) >= SAMPLE_RATE // 2:
+                signals.append(signal.astype(np.float32))
+        if len(signals) >= 2:
+            return signals
+        logger.warning(f"[임베딩 점검] {reference_dir} 에서 사용할 수 있는 WAV 가 2개 미만이라 합성 신호를 사용합니다.")
+    return synthetic_reference_signals(count=limit, seconds=seconds)
+
+
+def measure_throughput(classifier, embedding_model, signals: list[np.ndarray], batch_size: int, repeats: int) -> float:
+    batches = [signals[i:i + batch_size] for i in range(0, len(signals), batch_size)]
+    encode(classifier, embedding_model, *pad_batch(batches[0]))  # 워밍업
+    count = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for batch in batches:
+            encode(classifier, embedding_model, *pad_batch(batch))
+            count += len(batch)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ECAPA 임베딩 추론 모드 정확도/처리량 점검")
+    parser.add_argument("--modes", nargs="+", default=["int8", "torchscript"], choices=INFERENCE_MODES)
+    parser.add_argument("--reference-dir", default=None, help="참조 WAV 디렉터리 (하위 디렉터리 포함)")
+    parser.add_argument("--limit", type=int, default=16, help="사용할 참조 음성 수")
+    parser.add_argument("--seconds", type=float, default=3.0, help="참조 음성당 사용할 길이(초)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="통과 기준 최소 코사인 유사도")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    classifier = voice_embedding_service.classifier
+    signals = load_reference_signals(args.reference_dir, args.limit, args.seconds)
+    print(f"참조 음성 {len(signals)}개, 길이 {args.seconds}초")
+
+    report = {"samples": len(signals), "modes": {}}
+    for mode in ["fp32"] + [m for m in args.modes if m != "fp32"]:
+        try:
+            model = build_embedding_model(classifier, mode)
+        except Exception as e:
+            print(f"[{mode}] 모델 준비 실패: {e}")
+            report["modes"][mode] = {"error": str(e)}
+            continue
+        entry = {"throughput": {}}
+        if mode != "fp32":
+            entry["accuracy"] = compare_with_fp32(classifier, model, signals)
+            entry["passed"] = entry["accuracy"]["self_cosine_min"] >= args.min_cosine
+        for batch_size in args.batch_sizes:
+            entry["throughput"][f"batch_{batch_size}"] = measure_throughput(classifier, model, signals, batch_size, args.repeats)
+        report["modes"][mode] = entry
+
+        throughput = ", ".join(f"{k}={v:.1f}/s" for k, v in entry["throughput"].items())
+        if mode == "fp32":
+            print(f"[fp32] 기준 | {throughput}")
+        else:
+            acc = entry["accuracy"]
+            print(
+                f"[{mode}] {'통과' if entry['passed'] else '실패'} | 코사인 평균 {acc['self_cosine_mean']:.4f} "
+                f"최소 {acc['self_cosine_min']:.4f} | 쌍별 최대 오차 {acc['pairwise_max_abs_error']:.4f} | {throughput}"
+            )
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,29 @@
+import os
+
 import numpy as np
 import torch
 import librosa
 from speechbrain.inference import EncoderClassifier
 
+from app.services import embedding_inference
+from app.services.embedding_inference import encode, pad_batch, select_embedding_model
+from app.utils.audio_utils import pcm16_to_float32
+from app.utils.executors import torch_threads_per_worker
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# inference 풀의 스레드들이 각자 torch intra-op 스레드를 띄워 코어를 과다 구독하지 않도록 제한합니다.
+torch.set_num_threads(torch_threads_per_worker())
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    pass  # 이미 병렬 작업이 시작된 뒤에는 변경할 수 없음
+
 class VoiceEmbeddingService:
     _classifier = None
+    _embedding_model = None  # fp32 가 아닌 추론 모드에서 변환된 embedding_model
+    _inference_mode = None
 
     def __init__(self):
         if VoiceEmbeddingService._classifier is None:
@@ -14,11 +33,23 @@ class VoiceEmbeddingService:
                 source = "speechbrain/spkrec-ecapa-voxceleb"
                 savedir = "/tmp/spkrec-ecapa-voxceleb"
                 VoiceEmbeddingService._classifier = EncoderClassifier.from_hparams(source=source, savedir=savedir)
-                print("[음성 임베딩 서비스] 분류기 모델 로드 성공.")
+                logger.info("[음성 임베딩 서비스] 분류기 모델 로드 성공.")
             except Exception as e:
-                print(f"[음성 임베딩 서비스] 분류기 모델 로드 실패: {e}")
+                logger.error(f"[음성 임베딩 서비스] 분류기 모델 로드 실패: {e}")
                 raise
         self.classifier = VoiceEmbeddingService._classifier
+        if VoiceEmbeddingService._inference_mode is None:
+            # EMBEDDING_INFERENCE_MODE=fp32|int8|torchscript (기본 fp32)
+            # EMBEDDING_INFERENCE_CHECK=true 이면 시작 시 fp32 와 비교해 정확도가 떨어지면 fp32 로 되돌립니다.
+            mode = os.getenv("EMBEDDING_INFERENCE_MODE", "").strip().lower() or "fp32"
+            check = os.getenv("EMBEDDING_INFERENCE_CHECK", "false").strip().lower() in ("1", "true", "yes", "on")
+            min_cosine = float(os.getenv("EMBEDDING_INFERENCE_MIN_COSINE", "").strip() or 0.99)
+            model, applied_mode = select_embedding_model(self.classifier, mode, check, min_cosine)
+            VoiceEmbeddingService._embedding_model = model
+            VoiceEmbeddingService._inference_mode = applied_mode
+            logger.info(f"[음성 임베딩 서비스] 추론 모드: {applied_mode}")
+        self.inference_mode = VoiceEmbeddingService._inference_mode
+        self.embedding_model = VoiceEmbeddingService._embedding_model
 
     def extract_voice_embedding(self, audio_path: str) -> np.ndarray | None:
         """
@@ -30,28 +61,64 @@ class VoiceEmbeddingService:
         Returns:
             np.ndarray | None: 추출된 임베딩(numpy array) 또는 실패 시 None.
         """
+        try:
+            signal, fs = librosa.load(audio_path, sr=16000)
+        except Exception as e:
+            logger.warning(f"[임베딩 추출] 오디오 로드 오류: {e} (오디오 파일: {audio_path})")
+            return None
+        return self.extract_voice_embedding_from_array(signal)
+
+    def extract_voice_embedding_from_array(self, signal: np.ndarray) -> np.ndarray | None:
+        """16kHz float32 파형에서 바로 임베딩을 추출합니다. (임시 파일/디코딩 없이)"""
         if self.classifier is None:
-            print("[임베딩 추출] 오류: 분류기(classifier)가 초기화되지 않았습니다.")
+            logger.error("[임베딩 추출] 오류: 분류기(classifier)가 초기화되지 않았습니다.")
             return None
-        
         try:
-            signal, fs = librosa.load(audio_path, sr=16000)
-            
-            # 음성 데이터가 너무 짧을 경우(0.5초 미만) 에러가 발생하므로 패딩 처리합니다.
-            min_length = 8000 # 16000 * 0.5
-            if len(signal) < min_length:
-                signal = np.pad(signal, (0, min_length - len(signal)), 'constant')
-
-            # speechbrain 모델을 사용하여 임베딩을 추출합니다.
-            embeddings = self.classifier.encode_batch(torch.tensor(signal).unsqueeze(0))
-            embedding_np = embeddings.squeeze().cpu().numpy().astype(np.float32)
-            
-            return embedding_np
+            return self.encode_batch([signal])[0]
         except Exception as e:
-            print(f"[임베딩 추출] 오류 발생: {e} (오디오 파일: {audio_path})")
+            logger.warning(f"[임베딩 추출] 오류 발생: {e}")
             return None
 
+    def encode_batch(self, signals: list[np.ndarray]) -> np.ndarray:
+        """
+        여러 파형을 한 번의 모델 호출로 임베딩합니다. 길이가 다른 파형은 0으로 패딩하고
+        상대 길이(wav_lens)를 함께 넘겨 패딩 구간이 통계 풀링에 섞이지 않도록 합니다.
+
+        Returns:
+            np.ndarray: (배치 크기, 임베딩 차원) float32 배열
+        """
+        # 음성 데이터가 너무 짧을 경우(0.5초 미만) 에러가 발생하므로 패딩 처리합니다.
+        min_length = 8000 # 16000 * 0.5
+        signals = [
+            np.pad(s, (0, min_length - len(s)), 'constant') if len(s) < min_length else s
+            for s in signals
+        ]
+        wavs, wav_lens = pad_batch(signals)
+
+        # speechbrain 모델을 사용하여 임베딩을 추출합니다. (설정된 추론 모드의 embedding_model 사용)
+        embeddings = encode(self.classifier, self.embedding_model, wavs, wav_lens)
+        return embeddings.cpu().numpy().astype(np.float32)
+
+    def compute_frame_features(self, signal: np.ndarray) -> torch.Tensor:
+        """16kHz 파형의 프레임 단위 특징(fbank)을 (프레임 수, 특징 차원)으로 반환합니다. (스트리밍 화자 검증용)"""
+        return embedding_inference.compute_frame_features(self.classifier, signal)
+
+    def encode_features(self, features: list[torch.Tensor], max_frames: int | None = None) -> np.ndarray:
+        """누적된 프레임 특징들을 이어 붙여 (최근 max_frames 프레임만) 임베딩 1개를 계산합니다."""
+        feats = torch.cat(features, dim=0)
+        if max_frames is not None:
+            feats = feats[-max_frames:]
+        return embedding_inference.encode_features(self.classifier, self.embedding_model, feats)
+
 # 싱글턴 인스턴스
 # 애플리케이션 전체에서 하나의 VoiceEmbeddingService 인스턴스만 사용하도록 하여
 # 모델을 한번만 로드하게 만듭니다.
-voice_embedding_service = VoiceEmbeddingService()
\ No newline at end of file
+voice_embedding_service = VoiceEmbeddingService()
+
+
+def extract_voice_embedding_from_pcm(pcm_bytes: bytes) -> np.ndarray | None:
+    """
+    16kHz/16bit/mono PCM 바이트에서 임베딩을 추출합니다.
+    프로세스 풀(embedding_process)에서 pickle 로 호출할 수 있도록 모듈 최상위 함수로 둡니다.
+    """
+    return voice_embedding_service.extract_voice_embedding_from_array(pcm16_to_float32(pcm_bytes))
@@ -3,6 +3,10 @@ import subprocess
 import wave
 import numpy as np
 
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def cut_wav_by_timestamps(input_wav: str, timestamps: list[tuple[float, float]], output_dir: str) -> list[str]:
     """WAV 파일을 주어진 타임스탬프 목록에 따라 여러 세그먼트로 잘라 저장합니다.
@@ -41,7 +45,7 @@ def cut_wav_by_timestamps(input_wav: str, timestamps: list[tuple[float, float]],
                     out_f.writeframes(frames)
                 segment_files.append(str(output_wav))
     except Exception as e:
-        print(f"오디오 컷팅 중 에러: {e}")
+        logger.error(f"오디오 컷팅 중 에러: {e}")
         return []
     return segment_files
 
@@ -62,6 +66,12 @@ def get_storage_audio_path(subpath: str = "") -> str:
     return str(target_path)
 
 
+def pcm16_to_float32(pcm_bytes: bytes) -> np.ndarray:
+    """16bit PCM 바이트를 librosa.load 와 같은 [-1, 1] 범위의 float32 파형으로 변환합니다."""
+    usable = len(pcm_bytes) - (len(pcm_bytes) % 2)
+    return np.frombuffer(bytes(pcm_bytes[:usable]), dtype=np.int16).astype(np.float32) / 32768.0
+
+
 def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
     """두 개의 numpy 벡터 간의 코사인 유사도를 계산합니다.
 
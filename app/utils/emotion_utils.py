@@ -0,0 +1,155 @@
+import math
+
+# 감정 색상, 한글 매핑, 표준화 맵
+EMOTION_COLORS = {
+    "positive": "#FFD700",  # Gold
+    "negative": "#4682B4",  # Steel Blue
+    "angry": "#FF4500",  # Red Orange
+    "fear": "#800080",  # Purple
+    "disgust": "#006400",  # Dark Green
+    "surprise": "#FF69B4",  # Hot Pink
+    "neutral": "#F5F5F5",  # Light Gray
+    "happy": "#FFD700",  # Alias for positive
+    "sad": "#4682B4",  # Alias for negative
+}
+
+EMOTION_MAPPING = {
+    "positive": "긍정",
+    "negative": "부정",
+    "neutral": "중립",
+    "happy": "행복",
+    "sad": "슬픔",
+    "angry": "분노",
+    "fear": "두려움",
+    "disgust": "혐오",
+    "surprise": "놀람",
+}
+
+EMOTION_MAP = {
+    "positive": "positive",
+    "negative": "negative",
+    "neutral": "neutral",
+    "happy": "positive",
+    "surprise": "positive",
+    "sad": "negative",
+    "angry": "negative",
+    "fear": "negative",
+    "disgust": "negative",
+}
+
+# DB의 real[] 점수 벡터 순서 (migrations/005 의 SQL 함수와 동일한 순서를 유지해야 합니다)
+TEXT_EMOTIONS = ("positive", "negative", "neutral")
+AUDIO_EMOTIONS = ("happy", "sad", "angry", "fear", "disgust", "surprise", "neutral")
+
+
+def get_dominant_emotion(emotion_scores: dict, default="neutral"):
+    """
+    감정 점수 dict에서 가장 높은 감정 key를 반환 (값이 없거나 dict가 아니거나 양수 점수가 없으면 default)
+    동점이면 앞쪽 감정을 선택합니다. (migrations/008 의 emotion_argmax 와 동일)
+    """
+    if emotion_scores and isinstance(emotion_scores, dict):
+        try:
+            emotion_values = {k: float(v) for k, v in emotion_scores.items()}
+            dominant = max(emotion_values, key=emotion_values.get, default=default)
+            return dominant if emotion_values.get(dominant, 0.0) > 0 else default
+        except Exception:
+            return default
+    return default
+
+def map_emotion_to_standard(emotion: str) -> str:
+    """7가지 감정을 3가지 표준 감정(positive/negative/neutral)으로 매핑"""
+    return EMOTION_MAP.get(emotion, "neutral")
+
+def map_emotion_to_korean(emotion: str) -> str:
+    """영문 감정명을 한글로 매핑"""
+    return EMOTION_MAPPING.get(emotion, "중립")
+
+def map_emotion_to_color(emotion: str) -> str:
+    """감정명에 해당하는 색상 hex코드 반환"""
+    return EMOTION_COLORS.get(emotion, "#F5F5F5")
+
+def scores_to_vector(scores: dict | None, labels: tuple) -> list[float] | None:
+    """
+    감정 점수 dict를 labels 순서의 고정 길이 리스트로 변환 (없는 감정은 0.0)
+    분석하지 못한 모달리티(scores 가 None)는 None 이며 DB 에는 NULL 로 저장됩니다.
+    """
+    if scores is None:
+        return None
+    scores = scores if isinstance(scores, dict) else {}
+    vector = []
+    for label in labels:
+        try:
+            vector.append(float(scores.get(label, 0.0)))
+        except (TypeError, ValueError):
+            vector.append(0.0)
+    return vector
+
+def normalize_scores(raw, labels: tuple) -> tuple[dict | None, bool]:
+    """
+    모델이 반환한 점수 dict 를 labels 의 확률 분포로 한 번에 검증/정규화합니다.
+    - 없는 라벨은 0, 음수는 0 으로 보고 합이 1 이 아니면 합으로 나눕니다. (거의 맞는 응답은 버리지 않음)
+    - dict 가 아니거나, 숫자가 아닌 값이 있거나, 합이 0 이면 (None, False)
+    반환: (정규화된 점수 dict | None, 보정 여부)
+    """
+    if not isinstance(raw, dict):
+        return None, False
+    scores = {}
+    total = 0.0
+    adjusted = False
+    for label in labels:
+        value = raw.get(label)
+        if value is None:
+            value, adjusted = 0.0, True
+        elif isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            return None, False
+        elif value < 0:
+            value, adjusted = 0.0, True
+        scores[label] = float(value)
+        total += value
+    if total <= 0.0:
+        return None, False
+    if adjusted or abs(total - 1.0) > 1e-3:
+        return {label: round(value / total, 4) for label, value in scores.items()}, True
+    return scores, False
+
+def vector_to_scores(vector, labels: tuple) -> dict:
+    """scores_to_vector의 역변환. vector가 없으면 빈 dict"""
+    if not vector:
+        return {}
+    return {label: float(v) for label, v in zip(labels, vector)}
+
+def summarize_emotion(scores: dict) -> dict:
+    """점수 dict로부터 우세 감정, 표준 감정, 한글, 색상 정보를 계산"""
+    dominant = get_dominant_emotion(scores)
+    standard = map_emotion_to_standard(dominant)
+    return {
+        "dominant": dominant,
+        "standard": standard,
+        "korean": map_emotion_to_korean(dominant),
+        "color": map_emotion_to_color(standard),
+    }
+
+def _format_modality(scores):
+    return None if scores is None else {"scores": scores, **summarize_emotion(scores)}
+
+def format_analysis_result(text_scores, audio_scores):
+    """
+    분석 결과를 최종 포맷으로 조합하는 헬퍼 함수
+    점수가 None 인 모달리티(오디오 없음, 호출 실패 등으로 분석하지 못함)는 중립으로 채우지 않고 None 으로 둡니다.
+    """
+    return {
+        "text": _format_modality(text_scores),
+        "audio": _format_modality(audio_scores),
+    }
+
+def format_analysis_result_from_vectors(text_vector, audio_vector, include_scores: bool = True):
+    """DB에 저장된 점수 벡터로부터 읽기 시점에 표시용 분석 결과를 만듭니다. (NULL 벡터는 분석하지 않은 모달리티로 None)"""
+    result = format_analysis_result(
+        None if text_vector is None else vector_to_scores(text_vector, TEXT_EMOTIONS),
+        None if audio_vector is None else vector_to_scores(audio_vector, AUDIO_EMOTIONS),
+    )
+    if not include_scores:
+        for modality in result.values():
+            if modality is not None:
+                modality.pop("scores")
+    return result
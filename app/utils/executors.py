@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from app.utils.logger import get_logger
+from app.utils.metrics import EXECUTOR_ACTIVE_WORKERS, EXECUTOR_QUEUE_DEPTH
+from app.utils.profiler import run_profiled
+
+logger = get_logger(__name__)
+
+# 풀 크기는 import 시점에 정해지므로 여기서 .env 를 먼저 로드합니다.
+dotenv_path = Path(__file__).parent.parent.parent / "ENV" / ".env"
+if dotenv_path.exists():
+    load_dotenv(dotenv_path=dotenv_path)
+
+# 작업 성격별 전용 executor
+#   provider_io : Google STT / Clova 등 외부 API 블로킹 호출 (대부분 네트워크 대기. Gemini 는 비동기 API 로 이벤트 루프에서 호출)
+#   audio_dsp   : librosa 디코딩/리샘플링 등 오디오 신호 처리 (CPU)
+#   inference   : ECAPA 임베딩 등 모델 추론 (CPU, torch 내부 스레드 사용)
+#   finalize    : 세션 종료 후 최종 분석의 블로킹 단계 (Clova Long, 오디오 컷팅, DB 저장. 길게 점유하므로 분리)
+#   embedding_process : (선택) ECAPA 추론을 GIL 밖에서 실행하는 프로세스 풀. EMBEDDING_PROCESS_WORKERS > 0 일 때만 사용
+# 하나의 공용 executor 를 쓰면 임베딩 작업이 몰릴 때 STT 호출이 밀리고, 그 반대도 발생하므로 풀을 나눕니다.
+_CPU_COUNT = os.cpu_count() or 1
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+EXECUTOR_SIZES = {
+    "provider_io": _env_int("PROVIDER_IO_WORKERS", 32),
+    "audio_dsp": _env_int("AUDIO_DSP_WORKERS", _CPU_COUNT),
+    "inference": _env_int("INFERENCE_WORKERS", max(1, _CPU_COUNT // 2)),
+    "finalize": _env_int("FINALIZE_WORKERS", 4),
+}
+EMBEDDING_PROCESS_WORKERS = _env_int("EMBEDDING_PROCESS_WORKERS", 0)
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def torch_threads_per_worker() -> int:
+    """inference 워커 수 × torch 스레드 수가 코어 수를 넘지 않도록 torch intra-op 스레드 수를 정합니다."""
+    default = max(1, _CPU_COUNT // max(1, EXECUTOR_SIZES["inference"]))
+    return max(1, _env_int("TORCH_NUM_THREADS", default))
+
+
+def embedding_process_pool_enabled() -> bool:
+    return EMBEDDING_PROCESS_WORKERS > 0
+
+
+def _init_embedding_process():
+    # 자식 프로세스들의 torch 스레드 합이 코어 수를 넘지 않도록 제한해 과다 구독을 막습니다.
+    import torch
+    torch.set_num_threads(max(1, _CPU_COUNT // EMBEDDING_PROCESS_WORKERS))
+
+
+def get_executor(kind: str):
+    with _lock:
+        executor = _executors.get(kind)
+        if executor is not None:
+            return executor
+        if kind == "embedding_process":
+            if not embedding_process_pool_enabled():
+                raise ValueError("EMBEDDING_PROCESS_WORKERS 가 0 이므로 embedding_process 풀을 사용할 수 없습니다.")
+            # torch/스레드가 이미 초기화된 부모를 fork 하면 교착될 수 있으므로 spawn 사용
+            executor = ProcessPoolExecutor(
+                max_workers=EMBEDDING_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_embedding_process,
+            )
+        elif kind in EXECUTOR_SIZES:
+            executor = ThreadPoolExecutor(max_workers=EXECUTOR_SIZES[kind], thread_name_prefix=kind)
+        else:
+            raise ValueError(f"알 수 없는 executor 종류입니다: {kind}")
+        _executors[kind] = executor
+        logger.info(f"[executor] {kind} 생성 (workers={getattr(executor, '_max_workers', '?')})")
+        return executor
+
+
+def _tracked_call(kind: str, fn, *args):
+    EXECUTOR_QUEUE_DEPTH.dec(executor=kind)
+    with EXECUTOR_ACTIVE_WORKERS.track_inprogress(executor=kind):
+        return run_profiled(fn, *args)
+
+
+async def run_in(kind: str, fn, *args):
+    """
+    fn(*args) 를 kind 에 해당하는 전용 executor 에서 실행합니다.
+    스레드 풀은 asyncio.to_thread 처럼 contextvars(로그 상관관계 ID, 세션 프로파일러)를 복사해서 실행합니다.
+    프로세스 풀(embedding_process)은 fn 과 인자가 pickle 가능해야 하며 컨텍스트는 전달되지 않습니다.
+    """
+    executor = get_executor(kind)
+    EXECUTOR_QUEUE_DEPTH.inc(executor=kind)
+    if isinstance(executor, ProcessPoolExecutor):
+        # 프로세스 풀은 워커 측 시작 시점을 알 수 없으므로 완료 시점까지를 대기열로 봅니다.
+        future = executor.submit(fn, *args)
+        future.add_done_callback(lambda _: EXECUTOR_QUEUE_DEPTH.dec(executor=kind))
+    else:
+        ctx = contextvars.copy_context()
+        future = executor.submit(ctx.run, _tracked_call, kind, fn, *args)
+        # 타임아웃 등으로 시작 전에 취소되면 _tracked_call 이 실행되지 않으므로 여기서 대기열 수를 줄입니다.
+        future.add_done_callback(lambda f: f.cancelled() and EXECUTOR_QUEUE_DEPTH.dec(executor=kind))
+    return await asyncio.wrap_future(future)
+
+
+def shutdown_executors(wait: bool = False):
+    with _lock:
+        executors = list(_executors.items())
+        _executors.clear()
+    for kind, executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info(f"[executor] {kind} 종료")
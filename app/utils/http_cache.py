@@ -0,0 +1,72 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_etag(body: bytes, weak: bool = False) -> str:
+    """응답 바이트로부터 ETag 값을 생성합니다."""
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 헤더가 주어진 ETag와 일치하는지 확인합니다. (weak 비교)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+class LRUResponseCache:
+    """
+    직렬화된 응답 바이트와 ETag를 보관하는 프로세스 내 LRU 캐시입니다.
+    내용이 바뀌면 invalidate 로 항목을 지워야 합니다. 다른 프로세스에서 바뀐 내용은 알 수 없으므로,
+    ttl_sec 가 있으면 그보다 오래된 항목은 버립니다. (여러 워커에서 오래된 응답을 쓰는 시간의 상한)
+    """
+    def __init__(self, max_entries: int = 1024, ttl_sec: float | None = None):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> tuple[bytes, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            body, etag, stored_at = entry
+            if self.ttl_sec is not None and time.monotonic() - stored_at > self.ttl_sec:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body, etag
+
+    def put(self, key, body: bytes, etag: str | None = None) -> str:
+        """body 를 저장하고 ETag 를 반환합니다. etag 를 주지 않으면 body 로부터 생성합니다."""
+        etag = etag or make_etag(body)
+        with self._lock:
+            self._entries[key] = (body, etag, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def invalidate(self, predicate) -> int:
+        """predicate(key) 가 참인 항목을 지우고 지운 개수를 반환합니다."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def __len__(self):
+        return len(self._entries)
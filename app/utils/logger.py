@@ -0,0 +1,111 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+
+# 세션 상관관계 ID. asyncio Task 와 asyncio.to_thread 로 실행되는 작업에 자동으로 전파됩니다.
+_sid_var = contextvars.ContextVar("log_sid", default="-")
+_user_id_var = contextvars.ContextVar("log_user_id", default="-")
+_chunk_id_var = contextvars.ContextVar("log_chunk_id", default="-")
+_CONTEXT_VARS = {"sid": _sid_var, "user_id": _user_id_var, "chunk_id": _chunk_id_var}
+
+# 대량으로 발생하는 디버그 로그에 extra=SAMPLED 를 주면 LOG_SAMPLE_EVERY 건 중 1건만 출력됩니다.
+SAMPLED = {"sampled": True}
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] [sid=%(sid)s user=%(user_id)s chunk=%(chunk_id)s] %(message)s"
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def bind_log_context(**values) -> dict:
+    """현재 컨텍스트에 sid/user_id/chunk_id 를 설정하고, 복원용 토큰을 반환합니다."""
+    tokens = {}
+    for key, value in values.items():
+        if key not in _CONTEXT_VARS:
+            raise ValueError(f"지원하지 않는 로그 컨텍스트 키: {key}")
+        tokens[key] = _CONTEXT_VARS[key].set("-" if value is None else value)
+    return tokens
+
+
+def reset_log_context(tokens: dict):
+    for key, token in tokens.items():
+        _CONTEXT_VARS[key].reset(token)
+
+
+@contextmanager
+def log_context(**values):
+    tokens = bind_log_context(**values)
+    try:
+        yield
+    finally:
+        reset_log_context(tokens)
+
+
+class ContextFilter(logging.Filter):
+    """로그 레코드에 세션 상관관계 ID를 채워 넣습니다. (로그를 남긴 스레드에서 실행되는 QueueHandler 에 부착)"""
+    def filter(self, record):
+        record.sid = _sid_var.get()
+        record.user_id = _user_id_var.get()
+        record.chunk_id = _chunk_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """extra=SAMPLED 로 표시된 레코드를 메시지 템플릿별로 every 건 중 1건만 통과시킵니다."""
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, "sampled", False) or self.every == 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+
+def setup_logging(level: str | None = None):
+    """
+    'app' 로거에 큐 기반 비동기 핸들러를 설정합니다.
+    이벤트 루프/워커 스레드는 큐에 넣기만 하고, 실제 stdout 쓰기는 QueueListener 스레드가 담당합니다.
+    여러 번 호출해도 한 번만 설정됩니다.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+        sample_every = int(os.getenv("LOG_SAMPLE_EVERY", "20"))
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        # 하위 로거(app.*)에서 전파된 레코드는 logger 필터를 거치지 않으므로 핸들러에 부착합니다.
+        queue_handler.addFilter(ContextFilter())
+        queue_handler.addFilter(SamplingFilter(sample_every))
+
+        app_logger = logging.getLogger("app")
+        app_logger.setLevel(level)
+        app_logger.addHandler(queue_handler)
+        app_logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """app.* 네임스페이스의 로거를 반환합니다. (모듈에서는 get_logger(__name__) 으로 사용)"""
+    return logging.getLogger(name if name.startswith("app") else f"app.{name}")
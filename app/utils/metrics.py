@@ -0,0 +1,244 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# 외부 의존성 없이 Prometheus text format(0.0.4)으로 내보내는 경량 메트릭 모듈입니다.
+# 관측 1회는 lock 한 번 + bisect 한 번이므로 운영 환경에서 상시 켜두어도 부담이 적습니다.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0, 120.0)
+
+
+def _escape_label_value(value) -> str:
+    """라벨 값의 역슬래시, 큰따옴표, 줄바꿈을 text format 규칙대로 이스케이프합니다."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_help(text: str) -> str:
+    """HELP 설명은 역슬래시와 줄바꿈만 이스케이프합니다."""
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape_label_value(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨은 {self.labelnames} 이어야 합니다. (입력: {tuple(labels)})")
+        return tuple(labels[n] for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """현재 값을 반환합니다. 벤치마크 등에서 사용"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [버킷별 카운트..., +Inf 카운트], 합계
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][idx] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels) -> tuple[int, float]:
+        """(관측 횟수, 합계)를 반환합니다. 벤치마크 등에서 사용"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return 0, 0.0
+            return sum(state[0]), state[1]
+
+    def _render_sample(self, key, value) -> list[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- 실시간 분석 파이프라인 메트릭 ---
+PIPELINE_STAGE_SECONDS = registry.histogram(
+    "pipeline_stage_seconds", "파이프라인 단계별 소요 시간(초)", ("stage",))
+CHUNK_END_TO_END_SECONDS = registry.histogram(
+    "chunk_end_to_end_seconds", "청크 수신부터 결과 전송까지 소요 시간(초)")
+EARLY_RESULT_SECONDS = registry.histogram(
+    "early_result_seconds", "progressive 모드에서 청크 수신부터 선행 결과 전송까지 소요 시간(초)",
+    ("event",))
+RESULT_ORDER_WAIT_SECONDS = registry.histogram(
+    "result_order_wait_seconds", "처리가 끝난 청크 결과가 앞 청크를 기다리며 전송 대기한 시간(초)")
+CHUNKS_DROPPED_TOTAL = registry.counter(
+    "chunks_dropped_total", "결과 없이 버려진 청크 수", ("reason",))
+CHUNKS_IN_FLIGHT = registry.gauge(
+    "chunks_in_flight", "현재 처리 중인 청크 수")
+WEBSOCKET_SESSIONS_ACTIVE = registry.gauge(
+    "websocket_sessions_active", "현재 연결된 웹소켓 세션 수", ("endpoint",))
+LIVE_SESSIONS_DETACHED = registry.gauge(
+    "live_sessions_detached", "연결이 끊긴 채 재연결을 기다리는 resumable 세션 수")
+SESSION_RESUMES_TOTAL = registry.counter(
+    "session_resumes_total", "세션 재개 요청 결과 (outcome=resumed|taken_over|unknown|expired)", ("outcome",))
+WEBSOCKET_SENT_BYTES_TOTAL = registry.counter(
+    "websocket_sent_bytes_total", "웹소켓 결과 메시지 전송 바이트 수 (encoding=json|msgpack|binary)", ("encoding",))
+FINALIZATION_JOBS_TOTAL = registry.counter(
+    "finalization_jobs_total", "최종 분석 작업 수 (outcome=submitted|done|failed|lost, lost 는 lease 를 잃어 결과를 버린 실행)", ("outcome",))
+FINALIZATION_JOBS_RUNNING = registry.gauge(
+    "finalization_jobs_running", "이 워커에서 실행 중인 최종 분석 작업 수")
+FINALIZE_SEGMENTS_TOTAL = registry.counter(
+    "finalize_segments_total", "최종 분석 세그먼트 감정 분석 수 (result=reused|computed, reused 는 실시간 결과 재사용)", ("result",))
+FINALIZE_REUSE_RATIO = registry.histogram(
+    "finalize_reuse_ratio", "FINALIZE_MODE=incremental 에서 실시간 감정 결과를 재사용한 세그먼트 비율",
+    buckets=(0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0))
+EXECUTOR_QUEUE_DEPTH = registry.gauge(
+    "executor_queue_depth", "executor 에 제출되었지만 아직 실행되지 않은 작업 수", ("executor",))
+EXECUTOR_ACTIVE_WORKERS = registry.gauge(
+    "executor_active_workers", "executor 에서 실행 중인 작업 수", ("executor",))
+EMBEDDING_BATCH_SIZE = registry.histogram(
+    "embedding_batch_size", "임베딩 워커 풀이 한 번에 처리한 요청 수", buckets=(1, 2, 4, 8, 16, 32, 64))
+SPEAKER_VERIFY_UPDATES_TOTAL = registry.counter(
+    "speaker_verify_updates_total", "스트리밍 화자 검증 청크 처리 수 (result=computed|reused)", ("result",))
+
+# --- 외부 Provider / DB 메트릭 ---
+PROVIDER_REQUESTS_TOTAL = registry.counter(
+    "provider_requests_total", "외부 Provider 호출 수 (outcome=success|error|invalid, invalid 는 응답은 받았으나 쓸 수 없는 경우)", ("provider", "outcome"))
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_seconds", "DB 쿼리 실행 시간(초)", ("operation",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+GEMINI_QUEUE_WAIT_SECONDS = registry.histogram(
+    "gemini_queue_wait_seconds", "Gemini 스케줄러 토큰 대기 시간(초)", ("priority",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+GEMINI_THROTTLED_TOTAL = registry.counter(
+    "gemini_throttled_total", "Gemini 호출 제한 발생 수 (reason=queue_timeout|retry_429|quota_exhausted)", ("priority", "reason"))
+GEMINI_RESPONSES_TOTAL = registry.counter(
+    "gemini_responses_total", "Gemini 감정 응답 검증 결과 (outcome=valid|normalized|invalid|error, invalid 는 기본값으로 대체된 응답, error 는 호출 오류로 건너뛴 모달리티)",
+    ("modality", "outcome"))
+CIRCUIT_STATE = registry.gauge(
+    "circuit_state", "Provider 서킷 상태 (0=closed, 1=half_open, 2=open)", ("provider",))
+CIRCUIT_TRANSITIONS_TOTAL = registry.counter(
+    "circuit_transitions_total", "Provider 서킷 상태 전환 수", ("provider", "state"))
+CIRCUIT_REJECTED_TOTAL = registry.counter(
+    "circuit_rejected_total", "서킷이 열려 있어 호출하지 않은 요청 수", ("provider",))
+
+
+def record_provider_result(provider: str, success: bool, outcome: str = "error"):
+    """success 가 False 이면 outcome(error|invalid)으로 집계합니다."""
+    PROVIDER_REQUESTS_TOTAL.inc(provider=provider, outcome="success" if success else outcome)
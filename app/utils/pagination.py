@@ -0,0 +1,72 @@
+import base64
+import json
+
+# PostgreSQL INTEGER 범위 (uid SERIAL, start_ms 등 커서 키 컬럼)
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+
+def encode_cursor(*values) -> str:
+    """키셋 페이지네이션용 커서 값을 URL-safe 문자열로 인코딩합니다.
+
+    Args:
+        *values: 마지막 행의 정렬 키 값들 (예: created_at, uid).
+
+    Returns:
+        str: 불투명(opaque) 커서 문자열.
+    """
+    raw = json.dumps([str(v) if not isinstance(v, (int, float)) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def cursor_int(value) -> int:
+    """커서의 정수 키 변환 함수. JSON 정수이면서 INTEGER 범위인 값만 허용합니다.
+
+    int() 와 달리 실수(1.5)·문자열·bool 을 변환하지 않고, 범위를 벗어난 값이 DB 에서 오류가 나기 전에 거릅니다.
+
+    Raises:
+        ValueError: 정수가 아니거나 범위를 벗어난 경우.
+    """
+    if type(value) is not int or not INT32_MIN <= value <= INT32_MAX:
+        raise ValueError(f"잘못된 cursor 키 값입니다: {value!r}")
+    return value
+
+
+def decode_cursor(cursor: str, types: tuple) -> list:
+    """encode_cursor로 만든 커서를 디코딩합니다.
+
+    Args:
+        cursor (str): 클라이언트가 전달한 커서 문자열.
+        types (tuple): 키마다 값을 변환할 함수 (예: (datetime.fromisoformat, cursor_int)). 키 개수도 이 길이와 같아야 합니다.
+
+    Returns:
+        list: 변환된 정렬 키 값 리스트.
+
+    Raises:
+        ValueError: 커서 형식이나 키 값이 올바르지 않은 경우. (변환하지 못한 값이 DB 쿼리까지 가지 않도록 여기서 거릅니다)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"잘못된 cursor 입니다: {cursor}") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError(f"잘못된 cursor 입니다: {cursor}")
+    try:
+        return [convert(value) for convert, value in zip(types, values)]
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"잘못된 cursor 입니다: {cursor}") from e
+
+
+def parse_fields(fields: str | None, allowed, default) -> list[str]:
+    """`fields=a,b,c` 형태의 프로젝션 파라미터를 검증하여 필드 리스트로 변환합니다.
+
+    Raises:
+        ValueError: 허용되지 않은 필드가 포함된 경우.
+    """
+    if not fields:
+        return list(default)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"지원하지 않는 fields: {unknown}. 사용 가능: {list(allowed)}")
+    return requested
@@ -0,0 +1,264 @@
+import asyncio
+import contextvars
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 세션 단위 프로파일링 (기본 비활성화)
+#   SESSION_PROFILING_ENABLED=true 일 때만 send_conversation 설정 메시지의 "profile" 필드를 허용합니다.
+#   PROFILED_USER_IDS=user1,user2 에 포함된 사용자는 설정 메시지와 관계없이 프로파일링합니다. (운영자 플래그)
+#   PROFILE_MAX_SESSIONS: 동시에 프로파일링할 수 있는 최대 세션 수
+#   PROFILE_SAMPLE_INTERVAL_MS: sampling 모드의 샘플링 간격
+#
+# 모드
+#   sampling: 별도 스레드가 주기적으로 스택을 수집하여 flamegraph 용 folded stack(.folded) 파일로 저장합니다.
+#             (flamegraph.pl, speedscope, inferno 등에서 바로 열 수 있음)
+#             세션의 asyncio Task 가 이벤트 루프에서 실행 중인 구간과, 세션의 executor 작업이 실행 중인 스레드만 샘플링합니다.
+#   cprofile: 세션의 executor 작업마다 cProfile 을 켜고 합쳐서 .prof 파일로 저장합니다. (snakeviz 등으로 확인)
+#             이벤트 루프 스레드는 다른 세션과 공유하므로 cprofile 모드에서는 측정하지 않습니다.
+PROFILE_DIR = os.path.join("storage", "profiles")
+PROFILE_MODES = ("sampling", "cprofile")
+
+_current_profiler = contextvars.ContextVar("session_profiler", default=None)
+_active = set()
+_active_lock = threading.Lock()
+_sampler_thread = None
+_installed_loops = set()
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def resolve_profile_mode(requested, user_id: str | None) -> str | None:
+    """설정 메시지의 profile 필드와 운영자 플래그로 프로파일링 모드를 결정합니다. (None = 프로파일링 안 함)"""
+    profiled_users = {u.strip() for u in os.getenv("PROFILED_USER_IDS", "").split(",") if u.strip()}
+    if user_id and user_id in profiled_users:
+        return requested if requested in PROFILE_MODES else "sampling"
+    if not requested or not _env_flag("SESSION_PROFILING_ENABLED"):
+        return None
+    if requested is True:
+        return "sampling"
+    return requested if requested in PROFILE_MODES else None
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SessionProfiler:
+    """한 웹소켓 세션의 파이프라인 작업만 골라서 프로파일링합니다."""
+    def __init__(self, name: str, mode: str = "sampling", interval_sec: float = 0.005):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"지원하지 않는 프로파일링 모드입니다: {mode}")
+        self.name = name
+        self.mode = mode
+        self.interval_sec = interval_sec
+        self.stacks = Counter()
+        self.samples = 0
+        self._tasks = set()
+        self._threads = Counter()  # thread id -> 중첩 실행 수
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread_id = None
+        self._token = None
+        self._started_at = None
+
+    # --- 추적 대상 등록 ---
+    def add_task(self, task: asyncio.Task):
+        with self._lock:
+            self._tasks.add(task)
+        task.add_done_callback(self._discard_task)
+
+    def _discard_task(self, task):
+        with self._lock:
+            self._tasks.discard(task)
+
+    @contextmanager
+    def track_thread(self):
+        """현재 스레드에서 실행되는 동안 이 세션의 작업으로 간주하여 샘플링합니다."""
+        tid = threading.get_ident()
+        with self._lock:
+            self._threads[tid] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[tid] -= 1
+                if self._threads[tid] <= 0:
+                    del self._threads[tid]
+
+    def run(self, fn, *args, **kwargs):
+        """executor 작업을 프로파일링하며 실행합니다."""
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._profiles.append(profile)
+        with self.track_thread():
+            return fn(*args, **kwargs)
+
+    # --- 샘플링 ---
+    def _sample(self, frames: dict):
+        with self._lock:
+            thread_ids = list(self._threads)
+            tasks = set(self._tasks)
+        if self._loop_thread_id is not None and self._loop_thread_id not in thread_ids:
+            # 이벤트 루프 스레드는 이 세션의 Task 가 실행 중일 때만 샘플링
+            running = asyncio.tasks._current_tasks.get(self._loop)
+            if running is not None and running in tasks:
+                thread_ids.append(self._loop_thread_id)
+        for tid in thread_ids:
+            frame = frames.get(tid)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+                self.samples += 1
+
+    # --- 시작/종료 ---
+    def start(self):
+        """현재 Task(웹소켓 핸들러)와 이후 생성되는 하위 Task 를 추적하기 시작합니다."""
+        self._started_at = time.perf_counter()
+        self._token = _current_profiler.set(self)
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            _install_task_factory(self._loop)
+            current = asyncio.current_task()
+            if current is not None:
+                self.add_task(current)
+        except RuntimeError:
+            pass  # 이벤트 루프 밖에서 시작한 경우 스레드 추적만 사용
+        with _active_lock:
+            _active.add(self)
+        if self.mode == "sampling":
+            _ensure_sampler()
+
+    def stop(self, output_dir: str = PROFILE_DIR) -> str | None:
+        """프로파일링을 종료하고 결과 파일 경로를 반환합니다."""
+        with _active_lock:
+            _active.discard(self)
+        if self._token is not None:
+            try:
+                _current_profiler.reset(self._token)
+            except ValueError:
+                _current_profiler.set(None)  # 다른 컨텍스트에서 종료하는 경우
+            self._token = None
+
+        os.makedirs(output_dir, exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        elapsed = time.perf_counter() - (self._started_at or time.perf_counter())
+        if self.mode == "cprofile":
+            with self._lock:
+                profiles = list(self._profiles)
+            if not profiles:
+                logger.info(f"[프로파일링] 수집된 executor 작업이 없습니다: {self.name}")
+                return None
+            path = os.path.join(output_dir, f"{ts}_{self.name}.prof")
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(path)
+        else:
+            path = os.path.join(output_dir, f"{ts}_{self.name}.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        logger.info(f"[프로파일링] 저장 완료: {path} (모드: {self.mode}, 샘플: {self.samples}, 세션 시간: {elapsed:.1f}초)")
+        return path
+
+
+def current_profiler() -> SessionProfiler | None:
+    return _current_profiler.get()
+
+
+def run_profiled(fn, *args, **kwargs):
+    """
+    executor 스레드에서 실행할 함수를 감쌉니다.
+    asyncio.to_thread / run_in_executor(contextvars 복사) 로 실행되면 호출한 세션의 프로파일러를 찾아 적용합니다.
+    """
+    profiler = _current_profiler.get()
+    if profiler is None:
+        return fn(*args, **kwargs)
+    return profiler.run(fn, *args, **kwargs)
+
+
+def start_session_profiler(name: str, mode: str) -> SessionProfiler | None:
+    """동시 프로파일링 세션 수 제한(PROFILE_MAX_SESSIONS)을 확인하고 프로파일러를 시작합니다."""
+    max_sessions = int(os.getenv("PROFILE_MAX_SESSIONS", "2"))
+    interval_ms = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    with _active_lock:
+        running = len(_active)
+    if running >= max_sessions:
+        logger.warning(f"[프로파일링] 동시 프로파일링 세션 수 제한({max_sessions}) 초과. 요청 무시: {name}")
+        return None
+    profiler = SessionProfiler(name, mode, interval_ms / 1000)
+    profiler.start()
+    logger.info(f"[프로파일링] 시작: {name} (모드: {mode})")
+    return profiler
+
+
+def _install_task_factory(loop):
+    """세션 컨텍스트에서 생성된 Task 를 해당 세션 프로파일러에 자동 등록하는 task factory 를 설치합니다."""
+    if loop in _installed_loops:
+        return
+    previous = loop.get_task_factory()
+
+    def factory(loop, coro, **kwargs):
+        if previous is not None:
+            task = previous(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        profiler = _current_profiler.get()
+        if profiler is not None:
+            profiler.add_task(task)
+        return task
+
+    loop.set_task_factory(factory)
+    _installed_loops.add(loop)
+
+
+def _ensure_sampler():
+    global _sampler_thread
+    with _active_lock:
+        if _sampler_thread is not None:
+            return
+        _sampler_thread = threading.Thread(target=_sampler_loop, name="session-profiler", daemon=True)
+        _sampler_thread.start()
+
+
+def _sampler_loop():
+    global _sampler_thread
+    sampler_id = threading.get_ident()
+    while True:
+        with _active_lock:
+            profilers = [p for p in _active if p.mode == "sampling"]
+            if not profilers:
+                _sampler_thread = None
+                return
+        frames = sys._current_frames()
+        frames.pop(sampler_id, None)
+        for profiler in profilers:
+            profiler._sample(frames)
+        time.sleep(min(p.interval_sec for p in profilers))
@@ -0,0 +1,285 @@
+# /ws/analyze 결과 메시지 인코딩
+#
+# 초기 설정 메시지의 "encoding" 으로 세션별 인코딩을 정합니다. (기본 json)
+#     json    : 기존과 같은 JSON 텍스트 메시지 (orjson 이 설치되어 있으면 orjson 으로 직렬화)
+#     msgpack : 모든 메시지를 MessagePack 바이너리로 전송. 감정 결과는 compact 형태로 줄입니다.
+#     binary  : 감정 결과(emotion_analysis / emotion_update)만 고정 레이아웃 바이너리 프레임, 나머지는 JSON 텍스트
+#
+# compact 인코딩(msgpack/binary)에서는 한글 라벨/색상/표준 감정을 매번 보내지 않고,
+# 세션 시작 시 emotion_table 이벤트로 한 번만 보냅니다. 클라이언트는 라벨 순서(index)로 점수와 우세 감정을 해석합니다.
+#
+# compact 감정 결과 (msgpack):
+#     "emotion": {"text": [점수 3개] | None, "audio": [점수 7개] | None, "dominant": [텍스트 index, 음성 index],
+#                 "degraded": str | None, "source": dict | None}
+#     "provider_status": [상태 index, ...] (emotion_table 의 providers 순서)
+#
+# binary 프레임 (little-endian, BINARY_HEADER 뒤에 UTF-8 transcript):
+#     B version, B kind(1=emotion_analysis, 2=emotion_update), I chunk_id,
+#     B flags(bit0 감정 있음, bit1 is_same 있음, bit2 is_same 값, bit3 similarity 있음,
+#             bit4 텍스트 감정 없음, bit5 음성 감정 없음 - 분석하지 않은 모달리티. 점수는 0 으로 채움),
+#     B degraded index, B source(텍스트 index << 4 | 음성 index), B 텍스트 우세 index, B 음성 우세 index,
+#     e similarity, 3e 텍스트 점수, 7e 음성 점수, H provider_status(Provider 당 2bit), H transcript 길이
+import json
+import struct
+
+from app.providers.circuit_breaker import PROVIDERS
+from app.utils.emotion_utils import (
+    AUDIO_EMOTIONS,
+    EMOTION_COLORS,
+    EMOTION_MAPPING,
+    TEXT_EMOTIONS,
+    format_analysis_result,
+    map_emotion_to_standard,
+    vector_to_scores,
+)
+from app.utils.logger import get_logger
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 표준 json 사용
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성: 없으면 msgpack 인코딩 요청을 json 으로 대체
+    msgpack = None
+
+logger = get_logger(__name__)
+
+ENCODINGS = ("json", "msgpack", "binary")
+TABLE_VERSION = 1
+RESULT_EVENTS = ("emotion_analysis", "emotion_update")
+PROVIDER_STATES = ("closed", "half_open", "open")
+DEGRADED_MODES = (None, "text_only", "audio_only")
+EMOTION_SOURCES = (None, "gemini", "local", "skipped")
+
+BINARY_HEADER = struct.Struct("<BBIBBBBBe3e7eHH")
+_FLAG_EMOTION, _FLAG_HAS_SAME, _FLAG_IS_SAME, _FLAG_SIMILARITY = 1, 2, 4, 8
+_FLAG_NO_TEXT, _FLAG_NO_AUDIO = 16, 32
+
+
+def negotiate_encoding(requested) -> str:
+    """클라이언트가 요청한 인코딩 중 사용할 수 있는 것을 반환합니다. (모르는 값이거나 라이브러리가 없으면 json)"""
+    encoding = str(requested or "json").strip().lower()
+    if encoding not in ENCODINGS:
+        logger.warning(f"[결과 인코딩] 지원하지 않는 인코딩 요청: {requested}. json 사용")
+        return "json"
+    if encoding == "msgpack" and msgpack is None:
+        logger.warning("[결과 인코딩] msgpack 패키지가 없어 json 사용")
+        return "json"
+    return encoding
+
+
+def dumps_json(payload) -> str:
+    """ensure_ascii=False 의 json.dumps 와 같은 문자열 (orjson 이 있으면 orjson 사용)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def emotion_table(encoding: str) -> dict:
+    """compact 인코딩 세션 시작 시 한 번 보내는 라벨/색상 표"""
+    labels = {}
+    for label in dict.fromkeys(TEXT_EMOTIONS + AUDIO_EMOTIONS):
+        standard = map_emotion_to_standard(label)
+        labels[label] = {
+            "korean": EMOTION_MAPPING.get(label, "중립"),
+            "standard": standard,
+            "color": EMOTION_COLORS.get(standard, "#F5F5F5"),
+        }
+    return {
+        "event": "emotion_table",
+        "version": TABLE_VERSION,
+        "encoding": encoding,
+        "text_labels": list(TEXT_EMOTIONS),
+        "audio_labels": list(AUDIO_EMOTIONS),
+        "labels": labels,
+        "providers": list(PROVIDERS),
+        "provider_states": list(PROVIDER_STATES),
+        "degraded": list(DEGRADED_MODES),
+        "sources": list(EMOTION_SOURCES),
+    }
+
+
+def _index(values: tuple, value, default: int = 0) -> int:
+    try:
+        return values.index(value)
+    except ValueError:
+        return default
+
+
+def _vector(modality: dict | None, labels: tuple) -> list[float] | None:
+    """모달리티의 점수를 라벨 순서 벡터로 바꿉니다. 분석하지 않은 모달리티(None)는 None"""
+    if modality is None:
+        return None
+    scores = modality.get("scores") or {}
+    return [float(scores.get(label, 0.0)) for label in labels]
+
+
+def _compact_emotion(emotion: dict | None) -> dict | None:
+    if not emotion:
+        return None
+    return {
+        "text": _vector(emotion.get("text"), TEXT_EMOTIONS),
+        "audio": _vector(emotion.get("audio"), AUDIO_EMOTIONS),
+        "dominant": [
+            _index(TEXT_EMOTIONS, (emotion.get("text") or {}).get("dominant"), TEXT_EMOTIONS.index("neutral")),
+            _index(AUDIO_EMOTIONS, (emotion.get("audio") or {}).get("dominant"), AUDIO_EMOTIONS.index("neutral")),
+        ],
+        "degraded": emotion.get("degraded"),
+        "source": emotion.get("source"),
+    }
+
+
+def _compact_status(status: dict | None) -> list[int]:
+    status = status or {}
+    return [_index(PROVIDER_STATES, status.get(name, "closed")) for name in PROVIDERS]
+
+
+def compact_message(message: dict) -> dict:
+    """감정 결과의 점수 dict/한글/색상을 라벨 순서 벡터와 index 로 줄입니다. (감정 결과가 아닌 메시지는 그대로)"""
+    if message.get("event") not in RESULT_EVENTS:
+        return message
+    compact = dict(message)
+    compact["emotion"] = _compact_emotion(message.get("emotion"))
+    compact["provider_status"] = _compact_status(message.get("provider_status"))
+    return compact
+
+
+def _pack_status(status: dict | None) -> int:
+    packed = 0
+    for i, state in enumerate(_compact_status(status)):
+        packed |= state << (2 * i)
+    return packed
+
+
+def encode_binary_result(message: dict) -> bytes:
+    """감정 결과 메시지를 고정 레이아웃 바이너리 프레임으로 인코딩합니다."""
+    emotion = message.get("emotion")
+    is_same = message.get("is_same")
+    similarity = message.get("similarity")
+    flags = 0
+    if emotion:
+        flags |= _FLAG_EMOTION
+    if is_same is not None:
+        flags |= _FLAG_HAS_SAME | (_FLAG_IS_SAME if is_same else 0)
+    if similarity is not None:
+        flags |= _FLAG_SIMILARITY
+    compact = _compact_emotion(emotion) or {
+        "text": [0.0] * len(TEXT_EMOTIONS), "audio": [0.0] * len(AUDIO_EMOTIONS),
+        "dominant": [0, 0], "degraded": None, "source": None,
+    }
+    if compact["text"] is None:
+        flags |= _FLAG_NO_TEXT
+    if compact["audio"] is None:
+        flags |= _FLAG_NO_AUDIO
+    source = compact["source"] or {}
+    transcript = (message.get("transcript") or "").encode("utf-8")[:0xFFFF]
+    header = BINARY_HEADER.pack(
+        TABLE_VERSION,
+        RESULT_EVENTS.index(message["event"]) + 1,
+        message["chunk_id"],
+        flags,
+        _index(DEGRADED_MODES, compact["degraded"]),
+        _index(EMOTION_SOURCES, source.get("text")) << 4 | _index(EMOTION_SOURCES, source.get("audio")),
+        compact["dominant"][0],
+        compact["dominant"][1],
+        float(similarity or 0.0),
+        *(compact["text"] or [0.0] * len(TEXT_EMOTIONS)),
+        *(compact["audio"] or [0.0] * len(AUDIO_EMOTIONS)),
+        _pack_status(message.get("provider_status")),
+        len(transcript),
+    )
+    return header + transcript
+
+
+def _expand_emotion(compact: dict) -> dict:
+    result = format_analysis_result(
+        None if compact["text"] is None else vector_to_scores(compact["text"], TEXT_EMOTIONS),
+        None if compact["audio"] is None else vector_to_scores(compact["audio"], AUDIO_EMOTIONS),
+    )
+    # 우세 감정은 서버가 계산한 값을 사용합니다. (float16 반올림으로 순위가 바뀌지 않도록)
+    for modality, labels, index in (("text", TEXT_EMOTIONS, 0), ("audio", AUDIO_EMOTIONS, 1)):
+        if result[modality] is None:
+            continue
+        dominant = labels[compact["dominant"][index]]
+        standard = map_emotion_to_standard(dominant)
+        result[modality].update(
+            dominant=dominant, standard=standard,
+            korean=EMOTION_MAPPING.get(dominant, "중립"), color=EMOTION_COLORS.get(standard, "#F5F5F5"))
+    if compact.get("degraded"):
+        result["degraded"] = compact["degraded"]
+    if compact.get("source"):
+        result["source"] = compact["source"]
+    return result
+
+
+def expand_message(message: dict) -> dict:
+    """compact_message 의 역변환 (클라이언트/테스트용)"""
+    if message.get("event") not in RESULT_EVENTS:
+        return message
+    expanded = dict(message)
+    expanded["emotion"] = _expand_emotion(message["emotion"]) if message.get("emotion") else None
+    expanded["provider_status"] = {
+        name: PROVIDER_STATES[state] for name, state in zip(PROVIDERS, message.get("provider_status") or [])}
+    return expanded
+
+
+def decode_binary_result(data: bytes) -> dict:
+    """encode_binary_result 의 역변환 (클라이언트/테스트용). compact_message 와 같은 형태의 dict 를 반환합니다."""
+    fields = BINARY_HEADER.unpack_from(data)
+    version, kind, chunk_id, flags, degraded, source, text_dominant, audio_dominant, similarity = fields[:9]
+    text_scores = list(fields[9:9 + len(TEXT_EMOTIONS)])
+    audio_scores = list(fields[9 + len(TEXT_EMOTIONS):9 + len(TEXT_EMOTIONS) + len(AUDIO_EMOTIONS)])
+    status, transcript_len = fields[-2:]
+    if version != TABLE_VERSION:
+        raise ValueError(f"지원하지 않는 결과 프레임 버전입니다: {version}")
+    transcript = data[BINARY_HEADER.size:BINARY_HEADER.size + transcript_len].decode("utf-8")
+    text_source, audio_source = EMOTION_SOURCES[source >> 4], EMOTION_SOURCES[source & 0x0F]
+    message = {
+        "event": RESULT_EVENTS[kind - 1],
+        "chunk_id": chunk_id,
+        "transcript": transcript,
+        "emotion": {
+            "text": None if flags & _FLAG_NO_TEXT else text_scores,
+            "audio": None if flags & _FLAG_NO_AUDIO else audio_scores,
+            "dominant": [text_dominant, audio_dominant],
+            "degraded": DEGRADED_MODES[degraded],
+            "source": {"text": text_source, "audio": audio_source} if text_source or audio_source else None,
+        } if flags & _FLAG_EMOTION else None,
+        "is_same": bool(flags & _FLAG_IS_SAME) if flags & _FLAG_HAS_SAME else None,
+        "similarity": similarity if flags & _FLAG_SIMILARITY else None,
+        "provider_status": [(status >> (2 * i)) & 0b11 for i in range(len(PROVIDERS))],
+    }
+    if kind == 2:
+        message["utterance_id"] = chunk_id
+    return message
+
+
+class ResultEncoder:
+    """세션의 인코딩에 맞게 메시지를 str(텍스트 프레임) 또는 bytes(바이너리 프레임)로 변환합니다."""
+    def __init__(self, encoding: str = "json"):
+        self.encoding = encoding
+
+    @property
+    def compact(self) -> bool:
+        return self.encoding != "json"
+
+    def encode(self, message: dict) -> str | bytes:
+        if self.encoding == "msgpack":
+            return msgpack.packb(compact_message(message), use_bin_type=True)
+        if self.encoding == "binary" and message.get("event") in RESULT_EVENTS:
+            return encode_binary_result(message)
+        return dumps_json(message)
+
+
+def decode_frame(message: dict, encoding: str = "json") -> dict | None:
+    """ASGI 웹소켓 수신 메시지(text/bytes)를 dict 로 복원합니다. 감정 결과는 compact 형태 그대로입니다. (클라이언트/테스트용)"""
+    if message.get("text") is not None:
+        return json.loads(message["text"])
+    data = message.get("bytes")
+    if not data:
+        return None
+    if encoding == "msgpack":
+        return msgpack.unpackb(data, raw=False)
+    return decode_binary_result(data)
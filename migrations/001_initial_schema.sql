@@ -0,0 +1,35 @@
+-- 기존 운영 DB에 이미 존재하는 기본 테이블 (IF NOT EXISTS 로 기존 DB에도 안전하게 적용)
+
+CREATE TABLE IF NOT EXISTS users (
+    uid SERIAL PRIMARY KEY,
+    user_id VARCHAR(64) UNIQUE,
+    user_name VARCHAR(128),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_voice_embeddings (
+    uid SERIAL PRIMARY KEY,
+    user_uid INTEGER UNIQUE,
+    embedding BYTEA,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_conversation_master (
+    uid SERIAL PRIMARY KEY,
+    user_uid INTEGER,
+    topic VARCHAR(255),
+    audio_path TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_conversation_detail (
+    uid SERIAL PRIMARY KEY,
+    master_uid INTEGER REFERENCES user_conversation_master(uid) ON DELETE CASCADE,
+    sentence TEXT,
+    speaker VARCHAR(16),
+    emotion_result JSONB,
+    dominant_emotion VARCHAR(32),
+    start_ms INTEGER,
+    end_ms INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,14 @@
+-- 사용자 본인 발화 여부 및 사용자별 감정 추이 집계 테이블
+
+ALTER TABLE user_conversation_detail ADD COLUMN IF NOT EXISTS is_user BOOLEAN;
+
+CREATE TABLE IF NOT EXISTS user_emotion_trend (
+    user_uid INTEGER NOT NULL,
+    bucket_date DATE NOT NULL,
+    dominant_emotion VARCHAR(32) NOT NULL,
+    sentence_count INTEGER NOT NULL DEFAULT 0,
+    disagree_count INTEGER NOT NULL DEFAULT 0,
+    user_speech_ms BIGINT NOT NULL DEFAULT 0,
+    total_speech_ms BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_uid, bucket_date, dominant_emotion)
+);
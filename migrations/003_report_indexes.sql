@@ -0,0 +1,7 @@
+-- 리포트 API 키셋(커서) 페이지네이션용 복합 인덱스
+
+CREATE INDEX IF NOT EXISTS idx_conversation_master_user_created
+    ON user_conversation_master (user_uid, created_at DESC, uid DESC);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_detail_master_start
+    ON user_conversation_detail (master_uid, start_ms, uid);
@@ -0,0 +1,3 @@
+-- finalize_analysis 완료 시각. 값이 있으면 대화 상세는 더 이상 변경되지 않습니다. (응답 캐시 대상)
+
+ALTER TABLE user_conversation_master ADD COLUMN IF NOT EXISTS finalized_at TIMESTAMP;
@@ -0,0 +1,43 @@
+-- 감정분석 결과 JSONB(emotion_result)를 고정 순서 real[] 점수 벡터로 정규화합니다.
+-- 우세 감정/표준 감정/한글/색상은 읽기 시점에 app/utils/emotion_utils.py 매핑으로 계산합니다.
+--   text_scores  : positive, negative, neutral
+--   audio_scores : happy, sad, angry, fear, disgust, surprise, neutral
+
+ALTER TABLE user_conversation_detail ADD COLUMN IF NOT EXISTS text_scores real[];
+ALTER TABLE user_conversation_detail ADD COLUMN IF NOT EXISTS audio_scores real[];
+
+UPDATE user_conversation_detail SET
+    text_scores = ARRAY[
+        COALESCE((emotion_result->'text'->'scores'->>'positive')::real, 0),
+        COALESCE((emotion_result->'text'->'scores'->>'negative')::real, 0),
+        COALESCE((emotion_result->'text'->'scores'->>'neutral')::real, 0)
+    ],
+    audio_scores = ARRAY[
+        COALESCE((emotion_result->'audio'->'scores'->>'happy')::real, 0),
+        COALESCE((emotion_result->'audio'->'scores'->>'sad')::real, 0),
+        COALESCE((emotion_result->'audio'->'scores'->>'angry')::real, 0),
+        COALESCE((emotion_result->'audio'->'scores'->>'fear')::real, 0),
+        COALESCE((emotion_result->'audio'->'scores'->>'disgust')::real, 0),
+        COALESCE((emotion_result->'audio'->'scores'->>'surprise')::real, 0),
+        COALESCE((emotion_result->'audio'->'scores'->>'neutral')::real, 0)
+    ]
+WHERE emotion_result IS NOT NULL;
+
+-- emotion_result 는 백필 검증이 끝날 때까지 남겨 둡니다. (새 행은 점수 벡터만 기록하므로 NULL)
+-- 검증 쿼리와 컬럼 삭제 절차는 README 의 "감정 점수 저장 형식" 참고, 되돌리기는 migrations/down/005_compact_emotion_scores.sql
+COMMENT ON COLUMN user_conversation_detail.emotion_result IS
+    'deprecated: 005 이전 행의 원본 감정분석 결과. text_scores/audio_scores 백필 검증 후 삭제 예정';
+
+-- 점수 벡터에서 가장 큰 값의 (1부터 시작하는) 위치. 동점이면 앞쪽 감정을 선택합니다.
+CREATE OR REPLACE FUNCTION emotion_argmax(scores real[]) RETURNS integer AS $$
+    SELECT i::integer FROM unnest(scores) WITH ORDINALITY AS u(v, i)
+    ORDER BY v DESC, i ASC LIMIT 1
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION text_emotion_standard(scores real[]) RETURNS text AS $$
+    SELECT (ARRAY['positive', 'negative', 'neutral'])[emotion_argmax(scores)]
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION audio_emotion_standard(scores real[]) RETURNS text AS $$
+    SELECT (ARRAY['positive', 'negative', 'negative', 'negative', 'negative', 'positive', 'neutral'])[emotion_argmax(scores)]
+$$ LANGUAGE sql IMMUTABLE;
@@ -0,0 +1,26 @@
+-- 다중 샘플 음성 등록
+-- user_voice_samples 에 사용자별 등록 임베딩을 최근 N개(VOICE_ENROLL_MAX_SAMPLES)까지 보관하고,
+-- user_voice_embeddings.embedding 에는 샘플들의 정규화된 중심(centroid)을 저장합니다.
+-- 비교는 여전히 중심 임베딩과의 내적 한 번으로 끝납니다.
+--   sample_count : 중심 계산에 사용된 샘플 수
+--   spread       : 샘플과 중심 사이 코사인 거리(1 - cos)의 평균 (등록 음성의 일관성)
+
+CREATE TABLE IF NOT EXISTS user_voice_samples (
+    uid SERIAL PRIMARY KEY,
+    user_uid INTEGER NOT NULL,
+    embedding BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_voice_samples_user_created
+    ON user_voice_samples (user_uid, created_at DESC);
+
+ALTER TABLE user_voice_embeddings ADD COLUMN IF NOT EXISTS sample_count INTEGER DEFAULT 1;
+ALTER TABLE user_voice_embeddings ADD COLUMN IF NOT EXISTS spread REAL DEFAULT 0;
+
+-- 기존 단일 임베딩을 첫 번째 샘플로 옮깁니다.
+INSERT INTO user_voice_samples (user_uid, embedding, created_at)
+SELECT e.user_uid, e.embedding, e.created_at
+FROM user_voice_embeddings e
+WHERE e.embedding IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM user_voice_samples s WHERE s.user_uid = e.user_uid);
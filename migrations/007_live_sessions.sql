@@ -0,0 +1,33 @@
+-- 여러 워커/노드가 실시간 분석 세션 상태와 최종 분석 작업을 공유하기 위한 테이블 (SESSION_STORE_BACKEND=postgres)
+--   live_sessions     : resumable 세션 메타데이터. node_id 가 현재 세션을 가진 워커이며,
+--                       연결이 끊긴 세션(detached_at)은 다른 워커가 이어받을 수 있습니다. (음성은 state.pcm_path 에 보관)
+--   finalization_jobs : 최종 분석 작업 큐. 어느 워커든 FOR UPDATE SKIP LOCKED 로 작업을 가져가 실행합니다.
+--                       session_id 가 UNIQUE 이므로 대화당 최종 분석은 한 번만 등록됩니다.
+
+CREATE TABLE IF NOT EXISTS live_sessions (
+    token VARCHAR(64) PRIMARY KEY,
+    session_id VARCHAR(32) NOT NULL,
+    node_id VARCHAR(255) NOT NULL,
+    user_id VARCHAR(255),
+    state JSONB NOT NULL,
+    detached_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS finalization_jobs (
+    uid SERIAL PRIMARY KEY,
+    session_id VARCHAR(32) NOT NULL UNIQUE,
+    payload JSONB NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',  -- pending | running | done | failed
+    node_id VARCHAR(255),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    master_uid INTEGER,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    claimed_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_finalization_jobs_open
+    ON finalization_jobs (created_at)
+    WHERE status IN ('pending', 'running');
@@ -0,0 +1,21 @@
+-- 점수가 모두 0 인 벡터의 우세 감정을 첫 감정(positive/happy)이 아니라 neutral 로 계산합니다.
+-- (app/utils/emotion_utils.py 의 get_dominant_emotion 과 동일) 되돌리기는 migrations/down/008_emotion_argmax_neutral.sql
+
+-- 점수 벡터에서 가장 큰 값의 (1부터 시작하는) 위치. 동점이면 앞쪽 감정을 선택합니다.
+-- 양수 점수가 없으면(모두 0) neutral_index 를 반환하고, 분석하지 않은 모달리티(NULL 벡터)는 NULL 입니다.
+CREATE OR REPLACE FUNCTION emotion_argmax(scores real[], neutral_index integer) RETURNS integer AS $$
+    SELECT CASE WHEN scores IS NOT NULL THEN COALESCE(
+        (SELECT i::integer FROM unnest(scores) WITH ORDINALITY AS u(v, i) WHERE v > 0 ORDER BY v DESC, i ASC LIMIT 1),
+        neutral_index
+    ) END
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION text_emotion_standard(scores real[]) RETURNS text AS $$
+    SELECT (ARRAY['positive', 'negative', 'neutral'])[emotion_argmax(scores, 3)]
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION audio_emotion_standard(scores real[]) RETURNS text AS $$
+    SELECT (ARRAY['positive', 'negative', 'negative', 'negative', 'negative', 'positive', 'neutral'])[emotion_argmax(scores, 7)]
+$$ LANGUAGE sql IMMUTABLE;
+
+DROP FUNCTION IF EXISTS emotion_argmax(real[]);
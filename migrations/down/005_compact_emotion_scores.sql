@@ -0,0 +1,43 @@
+-- 005_compact_emotion_scores 되돌리기 (자동 적용되지 않음. 필요할 때 psql 로 직접 실행)
+--   psql "$DATABASE_URL" -f migrations/down/005_compact_emotion_scores.sql
+-- 005 이후에 저장된 행(emotion_result 가 NULL)은 점수 벡터로부터 emotion_result 를 다시 만든 뒤 벡터 컬럼을 삭제합니다.
+-- 우세/표준 감정, 한글, 색상은 app/utils/emotion_utils.py 의 매핑과 같습니다. (색상은 표준 감정 기준)
+-- 되돌린 뒤에는 005 이전 버전의 애플리케이션 코드로 배포해야 합니다.
+
+BEGIN;
+
+UPDATE user_conversation_detail SET emotion_result = jsonb_build_object(
+    'text', jsonb_build_object(
+        'scores', jsonb_build_object(
+            'positive', text_scores[1], 'negative', text_scores[2], 'neutral', text_scores[3]),
+        'dominant', (ARRAY['positive', 'negative', 'neutral'])[emotion_argmax(text_scores)],
+        'standard', text_emotion_standard(text_scores),
+        'korean', (ARRAY['긍정', '부정', '중립'])[emotion_argmax(text_scores)],
+        'color', CASE text_emotion_standard(text_scores)
+            WHEN 'positive' THEN '#FFD700' WHEN 'negative' THEN '#4682B4' ELSE '#F5F5F5' END
+    ),
+    'audio', jsonb_build_object(
+        'scores', jsonb_build_object(
+            'happy', audio_scores[1], 'sad', audio_scores[2], 'angry', audio_scores[3], 'fear', audio_scores[4],
+            'disgust', audio_scores[5], 'surprise', audio_scores[6], 'neutral', audio_scores[7]),
+        'dominant', (ARRAY['happy', 'sad', 'angry', 'fear', 'disgust', 'surprise', 'neutral'])[emotion_argmax(audio_scores)],
+        'standard', audio_emotion_standard(audio_scores),
+        'korean', (ARRAY['행복', '슬픔', '분노', '두려움', '혐오', '놀람', '중립'])[emotion_argmax(audio_scores)],
+        'color', CASE audio_emotion_standard(audio_scores)
+            WHEN 'positive' THEN '#FFD700' WHEN 'negative' THEN '#4682B4' ELSE '#F5F5F5' END
+    )
+)
+WHERE emotion_result IS NULL AND text_scores IS NOT NULL AND audio_scores IS NOT NULL;
+
+COMMENT ON COLUMN user_conversation_detail.emotion_result IS NULL;
+
+DROP FUNCTION IF EXISTS audio_emotion_standard(real[]);
+DROP FUNCTION IF EXISTS text_emotion_standard(real[]);
+DROP FUNCTION IF EXISTS emotion_argmax(real[]);
+
+ALTER TABLE user_conversation_detail DROP COLUMN IF EXISTS text_scores;
+ALTER TABLE user_conversation_detail DROP COLUMN IF EXISTS audio_scores;
+
+DELETE FROM schema_migrations WHERE version = '005_compact_emotion_scores';
+
+COMMIT;
@@ -0,0 +1,24 @@
+-- 008_emotion_argmax_neutral 되돌리기 (자동 적용되지 않음. 필요할 때 psql 로 직접 실행)
+--   psql "$DATABASE_URL" -f migrations/down/008_emotion_argmax_neutral.sql
+-- 005 의 emotion_argmax(real[]) 를 되살립니다. 005 까지 되돌릴 때는 이 파일을 먼저 실행합니다.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION emotion_argmax(scores real[]) RETURNS integer AS $$
+    SELECT i::integer FROM unnest(scores) WITH ORDINALITY AS u(v, i)
+    ORDER BY v DESC, i ASC LIMIT 1
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION text_emotion_standard(scores real[]) RETURNS text AS $$
+    SELECT (ARRAY['positive', 'negative', 'neutral'])[emotion_argmax(scores)]
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION audio_emotion_standard(scores real[]) RETURNS text AS $$
+    SELECT (ARRAY['positive', 'negative', 'negative', 'negative', 'negative', 'positive', 'neutral'])[emotion_argmax(scores)]
+$$ LANGUAGE sql IMMUTABLE;
+
+DROP FUNCTION IF EXISTS emotion_argmax(real[], integer);
+
+DELETE FROM schema_migrations WHERE version = '008_emotion_argmax_neutral';
+
+COMMIT;
@@ -0,0 +1,538 @@
+"""
+오프라인 벤치마크용 가짜(Fake) Provider 모음
+
+실제 Google STT / Clova / Gemini / ECAPA 모델 / PostgreSQL 없이 실시간 분석 파이프라인을 돌릴 수 있도록
+같은 인터페이스를 가진 결정적(deterministic) 가짜 구현을 제공합니다.
+각 Provider는 지연 시간 분포와 실패율을 설정할 수 있습니다.
+
+지연 시간 스펙 문자열:
+    const:0.3               항상 0.3초
+    uniform:0.2,0.6         0.2~0.6초 균등 분포
+    normal:0.4,0.1          평균 0.4초, 표준편차 0.1초 (0 미만은 0)
+    lognormal:0.35,0.5      중앙값 0.35초, sigma 0.5 의 로그정규 분포 (외부 API 응답 시간에 가장 가까움)
+
+사용법:
+    from fake_providers import FakeProviderConfig, install_fake_providers
+    fakes = install_fake_providers(FakeProviderConfig(seed=1, stt_latency="lognormal:0.3,0.4"))
+    from app.endpoints.ws_analyze import router   # install 이후에 app 모듈을 import 해야 합니다.
+"""
+import asyncio
+import hashlib
+import io
+import itertools
+import sys
+import threading
+import time
+import types
+import wave
+from dataclasses import dataclass, field
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+EMBEDDING_DIM = 192  # ECAPA-TDNN 임베딩 차원
+_LIVE_CHUNK_BYTES = SAMPLE_RATE * 2 * 2  # /ws/analyze 실시간 청크 크기 (2초)
+
+_FAKE_SENTENCES = [
+    "오늘 회의는 생각보다 길어졌어요",
+    "그 부분은 다시 확인해 볼게요",
+    "정말 다행이네요 고마워요",
+    "잠깐만요 그건 제 생각과 좀 달라요",
+    "저녁은 뭐 먹을까요",
+    "내일 아침에 다시 이야기해요",
+]
+
+
+class LatencyModel:
+    """지연 시간 분포 + 실패율. 같은 seed면 같은 순서의 값을 생성합니다. (스레드 안전)"""
+    def __init__(self, spec: str = "const:0", failure_rate: float = 0.0, seed: int = 0):
+        self.spec = spec
+        self.failure_rate = failure_rate
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",")] if params else []
+        if kind not in ("const", "uniform", "normal", "lognormal"):
+            raise ValueError(f"지원하지 않는 지연 시간 분포입니다: {spec}")
+
+    def sample(self) -> tuple[float, bool]:
+        """(지연 시간(초), 실패 여부)를 반환합니다."""
+        with self._lock:
+            if self.kind == "const":
+                delay = self.params[0] if self.params else 0.0
+            elif self.kind == "uniform":
+                delay = self._rng.uniform(self.params[0], self.params[1])
+            elif self.kind == "normal":
+                delay = self._rng.normal(self.params[0], self.params[1])
+            else:
+                delay = self.params[0] * float(np.exp(self._rng.normal(0.0, self.params[1])))
+            failed = self.failure_rate > 0 and self._rng.random() < self.failure_rate
+        return max(0.0, float(delay)), bool(failed)
+
+    def wait(self) -> bool:
+        """지연 시간만큼 블로킹 대기(실제 HTTP/gRPC 호출과 동일하게 스레드를 점유)하고 실패 여부를 반환합니다."""
+        delay, failed = self.sample()
+        if delay:
+            time.sleep(delay)
+        return failed
+
+    async def wait_async(self) -> bool:
+        """지연 시간만큼 asyncio 로 대기(비동기 SDK 호출과 동일하게 스레드를 점유하지 않음)하고 실패 여부를 반환합니다."""
+        delay, failed = self.sample()
+        if delay:
+            await asyncio.sleep(delay)
+        return failed
+
+
+@dataclass
+class FakeProviderConfig:
+    seed: int = 0
+    stt_latency: str = "lognormal:0.3,0.4"
+    stt_failure_rate: float = 0.0
+    clova_latency: str = "lognormal:1.5,0.3"
+    clova_failure_rate: float = 0.0
+    gemini_text_latency: str = "lognormal:0.6,0.4"
+    gemini_audio_latency: str = "lognormal:0.9,0.4"
+    gemini_failure_rate: float = 0.0
+    voice_latency: str = "const:0.02"
+    db_latency: str = "const:0.002"
+    # 최종 분석(Clova Long) 세그먼트 길이(초)와 화자 수
+    segment_sec: float = 3.0
+    speakers: int = 2
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class CpuStats:
+    """단계별 호출 수 / 스레드 CPU 시간 / 벽시계 시간을 누적합니다."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, stage: str, cpu_sec: float, wall_sec: float):
+        with self._lock:
+            calls, cpu, wall = self._stats.get(stage, (0, 0.0, 0.0))
+            self._stats[stage] = (calls + 1, cpu + cpu_sec, wall + wall_sec)
+
+    def measure(self, stage: str, fn, *args, **kwargs):
+        cpu_start, wall_start = time.thread_time(), time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.record(stage, time.thread_time() - cpu_start, time.perf_counter() - wall_start)
+
+    def wrap(self, stage: str, fn):
+        def wrapper(*args, **kwargs):
+            return self.measure(stage, fn, *args, **kwargs)
+        return wrapper
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            items = dict(self._stats)
+        return {
+            stage: {
+                "calls": calls,
+                "cpu_sec_total": cpu,
+                "cpu_ms_per_call": cpu / calls * 1000 if calls else 0.0,
+                "wall_ms_per_call": wall / calls * 1000 if calls else 0.0,
+            }
+            for stage, (calls, cpu, wall) in sorted(items.items())
+        }
+
+
+def _pcm_seed(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=4).digest(), "little")
+
+
+def _fake_sentence(pcm: bytes) -> str | None:
+    """PCM 내용으로 정해지는 가짜 인식 문장. 거의 무음이면 None"""
+    samples = np.frombuffer(pcm[: len(pcm) // 2 * 2], dtype=np.int16)
+    if samples.size == 0 or np.abs(samples).mean() < 50:
+        return None
+    return _FAKE_SENTENCES[_pcm_seed(pcm) % len(_FAKE_SENTENCES)]
+
+
+def _wav_duration_sec(wav_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+# --- STT ---
+
+class FakeGoogleSTTProvider:
+    """GoogleSTTProvider 와 같은 인터페이스(streaming/sync)를 가진 가짜 STT"""
+    def __init__(self, latency: LatencyModel, cpu_stats: CpuStats | None = None):
+        self.latency = latency
+        self.cpu_stats = cpu_stats
+
+    def streaming(self, audio_bytes: bytes, on_interim=None) -> str | None:
+        if self.cpu_stats:
+            return self.cpu_stats.measure("stt", self._recognize, audio_bytes, on_interim)
+        return self._recognize(audio_bytes, on_interim)
+
+    def sync(self, audio_bytes: bytes) -> str | None:
+        return self._recognize(audio_bytes)
+
+    def _recognize(self, audio_bytes: bytes, on_interim=None) -> str | None:
+        delay, failed = self.latency.sample()
+        # 거의 무음인 청크는 실제 STT처럼 빈 결과를 돌려줍니다.
+        sentence = None if failed else _fake_sentence(audio_bytes)
+        speech = sentence is not None
+        if on_interim is not None and speech and delay:
+            # 실제 스트리밍 STT 처럼 지연 시간의 절반쯤에 앞부분 단어로 중간 결과를 한 번 보냅니다.
+            time.sleep(delay / 2)
+            words = sentence.split()
+            on_interim(" ".join(words[: max(1, len(words) // 2)]))
+            delay /= 2
+        if delay:
+            time.sleep(delay)
+        return sentence  # 실제 구현도 에러 시 None 반환
+
+
+class FakeClovaSpeechClient:
+    """ClovaSpeechClient 와 같은 인터페이스(recognize_long/recognize_short)를 가진 가짜 클라이언트"""
+    def __init__(self, latency: LatencyModel, segment_sec: float = 3.0, speakers: int = 2):
+        self.latency = latency
+        self.segment_sec = segment_sec
+        self.speakers = max(1, speakers)
+
+    def recognize_long(self, audio_data: bytes, language="ko-KR") -> dict | None:
+        if self.latency.wait():
+            return None
+        duration_ms = int(_wav_duration_sec(audio_data) * 1000)
+        with wave.open(io.BytesIO(audio_data), "rb") as wf:
+            pcm = wf.readframes(wf.getnframes())
+        step_ms = int(self.segment_sec * 1000)
+        chunk_ms = _LIVE_CHUNK_BYTES * 1000 // (SAMPLE_RATE * 2)
+        segments = []
+        for i, start in enumerate(range(0, duration_ms, step_ms)):
+            end = min(start + step_ms, duration_ms)
+            if end - start < 300:
+                break
+            # 실시간 STT 가 같은 구간의 2초 청크에서 인식한 문장과 겹치도록, 구간 안에서 시작하는 청크의 문장을 이어 붙입니다.
+            # (FINALIZE_MODE=incremental 의 실시간 결과 재사용이 실제처럼 동작하도록)
+            sentences = [
+                _fake_sentence(pcm[k * _LIVE_CHUNK_BYTES:(k + 1) * _LIVE_CHUNK_BYTES])
+                for k in range(-(-start // chunk_ms), -(-end // chunk_ms))
+            ]
+            text = " ".join(s for s in sentences if s) or _FAKE_SENTENCES[i % len(_FAKE_SENTENCES)]
+            segments.append({
+                "text": text,
+                "speaker": {"label": str(i % self.speakers + 1)},
+                "start": start,
+                "end": end,
+            })
+        return {"segments": segments}
+
+    def recognize_short(self, audio_data: bytes, language="Kor") -> str | None:
+        if self.latency.wait():
+            return None
+        return _FAKE_SENTENCES[_pcm_seed(audio_data) % len(_FAKE_SENTENCES)]
+
+
+class FakeClovaSTTAdapter:
+    """ClovaSTTAdapter 와 같은 인터페이스(streaming/sync)를 가진 가짜 STT"""
+    def __init__(self, client: FakeClovaSpeechClient):
+        self.client = client
+
+    def streaming(self, audio_bytes: bytes, on_interim=None) -> str | None:
+        with io.BytesIO() as wav_io:
+            with wave.open(wav_io, "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(SAMPLE_RATE)
+                wf.writeframes(audio_bytes)
+            return self.client.recognize_short(wav_io.getvalue())
+
+    def sync(self, audio_bytes: bytes) -> dict | None:
+        return self.client.recognize_long(audio_bytes)
+
+
+# --- Gemini ---
+
+class FakeGemini:
+    """gemini_client 의 analyze_emotions / analyze_conversation_emotions 와 같은 동작을 하는 가짜 분석기"""
+    def __init__(self, text_latency: LatencyModel, audio_latency: LatencyModel, seed: int = 0,
+                 cpu_stats: CpuStats | None = None):
+        self.text_latency = text_latency
+        self.audio_latency = audio_latency
+        self.seed = seed
+        self.cpu_stats = cpu_stats
+
+    def _scores(self, keys: tuple, key_seed: int) -> dict:
+        rng = np.random.default_rng(self.seed * 1_000_003 + key_seed)
+        values = rng.dirichlet(np.ones(len(keys)))
+        return {k: round(float(v), 3) for k, v in zip(keys, values)}
+
+    @staticmethod
+    async def _call(priority, latency: LatencyModel) -> bool:
+        # 실제 gemini_client 와 같이 공유 토큰 버킷(gemini_scheduler)을 거쳐 비동기로 호출합니다. (스레드를 점유하지 않음)
+        from app.providers.gemini_scheduler import gemini_scheduler
+        return await gemini_scheduler.call_async(priority, latency.wait_async)
+
+    async def analyze_text_sentiment(self, text, context="", priority="realtime"):
+        if await self._call(priority, self.text_latency):
+            return None  # 실제 구현도 429 가 아닌 호출 오류는 None (해당 모달리티 건너뜀)
+        return self._scores(("positive", "negative", "neutral"), _pcm_seed((text or "").encode()))
+
+    async def analyze_audio_emotion(self, audio_array, priority="realtime"):
+        if await self._call(priority, self.audio_latency):
+            return None
+        key_seed = _pcm_seed(np.asarray(audio_array[:1600], dtype=np.float32).tobytes())
+        return self._scores(("happy", "sad", "angry", "fear", "disgust", "surprise", "neutral"), key_seed)
+
+    async def analyze_emotions(self, text, audio_array, context="", priority="realtime"):
+        from app.providers.circuit_breaker import CircuitOpenError
+        from app.utils.emotion_utils import format_analysis_result
+
+        start = time.perf_counter()
+        has_audio = audio_array is not None and audio_array.size > 0
+        if has_audio:
+            text_scores, audio_scores = await asyncio.gather(
+                self.analyze_text_sentiment(text, context, priority),
+                self.analyze_audio_emotion(audio_array, priority),
+            )
+        else:
+            text_scores = await self.analyze_text_sentiment(text, context, priority)
+            audio_scores = None
+        # 실제 구현과 같이 실패한 모달리티는 중립으로 채우지 않고(None) degraded 로 표시합니다.
+        if text_scores is None and audio_scores is None:
+            raise CircuitOpenError("gemini_text")
+        degraded = "audio_only" if text_scores is None else "text_only" if has_audio and audio_scores is None else None
+        result = format_analysis_result(text_scores, audio_scores)
+        if degraded:
+            result["degraded"] = degraded
+        if self.cpu_stats:
+            # 이벤트 루프에서 실행되므로 스레드 CPU 시간 대신 벽시계 시간만 기록합니다.
+            self.cpu_stats.record("emotion", 0.0, time.perf_counter() - start)
+        return result
+
+    async def analyze_conversation_emotions(self, segments: list) -> list:
+        if not segments:
+            return []
+        history = []
+        results = []
+        for seg in segments:
+            context = "\n".join(history[-3:])
+            if seg.get("result") is not None:
+                results.append(seg["result"])
+            else:
+                try:
+                    results.append(await self.analyze_emotions(seg.get("text", ""), seg.get("audio"), context, priority="batch"))
+                except Exception:
+                    results.append(None)  # 분석하지 못한 세그먼트 (NULL 점수로 저장)
+            history.append(f"Speaker {seg.get('speaker', 'Unknown')}: {seg.get('text', '')}")
+        return results
+
+
+# --- 음성 임베딩 ---
+
+class FakeVoiceEmbeddingService:
+    """VoiceEmbeddingService 와 같은 인터페이스를 가진 가짜 임베딩 추출기 (파일 내용 기반 결정적 벡터)"""
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+
+    def extract_voice_embedding(self, audio_path: str) -> np.ndarray | None:
+        if self.latency.wait():
+            return None
+        with open(audio_path, "rb") as f:
+            return self._embedding(f.read())
+
+    def extract_voice_embedding_from_array(self, signal: np.ndarray) -> np.ndarray | None:
+        if self.latency.wait():
+            return None
+        return self._embedding(np.asarray(signal, dtype=np.float32).tobytes())
+
+    def extract_voice_embedding_from_pcm(self, pcm_bytes: bytes) -> np.ndarray | None:
+        if self.latency.wait():
+            return None
+        return self._embedding(pcm_bytes)
+
+    def compute_frame_features(self, signal: np.ndarray) -> np.ndarray:
+        # 10ms 프레임 단위 (프레임 수, 1) 특징: 프레임 RMS
+        frames = np.asarray(signal, dtype=np.float32)[:len(signal) // 160 * 160].reshape(-1, 160)
+        return np.sqrt(np.mean(frames ** 2, axis=1, keepdims=True))
+
+    def encode_features(self, features: list[np.ndarray], max_frames: int | None = None) -> np.ndarray:
+        self.latency.wait()
+        feats = np.concatenate(features, axis=0)
+        if max_frames is not None:
+            feats = feats[-max_frames:]
+        return self._embedding(feats.tobytes())
+
+    @staticmethod
+    def _embedding(data: bytes) -> np.ndarray:
+        vec = np.random.default_rng(_pcm_seed(data)).standard_normal(EMBEDDING_DIM).astype(np.float32)
+        return vec / np.linalg.norm(vec)
+
+
+# --- DAO ---
+
+class _FakeDAOBase:
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+
+    def _query(self):
+        self.latency.wait()
+
+    def close(self):
+        pass
+
+
+class FakeUserConversationDAO(_FakeDAOBase):
+    def __init__(self, latency: LatencyModel):
+        super().__init__(latency)
+        self._ids = itertools.count(1)
+        self.masters = {}
+        self.details = {}
+
+    def insert_conversation_master(self, user_uid: int, topic: str | None = None) -> int:
+        self._query()
+        master_uid = next(self._ids)
+        self.masters[master_uid] = {"user_uid": user_uid, "topic": topic, "audio_path": None, "finalized": False}
+        self.details[master_uid] = []
+        return master_uid
+
+    def insert_conversation_detail(self, master_uid, sentence, speaker, text_scores, audio_scores,
+                                   dominant_emotion, start_ms, end_ms, is_user=None):
+        self._query()
+        self.details.setdefault(master_uid, []).append({
+            "sentence": sentence, "speaker": speaker, "dominant_emotion": dominant_emotion,
+            "start_ms": start_ms, "end_ms": end_ms, "is_user": is_user,
+        })
+
+    def delete_conversation_master(self, master_uid: int):
+        self._query()
+        self.masters.pop(master_uid, None)
+        self.details.pop(master_uid, None)
+
+    def update_master_audio_path(self, master_uid: int, audio_path: str):
+        self._query()
+        self.masters[master_uid]["audio_path"] = audio_path
+
+    def mark_master_finalized(self, master_uid: int):
+        self._query()
+        self.masters[master_uid]["finalized"] = True
+
+
+class FakeEmotionTrendDAO(_FakeDAOBase):
+    def add_conversation_to_trend(self, master_uid: int):
+        self._query()
+
+
+class FakeUserDAO(_FakeDAOBase):
+    """모든 사용자가 등록되어 있고, 음성 임베딩도 저장되어 있다고 가정합니다."""
+    def get_user_by_id(self, user_id: str):
+        self._query()
+        return {"uid": _pcm_seed(user_id.encode()) % 1_000_000, "user_id": user_id, "user_name": user_id, "created_at": ""}
+
+    def get_user_voice_embedding(self, user_uid: int):
+        self._query()
+        vec = np.random.default_rng(user_uid).standard_normal(EMBEDDING_DIM).astype(np.float32)
+        return vec / np.linalg.norm(vec)
+
+    def save_user_voice_embedding(self, user_uid: int, embedding: np.ndarray, sample_count: int = 1, spread: float = 0.0):
+        self._query()
+
+    def add_user_voice_sample(self, user_uid: int, embedding: np.ndarray, max_samples: int) -> list[np.ndarray]:
+        self._query()
+        return [embedding]
+
+    def get_user_voice_profile(self, user_uid: int):
+        self._query()
+        return {"sample_count": 1, "spread": 0.0, "updated_at": ""}
+
+    def register_user(self, user_id: str, user_name: str):
+        self._query()
+
+
+@dataclass
+class FakeProviders:
+    config: FakeProviderConfig
+    cpu_stats: CpuStats
+    streaming_stt: FakeGoogleSTTProvider
+    sync_stt: FakeClovaSTTAdapter
+    gemini: FakeGemini
+    voice: FakeVoiceEmbeddingService
+    conversation_dao: FakeUserConversationDAO
+    extra: dict = field(default_factory=dict)
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install_fake_providers(config: FakeProviderConfig | None = None) -> FakeProviders:
+    """
+    외부 API / 모델을 초기화하는 모듈을 sys.modules 에서 가짜 모듈로 바꾸고,
+    서비스 싱글턴의 Provider/DAO 를 가짜 구현으로 교체합니다.
+    반드시 app.endpoints / app.services 를 import 하기 전에 호출해야 합니다.
+    """
+    config = config or FakeProviderConfig()
+    cpu_stats = CpuStats()
+    seed = config.seed
+
+    def latency(spec, failure_rate=0.0, offset=0):
+        return LatencyModel(spec, failure_rate, seed * 100 + offset)
+
+    streaming_stt = FakeGoogleSTTProvider(latency(config.stt_latency, config.stt_failure_rate, 1), cpu_stats)
+    clova_client = FakeClovaSpeechClient(latency(config.clova_latency, config.clova_failure_rate, 2),
+                                         config.segment_sec, config.speakers)
+    sync_stt = FakeClovaSTTAdapter(clova_client)
+    gemini = FakeGemini(latency(config.gemini_text_latency, config.gemini_failure_rate, 3),
+                        latency(config.gemini_audio_latency, config.gemini_failure_rate, 4),
+                        seed, cpu_stats)
+    voice = FakeVoiceEmbeddingService(latency(config.voice_latency, 0.0, 5))
+
+    from app.utils import emotion_utils
+
+    # import 시점에 인증/네트워크/모델 로드를 하는 모듈을 가짜 모듈로 대체
+    sys.modules["app.providers.gemini_client"] = _module(
+        "app.providers.gemini_client",
+        analyze_emotions=gemini.analyze_emotions,
+        analyze_conversation_emotions=gemini.analyze_conversation_emotions,
+        analyze_text_sentiment=gemini.analyze_text_sentiment,
+        analyze_audio_emotion=gemini.analyze_audio_emotion,
+        model=None,
+        **{name: getattr(emotion_utils, name) for name in (
+            "EMOTION_COLORS", "EMOTION_MAPPING", "EMOTION_MAP", "get_dominant_emotion",
+            "map_emotion_to_standard", "map_emotion_to_korean", "map_emotion_to_color",
+            "format_analysis_result")},
+    )
+    sys.modules["app.providers.google_stt_client"] = _module(
+        "app.providers.google_stt_client", GoogleSTTProvider=lambda: streaming_stt)
+    sys.modules["app.providers.clova_speech_client"] = _module(
+        "app.providers.clova_speech_client", ClovaSpeechClient=lambda: clova_client)
+    sys.modules["app.services.voice_service"] = _module(
+        "app.services.voice_service", VoiceEmbeddingService=lambda: voice, voice_embedding_service=voice,
+        extract_voice_embedding_from_pcm=voice.extract_voice_embedding_from_pcm)
+
+    from app.providers import stt_provider
+    from app.services import analyze_service as analyze_service_module
+    from app.services.user_services import user_service
+    from app.services.user_voice_service import user_voice_service
+
+    stt_provider._google_stt_provider = streaming_stt
+    stt_provider._clova_stt_provider = sync_stt
+
+    conversation_dao = FakeUserConversationDAO(latency(config.db_latency, 0.0, 6))
+    user_dao = FakeUserDAO(latency(config.db_latency, 0.0, 7))
+    service = analyze_service_module.analyze_service
+    trend_dao = FakeEmotionTrendDAO(latency(config.db_latency, 0.0, 8))
+    service._new_daos = lambda: (conversation_dao, trend_dao)
+    user_service.user_dao = user_dao
+    user_voice_service.user_dao = user_dao
+
+    # 실제 CPU를 쓰는 단계(librosa 디코딩, 음성 비교)도 스레드 CPU 시간을 측정하도록 감쌉니다.
+    librosa_module = analyze_service_module.librosa
+    analyze_service_module.librosa = _module(
+        "librosa_timed", load=cpu_stats.wrap("audio_decode", librosa_module.load))
+    service._compare_voice_in_memory = cpu_stats.wrap("voice_compare", service._compare_voice_in_memory)
+    service._prepare_final_segments = cpu_stats.wrap("finalize", service._prepare_final_segments)
+    service._save_final_results = cpu_stats.wrap("finalize_save", service._save_final_results)
+
+    return FakeProviders(config, cpu_stats, streaming_stt, sync_stt, gemini, voice, conversation_dao)
@@ -0,0 +1,464 @@
+"""
+실시간 분석 파이프라인(/ws/analyze) 오프라인 벤치마크
+
+외부 API 인증 정보 없이 fake_providers.py 의 가짜 Provider 로 파이프라인 처리량을 측정합니다.
+서버를 띄우지 않고 같은 프로세스에서 ASGI 웹소켓 세션 N개를 동시에 구동하며,
+합성 음성 PCM(signals.py)을 100ms 프레임 단위로 전송합니다.
+
+측정 항목:
+    - 청크 지연 시간(2초 청크가 완성된 시점 → 결과 수신) p50/p90/p95/p99
+    - 첫 결과까지 시간, 결과 누락률
+    - 순서 보장 대기 시간(result_order_wait_seconds), 단계별 평균 시간(pipeline_stage_seconds)
+    - 단계별 CPU 시간(스레드 CPU 기준)
+    - 세션당 메모리(tracemalloc 피크 기준 근사치)
+    - 종료 요청(end_conversation) → finalized 응답까지 시간 (남은 청크 전송 + 후처리)
+    - (--progressive) 청크 완성 → 첫 선행 메시지(transcript_interim/transcript_final/emotion_estimate)까지 시간
+    - 결과 메시지 전송량(websocket_sent_bytes_total, --encoding 별)
+    - (--reconnect-every) 연결이 주기적으로 끊겨도 결과 누락 없이 이어지는지 (drop_rate, resumed_connections)
+    - (--finalize-mode incremental) 최종 분석에서 실시간 결과를 재사용한 세그먼트 비율 (finalize_reuse)
+
+사용법:
+    python test/bench/pipeline_bench.py --sessions 20 --duration 30 --rate 4 --output storage/bench/baseline.json
+    python test/bench/pipeline_bench.py --sessions 20 --duration 30 --rate 4 --compare storage/bench/baseline.json
+    python test/bench/pipeline_bench.py --sessions 20 --duration 30 --progressive
+    python test/bench/pipeline_bench.py --sessions 20 --duration 30 --encoding binary
+    python test/bench/pipeline_bench.py --sessions 20 --duration 30 --reconnect-every 7
+    python test/bench/pipeline_bench.py --sessions 20 --duration 30 --finalize-mode incremental
+
+    --rate 는 실시간 대비 전송 속도 배율입니다. (1 = 실시간, 0 = 대기 없이 최대 속도)
+    --compare 결과 대비 --threshold(기본 15%) 이상 나빠진 지표가 있으면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_providers import FakeProviderConfig, install_fake_providers
+from signals import BYTES_PER_SEC, synth_speech_pcm
+
+FRAME_SEC = 0.1
+CHUNK_SEC = 2.0  # live_session_service 의 CHUNK_DURATION_SEC 와 동일
+
+# 비교 시 값이 클수록 나쁜 지표 (요약 dict 의 키 경로)
+REGRESSION_KEYS = [
+    ("chunk_latency_ms", "p50"),
+    ("chunk_latency_ms", "p95"),
+    ("chunk_latency_ms", "p99"),
+    ("first_result_ms", "mean"),
+    ("order_wait_ms", "mean"),
+    ("finalize_ms", "mean"),
+    ("memory", "peak_kb_per_session"),
+    ("drop_rate",),
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def distribution(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": statistics.mean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+class ASGIWebSocketSession:
+    """ASGI 앱에 직접 연결하는 최소한의 웹소켓 클라이언트 (네트워크/서버 없이 같은 이벤트 루프에서 구동)"""
+    def __init__(self, app, path: str, client_port: int):
+        self.app = app
+        self.scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "http_version": "1.1",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", client_port),
+            "server": ("bench", 80),
+            "subprotocols": [],
+            "state": {},
+        }
+        self._to_app = asyncio.Queue()
+        self._from_app = asyncio.Queue()
+        self.app_task = None
+        self.closed = False
+
+    async def connect(self):
+        async def receive():
+            return await self._to_app.get()
+
+        async def send(message):
+            await self._from_app.put(message)
+
+        self.app_task = asyncio.create_task(self.app(self.scope, receive, send))
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await self._from_app.get()
+        if message["type"] != "websocket.accept":
+            raise RuntimeError(f"웹소켓 연결 거부: {message}")
+
+    async def send_text(self, text: str):
+        await self._to_app.put({"type": "websocket.receive", "text": text})
+
+    async def send_bytes(self, data: bytes):
+        await self._to_app.put({"type": "websocket.receive", "bytes": data})
+
+    async def receive(self, timeout: float | None = None) -> dict | None:
+        """다음 메시지를 반환합니다. 서버가 연결을 닫으면 None"""
+        if self.closed:
+            return None
+        message = await asyncio.wait_for(self._from_app.get(), timeout)
+        if message["type"] == "websocket.close":
+            self.closed = True
+            return None
+        return message
+
+    async def disconnect(self, code: int = 1000):
+        await self._to_app.put({"type": "websocket.disconnect", "code": code})
+
+    def close_local(self):
+        """클라이언트 쪽에서 끊은 뒤, 이미 받은 메시지를 다 읽으면 receive 가 None 을 반환하도록 합니다."""
+        self._from_app.put_nowait({"type": "websocket.close"})
+
+
+async def run_session(app, index: int, args, pcm: bytes, record: dict):
+    from app.utils.result_codec import decode_frame
+
+    chunk_bytes = int(CHUNK_SEC * BYTES_PER_SEC)
+    frame_bytes = int(FRAME_SEC * BYTES_PER_SEC)
+    reconnect_bytes = int(args.reconnect_every * BYTES_PER_SEC)
+    expected = len(pcm) // chunk_bytes
+    chunk_completed_at = {}
+    latencies, received_ids = [], set()
+    first_feedback = {}
+    resume_token = None
+
+    start = time.perf_counter()
+    first_result_at = None
+    finalized_at = None
+
+    async def reader(ws, encoding):
+        nonlocal first_result_at, finalized_at
+        while True:
+            message = await ws.receive()
+            if message is None:
+                return
+            payload = decode_frame(message, encoding) or {}
+            event = payload.get("event")
+            if event == "finalized":
+                finalized_at = time.perf_counter()
+                continue
+            if event in ("transcript_interim", "transcript_final", "emotion_estimate"):
+                utterance_id = payload.get("utterance_id")
+                if utterance_id in chunk_completed_at and utterance_id not in first_feedback:
+                    first_feedback[utterance_id] = (time.perf_counter() - chunk_completed_at[utterance_id]) * 1000
+                continue
+            if event not in ("emotion_analysis", "emotion_update"):
+                continue
+            now = time.perf_counter()
+            chunk_id = payload.get("chunk_id")
+            received_ids.add(chunk_id)
+            if first_result_at is None:
+                first_result_at = now
+            if chunk_id in chunk_completed_at:
+                latencies.append((now - chunk_completed_at[chunk_id]) * 1000)
+
+    async def open_connection():
+        """연결 후 초기 설정을 보내고 (웹소켓, reader Task, 서버가 받은 바이트 수)를 반환합니다."""
+        ws = ASGIWebSocketSession(app, "/ws/analyze", 50000 + index)
+        await ws.connect()
+        setup_message = {
+            "event": "send_conversation",
+            "user_info": {"user_id": f"bench_user_{index}"},
+            "progressive": args.progressive,
+            "encoding": args.encoding,
+        }
+        if reconnect_bytes > 0:
+            setup_message["resumable"] = True
+            if resume_token:
+                setup_message["resume_token"] = resume_token
+        await ws.send_text(json.dumps(setup_message))
+        setup = await ws.receive(timeout=30)
+        setup_payload = json.loads(setup.get("text") or "{}") if setup else {}
+        if setup_payload.get("status") != "ok":
+            raise RuntimeError(f"세션 {index} 초기 설정 실패: {setup}")
+        if setup_payload.get("resumed"):
+            record["resumed"] += 1
+        # 서버가 요청한 인코딩을 쓸 수 없으면 json 으로 응답합니다.
+        encoding = record["encoding"] = setup_payload.get("encoding", "json")
+        reader_task = asyncio.create_task(reader(ws, encoding))
+        return ws, reader_task, setup_payload
+
+    ws, reader_task, setup_payload = await open_connection()
+    resume_token = setup_payload.get("resume_token")
+
+    # 프레임 전송 (rate 배율만큼 실시간보다 빠르게)
+    position = 0
+    next_reconnect_at = reconnect_bytes
+    while position < len(pcm):
+        if reconnect_bytes > 0 and position >= next_reconnect_at:
+            # 연결 끊김 재현: 서버 핸들러가 끝나면 받은 메시지까지 읽고 같은 토큰으로 재연결합니다.
+            next_reconnect_at += reconnect_bytes
+            await ws.disconnect(code=1006)
+            await ws.app_task
+            ws.close_local()
+            await reader_task
+            ws, reader_task, setup_payload = await open_connection()
+            resume_token = setup_payload.get("resume_token")
+            position = setup_payload.get("offset", position)
+        frame = pcm[position:position + frame_bytes]
+        await ws.send_bytes(frame)
+        position += len(frame)
+        if position // chunk_bytes > len(chunk_completed_at):
+            chunk_completed_at[len(chunk_completed_at)] = time.perf_counter()
+        if args.rate > 0:
+            target = start + position / BYTES_PER_SEC / args.rate
+            delay = target - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+
+    # 종료 요청: 서버가 남은 청크 결과를 모두 보낸 뒤 finalize_analysis 를 수행하고 finalized 이벤트를 보냅니다.
+    end_at = time.perf_counter()
+    await ws.send_text(json.dumps({"event": "end_conversation"}))
+    await asyncio.wait_for(reader_task, args.finalize_timeout)
+    await ws.app_task
+    finalize_ms = (finalized_at - end_at) * 1000 if finalized_at else None
+
+    record["chunk_latency_ms"].extend(latencies)
+    record["first_feedback_ms"].extend(first_feedback.values())
+    record["expected_chunks"] += expected
+    record["received_chunks"] += len(received_ids)
+    if finalize_ms is not None:
+        record["finalize_ms"].append(finalize_ms)
+    if first_result_at is not None:
+        record["first_result_ms"].append((first_result_at - start) * 1000)
+
+
+def histogram_mean_ms(histogram, **labels) -> float:
+    count, total = histogram.snapshot(**labels)
+    return total / count * 1000 if count else 0.0
+
+
+async def run_benchmark(app, args, metrics) -> dict:
+    record = {
+        "chunk_latency_ms": [],
+        "first_feedback_ms": [],
+        "first_result_ms": [],
+        "finalize_ms": [],
+        "expected_chunks": 0,
+        "received_chunks": 0,
+        "encoding": args.encoding,
+        "resumed": 0,
+    }
+    # 세션마다 다른 화자 신호(seed)를 사용
+    pcms = [synth_speech_pcm(args.duration, seed=args.seed * 1000 + i) for i in range(args.sessions)]
+
+    tracemalloc.start()
+    baseline_mem, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+
+    tasks = []
+    for i in range(args.sessions):
+        tasks.append(asyncio.create_task(run_session(app, i, args, pcms[i], record)))
+        if args.ramp > 0:
+            await asyncio.sleep(args.ramp / args.sessions)
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    _, peak_mem = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    errors = [repr(o) for o in outcomes if isinstance(o, Exception)]
+    expected = record["expected_chunks"]
+    stages = ("stt", "audio_decode", "emotion", "emotion_estimate", "voice_compare", "finalize", "clova_long", "final_emotion")
+    return {
+        "sessions": args.sessions,
+        "session_errors": errors,
+        "wall_sec": wall,
+        "process_cpu_sec": cpu,
+        "chunks_expected": expected,
+        "chunks_received": record["received_chunks"],
+        "drop_rate": 1 - record["received_chunks"] / expected if expected else 0.0,
+        "throughput_chunks_per_sec": record["received_chunks"] / wall if wall else 0.0,
+        "chunk_latency_ms": distribution(record["chunk_latency_ms"]),
+        "first_feedback_ms": distribution(record["first_feedback_ms"]),
+        "first_result_ms": distribution(record["first_result_ms"]),
+        "finalize_ms": distribution(record["finalize_ms"]),
+        "order_wait_ms": {
+            "mean": histogram_mean_ms(metrics.RESULT_ORDER_WAIT_SECONDS),
+            "count": metrics.RESULT_ORDER_WAIT_SECONDS.snapshot()[0],
+        },
+        "server_end_to_end_ms": {"mean": histogram_mean_ms(metrics.CHUNK_END_TO_END_SECONDS)},
+        "encoding": record["encoding"],
+        "resumed_connections": record["resumed"],
+        "sent_kb": metrics.WEBSOCKET_SENT_BYTES_TOTAL.value(encoding=record["encoding"]) / 1024,
+        "finalize_reuse": {result: metrics.FINALIZE_SEGMENTS_TOTAL.value(result=result) for result in ("reused", "computed")},
+        "stage_wall_ms": {s: histogram_mean_ms(metrics.PIPELINE_STAGE_SECONDS, stage=s) for s in stages},
+        "memory": {
+            # 동시에 살아있는 세션들이 나눠 쓴 피크이므로 세션당 값은 근사치입니다.
+            "traced_peak_kb": (peak_mem - baseline_mem) / 1024,
+            "peak_kb_per_session": (peak_mem - baseline_mem) / 1024 / max(1, args.sessions),
+        },
+    }
+
+
+def _lookup(data: dict, path: tuple):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """기준 결과 대비 threshold(비율) 이상 나빠진 지표 목록을 반환합니다."""
+    regressions = []
+    for path in REGRESSION_KEYS:
+        now, before = _lookup(current["summary"], path), _lookup(baseline.get("summary", {}), path)
+        if now is None or before is None:
+            continue
+        name = ".".join(path)
+        if path == ("drop_rate",):
+            # 누락률은 비율 자체가 작으므로 절대값 차이로 비교
+            if now - before > threshold / 10:
+                regressions.append(f"{name}: {before:.4f} -> {now:.4f}")
+        elif before > 0 and (now - before) / before > threshold:
+            regressions.append(f"{name}: {before:.2f} -> {now:.2f} (+{(now - before) / before * 100:.1f}%)")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="실시간 분석 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--sessions", type=int, default=10, help="동시 세션 수")
+    parser.add_argument("--duration", type=float, default=20.0, help="세션당 음성 길이(초)")
+    parser.add_argument("--rate", type=float, default=1.0, help="실시간 대비 전송 속도 배율 (0 = 최대 속도)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="세션 시작을 분산할 시간(초)")
+    parser.add_argument("--finalize-timeout", type=float, default=120.0, help="종료 요청 후 finalized 응답 대기 최대 시간(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--progressive", action="store_true", help="progressive 결과 프로토콜 사용 (선행 메시지 지연 측정)")
+    parser.add_argument("--reconnect-every", type=float, default=0.0,
+                        help="N초 분량을 보낼 때마다 연결을 끊고 resume_token 으로 재연결 (0 = 사용 안 함)")
+    parser.add_argument("--encoding", default="json", choices=("json", "msgpack", "binary"), help="결과 메시지 인코딩")
+    parser.add_argument("--finalize-mode", default="full", choices=("full", "incremental"), help="최종 분석 모드 (FINALIZE_MODE)")
+    parser.add_argument("--stt-latency", default=FakeProviderConfig.stt_latency)
+    parser.add_argument("--stt-failure-rate", type=float, default=0.0)
+    parser.add_argument("--clova-latency", default=FakeProviderConfig.clova_latency)
+    parser.add_argument("--clova-failure-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-text-latency", default=FakeProviderConfig.gemini_text_latency)
+    parser.add_argument("--gemini-audio-latency", default=FakeProviderConfig.gemini_audio_latency)
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--voice-latency", default=FakeProviderConfig.voice_latency)
+    parser.add_argument("--db-latency", default=FakeProviderConfig.db_latency)
+    parser.add_argument("--label", default="", help="결과 파일에 남길 실행 이름 (예: 브랜치명)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (기본: storage/bench/pipeline_<시각>.json)")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.15, help="회귀로 판단할 악화 비율 (기본 0.15)")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    config = FakeProviderConfig(
+        seed=args.seed,
+        stt_latency=args.stt_latency,
+        stt_failure_rate=args.stt_failure_rate,
+        clova_latency=args.clova_latency,
+        clova_failure_rate=args.clova_failure_rate,
+        gemini_text_latency=args.gemini_text_latency,
+        gemini_audio_latency=args.gemini_audio_latency,
+        gemini_failure_rate=args.gemini_failure_rate,
+        voice_latency=args.voice_latency,
+        db_latency=args.db_latency,
+    )
+    # app 모듈이 import 시점에 읽으므로 가짜 Provider 설치(app.services import) 전에 설정합니다.
+    os.environ["FINALIZE_MODE"] = args.finalize_mode
+    fakes = install_fake_providers(config)
+
+    # 가짜 Provider 설치 이후에 import 해야 실제 API 클라이언트가 초기화되지 않습니다.
+    from fastapi import FastAPI
+    from app.endpoints.ws_analyze import router as ws_analyze_router
+    from app.utils import metrics
+
+    app = FastAPI()
+    app.include_router(ws_analyze_router)
+
+    summary = asyncio.run(run_benchmark(app, args, metrics))
+    result = {
+        "label": args.label,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "fake_providers": fakes.config.to_dict(),
+        "summary": summary,
+        "cpu_by_stage": fakes.cpu_stats.to_dict(),
+    }
+
+    output_path = args.output or os.path.join(
+        project_root, "storage", "bench", f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    latency = summary["chunk_latency_ms"]
+    print(f"세션 {summary['sessions']}개, 청크 {summary['chunks_received']}/{summary['chunks_expected']} "
+          f"(누락률 {summary['drop_rate'] * 100:.1f}%), 처리량 {summary['throughput_chunks_per_sec']:.2f} chunks/s")
+    print(f"청크 지연(ms) p50={latency['p50']:.0f} p95={latency['p95']:.0f} p99={latency['p99']:.0f}, "
+          f"순서 대기 평균 {summary['order_wait_ms']['mean']:.0f}ms, "
+          f"finalize 평균 {summary['finalize_ms']['mean']:.0f}ms, "
+          f"세션당 메모리 ~{summary['memory']['peak_kb_per_session']:.0f}KB")
+    if args.progressive:
+        feedback = summary["first_feedback_ms"]
+        print(f"첫 선행 메시지(ms) p50={feedback['p50']:.0f} p95={feedback['p95']:.0f} p99={feedback['p99']:.0f}")
+    print(f"결과 전송량({summary['encoding']}) {summary['sent_kb']:.1f}KB")
+    if args.finalize_mode == "incremental":
+        reuse = summary["finalize_reuse"]
+        print(f"최종 분석 감정 재사용 세그먼트 {reuse['reused']:.0f}/{reuse['reused'] + reuse['computed']:.0f}")
+    if summary["session_errors"]:
+        print(f"세션 에러 {len(summary['session_errors'])}건: {summary['session_errors'][:3]}")
+    print(f"결과 저장: {output_path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(result, baseline, args.threshold)
+        if regressions:
+            print(f"성능 회귀 감지 (기준: {args.compare}, 임계값 {args.threshold * 100:.0f}%)")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"성능 회귀 없음 (기준: {args.compare})")
+
+
+if __name__ == "__main__":
+    main()
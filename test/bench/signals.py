@@ -0,0 +1,49 @@
+"""
+벤치마크/부하 테스트용 오디오 신호 유틸리티
+
+- synth_speech_pcm: 음성과 비슷한 합성 신호(기본 주파수 + 배음, 음절 단위 진폭 변조, 잡음)를
+  16kHz / 16bit / mono PCM 바이트로 생성합니다. seed가 같으면 항상 같은 신호를 만듭니다.
+- load_wav_pcm: WAV 파일을 읽어 16kHz / 16bit / mono PCM 바이트로 반환합니다.
+"""
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+BYTES_PER_SEC = SAMPLE_RATE * 2
+
+
+def synth_speech_pcm(duration_sec: float, seed: int = 0, sample_rate: int = SAMPLE_RATE) -> bytes:
+    rng = np.random.default_rng(seed)
+    n = int(duration_sec * sample_rate)
+    t = np.arange(n) / sample_rate
+
+    # 화자별로 다른 기본 주파수(남/여 음역대)와 느린 억양 변화
+    f0 = rng.uniform(100, 220) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.2, 0.6) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    signal = sum((0.6 / k) * np.sin(k * phase) for k in range(1, 6))
+
+    # 초당 약 4음절의 진폭 변조 + 문장 사이 쉼(무음) 구간
+    syllable = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3.0, 5.0) * t)) ** 2
+    pauses = (np.sin(2 * np.pi * 0.15 * t + rng.uniform(0, np.pi)) > -0.6).astype(np.float64)
+    signal = signal * syllable * pauses + rng.normal(0, 0.01, n)
+
+    signal = signal / (np.max(np.abs(signal)) + 1e-9) * 0.6
+    return (signal * 32767).astype(np.int16).tobytes()
+
+
+def load_wav_pcm(path: str) -> bytes:
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"16bit WAV만 지원합니다: {path}")
+        frames = wf.readframes(wf.getnframes())
+        samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
+        if wf.getnchannels() > 1:
+            samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1)
+        rate = wf.getframerate()
+    if rate != SAMPLE_RATE:
+        # 간단한 선형 보간 리샘플링 (부하 테스트용으로 충분한 정확도)
+        duration = len(samples) / rate
+        target = np.linspace(0, len(samples) - 1, int(duration * SAMPLE_RATE))
+        samples = np.interp(target, np.arange(len(samples)), samples)
+    return samples.astype(np.int16).tobytes()
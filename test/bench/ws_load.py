@@ -0,0 +1,334 @@
+"""
+웹소켓 부하/소크(soak) 테스트 도구
+
+실행 중인 서버에 /ws/analyze, /ws/users 세션을 수백 개 동시에 열어 연결 한계와 이벤트 루프 블로킹을 확인합니다.
+WAV 파일 또는 합성 음성(signals.py)을 실시간 또는 배속으로 재생하며, 각 엔드포인트의 설정 프로토콜을 따릅니다.
+    - /ws/analyze: send_conversation → 음성 바이너리 → end_conversation → finalized 응답
+    - /ws/users  : register_voice    → 음성 바이너리 → end_register_voice → register_voice_done 응답
+
+세션별 측정 항목:
+    - 연결 시간, 첫 결과까지 시간(time-to-first-result)
+    - 결과 간 간격(gap) - 다른 세션의 finalize_analysis 가 이벤트 루프를 막으면 간격이 튀어 오릅니다.
+    - 종료 요청 → finalized(또는 register_voice_done) 까지 시간
+
+사용법:
+    # 200 세션을 30초에 걸쳐 열고, 60초 분량 합성 음성을 실시간으로 전송
+    python test/bench/ws_load.py --url ws://localhost:8000 --sessions 200 --ramp-up 30 --duration 60
+
+    # 연결 한계 탐색: 20초마다 50 세션씩 추가, 첫 결과 p95 가 5초를 넘거나 에러율이 5%를 넘으면 중단
+    python test/bench/ws_load.py --url ws://localhost:8000 --step-sessions 50 --step-interval 20 \\
+        --max-sessions 1000 --duration 600 --slo-ttfr-ms 5000
+
+    # WAV 파일 재생 + 사용자 음성 등록 세션 10% 혼합 + 여러 워커에 라운드 로빈 분배
+    python test/bench/ws_load.py --url ws://host1:8000 --url ws://host2:8000 --wav sample.wav --users-ratio 0.1
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from signals import BYTES_PER_SEC, load_wav_pcm, synth_speech_pcm
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+
+FRAME_SEC = 0.1
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def distribution(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": statistics.mean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+class SessionResult:
+    def __init__(self, index: int, kind: str, url: str, step: int):
+        self.index = index
+        self.kind = kind
+        self.url = url
+        self.step = step
+        self.started_at = None
+        self.connect_ms = None
+        self.ttfr_ms = None
+        self.gaps_ms = []
+        self.results = 0
+        self.finalize_ms = None
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "kind": self.kind,
+            "url": self.url,
+            "step": self.step,
+            "connect_ms": self.connect_ms,
+            "ttfr_ms": self.ttfr_ms,
+            "results": self.results,
+            "gap_ms": distribution(self.gaps_ms) if self.gaps_ms else None,
+            "finalize_ms": self.finalize_ms,
+            "error": self.error,
+        }
+
+
+async def stream_audio(ws, pcm: bytes, duration: float, rate: float, stop: asyncio.Event):
+    """pcm 을 100ms 프레임으로 duration 초 분량만큼 반복 재생합니다. (rate 배속, 0이면 대기 없이 전송)"""
+    frame_bytes = int(FRAME_SEC * BYTES_PER_SEC)
+    total_frames = int(duration / FRAME_SEC)
+    start = time.perf_counter()
+    for i in range(total_frames):
+        if stop.is_set():
+            return
+        offset = (i * frame_bytes) % max(1, len(pcm) - frame_bytes)
+        await ws.send(pcm[offset:offset + frame_bytes])
+        if rate > 0:
+            delay = start + (i + 1) * FRAME_SEC / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+async def run_analyze_session(result: SessionResult, pcm: bytes, args, stop: asyncio.Event):
+    connect_start = time.perf_counter()
+    async with websockets.connect(f"{result.url}/ws/analyze", max_size=None, open_timeout=args.connect_timeout) as ws:
+        result.connect_ms = (time.perf_counter() - connect_start) * 1000
+        await ws.send(json.dumps({"event": "send_conversation", "user_info": {"user_id": f"{args.user_prefix}{result.index}"}}))
+        setup = json.loads(await asyncio.wait_for(ws.recv(), args.connect_timeout))
+        if setup.get("status") != "ok":
+            raise RuntimeError(f"setup 실패: {setup}")
+
+        stream_start = time.perf_counter()
+        finalized = asyncio.get_running_loop().create_future()
+
+        async def reader():
+            last_at = None
+            async for message in ws:
+                if isinstance(message, bytes):
+                    continue
+                payload = json.loads(message)
+                now = time.perf_counter()
+                if payload.get("event") == "finalized":
+                    finalized.set_result(now)
+                    return
+                result.results += 1
+                if result.ttfr_ms is None:
+                    result.ttfr_ms = (now - stream_start) * 1000
+                if last_at is not None:
+                    result.gaps_ms.append((now - last_at) * 1000)
+                last_at = now
+
+        reader_task = asyncio.create_task(reader())
+        try:
+            await stream_audio(ws, pcm, args.duration, args.rate, stop)
+            end_at = time.perf_counter()
+            await ws.send(json.dumps({"event": "end_conversation"}))
+            finalized_at = await asyncio.wait_for(finalized, args.finalize_timeout)
+            result.finalize_ms = (finalized_at - end_at) * 1000
+        finally:
+            reader_task.cancel()
+
+
+async def run_users_session(result: SessionResult, pcm: bytes, args, stop: asyncio.Event):
+    connect_start = time.perf_counter()
+    async with websockets.connect(f"{result.url}/ws/users", max_size=None, open_timeout=args.connect_timeout) as ws:
+        result.connect_ms = (time.perf_counter() - connect_start) * 1000
+        user_id = f"{args.user_prefix}{result.index}"
+        await ws.send(json.dumps({"event": "register_voice", "user_info": {"user_id": user_id}}))
+        setup = json.loads(await asyncio.wait_for(ws.recv(), args.connect_timeout))
+        if setup.get("status") != "ok":
+            raise RuntimeError(f"setup 실패: {setup}")
+
+        await stream_audio(ws, pcm, args.register_sec, args.rate, stop)
+        end_at = time.perf_counter()
+        await ws.send(json.dumps({"event": "end_register_voice"}))
+        while True:
+            payload = json.loads(await asyncio.wait_for(ws.recv(), args.finalize_timeout))
+            if payload.get("event") == "register_voice_done":
+                result.finalize_ms = (time.perf_counter() - end_at) * 1000
+                result.results = 1 if payload.get("status") == "ok" else 0
+                return
+
+
+async def run_session(result: SessionResult, pcm: bytes, args, stop: asyncio.Event):
+    result.started_at = time.perf_counter()
+    try:
+        if result.kind == "users":
+            await run_users_session(result, pcm, args, stop)
+        else:
+            await run_analyze_session(result, pcm, args, stop)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+
+def summarize(results: list[SessionResult]) -> dict:
+    analyze = [r for r in results if r.kind == "analyze"]
+    users = [r for r in results if r.kind == "users"]
+    errors = [r for r in results if r.error]
+    return {
+        "sessions": len(results),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(results) if results else 0.0,
+        "error_samples": sorted({r.error for r in errors})[:10],
+        "connect_ms": distribution([r.connect_ms for r in results if r.connect_ms is not None]),
+        "analyze": {
+            "sessions": len(analyze),
+            "ttfr_ms": distribution([r.ttfr_ms for r in analyze if r.ttfr_ms is not None]),
+            "gap_ms": distribution([g for r in analyze for g in r.gaps_ms]),
+            "finalize_ms": distribution([r.finalize_ms for r in analyze if r.finalize_ms is not None]),
+            "results_total": sum(r.results for r in analyze),
+        },
+        "users": {
+            "sessions": len(users),
+            "register_ms": distribution([r.finalize_ms for r in users if r.finalize_ms is not None]),
+            "registered": sum(r.results for r in users),
+        },
+        # 여러 --url(워커/노드)로 나눠 보낸 경우 대상별 처리량 비교용
+        "per_url": {
+            url: {
+                "sessions": sum(1 for r in analyze if r.url == url),
+                "results_total": sum(r.results for r in analyze if r.url == url),
+                "errors": sum(1 for r in results if r.url == url and r.error),
+            }
+            for url in sorted({r.url for r in results})
+        },
+    }
+
+
+def violates_slo(summary: dict, args) -> list[str]:
+    reasons = []
+    if summary["error_rate"] > args.slo_error_rate:
+        reasons.append(f"에러율 {summary['error_rate'] * 100:.1f}% > {args.slo_error_rate * 100:.1f}%")
+    ttfr = summary["analyze"]["ttfr_ms"]
+    if ttfr["count"] and ttfr["p95"] > args.slo_ttfr_ms:
+        reasons.append(f"첫 결과 p95 {ttfr['p95']:.0f}ms > {args.slo_ttfr_ms:.0f}ms")
+    gap = summary["analyze"]["gap_ms"]
+    if gap["count"] and gap["p95"] > args.slo_gap_ms:
+        reasons.append(f"결과 간격 p95 {gap['p95']:.0f}ms > {args.slo_gap_ms:.0f}ms")
+    return reasons
+
+
+async def run_load(args, pcm: bytes) -> dict:
+    urls = itertools.cycle(args.url)
+    stop = asyncio.Event()
+    results, tasks = [], []
+    users_every = round(1 / args.users_ratio) if args.users_ratio > 0 else 0
+
+    def launch(step: int):
+        index = len(results)
+        kind = "users" if users_every and index % users_every == users_every - 1 else "analyze"
+        result = SessionResult(index, kind, next(urls).rstrip("/"), step)
+        results.append(result)
+        tasks.append(asyncio.create_task(run_session(result, pcm, args, stop)))
+
+    started = time.perf_counter()
+    steps = []
+    if args.step_sessions:
+        # 연결 한계 탐색: 단계마다 세션을 추가하고, 해당 단계에서 시작한 세션으로 SLO 를 판정합니다.
+        ceiling = 0
+        step = 0
+        while len(results) < args.max_sessions:
+            for _ in range(min(args.step_sessions, args.max_sessions - len(results))):
+                launch(step)
+                await asyncio.sleep(args.step_interval / args.step_sessions / 4)
+            await asyncio.sleep(args.step_interval * 3 / 4)
+            step_summary = summarize([r for r in results if r.step == step])
+            reasons = violates_slo(step_summary, args)
+            steps.append({"step": step, "total_sessions": len(results), "summary": step_summary, "slo_violations": reasons})
+            print(f"[단계 {step}] 세션 {len(results)}개, 첫 결과 p95 {step_summary['analyze']['ttfr_ms']['p95']:.0f}ms, "
+                  f"간격 p95 {step_summary['analyze']['gap_ms']['p95']:.0f}ms, 에러 {step_summary['errors']}건")
+            if reasons:
+                print(f"  SLO 위반: {', '.join(reasons)}")
+                break
+            ceiling = len(results)
+            step += 1
+        stop.set()  # 한계 탐색이 끝나면 남은 세션의 음성 전송을 중단하고 정상 종료합니다.
+    else:
+        for _ in range(args.sessions):
+            launch(0)
+            if args.ramp_up > 0:
+                await asyncio.sleep(args.ramp_up / args.sessions)
+        ceiling = None
+
+    await asyncio.gather(*tasks)
+    return {
+        "wall_sec": time.perf_counter() - started,
+        "connection_ceiling": ceiling,
+        "steps": steps,
+        "summary": summarize(results),
+        "sessions": [r.to_dict() for r in results] if args.per_session else None,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="웹소켓 부하/소크 테스트")
+    parser.add_argument("--url", action="append", help="서버 주소 (예: ws://localhost:8000). 여러 번 지정하면 라운드 로빈")
+    parser.add_argument("--sessions", type=int, default=100, help="동시 세션 수 (고정 부하 모드)")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="세션을 모두 여는 데 걸리는 시간(초)")
+    parser.add_argument("--duration", type=float, default=60.0, help="세션당 음성 전송 시간(초). 음성이 짧으면 반복 재생")
+    parser.add_argument("--rate", type=float, default=1.0, help="실시간 대비 전송 속도 배율 (0 = 최대 속도)")
+    parser.add_argument("--wav", help="재생할 WAV 파일 (미지정 시 합성 음성)")
+    parser.add_argument("--seed", type=int, default=1, help="합성 음성 seed")
+    parser.add_argument("--users-ratio", type=float, default=0.0, help="/ws/users(음성 등록) 세션 비율 (0~1)")
+    parser.add_argument("--register-sec", type=float, default=5.0, help="음성 등록 세션의 음성 길이(초)")
+    parser.add_argument("--user-prefix", default="load_user_", help="테스트 사용자 ID 접두사")
+    parser.add_argument("--connect-timeout", type=float, default=10.0)
+    parser.add_argument("--finalize-timeout", type=float, default=180.0)
+    parser.add_argument("--step-sessions", type=int, default=0, help="연결 한계 탐색: 단계마다 추가할 세션 수")
+    parser.add_argument("--step-interval", type=float, default=20.0, help="연결 한계 탐색: 단계 간격(초)")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="연결 한계 탐색: 최대 세션 수")
+    parser.add_argument("--slo-ttfr-ms", type=float, default=5000.0, help="첫 결과 p95 허용치(ms)")
+    parser.add_argument("--slo-gap-ms", type=float, default=6000.0, help="결과 간격 p95 허용치(ms)")
+    parser.add_argument("--slo-error-rate", type=float, default=0.05, help="허용 에러율")
+    parser.add_argument("--per-session", action="store_true", help="세션별 상세 결과도 저장")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (기본: storage/bench/ws_load_<시각>.json)")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    args.url = args.url or ["ws://localhost:8000"]
+    pcm = load_wav_pcm(args.wav) if args.wav else synth_speech_pcm(min(args.duration, 60.0), seed=args.seed)
+
+    result = asyncio.run(run_load(args, pcm))
+    result = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "args": vars(args),
+        **result,
+    }
+    output_path = args.output or os.path.join(
+        project_root, "storage", "bench", f"ws_load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    summary = result["summary"]
+    analyze = summary["analyze"]
+    print(f"세션 {summary['sessions']}개 (에러 {summary['errors']}건), 소요 {result['wall_sec']:.1f}초")
+    print(f"첫 결과(ms) p50={analyze['ttfr_ms']['p50']:.0f} p95={analyze['ttfr_ms']['p95']:.0f}, "
+          f"결과 간격(ms) p95={analyze['gap_ms']['p95']:.0f} max={analyze['gap_ms']['max']:.0f}, "
+          f"finalize(ms) p95={analyze['finalize_ms']['p95']:.0f}")
+    if result["connection_ceiling"] is not None:
+        print(f"SLO 를 만족한 최대 동시 세션 수: {result['connection_ceiling']}")
+    print(f"결과 저장: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ DAO 테스트 스크립트 사용법
 - 감정분석 대화 리스트 조회:
     python -m app.persistence.dao_test get_user_conversations_with_emotions "1"
 """
+import json
 import sys
 import os
 from pprint import pprint
@@ -17,6 +18,7 @@ sys.path.insert(0, project_root)
 
 from app.dao.user_conversation_dao import UserConversationDAO
 from app.dao.user_dao import UserDAO
+from app.utils.emotion_utils import AUDIO_EMOTIONS, TEXT_EMOTIONS, scores_to_vector
 
 def test_connect():
     dao = UserConversationDAO()
@@ -51,6 +53,19 @@ def test_login_user(user_id):
     finally:
         dao.close()
 
+def test_get_user_voice_profile(user_uid):
+    dao = UserDAO()
+    try:
+        profile = dao.get_user_voice_profile(user_uid)
+        if profile:
+            print(f"Voice profile: {profile}")
+        else:
+            print("Voice profile not found")
+    except Exception as e:
+        print(f"Voice profile query failed: {e}")
+    finally:
+        dao.close()
+
 def test_insert_conversation_master(user_id, topic=None):
     dao = UserConversationDAO()
     try:
@@ -74,7 +89,10 @@ def test_update_master_audio_path(master_id, audio_path):
 def test_insert_conversation_detail(master_id, sentence, speaker, emotion_result, dominant_emotion, start_ms, end_ms):
     dao = UserConversationDAO()
     try:
-        detail_id = dao.insert_conversation_detail(master_id, sentence, speaker, emotion_result, dominant_emotion, start_ms, end_ms)
+        result = json.loads(emotion_result)
+        text_scores = scores_to_vector(result.get("text", {}).get("scores"), TEXT_EMOTIONS)
+        audio_scores = scores_to_vector(result.get("audio", {}).get("scores"), AUDIO_EMOTIONS)
+        detail_id = dao.insert_conversation_detail(master_id, sentence, speaker, text_scores, audio_scores, dominant_emotion, start_ms, end_ms)
         print(f"Inserted detail: id={detail_id}")
     except Exception as e:
         print(f"Insert detail failed: {e}")
@@ -145,5 +163,10 @@ if __name__ == "__main__":
             raise ValueError("인자가 맞지 않습니다.")
         user_id = sys.argv[2]
         test_login_user(user_id)
+    elif cmd == "get_user_voice_profile":
+        if len(sys.argv) < 3:
+            raise ValueError("인자가 맞지 않습니다.")
+        user_uid = int(sys.argv[2])
+        test_get_user_voice_profile(user_uid)
     else:
         raise ValueError("인자가 맞지 않습니다.") 
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+감정 점수 저장 방식 벤치마크 스크립트
+
+migrations/005_compact_emotion_scores.sql 적용 전/후에 각각 실행하여
+user_conversation_detail 행 크기와 리포트 상세 조회 시간을 비교합니다.
+(text_scores 컬럼이 없으면 '적용 전', 있으면 '적용 후'로 판단)
+005 는 백필 검증 전까지 emotion_result 를 남겨 두므로, 적용 후에는 같은 행의 JSONB 와 점수 벡터 크기를 함께 측정합니다.
+(legacy_json_bytes / vector_bytes, 백필된 행 기준)
+
+사용법:
+    python test/persistence/emotion_storage_bench.py [master_uid] [반복횟수] [결과저장경로.json]
+
+예시:
+    python test/persistence/emotion_storage_bench.py 12 50 storage/bench/emotion_storage_before.json
+    (마이그레이션 적용)
+    python test/persistence/emotion_storage_bench.py 12 50 storage/bench/emotion_storage_after.json
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.dao.user_conversation_dao import UserConversationDAO
+
+
+def detect_schema(dao) -> str:
+    rows = dao.execute_query("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'user_conversation_detail'
+    """)
+    columns = {r[0] for r in rows}
+    return "compact" if "text_scores" in columns else "jsonb"
+
+
+def measure_row_size(dao, schema: str) -> dict:
+    score_expr = (
+        "pg_column_size(d.text_scores) + pg_column_size(d.audio_scores)"
+        if schema == "compact" else "pg_column_size(d.emotion_result)"
+    )
+    rows = dao.execute_query(f"""
+        SELECT COUNT(*), AVG(pg_column_size(d.*)), AVG({score_expr}),
+               pg_total_relation_size('user_conversation_detail')
+        FROM user_conversation_detail d
+    """)
+    count, avg_row, avg_scores, table_bytes = rows[0]
+    result = {
+        "rows": count,
+        "avg_row_bytes": float(avg_row or 0),
+        "avg_score_bytes": float(avg_scores or 0),
+        "table_total_bytes": table_bytes,
+    }
+    if schema == "compact" and has_legacy_column(dao):
+        legacy = dao.execute_query("""
+            SELECT COUNT(*), AVG(pg_column_size(d.emotion_result)),
+                   AVG(pg_column_size(d.text_scores) + pg_column_size(d.audio_scores))
+            FROM user_conversation_detail d
+            WHERE d.emotion_result IS NOT NULL
+        """)
+        backfilled, legacy_bytes, vector_bytes = legacy[0]
+        result["backfilled_rows"] = backfilled
+        result["legacy_json_bytes"] = float(legacy_bytes or 0)
+        result["vector_bytes"] = float(vector_bytes or 0)
+    return result
+
+
+def has_legacy_column(dao) -> bool:
+    rows = dao.execute_query("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'user_conversation_detail' AND column_name = 'emotion_result'
+    """)
+    return bool(rows)
+
+
+def measure_report_query(dao, schema: str, master_uid: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if schema == "compact":
+            dao.get_conversation_details_by_master_uid(master_uid, limit=1000)
+        else:
+            dao.execute_query("""
+                SELECT d.uid, d.sentence, d.speaker, d.emotion_result, d.dominant_emotion,
+                       d.start_ms, d.end_ms, d.created_at
+                FROM user_conversation_detail d
+                WHERE d.master_uid = %s ORDER BY d.start_ms, d.uid
+            """, (master_uid,))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "repeat": repeat,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+if __name__ == "__main__":
+    master_uid = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    output_path = sys.argv[3] if len(sys.argv) > 3 else None
+
+    dao = UserConversationDAO()
+    try:
+        schema = detect_schema(dao)
+        result = {"schema": schema, "row_size": measure_row_size(dao, schema)}
+        if master_uid is not None:
+            result["report_query"] = measure_report_query(dao, schema, master_uid, repeat)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        if output_path:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            print(f"결과 저장: {output_path}")
+    except Exception as e:
+        print(f"벤치마크 실패: {e}")
+    finally:
+        dao.close()
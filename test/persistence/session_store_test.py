@@ -0,0 +1,83 @@
+"""
+세션 저장소(메모리) 세션 소유권/최종 분석 작업 큐 테스트 스크립트 사용법
+
+    python test/persistence/session_store_test.py
+"""
+import os
+import sys
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.services.session_store import MemorySessionStore
+
+
+def test_job_is_enqueued_once():
+    store = MemorySessionStore()
+    assert store.enqueue_job("s1", {"wav_path": "a.wav"})
+    assert not store.enqueue_job("s1", {"wav_path": "b.wav"})
+    session_id, payload, attempt = store.claim_job(lease_sec=60, max_attempts=3)
+    assert (session_id, payload["wav_path"], attempt) == ("s1", "a.wav", 1)
+    assert store.claim_job(lease_sec=60, max_attempts=3) is None
+
+
+def test_finish_is_fenced_by_attempt():
+    store = MemorySessionStore()
+    store.enqueue_job("s1", {})
+    _, _, attempt = store.claim_job(lease_sec=60, max_attempts=3)
+    assert store.renew_job("s1", attempt)
+    assert not store.renew_job("s1", attempt + 1)  # 다른 실행(attempt)은 연장 불가
+    assert not store.finish_job("s1", attempt + 1, master_uid=7)
+    assert store.finish_job("s1", attempt, master_uid=7)
+    assert store.get_job("s1") == {"status": "done", "master_uid": 7, "error": None}
+    # 끝난 작업은 다시 연장/완료할 수 없습니다.
+    assert not store.renew_job("s1", attempt)
+    assert not store.finish_job("s1", attempt, master_uid=8)
+    assert store.get_job("s1")["master_uid"] == 7
+
+
+def test_failed_job_records_error():
+    store = MemorySessionStore()
+    store.enqueue_job("s1", {})
+    _, _, attempt = store.claim_job(lease_sec=60, max_attempts=3)
+    assert store.finish_job("s1", attempt, master_uid=None, error="clova timeout")
+    assert store.get_job("s1") == {"status": "failed", "master_uid": None, "error": "clova timeout"}
+
+
+def test_session_claim_checks_user():
+    store = MemorySessionStore()
+    store.save_session("token", "s1", "user-a", {"received_bytes": 64000}, detached=True)
+    assert store.claim_session("token", "user-b") is None
+    assert store.claim_session("token", "user-a") == {"received_bytes": 64000}
+    assert store.release_session("token")
+    assert not store.release_session("token")
+
+
+
+def test_session_claim_checks_detached_and_owner():
+    # 같은 저장소를 보는 두 워커를 node_id 로 흉내 냅니다. (LiveSessionDAO 와 같은 규칙)
+    store = MemorySessionStore(node_id="node-a")
+    assert store.save_session("token", "s1", "user-a", {"received_bytes": 32000}, detached=False)
+    assert store.claim_session("token", "user-a") == {"received_bytes": 32000}  # 소유 워커의 재연결
+    store.node_id = "node-b"
+    assert store.claim_session("token", "user-a") is None  # node-a 에 연결 중
+    store.node_id = "node-a"
+    assert store.save_session("token", "s1", "user-a", {"received_bytes": 64000}, detached=True)
+    store.node_id = "node-b"
+    assert store.claim_session("token", "user-a") == {"received_bytes": 64000}  # 끊긴 세션은 이어받음
+    store.node_id = "node-a"
+    assert store.claim_session("token", "user-a") is None  # 이제 node-b 에 연결 중
+    assert not store.save_session("token", "s1", "user-a", {"received_bytes": 64000}, detached=True)
+    assert not store.release_session("token")
+    store.node_id = "node-b"
+    assert store.release_session("token")
+
+
+if __name__ == "__main__":
+    test_job_is_enqueued_once()
+    test_finish_is_fenced_by_attempt()
+    test_failed_job_records_error()
+    test_session_claim_checks_user()
+    test_session_claim_checks_detached_and_owner()
+    print("세션 저장소 테스트 통과")
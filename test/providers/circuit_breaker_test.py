@@ -0,0 +1,149 @@
+"""
+서킷 브레이커 상태 전환 테스트 스크립트 사용법
+
+    python test/providers/circuit_breaker_test.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.providers.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.providers.gemini_scheduler import GeminiScheduler
+
+
+def _open_breaker(name: str, open_sec: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker(name, window=4, min_calls=2, failure_ratio=0.5, open_sec=open_sec)
+    for _ in range(2):
+        call = breaker.call()
+        call.failure()
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_opens_after_failure_ratio():
+    breaker = CircuitBreaker("test_ratio", window=4, min_calls=4, failure_ratio=0.5, open_sec=60)
+    for ok in (True, False, True):
+        call = breaker.call()
+        call.success() if ok else call.failure()
+    assert breaker.state == CLOSED  # min_calls 미만
+    breaker.call().failure()
+    assert breaker.state == OPEN
+    assert breaker.call() is None
+    assert not breaker.available()
+
+
+def test_half_open_probe_closes_on_success():
+    breaker = _open_breaker("test_probe_success")
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    probe = breaker.call()
+    assert probe is not None
+    assert breaker.call() is None  # 시험 슬롯은 half_open_calls(1) 개
+    probe.success()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_reopens_on_failure():
+    breaker = _open_breaker("test_probe_failure")
+    time.sleep(0.06)
+    with breaker.call() as probe:
+        probe.failure()
+    assert breaker.state == OPEN
+
+
+def test_cancelled_probe_returns_slot():
+    breaker = _open_breaker("test_probe_cancel")
+    time.sleep(0.06)
+    try:
+        with breaker.call():
+            raise KeyboardInterrupt  # CancelledError 처럼 Exception 이 아닌 종료
+    except KeyboardInterrupt:
+        pass
+    assert breaker.state == HALF_OPEN
+    assert breaker.call() is not None
+
+
+def test_exception_in_block_counts_as_failure():
+    breaker = _open_breaker("test_probe_exception")
+    time.sleep(0.06)
+    try:
+        with breaker.call():
+            raise RuntimeError("provider error")
+    except RuntimeError:
+        pass
+    assert breaker.state == OPEN
+
+
+def test_stale_probe_does_not_touch_new_half_open():
+    breaker = _open_breaker("test_stale_probe")
+    time.sleep(0.06)
+    stale = breaker.call()
+    stale.failure()  # 다시 open
+    time.sleep(0.06)
+    current = breaker.call()  # 새 half_open 기간의 시험 호출
+    assert current is not None
+    stale.breaker.record_success(probe=stale.probe)  # 이전 기간의 늦은 결과
+    assert breaker.state == HALF_OPEN
+    current.success()
+    assert breaker.state == CLOSED
+
+
+def test_result_recorded_once():
+    breaker = CircuitBreaker("test_once", window=4, min_calls=1, failure_ratio=0.5, open_sec=60)
+    call = breaker.call()
+    call.success()
+    call.failure()
+    assert breaker.state == CLOSED
+
+
+
+def test_slow_call_counts_as_failure():
+    breaker = CircuitBreaker("test_slow", window=4, min_calls=1, failure_ratio=0.5, open_sec=60, slow_call_sec=0.02)
+
+    async def slow_provider():
+        await asyncio.sleep(0.05)
+
+    call = breaker.call()
+    asyncio.run(call.timed(slow_provider)())
+    call.success()
+    assert breaker.state == OPEN
+
+
+def test_queue_wait_is_not_slow_call():
+    # 토큰 1개를 먼저 써서 다음 호출이 스케줄러 대기열에서 약 0.1초 기다리게 합니다.
+    scheduler = GeminiScheduler(rate_per_sec=10.0, burst=1, max_wait={"realtime": 1.0, "batch": 1.0})
+    scheduler.acquire("batch")
+    breaker = CircuitBreaker("test_queue_wait", window=4, min_calls=1, failure_ratio=0.5, open_sec=60, slow_call_sec=0.05)
+
+    async def fast_provider(value):
+        return value
+
+    async def run():
+        call = breaker.call()
+        result = await scheduler.call_async("batch", call.timed(fast_provider), "ok")
+        call.success()
+        return time.perf_counter() - queued_at, result
+
+    queued_at = time.perf_counter()
+    elapsed, result = asyncio.run(run())
+    assert result == "ok"
+    assert elapsed >= 0.05  # 대기열 대기 시간은 slow_call_sec 보다 길었지만
+    assert breaker.state == CLOSED  # 느린 호출(실패)로 세지 않습니다.
+
+
+if __name__ == "__main__":
+    test_opens_after_failure_ratio()
+    test_half_open_probe_closes_on_success()
+    test_half_open_probe_reopens_on_failure()
+    test_cancelled_probe_returns_slot()
+    test_exception_in_block_counts_as_failure()
+    test_stale_probe_does_not_touch_new_half_open()
+    test_result_recorded_once()
+    test_slow_call_counts_as_failure()
+    test_queue_wait_is_not_slow_call()
+    print("서킷 브레이커 테스트 통과")
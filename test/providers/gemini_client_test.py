@@ -1,3 +1,4 @@
+import asyncio
 import sys
 from app.providers.gemini_client import analyze_emotions
 import numpy as np
@@ -12,7 +13,7 @@ text = "이 주임 어제 내가 요청한 수정 사항 왜 반영 안 된 거
 audio_array, sr = librosa.load(audio_path, sr=16000, mono=True)
 
 # 감정 분석 실행
-result = analyze_emotions(text, audio_array)
+result = asyncio.run(analyze_emotions(text, audio_array))
 
 # 결과 출력 (가독성 있게)
 import pprint
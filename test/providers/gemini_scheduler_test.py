@@ -0,0 +1,97 @@
+"""
+Gemini 호출 스케줄러(토큰 버킷) 테스트 스크립트 사용법
+
+    python test/providers/gemini_scheduler_test.py
+"""
+import os
+import sys
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.providers.gemini_scheduler import GeminiRateLimitedError, GeminiScheduler, is_rate_limited_error, retry_after_seconds
+
+
+def _scheduler(rate_per_sec: float, burst: int, batch_headroom: float = 0.3) -> GeminiScheduler:
+    scheduler = GeminiScheduler(rate_per_sec, burst, batch_headroom, max_wait={"realtime": 0.0, "batch": 0.0})
+    scheduler._updated = 0.0
+    return scheduler
+
+
+def test_realtime_uses_whole_bucket():
+    scheduler = _scheduler(rate_per_sec=1.0, burst=10)
+    for _ in range(10):
+        assert scheduler._try_take("realtime", 0.0) is None
+    wait = scheduler._try_take("realtime", 0.0)
+    assert wait is not None and abs(wait - 1.0) < 1e-6
+
+
+def test_batch_leaves_reserve_for_realtime():
+    scheduler = _scheduler(rate_per_sec=1.0, burst=10, batch_headroom=0.3)
+    taken = 0
+    while scheduler._try_take("batch", 0.0) is None:
+        taken += 1
+    assert taken == 7  # 예비분 3개는 realtime 몫
+    assert scheduler._try_take("realtime", 0.0) is None
+
+
+def test_batch_yields_to_waiting_realtime():
+    scheduler = _scheduler(rate_per_sec=1.0, burst=10)
+    scheduler._waiting["realtime"] = 1
+    assert scheduler._try_take("batch", 0.0) is not None
+    scheduler._waiting["realtime"] = 0
+    assert scheduler._try_take("batch", 0.0) is None
+
+
+def test_burst_one_does_not_starve_batch():
+    scheduler = _scheduler(rate_per_sec=1.0, burst=1, batch_headroom=0.5)
+    assert scheduler.batch_reserve == 0.0
+    assert scheduler._try_take("batch", 0.0) is None
+    assert scheduler._try_take("batch", 1.0) is None  # 1초 뒤 다시 한 개
+
+
+def test_pause_blocks_all_priorities():
+    scheduler = _scheduler(rate_per_sec=1.0, burst=10)
+    scheduler._paused_until = 5.0
+    assert scheduler._try_take("realtime", 0.0) == 5.0
+    assert scheduler._try_take("realtime", 6.0) is None
+
+
+def test_unlimited_rate():
+    scheduler = _scheduler(rate_per_sec=0.0, burst=1)
+    for _ in range(100):
+        assert scheduler._try_take("batch", 0.0) is None
+
+
+def test_acquire_timeout_raises():
+    scheduler = GeminiScheduler(1.0, 1, max_wait={"realtime": 0.01, "batch": 0.01})
+    scheduler.acquire("realtime")
+    try:
+        scheduler.acquire("realtime")
+    except GeminiRateLimitedError as e:
+        assert e.reason == "queue_timeout"
+    else:
+        raise AssertionError("대기 시간 초과 예외가 발생해야 합니다.")
+
+
+def test_rate_limit_detection():
+    class ResourceExhausted(Exception):
+        pass
+    assert is_rate_limited_error(ResourceExhausted("quota"))
+    assert not is_rate_limited_error(ValueError("bad request"))
+    assert retry_after_seconds(Exception("Please retry in 7.5s"), 1.0) == 7.5
+    assert retry_after_seconds(Exception("retry_delay { seconds: 12 }"), 1.0) == 12.0
+    assert retry_after_seconds(Exception("429"), 3.0) == 3.0
+
+
+if __name__ == "__main__":
+    test_realtime_uses_whole_bucket()
+    test_batch_leaves_reserve_for_realtime()
+    test_batch_yields_to_waiting_realtime()
+    test_burst_one_does_not_starve_batch()
+    test_pause_blocks_all_priorities()
+    test_unlimited_rate()
+    test_acquire_timeout_raises()
+    test_rate_limit_detection()
+    print("Gemini 스케줄러 테스트 통과")
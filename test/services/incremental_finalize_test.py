@@ -0,0 +1,79 @@
+"""
+증분 최종 분석(실시간 청크 결과 재사용) 매칭 테스트 스크립트 사용법
+
+    python test/services/incremental_finalize_test.py
+"""
+import os
+import sys
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.services.incremental_finalize import live_chunk_record, match_live_results
+from app.utils.emotion_utils import format_analysis_result
+
+CHUNK_MS = 2000
+
+
+def _emotion(positive: float, happy: float) -> dict:
+    return format_analysis_result(
+        {"positive": positive, "negative": 1.0 - positive, "neutral": 0.0},
+        {"happy": happy, "sad": 0.0, "angry": 0.0, "fear": 0.0, "disgust": 0.0, "surprise": 0.0, "neutral": 1.0 - happy},
+    )
+
+
+def test_record_drops_degraded_emotion():
+    degraded = dict(_emotion(1.0, 1.0), degraded="text_only")
+    skipped = dict(_emotion(1.0, 1.0), source={"text": "gemini", "audio": "skipped"})
+    no_audio = format_analysis_result({"positive": 1.0, "negative": 0.0, "neutral": 0.0}, None)  # 오디오 없는 청크
+    for emotion in (degraded, skipped, no_audio, None):
+        record = live_chunk_record(0, CHUNK_MS, "안녕", emotion)
+        assert record["text"] is None and record["audio"] is None
+    record = live_chunk_record(3, CHUNK_MS, "안녕", _emotion(1.0, 1.0))
+    assert (record["start_ms"], record["end_ms"]) == (6000, 8000)
+    assert "similarity" not in record  # 음성 유사도는 세그먼트마다 다시 계산
+
+
+def test_covered_segment_reuses_weighted_emotion():
+    live = [
+        live_chunk_record(0, CHUNK_MS, "오늘 날씨가", _emotion(1.0, 1.0)),
+        live_chunk_record(1, CHUNK_MS, "정말 좋네요", _emotion(0.0, 0.0)),
+    ]
+    # 0~3000ms: 첫 청크 2000ms, 둘째 청크 1000ms 겹침 → 2:1 가중 평균
+    matches = match_live_results([{"start": 0, "end": 3000, "text": "오늘 날씨가 정말"}], live)
+    result = matches[0]
+    assert result is not None
+    assert abs(result["text"]["scores"]["positive"] - 2 / 3) < 1e-6
+    assert abs(result["audio"]["scores"]["happy"] - 2 / 3) < 1e-6
+    assert result["text"]["dominant"] == "positive"
+
+
+def test_uncovered_or_changed_segments_are_recomputed():
+    live = [
+        live_chunk_record(0, CHUNK_MS, "오늘 날씨가", _emotion(1.0, 1.0)),
+        live_chunk_record(1, CHUNK_MS, "정말 좋네요", None),  # 재사용할 수 없는 청크
+    ]
+    segments = [
+        {"start": 0, "end": 4000, "text": "오늘 날씨가 정말 좋네요"},  # 절반만 덮임
+        {"start": 0, "end": 2000, "text": "내일은 비가 온대요"},  # 인식 문장이 다름
+        {"start": 5000, "end": 5000, "text": "빈 구간"},
+        {"start": 9000, "end": 11000, "text": "실시간 결과 없음"},
+    ]
+    assert match_live_results(segments, live) == [None, None, None, None]
+
+
+def test_matches_follow_segment_order():
+    live = [live_chunk_record(i, CHUNK_MS, f"문장 {i}", _emotion(1.0, 1.0)) for i in (2, 0, 1)]
+    segments = [{"start": i * CHUNK_MS, "end": (i + 1) * CHUNK_MS, "text": f"문장 {i}"} for i in range(4)]
+    matches = match_live_results(segments, live)
+    assert [m is not None for m in matches] == [True, True, True, False]
+    assert match_live_results(segments, None) == [None] * 4
+
+
+if __name__ == "__main__":
+    test_record_drops_degraded_emotion()
+    test_covered_segment_reuses_weighted_emotion()
+    test_uncovered_or_changed_segments_are_recomputed()
+    test_matches_follow_segment_order()
+    print("증분 최종 분석 매칭 테스트 통과")
@@ -0,0 +1,46 @@
+"""
+사용자 음성 등록 샘플 중심(voice_centroid) 테스트 스크립트 사용법 (torch/speechbrain 설치 필요)
+
+    python test/services/user_voice_service_test.py
+"""
+import os
+import sys
+
+import numpy as np
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.services.user_voice_service import voice_centroid
+
+
+def test_single_sample_is_normalized():
+    centroid, spread = voice_centroid([np.array([3.0, 4.0, 0.0])])
+    assert np.allclose(centroid, [0.6, 0.8, 0.0], atol=1e-6)
+    assert abs(spread) < 1e-6
+    assert centroid.dtype == np.float32
+
+
+def test_sample_scale_does_not_weight_centroid():
+    # 크기가 100배인 샘플도 방향만 반영되므로 중심은 두 축의 정확히 가운데
+    centroid, spread = voice_centroid([np.array([100.0, 0.0]), np.array([0.0, 1.0])])
+    assert np.allclose(centroid, [np.sqrt(0.5), np.sqrt(0.5)], atol=1e-6)
+    assert abs(spread - (1.0 - np.sqrt(0.5))) < 1e-6
+
+
+def test_spread_grows_with_disagreement():
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=192)
+    close = [base + rng.normal(scale=0.05, size=192) for _ in range(5)]
+    far = [base + rng.normal(scale=1.0, size=192) for _ in range(5)]
+    _, close_spread = voice_centroid(close)
+    _, far_spread = voice_centroid(far)
+    assert 0.0 <= close_spread < far_spread
+
+
+if __name__ == "__main__":
+    test_single_sample_is_normalized()
+    test_sample_scale_does_not_weight_centroid()
+    test_spread_grows_with_disagreement()
+    print("음성 등록 중심 테스트 통과")
@@ -0,0 +1,92 @@
+"""
+감정 점수 정규화/변환 테스트 스크립트 사용법
+
+    python test/utils/emotion_utils_test.py
+"""
+import os
+import sys
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.utils.emotion_utils import (
+    AUDIO_EMOTIONS, TEXT_EMOTIONS, format_analysis_result, format_analysis_result_from_vectors, get_dominant_emotion,
+    normalize_scores, scores_to_vector, vector_to_scores,
+)
+
+
+def test_normalize_valid_scores():
+    scores, adjusted = normalize_scores({"positive": 0.2, "negative": 0.3, "neutral": 0.5}, TEXT_EMOTIONS)
+    assert scores == {"positive": 0.2, "negative": 0.3, "neutral": 0.5}
+    assert adjusted is False
+
+
+def test_normalize_rescales_sum():
+    scores, adjusted = normalize_scores({"positive": 2, "negative": 1, "neutral": 1}, TEXT_EMOTIONS)
+    assert adjusted is True
+    assert scores == {"positive": 0.5, "negative": 0.25, "neutral": 0.25}
+
+
+def test_normalize_missing_and_negative_labels():
+    scores, adjusted = normalize_scores({"positive": 0.6, "negative": -0.1}, TEXT_EMOTIONS)
+    assert adjusted is True
+    assert scores == {"positive": 1.0, "negative": 0.0, "neutral": 0.0}
+
+
+def test_normalize_rejects_unusable_responses():
+    for raw in (None, [0.3, 0.7], {"positive": "high"}, {"positive": True}, {"positive": float("nan")},
+                {"positive": 0, "negative": 0, "neutral": 0}):
+        assert normalize_scores(raw, TEXT_EMOTIONS) == (None, False), raw
+
+
+def test_unanalyzed_modality_is_not_neutral():
+    # 분석하지 못한 모달리티는 중립 점수로 채우지 않고 None -> DB NULL -> 읽을 때 다시 None
+    text = {"positive": 0.7, "negative": 0.1, "neutral": 0.2}
+    result = format_analysis_result(text, None)
+    assert result["audio"] is None
+    assert result["text"]["dominant"] == "positive"
+    assert scores_to_vector(None, AUDIO_EMOTIONS) is None
+    stored = (scores_to_vector(text, TEXT_EMOTIONS), scores_to_vector(None, AUDIO_EMOTIONS))
+    assert format_analysis_result_from_vectors(*stored) == result
+    assert format_analysis_result_from_vectors(None, None, include_scores=False) == {"text": None, "audio": None}
+
+
+
+def test_vector_round_trip():
+    scores = {"happy": 0.1, "sad": 0.2, "angry": 0.3, "fear": 0.0, "disgust": 0.0, "surprise": 0.1, "neutral": 0.3}
+    vector = scores_to_vector(scores, AUDIO_EMOTIONS)
+    assert len(vector) == len(AUDIO_EMOTIONS)
+    assert vector_to_scores(vector, AUDIO_EMOTIONS) == scores
+
+
+def test_format_from_vectors_matches_dict_result():
+    text = {"positive": 0.1, "negative": 0.7, "neutral": 0.2}
+    audio = {"happy": 0.0, "sad": 0.1, "angry": 0.6, "fear": 0.1, "disgust": 0.0, "surprise": 0.0, "neutral": 0.2}
+    expected = format_analysis_result(text, audio)
+    result = format_analysis_result_from_vectors(scores_to_vector(text, TEXT_EMOTIONS), scores_to_vector(audio, AUDIO_EMOTIONS))
+    assert result == expected
+    assert result["audio"]["dominant"] == "angry" and result["audio"]["standard"] == "negative"
+
+
+def test_all_zero_vector_is_neutral():
+    # 모두 0 인 벡터는 첫 감정(positive/happy)이 아니라 neutral (SQL emotion_argmax 와 동일)
+    result = format_analysis_result_from_vectors([0.0] * len(TEXT_EMOTIONS), [0.0] * len(AUDIO_EMOTIONS))
+    for modality in ("text", "audio"):
+        assert result[modality]["dominant"] == "neutral", result
+        assert result[modality]["standard"] == "neutral" and result[modality]["korean"] == "중립"
+    assert get_dominant_emotion({"positive": 0.0, "negative": 0.0}) == "neutral"
+    # 동점이면 앞쪽 감정
+    assert get_dominant_emotion({"positive": 0.5, "negative": 0.5, "neutral": 0.0}) == "positive"
+
+
+if __name__ == "__main__":
+    test_normalize_valid_scores()
+    test_normalize_rescales_sum()
+    test_normalize_missing_and_negative_labels()
+    test_normalize_rejects_unusable_responses()
+    test_unanalyzed_modality_is_not_neutral()
+    test_vector_round_trip()
+    test_format_from_vectors_matches_dict_result()
+    test_all_zero_vector_is_neutral()
+    print("감정 점수 유틸 테스트 통과")
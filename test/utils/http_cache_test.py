@@ -0,0 +1,52 @@
+"""
+리포트 응답 캐시(LRUResponseCache) 테스트 스크립트 사용법
+
+    python test/utils/http_cache_test.py
+"""
+import os
+import sys
+import time
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.utils.http_cache import LRUResponseCache, etag_matches
+
+
+def test_invalidate_removes_only_matching_entries():
+    cache = LRUResponseCache(max_entries=8)
+    etag = cache.put((1, 200, None, None), b'{"page": 1}')
+    cache.put((1, 200, "next", None), b'{"page": 2}')
+    cache.put((2, 200, None, None), b'{"other": 1}')
+    assert cache.get((1, 200, None, None)) == (b'{"page": 1}', etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert cache.invalidate(lambda key: key[0] == 1) == 2
+    assert cache.get((1, 200, None, None)) is None
+    assert cache.get((2, 200, None, None)) is not None
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUResponseCache(max_entries=8, ttl_sec=0.05)
+    cache.put("key", b"body")
+    assert cache.get("key") is not None
+    time.sleep(0.1)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = LRUResponseCache(max_entries=2)
+    cache.put("a", b"a")
+    cache.put("b", b"b")
+    cache.get("a")
+    cache.put("c", b"c")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+if __name__ == "__main__":
+    test_invalidate_removes_only_matching_entries()
+    test_entries_expire_after_ttl()
+    test_lru_eviction()
+    print("응답 캐시 테스트 통과")
@@ -0,0 +1,45 @@
+"""
+메트릭 text format 출력 테스트 스크립트 사용법
+
+    python test/utils/metrics_test.py
+"""
+import os
+import sys
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.utils.metrics import MetricsRegistry
+
+
+def test_label_escaping():
+    registry = MetricsRegistry()
+    counter = registry.counter("escape_total", "라벨 이스케이프 확인", ("path",))
+    counter.inc(path='C:\\tmp\\"a"\nb')
+    sample = registry.render().splitlines()[-1]
+    assert sample == 'escape_total{path="C:\\\\tmp\\\\\\"a\\"\\nb"} 1.0', sample
+
+
+def test_help_escaping():
+    registry = MetricsRegistry()
+    registry.gauge("help_gauge", "첫 줄\n둘째 줄 \\ 끝")
+    help_line = registry.render().splitlines()[0]
+    assert help_line == "# HELP help_gauge 첫 줄\\n둘째 줄 \\\\ 끝", help_line
+
+
+def test_histogram_labels():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "지연 시간", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.5, stage='a"b')
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="a\\"b",le="0.1"} 0' in lines, lines
+    assert 'latency_seconds_bucket{stage="a\\"b",le="+Inf"} 1' in lines, lines
+    assert 'latency_seconds_count{stage="a\\"b"} 1' in lines, lines
+
+
+if __name__ == "__main__":
+    test_label_escaping()
+    test_help_escaping()
+    test_histogram_labels()
+    print("메트릭 출력 테스트 통과")
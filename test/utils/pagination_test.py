@@ -0,0 +1,66 @@
+"""
+키셋 페이지네이션 커서/fields 파라미터 테스트 스크립트 사용법
+
+    python test/utils/pagination_test.py
+"""
+import os
+import sys
+from datetime import datetime
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.utils.pagination import INT32_MAX, cursor_int, decode_cursor, encode_cursor, parse_fields
+
+LIST_KEY = (datetime.fromisoformat, cursor_int)
+DETAIL_KEY = (cursor_int, cursor_int)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 6, 16, 16, 36, 40, 382207)
+    cursor = encode_cursor(str(created_at), 17)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, LIST_KEY) == [created_at, 17]
+    assert decode_cursor(encode_cursor(1200, 5), DETAIL_KEY) == [1200, 5]
+
+
+def test_malformed_cursor_raises_value_error():
+    for cursor in ("%%%", "abc", "한글", encode_cursor("x", "y"), encode_cursor(1), encode_cursor("2025-01-01", [1])):
+        try:
+            decode_cursor(cursor, LIST_KEY)
+        except ValueError:
+            continue
+        raise AssertionError(f"ValueError 가 발생해야 합니다: {cursor}")
+
+
+
+def test_cursor_int_keys_are_strict():
+    # 실수, 숫자 문자열, bool, INTEGER 범위를 벗어난 값은 int() 로 바꾸지 않고 400 (ValueError)
+    for key in (1.5, 2.0, "7", True, None, INT32_MAX + 1, -2**31 - 1, 10**30):
+        try:
+            decode_cursor(encode_cursor(1200, key), DETAIL_KEY)
+        except ValueError:
+            continue
+        raise AssertionError(f"ValueError 가 발생해야 합니다: {key!r}")
+    assert cursor_int(INT32_MAX) == INT32_MAX
+
+
+def test_parse_fields():
+    allowed = {"sentence": (), "speaker": (), "emotion": ()}
+    assert parse_fields(None, allowed, ("sentence",)) == ["sentence"]
+    assert parse_fields(" speaker, emotion ", allowed, ("sentence",)) == ["speaker", "emotion"]
+    try:
+        parse_fields("sentence,audio_path", allowed, ("sentence",))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("허용되지 않은 필드는 ValueError 가 발생해야 합니다.")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_malformed_cursor_raises_value_error()
+    test_cursor_int_keys_are_strict()
+    test_parse_fields()
+    print("페이지네이션 테스트 통과")
@@ -0,0 +1,103 @@
+"""
+결과 메시지 인코딩(json/msgpack/binary) 왕복 테스트 스크립트 사용법
+
+    python test/utils/result_codec_test.py
+"""
+import json
+import os
+import sys
+
+# 테스트 스크립트에서 app 모듈을 찾을 수 있도록 프로젝트 루트를 path에 추가
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+sys.path.insert(0, project_root)
+
+from app.utils.emotion_utils import format_analysis_result
+from app.utils.result_codec import ResultEncoder, decode_frame, expand_message, negotiate_encoding
+
+
+def _result_message(**overrides) -> dict:
+    emotion = format_analysis_result(
+        {"positive": 0.125, "negative": 0.75, "neutral": 0.125},
+        {"happy": 0.0, "sad": 0.25, "angry": 0.5, "fear": 0.0, "disgust": 0.0, "surprise": 0.0, "neutral": 0.25},
+    )
+    emotion["degraded"] = "audio_only"
+    emotion["source"] = {"text": "skipped", "audio": "gemini"}
+    message = {
+        "event": "emotion_analysis",
+        "chunk_id": 42,
+        "transcript": "오늘 회의는 어땠어?",
+        "emotion": emotion,
+        "is_same": True,
+        "similarity": 0.8125,
+        "provider_status": {"gemini_text": "open", "gemini_audio": "closed", "google_stt": "half_open",
+                            "clova_short": "closed", "clova_long": "closed"},
+    }
+    message.update(overrides)
+    return message
+
+
+def _round_trip(encoding: str, message: dict) -> dict:
+    encoder = ResultEncoder(encoding)
+    frame = encoder.encode(message)
+    received = {"text": frame} if isinstance(frame, str) else {"bytes": frame}
+    decoded = decode_frame(received, encoding)
+    return expand_message(decoded) if encoder.compact else decoded
+
+
+def test_json_round_trip():
+    message = _result_message()
+    assert _round_trip("json", message) == json.loads(json.dumps(message))
+
+
+def test_compact_round_trip():
+    message = _result_message()
+    # 점수는 float16 으로 보내므로 2^-n 으로 표현되는 값을 사용해 정확히 비교합니다.
+    for encoding in ("msgpack", "binary"):
+        assert _round_trip(encoding, message) == message, encoding
+
+
+def test_binary_without_optional_fields():
+    message = _result_message(emotion=None, is_same=None, similarity=None, transcript="")
+    decoded = _round_trip("binary", message)
+    assert decoded["emotion"] is None
+    assert decoded["is_same"] is None and decoded["similarity"] is None
+    assert decoded["chunk_id"] == 42
+
+
+def test_progressive_update_keeps_utterance_id():
+    message = _result_message(event="emotion_update", utterance_id=42)
+    assert _round_trip("binary", message)["utterance_id"] == 42
+
+
+def test_non_result_events_stay_json():
+    message = {"event": "ack", "offset": 64000}
+    assert _round_trip("binary", message) == message
+    assert _round_trip("msgpack", message) == message
+
+
+
+def test_unanalyzed_modality_round_trip():
+    # 분석하지 않은 모달리티(None)는 compact 인코딩에서도 0 점수가 아니라 None 으로 복원됩니다.
+    emotion = format_analysis_result({"positive": 0.75, "negative": 0.125, "neutral": 0.125}, None)
+    emotion["degraded"] = "text_only"
+    message = _result_message(emotion=emotion)
+    for encoding in ("json", "msgpack", "binary"):
+        decoded = _round_trip(encoding, message)
+        assert decoded["emotion"] == emotion, (encoding, decoded["emotion"])
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("binary") == "binary"
+    assert negotiate_encoding(None) == "json"
+    assert negotiate_encoding("protobuf") == "json"
+
+
+if __name__ == "__main__":
+    test_json_round_trip()
+    test_compact_round_trip()
+    test_binary_without_optional_fields()
+    test_progressive_update_keeps_utterance_id()
+    test_non_result_events_stay_json()
+    test_unanalyzed_modality_round_trip()
+    test_negotiate_encoding()
+    print("결과 인코딩 테스트 통과")